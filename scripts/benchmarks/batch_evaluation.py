@@ -0,0 +1,81 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the evaluation of a grounded condition and of a numeric metric over
+many random states, state by state with the StateEvaluator and at once with
+the BatchEvaluator.
+
+Usage: python3 scripts/benchmarks/batch_evaluation.py [--states N] [--robots R]
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent.resolve()))
+
+from unified_planning.shortcuts import *
+from unified_planning.model import UPState
+from unified_planning.model.walkers import BatchEvaluator, StateBatch, StateEvaluator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--states", type=int, default=10000)
+    parser.add_argument("--robots", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    Robot = UserType("Robot")
+    charged = Fluent("charged", BoolType(), r=Robot)
+    battery = Fluent("battery", IntType(0, 100), r=Robot)
+    problem = Problem("robots")
+    problem.add_fluent(charged, default_initial_value=False)
+    problem.add_fluent(battery, default_initial_value=0)
+    robots = [Object(f"r{i}", Robot) for i in range(args.robots)]
+    problem.add_objects(robots)
+
+    rng = random.Random(args.seed)
+    states = []
+    for _ in range(args.states):
+        values = {}
+        for r in robots:
+            values[charged(r)] = Bool(rng.random() < 0.9)
+            values[battery(r)] = Int(rng.randint(0, 100))
+        states.append(UPState(values))
+    condition = And(Or(charged(r), GT(battery(r), 20)) for r in robots)
+    metric = Div(Plus(battery(r) for r in robots), len(robots))
+
+    se = StateEvaluator(problem)
+    start = time.perf_counter()
+    expected = [(se.evaluate(condition, s), se.evaluate(metric, s)) for s in states]
+    print(f"StateEvaluator: {time.perf_counter() - start:.3f}s")
+
+    for exact in (False, True):
+        be = BatchEvaluator(problem, exact=exact)
+        start = time.perf_counter()
+        batch = StateBatch(states)
+        conditions, metrics = be.evaluate([condition, metric], batch)
+        elapsed = time.perf_counter() - start
+        assert all(
+            c == e_c.bool_constant_value() and abs(m - e_m.constant_value()) < 1e-9
+            for c, m, (e_c, e_m) in zip(conditions, metrics, expected)
+        )
+        print(f"BatchEvaluator (exact={exact}): {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
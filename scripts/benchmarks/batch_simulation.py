@@ -0,0 +1,72 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the breadth-first expansion of the states of an example problem,
+state by state with get_applicable_actions, apply and is_goal, and frontier by
+frontier with expand and goal_mask.
+
+Usage: python3 scripts/benchmarks/batch_simulation.py [--problem NAME] [--depth D]
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent.resolve()))
+
+from unified_planning.engines import UPSequentialSimulator
+from unified_planning.test.examples import get_example_problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--problem", default="hierarchical_blocks_world")
+    parser.add_argument("--depth", type=int, default=4)
+    args = parser.parse_args()
+
+    problem = get_example_problems()[args.problem].problem
+
+    simulator = UPSequentialSimulator(problem)
+    start = time.perf_counter()
+    frontier = [simulator.get_initial_state()]
+    n_states, n_goals = 1, 0
+    for _ in range(args.depth):
+        new_frontier = []
+        for state in frontier:
+            for action, params in simulator.get_applicable_actions(state):
+                successor = simulator.apply(state, action, params)
+                if successor is not None:
+                    new_frontier.append(successor)
+        frontier = new_frontier
+        n_states += len(frontier)
+        n_goals += sum(1 for s in frontier if simulator.is_goal(s))
+    elapsed = time.perf_counter() - start
+    print(f"state by state: {n_states} states, {n_goals} goals in {elapsed:.3f}s")
+
+    simulator = UPSequentialSimulator(problem)
+    start = time.perf_counter()
+    frontier = [simulator.get_initial_state()]
+    n_states, n_goals = 1, 0
+    for _ in range(args.depth):
+        expanded = simulator.expand(frontier)
+        frontier = [s for successors in expanded for _, _, s in successors]
+        n_states += len(frontier)
+        n_goals += sum(simulator.goal_mask(frontier))
+    elapsed = time.perf_counter() - start
+    print(f"batched: {n_states} states, {n_goals} goals in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the DeltaSimpleTemporalNetwork on large STNs.
+
+It compares branching with copy_stn against checkpoint/backtrack, and
+building a network with add against add_many.
+
+Usage: python3 scripts/benchmarks/delta_stn.py [--events N] [--branches B] [--window W]
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent.resolve()))
+
+from unified_planning.model import DeltaSimpleTemporalNetwork
+
+
+def chain_stn(n_events: int) -> DeltaSimpleTemporalNetwork:
+    stn: DeltaSimpleTemporalNetwork[int] = DeltaSimpleTemporalNetwork()
+    for i in range(n_events - 1):
+        stn.insert_interval(i, i + 1, left_bound=1, right_bound=10)
+    return stn
+
+
+def random_branch(rng: random.Random, n_events: int, size: int, window: int):
+    # Like in a forward temporal search, the constraints of a branch involve
+    # the last `window` events; y must follow x by more than the chain lower
+    # bounds, so the distances of the events after y are updated.
+    res = []
+    for _ in range(size):
+        x = rng.randrange(n_events - window, n_events - 1)
+        y = rng.randrange(x + 1, n_events)
+        res.append((x, y, -rng.randint(2, 5) * (y - x)))
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--branches", type=int, default=200)
+    parser.add_argument("--branch-size", type=int, default=5)
+    parser.add_argument("--window", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    branches = [
+        random_branch(rng, args.events, args.branch_size, args.window)
+        for _ in range(args.branches)
+    ]
+
+    stn = chain_stn(args.events)
+    start = time.perf_counter()
+    for branch in branches:
+        child = stn.copy_stn()
+        for x, y, b in branch:
+            child.add(x, y, b)
+        child.check_stn()
+    copy_time = time.perf_counter() - start
+
+    stn = chain_stn(args.events)
+    start = time.perf_counter()
+    cp = stn.checkpoint()
+    for branch in branches:
+        for x, y, b in branch:
+            stn.add(x, y, b)
+        stn.check_stn()
+        stn.backtrack(cp)
+    trail_time = time.perf_counter() - start
+
+    print(f"STN with {args.events} events, {args.branches} branches:")
+    print(f"  copy_stn branching:            {copy_time:.3f}s")
+    print(f"  checkpoint/backtrack branching: {trail_time:.3f}s")
+
+    # Building the whole network from scratch, like STNPlan does
+    batch = [(i, i + 1, -1) for i in range(args.events - 1)]
+    batch.extend((i + 1, i, 10) for i in range(args.events - 1))
+    batch.extend(c for branch in branches for c in branch)
+    rng.shuffle(batch)
+    stn = DeltaSimpleTemporalNetwork()
+    start = time.perf_counter()
+    for x, y, b in batch:
+        stn.add(x, y, b)
+    add_time = time.perf_counter() - start
+
+    stn = DeltaSimpleTemporalNetwork()
+    start = time.perf_counter()
+    stn.add_many(batch)
+    add_many_time = time.perf_counter() - start
+
+    print(f"STN built from {len(batch)} shuffled constraints:")
+    print(f"  add:      {add_time:.3f}s")
+    print(f"  add_many: {add_many_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the engine selection path: the ProblemKind comparisons between the kinds
+of the builtin test cases of up_test_cases and the kinds supported by the installed
+engines, and the selection done by the Factory for every operation mode and
+compilation kind.
+
+Usage: python3 scripts/benchmarks/engine_selection.py [--repetitions N] [--filter SUBSTRING]
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "up_test_cases"))
+
+from unified_planning.engines import CompilationKind, OperationMode
+from unified_planning.environment import get_environment
+from unified_planning.exceptions import UPNoSuitableEngineAvailableException
+from up_test_cases.builtin import get_test_cases  # type: ignore[import]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repetitions", type=int, default=20)
+    parser.add_argument("--filter", default="")
+    args = parser.parse_args()
+
+    kinds = [
+        tc.problem.kind
+        for name, tc in sorted(get_test_cases().items())
+        if args.filter in name
+    ]
+    factory = get_environment().factory
+    engines = [factory._engines[name] for name in factory._preference_list]
+    supported_kinds = [e.supported_kind() for e in engines]
+    print(f"{len(kinds)} problem kinds, {len(engines)} engines")
+
+    start = time.perf_counter()
+    supported = 0
+    for _ in range(args.repetitions):
+        for kind in kinds:
+            for supported_kind in supported_kinds:
+                supported += kind <= supported_kind
+    elapsed = time.perf_counter() - start
+    comparisons = args.repetitions * len(kinds) * len(supported_kinds)
+    print(
+        f"{'comparisons':30} {comparisons:8} in {elapsed:7.3f}s "
+        f"({elapsed / comparisons * 1e6:.2f}us each, {supported} supported)"
+    )
+
+    start = time.perf_counter()
+    hashes = set()
+    for _ in range(args.repetitions):
+        for kind in kinds:
+            hashes.add(hash(kind))
+            for oth in kinds:
+                kind == oth
+    elapsed = time.perf_counter() - start
+    print(f"{'equalities and hashes':30} {'':8} in {elapsed:7.3f}s")
+
+    selections = [
+        (mode, None)
+        for mode in OperationMode
+        if mode.value in ("plan_validator", "sequential_simulator", "oneshot_planner")
+    ]
+    selections.extend((OperationMode.COMPILER, ck) for ck in CompilationKind)
+    for operation_mode, compilation_kind in selections:
+        start = time.perf_counter()
+        found = 0
+        for _ in range(args.repetitions):
+            for kind in kinds:
+                try:
+                    factory._get_engine_class(
+                        operation_mode,
+                        problem_kind=kind,
+                        compilation_kind=compilation_kind,
+                    )
+                    found += 1
+                except UPNoSuitableEngineAvailableException:
+                    pass
+        elapsed = time.perf_counter() - start
+        label = operation_mode.value
+        if compilation_kind is not None:
+            label = compilation_kind.name.lower()
+        print(
+            f"{label:30} {args.repetitions * len(kinds):8} in {elapsed:7.3f}s "
+            f"({found} found)"
+        )
+
+
+if __name__ == "__main__":
+    main()
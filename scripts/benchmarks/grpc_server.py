@@ -0,0 +1,126 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the throughput and latency of the UnifiedPlanning gRPC server: a server
+is started on the loopback interface and concurrent clients send planOneShot
+requests for the example problems solvable by the up_heuristic_search planner.
+
+Usage: python3 scripts/benchmarks/grpc_server.py [--requests N] [--clients C]
+    [--workers W] [--cache-size S] [--aio]
+"""
+
+import argparse
+import asyncio
+import pathlib
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = pathlib.Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+
+import grpc  # type: ignore[import]
+
+import unified_planning.grpc.generated.unified_planning_pb2 as proto
+from unified_planning.engines.heuristic_search_planner import HeuristicSearchPlanner
+from unified_planning.grpc.generated.unified_planning_pb2_grpc import (
+    UnifiedPlanningStub,
+)
+from unified_planning.grpc.proto_writer import ProtobufWriter  # type: ignore[attr-defined]
+from unified_planning.grpc.server import (
+    UnifiedPlanningServicer,
+    start_aio_server,
+    start_server,
+)
+from unified_planning.model import Problem
+from unified_planning.test.examples import get_example_problems
+
+
+def report(latencies, elapsed, servicer):
+    latencies = sorted(latencies)
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+    print(
+        f"{len(latencies)} requests in {elapsed:.3f}s: "
+        f"{len(latencies) / elapsed:.1f} requests/s, latency mean "
+        f"{statistics.mean(latencies) * 1000:.2f}ms, p50 {percentile(0.5) * 1000:.2f}ms, "
+        f"p99 {percentile(0.99) * 1000:.2f}ms, cache {servicer.cache_stats}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--cache-size", type=int, default=128)
+    parser.add_argument("--aio", action="store_true")
+    args = parser.parse_args()
+
+    writer = ProtobufWriter()
+    requests = [
+        proto.PlanRequest(problem=writer.convert(ex.problem), timeout=10)
+        for ex in get_example_problems().values()
+        if isinstance(ex.problem, Problem)
+        and ex.valid_plans
+        and HeuristicSearchPlanner.supports(ex.problem.kind)
+    ]
+    print(f"{len(requests)} problems")
+    servicer = UnifiedPlanningServicer(
+        planner_name="up_heuristic_search", cache_size=args.cache_size
+    )
+    if args.aio:
+        asyncio.run(run_aio(args, servicer, requests))
+        return
+
+    server, port = start_server(servicer=servicer, max_workers=args.workers)
+    try:
+        with grpc.insecure_channel(f"localhost:{port}") as channel:
+            stub = UnifiedPlanningStub(channel)
+
+            def send(i):
+                start = time.perf_counter()
+                stub.planOneShot(requests[i % len(requests)])
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.clients) as clients:
+                latencies = list(clients.map(send, range(args.requests)))
+            report(latencies, time.perf_counter() - start, servicer)
+    finally:
+        server.stop(None)
+
+
+async def run_aio(args, servicer, requests):
+    server, port = await start_aio_server(servicer=servicer, max_workers=args.workers)
+    try:
+        async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+            stub = UnifiedPlanningStub(channel)
+            semaphore = asyncio.Semaphore(args.clients)
+
+            async def send(i):
+                async with semaphore:
+                    start = time.perf_counter()
+                    await stub.planOneShot(requests[i % len(requests)])
+                    return time.perf_counter() - start
+
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(send(i) for i in range(args.requests)))
+            report(latencies, time.perf_counter() - start, servicer)
+    finally:
+        await server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the up_heuristic_search planner on the builtin test cases of
+up_test_cases supported by the planner; every plan found is validated.
+
+Usage: python3 scripts/benchmarks/heuristic_search.py [--timeout T] [--filter SUBSTRING]
+    [--configs gbfs:hadd astar:hmax ...]
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "up_test_cases"))
+
+from unified_planning.engines import (
+    HeuristicSearchPlanner,
+    PlanGenerationResultStatus,
+    SequentialPlanValidator,
+)
+from unified_planning.model import Problem
+from up_test_cases.builtin import get_test_cases  # type: ignore[import]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--filter", default="")
+    parser.add_argument(
+        "--configs",
+        nargs="+",
+        default=["gbfs:goal_count", "gbfs:hadd", "gbfs:hff", "astar:hmax"],
+        help="search:heuristic pairs",
+    )
+    args = parser.parse_args()
+
+    test_cases = {
+        name: tc
+        for name, tc in get_test_cases().items()
+        if args.filter in name
+        and isinstance(tc.problem, Problem)
+        and HeuristicSearchPlanner.supports(tc.problem.kind)
+    }
+    validator = SequentialPlanValidator()
+    for config in args.configs:
+        search, heuristic = config.split(":")
+        planner = HeuristicSearchPlanner(search=search, heuristic=heuristic)
+        solved, total_time = 0, 0.0
+        print(f"== {config}")
+        for name, tc in sorted(test_cases.items()):
+            start = time.perf_counter()
+            res = planner.solve(tc.problem, timeout=args.timeout)
+            elapsed = time.perf_counter() - start
+            total_time += elapsed
+            valid = res.plan is not None and bool(
+                validator.validate(tc.problem, res.plan)
+            )
+            unsolvable = res.status == PlanGenerationResultStatus.UNSOLVABLE_PROVEN
+            expected = tc.solvable != unsolvable and (tc.solvable or res.plan is None)
+            solved += valid
+            print(
+                f"{name:60} {res.status.name:26} {elapsed:7.3f}s "
+                f"expanded={(res.metrics or {}).get('expanded_states', '-'):>7} "
+                f"length={len(res.plan.actions) if res.plan is not None else '-'}"
+                f"{'' if res.plan is None or valid else ' INVALID'}"
+                f"{'' if expected else ' UNEXPECTED'}"
+            )
+        print(
+            f"{config}: {solved}/{len(test_cases)} solved and validated in {total_time:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the removal of the irrelevant elements of a grounded problem: a robot
+moves on a grid of the given size, where only the first row is connected to the
+goal, and can paint every cell; the grounded problem is compiled with the
+IrrelevantElementsRemover and both problems are written in PDDL.
+
+Usage: python3 scripts/benchmarks/irrelevant_elements_remover.py [--size N]
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+
+from unified_planning.shortcuts import *
+from unified_planning.engines.compilers import Grounder, IrrelevantElementsRemover
+from unified_planning.io import PDDLWriter
+
+
+def make_problem(size: int) -> Problem:
+    Cell = UserType("Cell")
+    robot_at = Fluent("robot_at", BoolType(), c=Cell)
+    connected = Fluent("connected", BoolType(), c_from=Cell, c_to=Cell)
+    painted = Fluent("painted", BoolType(), c=Cell)
+    move = InstantaneousAction("move", c_from=Cell, c_to=Cell)
+    c_from, c_to = move.parameters
+    move.add_precondition(robot_at(c_from))
+    move.add_precondition(connected(c_from, c_to))
+    move.add_effect(robot_at(c_from), False)
+    move.add_effect(robot_at(c_to), True)
+    paint = InstantaneousAction("paint", c=Cell)
+    paint.add_precondition(robot_at(paint.parameter("c")))
+    paint.add_effect(painted(paint.parameter("c")), True)
+    problem = Problem("grid")
+    for fluent in (robot_at, connected, painted):
+        problem.add_fluent(fluent, default_initial_value=False)
+    problem.add_actions([move, paint])
+    cells = [[Object(f"c_{i}_{j}", Cell) for j in range(size)] for i in range(size)]
+    with problem.bulk_load():
+        for row in cells:
+            problem.add_objects(row)
+        for i, row in enumerate(cells):
+            for j in range(size - 1):
+                # only the first row can be reached from the initial cell
+                problem.set_initial_value(connected(row[j], row[j + 1]), True)
+                if i > 0:
+                    problem.set_initial_value(connected(row[j], cells[i - 1][j]), True)
+    problem.set_initial_value(robot_at(cells[0][0]), True)
+    problem.add_goal(robot_at(cells[0][size - 1]))
+    return problem
+
+
+def timed(label, function):
+    start = time.perf_counter()
+    result = function()
+    print(f"{label:30} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def write(problem: Problem):
+    writer = PDDLWriter(problem)
+    return len(writer.get_domain()) + len(writer.get_problem())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=15)
+    args = parser.parse_args()
+
+    problem = make_problem(args.size)
+    grounded = timed("grounding", lambda: Grounder().compile(problem).problem)
+    compiled = timed(
+        "irrelevant elements removing",
+        lambda: IrrelevantElementsRemover().compile(grounded).problem,
+    )
+    for label, p in (("grounded", grounded), ("compiled", compiled)):
+        print(
+            f"{label}: {len(p.actions)} actions, {len(p.fluents)} fluents, "
+            f"{len(p.all_objects)} objects, "
+            f"{len(p.explicit_initial_values)} initial values"
+        )
+        size = timed(f"PDDL writing of the {label}", lambda: write(p))
+        print(f"{label}: {size} PDDL characters")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the parsing of a PDDL benchmark set: the problem of a domain of the
+tests is copied in the given number of files, that are parsed one at a time with
+PDDLReader.parse_problem and all together with PDDLReader.parse_problems.
+
+Usage: python3 scripts/benchmarks/parse_problems.py [--domain NAME] [--files N]
+    [--workers W]
+"""
+
+import argparse
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+
+from unified_planning.io import PDDLReader
+
+PDDL_DOMAINS_PATH = ROOT / "unified_planning" / "test" / "pddl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--domain", default="depot")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    domain_filename = str(PDDL_DOMAINS_PATH / args.domain / "domain.pddl")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        problem_filenames = []
+        for i in range(args.files):
+            problem_filename = os.path.join(tmpdir, f"problem{i}.pddl")
+            shutil.copy(
+                PDDL_DOMAINS_PATH / args.domain / "problem.pddl", problem_filename
+            )
+            problem_filenames.append(problem_filename)
+
+        start = time.perf_counter()
+        for problem_filename in problem_filenames:
+            PDDLReader().parse_problem(domain_filename, problem_filename)
+        serial = time.perf_counter() - start
+        print(f"parse_problem  {args.files:6} files in {serial:7.3f}s")
+
+        start = time.perf_counter()
+        problems = PDDLReader().parse_problems(
+            domain_filename, problem_filenames, max_workers=args.workers
+        )
+        for _ in problems:
+            pass
+        parallel = time.perf_counter() - start
+        print(f"parse_problems {args.files:6} files in {parallel:7.3f}s")
+        print(f"speedup {serial / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
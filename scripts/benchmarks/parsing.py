@@ -0,0 +1,97 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the parsing of many small files, as done by per-request workers: the
+example problems are written in PDDL (domain and problem pairs) and in ANML, and
+every file is parsed with a new reader, with and without the cache of the grammars.
+
+Usage: python3 scripts/benchmarks/parsing.py [--files N] [--cache-size S]
+    [--left-recursion] [--no-anml]
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+import warnings
+
+ROOT = pathlib.Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+
+from unified_planning.io import ANMLReader, ANMLWriter, PDDLReader, PDDLWriter
+from unified_planning.io.utils import GrammarCache, configure_pyparsing
+from unified_planning.model import Problem
+from unified_planning.test.examples import get_example_problems
+
+
+def written_files():
+    pddl, anml = [], []
+    for name, example in sorted(get_example_problems().items()):
+        problem = example.problem
+        if not isinstance(problem, Problem):
+            continue
+        try:
+            writer = PDDLWriter(problem)
+            pddl.append((writer.get_domain(), writer.get_problem()))
+        except Exception:
+            pass  # not expressible in PDDL
+        try:
+            anml.append(ANMLWriter(problem).get_problem())
+        except Exception:
+            pass  # not expressible in ANML
+    return pddl, anml
+
+
+def run(label, files, parse, cached):
+    start = time.perf_counter()
+    for source in files:
+        if not cached:
+            GrammarCache.clear_all()
+        parse(source)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:20} {len(files):6} files in {elapsed:7.3f}s "
+        f"({elapsed / len(files) * 1000:.2f}ms each)"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--cache-size", type=int, default=128)
+    parser.add_argument("--left-recursion", action="store_true")
+    parser.add_argument("--no-anml", action="store_true")
+    args = parser.parse_args()
+
+    configure_pyparsing(cache_size=args.cache_size, left_recursion=args.left_recursion)
+    pddl, anml = written_files()
+    pddl = [pddl[i % len(pddl)] for i in range(args.files)]
+    anml = [anml[i % len(anml)] for i in range(args.files)]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parse_pddl = lambda pair: PDDLReader().parse_problem_string(*pair)
+        uncached = run("pddl, no cache", pddl, parse_pddl, cached=False)
+        cached = run("pddl, cached grammar", pddl, parse_pddl, cached=True)
+        print(f"pddl speedup {uncached / cached:.2f}x")
+        if not args.no_anml:
+            parse_anml = lambda source: ANMLReader().parse_problem_string(source)
+            uncached = run("anml, no cache", anml, parse_anml, cached=False)
+            cached = run("anml, cached grammar", anml, parse_anml, cached=True)
+            print(f"anml speedup {uncached / cached:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
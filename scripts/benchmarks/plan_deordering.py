@@ -0,0 +1,97 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the conversion of a SequentialPlan to a PartialOrderPlan.
+
+The plan switches on and off random lamps, each connected to a random
+switch, so the plan is partially ordered.
+
+Usage: python3 scripts/benchmarks/plan_deordering.py [--steps N] [--lamps L]
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent.resolve()))
+
+from unified_planning.shortcuts import *
+from unified_planning.plans import ActionInstance, PlanKind, SequentialPlan
+
+
+def lamps_problem(n_lamps: int):
+    Lamp = UserType("Lamp")
+    Switch = UserType("Switch")
+    on = Fluent("on", BoolType(), l=Lamp)
+    enabled = Fluent("enabled", BoolType(), s=Switch)
+    connected = Fluent("connected", BoolType(), l=Lamp, s=Switch)
+    switch_on = InstantaneousAction("switch_on", l=Lamp, s=Switch)
+    l, s = switch_on.parameters
+    switch_on.add_precondition(enabled(s))
+    switch_on.add_precondition(connected(l, s))
+    switch_on.add_precondition(Not(on(l)))
+    switch_on.add_effect(on(l), True)
+    switch_off = InstantaneousAction("switch_off", l=Lamp, s=Switch)
+    l, s = switch_off.parameters
+    switch_off.add_precondition(enabled(s))
+    switch_off.add_precondition(connected(l, s))
+    switch_off.add_precondition(on(l))
+    switch_off.add_effect(on(l), False)
+    toggle = InstantaneousAction("toggle", s=Switch)
+    (s,) = toggle.parameters
+    toggle.add_effect(enabled(s), Not(enabled(s)))
+    problem = Problem("lamps")
+    for f in (on, enabled, connected):
+        problem.add_fluent(f, default_initial_value=False)
+    problem.add_actions([switch_on, switch_off, toggle])
+    lamps = [Object(f"l{i}", Lamp) for i in range(n_lamps)]
+    switches = [Object(f"s{i}", Switch) for i in range(max(1, n_lamps // 10))]
+    problem.add_objects(lamps)
+    problem.add_objects(switches)
+    return problem, lamps, switches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--lamps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    problem, lamps, switches = lamps_problem(args.lamps)
+    switch_on, switch_off, toggle = problem.actions
+    actions = []
+    for _ in range(args.steps):
+        r = rng.random()
+        if r < 0.05:
+            actions.append(ActionInstance(toggle, (rng.choice(switches),)))
+        else:
+            action = switch_on if r < 0.5 else switch_off
+            params = (rng.choice(lamps), rng.choice(switches))
+            actions.append(ActionInstance(action, params))
+    plan = SequentialPlan(actions)
+
+    start = time.perf_counter()
+    pop = plan.convert_to(PlanKind.PARTIAL_ORDER_PLAN, problem)
+    elapsed = time.perf_counter() - start
+    n_edges = sum(len(v) for v in pop.get_adjacency_list.values())
+    print(f"SequentialPlan with {args.steps} steps converted in {elapsed:.3f}s")
+    print(f"PartialOrderPlan ordering constraints: {n_edges}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the PDDL input and output of long plans: a plan with the given number of
+steps, moving between the given number of locations, is written with
+PDDLWriter.write_plan_lines and read with PDDLReader.parse_plan_lines and
+PDDLReader.parse_plan_string; the parsing is compared with the PDDLReader of a git
+revision of the repository, if given.
+
+Usage: python3 scripts/benchmarks/plan_io.py [--locations N] [--steps S]
+    [--baseline GIT_REVISION]
+"""
+
+import argparse
+import importlib.util
+import io
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+
+from unified_planning.shortcuts import *
+from unified_planning.io import PDDLReader, PDDLWriter
+from unified_planning.plans import SequentialPlan
+
+
+def make_problem_and_plan(locations: int, steps: int):
+    Location = UserType("Location")
+    robot_at = Fluent("robot_at", BoolType(), l=Location)
+    move = InstantaneousAction("move", l_from=Location, l_to=Location)
+    l_from, l_to = move.parameters
+    move.add_precondition(robot_at(l_from))
+    move.add_effect(robot_at(l_from), False)
+    move.add_effect(robot_at(l_to), True)
+    problem = Problem("moves")
+    problem.add_fluent(robot_at, default_initial_value=False)
+    problem.add_action(move)
+    locs = [Object(f"l{i}", Location) for i in range(locations)]
+    problem.add_objects(locs)
+    problem.set_initial_value(robot_at(locs[0]), True)
+    actions = [
+        move(locs[i % locations], locs[(i + 1) % locations]) for i in range(steps)
+    ]
+    return problem, actions
+
+
+def load_baseline_reader(revision: str):
+    source = subprocess.run(
+        ["git", "show", f"{revision}:unified_planning/io/pddl_reader.py"],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location("baseline_pddl_reader", f.name)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        os.unlink(f.name)
+    return module.PDDLReader()
+
+
+def timed(label, function):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:30} {elapsed:8.3f}s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=100000)
+    parser.add_argument("--baseline", default=None)
+    args = parser.parse_args()
+
+    problem, actions = make_problem_and_plan(args.locations, args.steps)
+    plan = SequentialPlan(actions)
+    writer = PDDLWriter(problem)
+    out = io.StringIO()
+    timed("write_plan_lines", lambda: writer.write_plan_lines(actions, out))
+    plan_str = out.getvalue()
+
+    reader = PDDLReader()
+    parsed, _ = timed(
+        "parse_plan_lines",
+        lambda: list(reader.parse_plan_lines(problem, io.StringIO(plan_str))),
+    )
+    assert SequentialPlan(parsed) == plan
+    parsed_plan, elapsed = timed(
+        "parse_plan_string", lambda: reader.parse_plan_string(problem, plan_str)
+    )
+    assert parsed_plan == plan
+    if args.baseline is not None:
+        baseline = load_baseline_reader(args.baseline)
+        parsed_plan, baseline_elapsed = timed(
+            f"parse_plan_string {args.baseline}",
+            lambda: baseline.parse_plan_string(problem, plan_str),
+        )
+        assert parsed_plan == plan
+        print(f"speedup {baseline_elapsed / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the protobuf round trip of large problems: a logistics-like problem with
+the given number of locations is written with the ProtobufWriter and read back with
+the ProtobufReader; the reading is compared with the ProtobufReader of a git revision
+of the repository, if given.
+
+Usage: python3 scripts/benchmarks/protobuf_roundtrip.py [--locations N]
+    [--repetitions R] [--baseline GIT_REVISION]
+"""
+
+import argparse
+import importlib.util
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).parent.parent.parent.resolve()
+sys.path.insert(0, str(ROOT))
+
+from unified_planning.shortcuts import *
+from unified_planning.grpc.proto_reader import ProtobufReader  # type: ignore[attr-defined]
+from unified_planning.grpc.proto_writer import ProtobufWriter  # type: ignore[attr-defined]
+
+
+def make_problem(locations: int) -> Problem:
+    Location = UserType("Location")
+    Package = UserType("Package")
+    robot_at = Fluent("robot_at", BoolType(), l=Location)
+    package_at = Fluent("package_at", BoolType(), p=Package, l=Location)
+    holding = Fluent("holding", BoolType(), p=Package)
+    connected = Fluent("connected", BoolType(), l_from=Location, l_to=Location)
+    fuel = Fluent("fuel", IntType(0, 1000))
+    distance = Fluent("distance", IntType(0, 100), l_from=Location, l_to=Location)
+
+    move = InstantaneousAction("move", l_from=Location, l_to=Location)
+    l_from, l_to = move.parameters
+    move.add_precondition(robot_at(l_from))
+    move.add_precondition(connected(l_from, l_to))
+    move.add_precondition(GE(fuel, distance(l_from, l_to)))
+    move.add_effect(robot_at(l_from), False)
+    move.add_effect(robot_at(l_to), True)
+    move.add_decrease_effect(fuel, distance(l_from, l_to))
+    pick = InstantaneousAction("pick", p=Package, l=Location)
+    p, l = pick.parameters
+    pick.add_precondition(And(robot_at(l), package_at(p, l)))
+    pick.add_effect(package_at(p, l), False)
+    pick.add_effect(holding(p), True)
+    drop = InstantaneousAction("drop", p=Package, l=Location)
+    p, l = drop.parameters
+    drop.add_precondition(And(robot_at(l), holding(p)))
+    drop.add_effect(holding(p), False)
+    drop.add_effect(package_at(p, l), True)
+
+    problem = Problem("logistics")
+    for f in (robot_at, package_at, holding, connected, distance):
+        problem.add_fluent(f, default_initial_value=f.type.is_int_type() and 0)
+    problem.add_fluent(fuel)
+    problem.add_actions([move, pick, drop])
+    locs = [Object(f"l{i}", Location) for i in range(locations)]
+    packages = [Object(f"p{i}", Package) for i in range(locations)]
+    problem.add_objects(locs)
+    problem.add_objects(packages)
+    problem.set_initial_value(fuel, 1000)
+    problem.set_initial_value(robot_at(locs[0]), True)
+    for i, (loc, package) in enumerate(zip(locs, packages)):
+        problem.set_initial_value(package_at(package, loc), True)
+        for j in (i - 1, i + 1):
+            if 0 <= j < locations:
+                problem.set_initial_value(connected(loc, locs[j]), True)
+                problem.set_initial_value(distance(loc, locs[j]), abs(i - j) * 3)
+        problem.add_goal(package_at(package, locs[-1 - i]))
+    return problem
+
+
+def load_baseline_reader(revision: str):
+    source = subprocess.run(
+        ["git", "show", f"{revision}:unified_planning/grpc/proto_reader.py"],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location("baseline_proto_reader", f.name)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        os.unlink(f.name)
+    return module.ProtobufReader()
+
+
+def time_reading(label, reader, problem_pb, problem, repetitions):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        # the baseline reader consumes the message, so every reading gets a copy
+        msg = type(problem_pb)()
+        msg.CopyFrom(problem_pb)
+        problem_up = reader.convert(msg)
+    elapsed = (time.perf_counter() - start) / repetitions
+    assert problem_up == problem, f"{label} reader returned a different problem"
+    print(f"{label:10} read in {elapsed:8.3f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=500)
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--baseline", default=None)
+    args = parser.parse_args()
+
+    problem = make_problem(args.locations)
+    start = time.perf_counter()
+    problem_pb = ProtobufWriter().convert(problem)
+    print(
+        f"{len(problem.all_objects)} objects, {len(problem.explicit_initial_values)} "
+        f"initial values, {problem_pb.ByteSize()} bytes written in "
+        f"{time.perf_counter() - start:.3f}s"
+    )
+    elapsed = time_reading(
+        "current", ProtobufReader(), problem_pb, problem, args.repetitions
+    )
+    if args.baseline is not None:
+        baseline = time_reading(
+            args.baseline,
+            load_baseline_reader(args.baseline),
+            problem_pb,
+            problem,
+            args.repetitions,
+        )
+        print(f"speedup {baseline / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
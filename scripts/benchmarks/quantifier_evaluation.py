@@ -0,0 +1,79 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the evaluation of quantified expressions in a state.
+
+The expressions quantify over pairs of packages and locations, where every
+package is at exactly one location.
+
+Usage: python3 scripts/benchmarks/quantifier_evaluation.py [--objects N]
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent.resolve()))
+
+from unified_planning.shortcuts import *
+from unified_planning.model import UPState
+from unified_planning.model.walkers import StateEvaluator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--objects", type=int, default=60)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    Package = UserType("Package")
+    Location = UserType("Location")
+    at = Fluent("at", BoolType(), p=Package, l=Location)
+    delivered = Fluent("delivered", BoolType(), p=Package)
+    target = Fluent("target", BoolType(), l=Location)
+    problem = Problem("packages")
+    problem.add_fluent(at, default_initial_value=False)
+    problem.add_fluent(delivered, default_initial_value=False)
+    problem.add_fluent(target, default_initial_value=False)
+    packages = [Object(f"p{i}", Package) for i in range(args.objects)]
+    locations = [Object(f"l{i}", Location) for i in range(args.objects)]
+    problem.add_objects(packages)
+    problem.add_objects(locations)
+    for i, p in enumerate(packages):
+        problem.set_initial_value(at(p, locations[i]), True)
+    problem.set_initial_value(target(locations[-1]), True)
+    state = UPState(dict(problem.initial_values))
+
+    p = Variable("p", Package)
+    l = Variable("l", Location)
+    expressions = {
+        # the witness is the last pair
+        "exists": Exists(And(at(p, l), target(l)), p, l),
+        # true, every pair has to be checked
+        "forall": Forall(Implies(And(at(p, l), target(l)), Not(delivered(p))), p, l),
+    }
+    se = StateEvaluator(problem)
+    for name, expression in expressions.items():
+        start = time.perf_counter()
+        for _ in range(args.repetitions):
+            value = se.evaluate(expression, state)
+        elapsed = (time.perf_counter() - start) / args.repetitions
+        print(
+            f"{name} over {args.objects}x{args.objects} objects: {value} in {elapsed:.4f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
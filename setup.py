@@ -18,7 +18,7 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     python_requires=">=3.8",
-    install_requires=["pyparsing", "networkx", "ConfigSpace"],
+    install_requires=["pyparsing", "networkx", "ConfigSpace", "numpy"],
     extras_require={
         "dev": ["tarski[arithmetic]", "pytest", "pytest-cov", "mypy"],
         "grpc": ["grpcio", "grpcio-tools", "grpc-stubs"],
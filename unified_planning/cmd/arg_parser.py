@@ -66,6 +66,11 @@ def create_up_parser() -> argparse.ArgumentParser:
     )
     compile_parser.set_defaults(cmd="list-engines")
 
+    parse_parser = subparsers.add_parser(
+        "parse",
+    )
+    parse_parser.set_defaults(cmd="parse")
+
     # Options:
     # --engine, -e
     # --engines
@@ -83,6 +88,9 @@ def create_up_parser() -> argparse.ArgumentParser:
     # --kinds
     # --operation-mode
     # --log, -l
+    # --pddl-domain
+    # --pddl-problems
+    # --workers, -w
 
     for sub_parser in (
         oneshot_planning_parser,
@@ -253,4 +261,39 @@ def create_up_parser() -> argparse.ArgumentParser:
         dest="show_kind",
         default=False,
     )
+
+    parse_parser.add_argument(
+        "--pddl-domain",
+        type=str,
+        help="The path of the pddl domain file",
+        dest="pddl_domain",
+        metavar="PDDL_DOMAIN_FILENAME",
+        required=True,
+    )
+
+    parse_parser.add_argument(
+        "--pddl-problems",
+        type=str,
+        nargs="+",
+        help="The paths of the pddl problem files of the domain",
+        dest="pddl_problems",
+        metavar="PDDL_PROBLEM_FILENAME",
+        required=True,
+    )
+
+    parse_parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        help="The number of processes parsing the problem files, by default the number of processors",
+        dest="max_workers",
+    )
+
+    parse_parser.add_argument(
+        "--show-kind",
+        action="store_true",
+        help="If specified, shows the kind of every problem",
+        dest="show_kind",
+        default=False,
+    )
     return parser
@@ -47,6 +47,8 @@ def main(args=None):
             operation_mode=parsed_args.operation_mode,
             show_supported_kind=parsed_args.show_kind,
         )
+    elif parsed_args.mode == "parse":
+        parse_problems(parser, parsed_args)
     else:
         parser.print_help()
 
@@ -265,5 +267,26 @@ def parse_problem(
     return problem
 
 
+def parse_problems(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+):
+    if args.max_workers is not None and args.max_workers <= 0:
+        parser.error("parse mode requires a positive number of --workers")
+    p_reader = PDDLReader()
+    problems = p_reader.parse_problems(
+        args.pddl_domain, args.pddl_problems, max_workers=args.max_workers
+    )
+    for problem_filename, problem in zip(args.pddl_problems, problems):
+        print(
+            f"{problem_filename}: problem {problem.name} with "
+            f"{len(problem.all_objects)} objects, "
+            f"{len(problem.explicit_initial_values)} initial values and "
+            f"{len(problem.goals)} goals"
+        )
+        if args.show_kind:
+            print(problem.kind)
+
+
 if __name__ == "__main__":
     main(sys.argv[1:])
@@ -46,10 +46,17 @@ from unified_planning.engines.sequential_simulator import (
 from unified_planning.engines.mixins.sequential_simulator import (
     SequentialSimulatorMixin,
 )
+from unified_planning.engines.stochastic_simulator import (
+    UPStochasticSimulator,
+    RolloutStatistics,
+)
 from unified_planning.engines.mixins.oneshot_planner import OptimalityGuarantee
 from unified_planning.engines.mixins.anytime_planner import AnytimeGuarantee
 from unified_planning.engines.mixins.compiler import CompilationKind
 from unified_planning.engines.mixins.portfolio import PortfolioSelectorMixin
+from unified_planning.engines.compilation_cache import CompilationCache
+from unified_planning.engines.heuristic_search_planner import HeuristicSearchPlanner
+from unified_planning.engines.contingent_planner import ContingentPlanner
 
 __all__ = [
     "Factory",
@@ -60,11 +67,16 @@ __all__ = [
     "SequentialPlanValidator",
     "SequentialSimulatorMixin",
     "UPSequentialSimulator",
+    "UPStochasticSimulator",
+    "RolloutStatistics",
+    "HeuristicSearchPlanner",
+    "ContingentPlanner",
     "Event",
     "InstantaneousEvent",
     "Engine",
     "OptimalityGuarantee",
     "CompilationKind",
+    "CompilationCache",
     "Credits",
     "Result",
     "LogMessage",
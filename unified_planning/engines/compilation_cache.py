@@ -0,0 +1,328 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""This module defines the persistent cache of the compiled problems."""
+
+
+import hashlib
+import os
+from functools import partial
+from typing import Dict, Optional
+
+import unified_planning as up
+from unified_planning.engines.compilers.utils import (
+    MapBackEntry,
+    compose_map_back_tables,
+    map_back_with_table,
+)
+from unified_planning.engines.mixins.compiler import CompilationKind
+from unified_planning.engines.results import CompilerResult
+from unified_planning.exceptions import UPException, UPUsageError
+
+
+class CompilationCache:
+    """
+    This class implements a persistent, on-disk cache of the results of the compilers.
+
+    Every entry is keyed by a stable content hash of the input problem, computed
+    on its protobuf serialization, together with the name and the configuration of
+    the compiler and the :class:`~unified_planning.engines.CompilationKind`; the entry
+    stores the compiled problem and the map back table in the protobuf format, so it
+    survives across process restarts.
+
+    The configuration of a compiler is given by its
+    :func:`~unified_planning.engines.mixins.CompilerMixin._compilation_configuration`,
+    like the ``grounding_actions_map`` of the :class:`~unified_planning.engines.compilers.Grounder`,
+    so differently configured compilers never share an entry; the compilers that do not
+    opt in by overriding it are not cached.
+
+    Only the results of :class:`~unified_planning.model.Problem` instances, whose map
+    back is a lookup table (every compiler of the library that maps back the actions with
+    :func:`~unified_planning.engines.compilers.utils.replace_action` or
+    :func:`~unified_planning.engines.compilers.utils.lift_action_instance`) and whose
+    problems can be converted in protobuf are cached.
+
+    When the total size of the cache directory exceeds ``max_size`` bytes, the least
+    recently used entries are evicted.
+
+    The cache is opt-in; it is used by the compilers returned by the :class:`~unified_planning.engines.Factory`
+    after setting the :func:`~unified_planning.engines.Factory.compilation_cache` property.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = 2**30):
+        try:
+            from google.protobuf.message import DecodeError
+            import unified_planning.grpc.generated.unified_planning_pb2 as proto
+            from unified_planning.grpc.proto_reader import ProtobufReader  # type: ignore[attr-defined]
+            from unified_planning.grpc.proto_writer import ProtobufWriter  # type: ignore[attr-defined]
+        except ImportError:
+            raise UPUsageError(
+                "The CompilationCache requires the protobuf package to be installed."
+            )
+        if max_size <= 0:
+            raise UPUsageError("The max_size of the CompilationCache must be positive.")
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._proto = proto
+        self._decode_error = DecodeError
+        self._reader = ProtobufReader()
+        self._writer = ProtobufWriter()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # The protobuf converters are not picklable, so only the configuration
+    # and the statistics of the cache are kept in the state.
+    def __getstate__(self):
+        return {
+            "cache_dir": self._cache_dir,
+            "max_size": self._max_size,
+            "stats": (self._hits, self._misses, self._evictions),
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state["cache_dir"], state["max_size"])
+        self._hits, self._misses, self._evictions = state["stats"]
+
+    @property
+    def cache_dir(self) -> str:
+        """Returns the directory where the cached results are stored."""
+        return self._cache_dir
+
+    @property
+    def max_size(self) -> int:
+        """Returns the maximum size, in bytes, of the cache directory."""
+        return self._max_size
+
+    @property
+    def hits(self) -> int:
+        """Returns the number of lookups that found a cached result."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Returns the number of lookups that did not find a cached result."""
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        """Returns the number of entries evicted to respect the `max_size`."""
+        return self._evictions
+
+    @property
+    def metrics(self) -> Dict[str, str]:
+        """Returns the statistics of this cache, in the format of the `Result` metrics."""
+        return {
+            "hits": str(self._hits),
+            "misses": str(self._misses),
+            "evictions": str(self._evictions),
+            "size": str(self.size),
+        }
+
+    @property
+    def size(self) -> int:
+        """Returns the total size, in bytes, of the entries in the cache directory."""
+        return sum(os.path.getsize(path) for path in self._entries())
+
+    def key(
+        self,
+        problem: "up.model.AbstractProblem",
+        compiler: "up.engines.engine.Engine",
+        compilation_kind: CompilationKind,
+    ) -> Optional[str]:
+        """
+        Returns the key of the cache entry of the given problem compiled by the given
+        compiler with the given `CompilationKind`, or `None` if the result can't be
+        cached because the problem is not a `Problem`, the problem can't be converted
+        in protobuf or the compiler does not give its configuration.
+
+        :param problem: The problem to compile.
+        :param compiler: The compiler; its name and configuration are part of the key.
+        :param compilation_kind: The `CompilationKind` applied by the compiler.
+        :return: The hexadecimal digest identifying the cache entry.
+        """
+        if not isinstance(problem, up.model.Problem):
+            return None
+        assert isinstance(compiler, up.engines.mixins.CompilerMixin)
+        configuration = compiler._compilation_configuration()
+        if configuration is None:
+            return None
+        try:
+            problem_msg = self._writer.convert(problem)
+        except (KeyError, NotImplementedError, UPException):
+            return None
+        h = hashlib.sha256()
+        h.update(problem_msg.SerializeToString(deterministic=True))
+        h.update(compiler.name.encode())
+        h.update(configuration.encode())
+        h.update(compilation_kind.name.encode())
+        return h.hexdigest()
+
+    def get(
+        self, key: Optional[str], problem: "up.model.AbstractProblem"
+    ) -> Optional[CompilerResult]:
+        """
+        Returns the cached `CompilerResult` of the given entry, or `None` if it is not
+        cached.
+
+        :param key: The key of the entry, as returned by :func:`key <unified_planning.engines.CompilationCache.key>`.
+        :param problem: The problem to compile, whose actions are referred by the map back.
+        :return: The cached `CompilerResult`, if present.
+        """
+        path = None if key is None else self._path(key)
+        if path is None or not os.path.isfile(path):
+            self._misses += 1
+            return None
+        msg = self._proto.CompilerResult()
+        try:
+            with open(path, "rb") as f:
+                msg.ParseFromString(f.read())
+            result = self._read_result(msg, problem)
+        except (self._decode_error, KeyError, UPException):
+            # a corrupted or stale entry is handled as a miss and removed
+            os.remove(path)
+            self._misses += 1
+            return None
+        # the modification time keeps track of the least recently used entries
+        os.utime(path)
+        self._hits += 1
+        return result
+
+    def put(self, key: Optional[str], result: CompilerResult) -> bool:
+        """
+        Stores the given `CompilerResult` in the given entry.
+
+        :param key: The key of the entry, as returned by :func:`key <unified_planning.engines.CompilationCache.key>`.
+        :param result: The `CompilerResult` to store.
+        :return: `True` if the result has been stored, `False` if it can't be cached.
+        """
+        if (
+            key is None
+            or not isinstance(result.problem, up.model.Problem)
+            or result.map_back_action_instance is None
+        ):
+            return False
+        table = compose_map_back_tables([result.map_back_action_instance])
+        if table is None:
+            return False
+        try:
+            msg = self._write_result(result, table)
+        except (KeyError, NotImplementedError, UPException):
+            return False
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(msg.SerializeToString())
+        os.replace(tmp_path, path)
+        self._evict()
+        return True
+
+    def clear(self):
+        """Removes every entry from the cache and resets the statistics."""
+        for path in self._entries():
+            os.remove(path)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.pb")
+
+    def _entries(self):
+        for name in os.listdir(self._cache_dir):
+            if name.endswith(".pb"):
+                yield os.path.join(self._cache_dir, name)
+
+    def _evict(self):
+        entries = []
+        total_size = 0
+        for path in self._entries():
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self._max_size:
+                break
+            os.remove(path)
+            total_size -= size
+            self._evictions += 1
+
+    def _write_result(
+        self,
+        result: CompilerResult,
+        table: Dict["up.model.Action", MapBackEntry],
+    ):
+        proto = self._proto
+        # The map back table is stored by name of the compiled action; an empty
+        # action_name means that the compiled action has no counterpart, while
+        # empty parameters on an action with the same arity of the compiled one
+        # mean that the parameters are kept unchanged.
+        map_back_plan: Dict[str, proto.ActionInstance] = {}
+        for compiled_action, entry in table.items():
+            if entry is None:
+                map_back_plan[compiled_action.name] = proto.ActionInstance()
+                continue
+            original_action, params = entry
+            map_back_plan[compiled_action.name] = proto.ActionInstance(
+                action_name=original_action.name,
+                parameters=(
+                    []
+                    if params is None
+                    else [self._writer.convert(p).atom for p in params]
+                ),
+            )
+        return proto.CompilerResult(
+            problem=self._writer.convert(result.problem),
+            map_back_plan=map_back_plan,
+            metrics=result.metrics,
+            log_messages=[
+                self._writer.convert(log) for log in result.log_messages or []
+            ],
+            engine=proto.Engine(name=result.engine_name),
+        )
+
+    def _read_result(
+        self, msg, original_problem: "up.model.AbstractProblem"
+    ) -> CompilerResult:
+        assert isinstance(original_problem, up.model.Problem)
+        compiled_problem = self._reader.convert(
+            msg.problem, original_problem.environment
+        )
+        table: Dict["up.model.Action", MapBackEntry] = {}
+        for compiled_action_name, ai in msg.map_back_plan.items():
+            compiled_action = compiled_problem.action(compiled_action_name)
+            if not ai.action_name:
+                table[compiled_action] = None
+                continue
+            original_action = original_problem.action(ai.action_name)
+            if not ai.parameters and len(original_action.parameters) == len(
+                compiled_action.parameters
+            ):
+                table[compiled_action] = (original_action, None)
+            else:
+                table[compiled_action] = (
+                    original_action,
+                    tuple(
+                        self._reader.convert(p, original_problem) for p in ai.parameters
+                    ),
+                )
+        return CompilerResult(
+            compiled_problem,
+            partial(map_back_with_table, table=table),
+            msg.engine.name,
+            log_messages=[self._reader.convert(log) for log in msg.log_messages],
+            metrics=dict(msg.metrics) if msg.metrics else None,
+        )
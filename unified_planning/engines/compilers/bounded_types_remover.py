@@ -57,6 +57,9 @@ class BoundedTypesRemover(engines.engine.Engine, CompilerMixin):
     def name(self):
         return "btrm"
 
+    def _compilation_configuration(self) -> Optional[str]:
+        return ""
+
     @staticmethod
     def supported_kind() -> ProblemKind:
         supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
@@ -17,9 +17,13 @@ import unified_planning as up
 import unified_planning.engines as engines
 from unified_planning.engines.mixins.compiler import CompilerMixin
 from unified_planning.engines.results import CompilerResult
+from unified_planning.engines.compilers.utils import (
+    compose_map_back_tables,
+    map_back_with_table,
+)
 from unified_planning.exceptions import UPUsageError
 from unified_planning.plans import ActionInstance
-from typing import List, Callable, Optional
+from typing import List, Callable, Optional, cast
 from functools import partial
 from warnings import warn
 
@@ -29,11 +33,38 @@ class CompilersPipeline(engines.engine.Engine, CompilerMixin):
     This engine implements a compilers pipeline.
     A list of compilers is given in the class constructor and the engine implements
     the compile operation mode executing the pipeline of the given compilers.
+
+    When ``compose_map_back`` is set, the :func:`kind <unified_planning.model.AbstractProblem.kind>`
+    of the given problem is computed only once and the kind of every intermediate problem
+    is derived with the :func:`~unified_planning.engines.mixins.CompilerMixin.resulting_problem_kind`
+    of the previous compiler; moreover, when every compiler of the pipeline maps back the
+    actions with a lookup table, the tables are composed into a single one, so the returned
+    ``map_back_action_instance`` does a single lookup instead of going through every stage
+    of the pipeline.
+
+    The compilers are not fused in a single rewrite of the problem: every compiler still
+    creates its intermediate problem, without sharing the memoization of the rewritten
+    expressions with the other compilers, so the compiling time is the one of the
+    plain pipeline, minus the computations of the problem kinds.
+    The checks on the intermediate problems follow the :func:`~unified_planning.engines.Engine.skip_checks`
+    and :func:`~unified_planning.engines.Engine.error_on_failed_checks` flags of every compiler,
+    as in :func:`~unified_planning.engines.mixins.CompilerMixin.compile`.
     """
 
-    def __init__(self, compilers: List[engines.engine.Engine]):
+    def __init__(
+        self, compilers: List[engines.engine.Engine], compose_map_back: bool = False
+    ):
         CompilerMixin.__init__(self)
         self._compilers = compilers
+        self._compose_map_back = compose_map_back
+
+    @property
+    def compose_map_back(self) -> bool:
+        """
+        Returns `True` if this pipeline derives the kinds of the intermediate problems
+        and composes the map back functions of its compilers.
+        """
+        return self._compose_map_back
 
     @property
     def name(self):
@@ -76,6 +107,8 @@ class CompilersPipeline(engines.engine.Engine, CompilerMixin):
             raise UPUsageError(
                 "Compilers pipeline ignores the compilation_kind parameter"
             )
+        if self._compose_map_back:
+            return self._compile_with_composed_map_back(problem)
         new_problem: "up.model.AbstractProblem" = problem
         map_back_functions: List[
             Callable[[ActionInstance], Optional[ActionInstance]]
@@ -97,6 +130,62 @@ class CompilersPipeline(engines.engine.Engine, CompilerMixin):
             self.name,
         )
 
+    def _compile_with_composed_map_back(
+        self, problem: "up.model.AbstractProblem"
+    ) -> "up.engines.results.CompilerResult":
+        """
+        Runs the pipeline deriving the kinds of the intermediate problems instead of
+        computing them and composing the map back functions, when possible; see the
+        class documentation for the limitations of this mode.
+        """
+        new_problem: "up.model.AbstractProblem" = problem
+        # the kinds are only needed by the compilers checking the problems
+        problem_kind: Optional["up.model.ProblemKind"] = None
+        if not all(cast(engines.engine.Engine, e).skip_checks for e in self._compilers):
+            problem_kind = problem.kind
+        map_back_functions: List[
+            Callable[[ActionInstance], Optional[ActionInstance]]
+        ] = []
+        for engine in self._compilers:
+            assert isinstance(engine, CompilerMixin)
+            assert isinstance(engine, engines.engine.Engine)
+            compilation_kind = engine.default
+            if compilation_kind is None:
+                raise UPUsageError(f"Compilation kind of {engine.name} is not set!")
+            if (
+                not engine.skip_checks
+                and problem_kind is not None
+                and not engine.supports(problem_kind)
+            ):
+                msg = f"We cannot establish whether {engine.name} can handle this problem!"
+                if engine.error_on_failed_checks:
+                    raise UPUsageError(msg)
+                warn(msg)
+            if not engine.supports_compilation(compilation_kind):
+                msg = f"{engine.name} cannot handle this kind of compilation!"
+                if engine.error_on_failed_checks:
+                    raise UPUsageError(msg)
+                warn(msg)
+            res = engine._cached_compile(new_problem, compilation_kind)
+            if res.problem is None:
+                return CompilerResult(None, None, self.name)
+            assert res.map_back_action_instance is not None
+            map_back_functions.append(res.map_back_action_instance)
+            if problem_kind is not None:
+                problem_kind = engine.resulting_problem_kind(
+                    problem_kind, compilation_kind
+                )
+            new_problem = res.problem
+        map_back_functions.reverse()
+        table = compose_map_back_tables(map_back_functions)
+        if table is not None:
+            map_back = partial(map_back_with_table, table=table)
+        else:
+            map_back = partial(
+                map_back_action_instance, map_back_functions=map_back_functions
+            )
+        return CompilerResult(new_problem, map_back, self.name)
+
     def _compile(
         self,
         problem: "up.model.AbstractProblem",
@@ -67,6 +67,9 @@ class DisjunctiveConditionsRemover(engines.engine.Engine, CompilerMixin):
     def name(self):
         return "dcrm"
 
+    def _compilation_configuration(self) -> Optional[str]:
+        return ""
+
     @staticmethod
     def supported_kind() -> ProblemKind:
         supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
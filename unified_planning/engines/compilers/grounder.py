@@ -252,6 +252,15 @@ class Grounder(engines.engine.Engine, CompilerMixin):
     def name(self):
         return "grounder"
 
+    def _compilation_configuration(self) -> Optional[str]:
+        actions_map = None
+        if self._grounding_actions_map is not None:
+            actions_map = [
+                (str(action), [tuple(map(str, params)) for params in groundings])
+                for action, groundings in self._grounding_actions_map.items()
+            ]
+        return repr((actions_map, self._prune_actions))
+
     @staticmethod
     def supported_kind() -> ProblemKind:
         supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
@@ -0,0 +1,483 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""This module defines the irrelevant elements remover class."""
+
+
+import unified_planning as up
+import unified_planning.engines as engines
+from unified_planning.engines.mixins.compiler import CompilationKind, CompilerMixin
+from unified_planning.engines.results import CompilerResult
+from unified_planning.model import (
+    Action,
+    Effect,
+    FNode,
+    Fluent,
+    InstantaneousAction,
+    Object,
+    Problem,
+    ProblemKind,
+    Type,
+)
+from unified_planning.model.metrics import (
+    MaximizeExpressionOnFinalState,
+    MinimizeActionCosts,
+    MinimizeExpressionOnFinalState,
+    Oversubscription,
+)
+from unified_planning.model.problem_kind_versioning import LATEST_PROBLEM_KIND_VERSION
+from unified_planning.engines.compilers.utils import (
+    replace_action,
+    updated_minimize_action_costs,
+)
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from functools import partial
+
+
+class _ReachableValues:
+    """
+    Over-approximates the values that the boolean fluents can have in the states
+    reachable from the initial state of a `Problem`.
+
+    The value of a ground fluent expression is tracked exactly, while the effects
+    on a lifted fluent expression (with parameters, variables or fluents in its
+    arguments) make that value possible for every instance of the fluent.
+    Every expression that is not built from boolean fluents and boolean operators
+    is considered able to have any value.
+    """
+
+    def __init__(self, problem: Problem):
+        # for each value, the ground fluent expressions that can have that value
+        self._ground: Dict[bool, Set[FNode]] = {True: set(), False: set()}
+        # for each value, the fluents of which every instance can have that value
+        self._lifted: Dict[bool, Set[Fluent]] = {True: set(), False: set()}
+        # for each value, the fluents of which at least an instance can have that value
+        self._fluents: Dict[bool, Set[Fluent]] = {True: set(), False: set()}
+        self.size = 0
+        for fluent, default in problem.fluents_defaults.items():
+            if fluent.type.is_bool_type():
+                self._add(fluent, default.bool_constant_value())
+        for fluent_exp, value in problem.explicit_initial_values.items():
+            if value.is_bool_constant():
+                self._add(fluent_exp.fluent(), value.bool_constant_value(), fluent_exp)
+
+    def _add(self, fluent: Fluent, value: bool, fluent_exp: Optional[FNode] = None):
+        """
+        Makes the given value possible for the given ground fluent expression or,
+        if it is None, for every instance of the given fluent.
+        """
+        if fluent in self._lifted[value]:
+            return
+        if fluent_exp is not None:
+            ground = self._ground[value]
+            if fluent_exp in ground:
+                return
+            ground.add(fluent_exp)
+        else:
+            self._lifted[value].add(fluent)
+        self._fluents[value].add(fluent)
+        self.size += 1
+
+    def add_effect(self, effect: Effect):
+        """
+        Makes possible the values that the given `Effect` can assign.
+
+        :param effect: The effect of an `Action` that can be applied.
+        """
+        if not effect.fluent.type.is_bool_type():
+            return
+        if not self.can_be(effect.condition, True):
+            return
+        fluent_exp: Optional[FNode] = effect.fluent
+        if effect.is_forall() or not all(a.is_constant() for a in effect.fluent.args):
+            fluent_exp = None
+        for value in (True, False):
+            if self.can_be(effect.value, value):
+                self._add(effect.fluent.fluent(), value, fluent_exp)
+
+    def can_be(self, expression: FNode, value: bool) -> bool:
+        """
+        Returns `False` if the given boolean expression can't have the given value in
+        any reachable state, `True` otherwise.
+
+        :param expression: The boolean expression to check.
+        :param value: The value that the expression must have.
+        :return: `False` if the expression surely does not have the given value.
+        """
+        if expression.is_bool_constant():
+            return expression.bool_constant_value() == value
+        elif expression.is_fluent_exp() and expression.type.is_bool_type():
+            fluent = expression.fluent()
+            if fluent in self._lifted[value]:
+                return True
+            if all(a.is_constant() for a in expression.args):
+                return expression in self._ground[value]
+            return fluent in self._fluents[value]
+        elif expression.is_not():
+            return self.can_be(expression.arg(0), not value)
+        elif expression.is_and():
+            if value:
+                return all(self.can_be(a, True) for a in expression.args)
+            return any(self.can_be(a, False) for a in expression.args)
+        elif expression.is_or():
+            if value:
+                return any(self.can_be(a, True) for a in expression.args)
+            return all(self.can_be(a, False) for a in expression.args)
+        elif expression.is_implies():
+            left, right = expression.args
+            if value:
+                return self.can_be(left, False) or self.can_be(right, True)
+            return self.can_be(left, True) and self.can_be(right, False)
+        elif expression.is_exists() and value:
+            return self.can_be(expression.arg(0), True)
+        elif expression.is_forall() and not value:
+            return self.can_be(expression.arg(0), False)
+        return True
+
+
+def _add_objects_and_variable_types(
+    expressions: Iterable[FNode], types: Set[Type]
+) -> Set[Object]:
+    """
+    Returns the objects that appear in the given expressions and adds to the given
+    set the types of the variables quantified in them.
+    """
+    objects: Set[Object] = set()
+    visited: Set[FNode] = set()
+    stack = list(expressions)
+    while stack:
+        expression = stack.pop()
+        if expression in visited:
+            continue
+        visited.add(expression)
+        if expression.is_object_exp():
+            objects.add(expression.object())
+        elif expression.is_exists() or expression.is_forall():
+            types.update(v.type for v in expression.variables())
+        stack.extend(expression.args)
+    return objects
+
+
+class IrrelevantElementsRemover(engines.engine.Engine, CompilerMixin):
+    """
+    Irrelevant elements remover class: this class offers the capability
+    to transform a :class:`~unified_planning.model.Problem` into an equivalent
+    `Problem` without the elements that can't be part of, or matter for, a plan.
+    This capability is offered by the :meth:`~unified_planning.engines.compilers.IrrelevantElementsRemover.compile`
+    method, that returns a :class:`~unified_planning.engines.CompilerResult` in which the :meth:`problem <unified_planning.engines.CompilerResult.problem>` field
+    is the compiled Problem.
+
+    This is done in 4 steps:
+
+    * a forward reachability analysis from the initial state removes the `Actions`
+      that can't be applied in any reachable state;
+    * the fluents that are not modified by the remaining `Actions` are static: their
+      instances with constant arguments (or all of them, if they all have the default
+      value) are replaced with their initial value and the expressions are simplified,
+      removing the `Actions` and the conditional effects that become unapplicable;
+    * a backward relevance analysis from the goals and the quality metrics removes
+      the fluents that do not matter for them, together with their initial values,
+      the `Effects` on them and the `Actions` that do not have any other effect;
+    * the objects that can't be used by the remaining fluents and `Actions` are removed.
+
+    The `Actions` of the resulting `Problem` keep the names of the original ones.
+
+    This `Compiler` supports only the the `IRRELEVANT_ELEMENTS_REMOVING` :class:`~unified_planning.engines.CompilationKind`.
+    """
+
+    def __init__(self):
+        engines.engine.Engine.__init__(self)
+        CompilerMixin.__init__(self, CompilationKind.IRRELEVANT_ELEMENTS_REMOVING)
+
+    @property
+    def name(self):
+        return "ierm"
+
+    def _compilation_configuration(self) -> Optional[str]:
+        return ""
+
+    @staticmethod
+    def supported_kind() -> ProblemKind:
+        supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
+        supported_kind.set_problem_class("ACTION_BASED")
+        supported_kind.set_typing("FLAT_TYPING")
+        supported_kind.set_typing("HIERARCHICAL_TYPING")
+        supported_kind.set_numbers("BOUNDED_TYPES")
+        supported_kind.set_problem_type("SIMPLE_NUMERIC_PLANNING")
+        supported_kind.set_problem_type("GENERAL_NUMERIC_PLANNING")
+        supported_kind.set_fluents_type("INT_FLUENTS")
+        supported_kind.set_fluents_type("REAL_FLUENTS")
+        supported_kind.set_fluents_type("OBJECT_FLUENTS")
+        supported_kind.set_conditions_kind("NEGATIVE_CONDITIONS")
+        supported_kind.set_conditions_kind("DISJUNCTIVE_CONDITIONS")
+        supported_kind.set_conditions_kind("EQUALITIES")
+        supported_kind.set_conditions_kind("EXISTENTIAL_CONDITIONS")
+        supported_kind.set_conditions_kind("UNIVERSAL_CONDITIONS")
+        supported_kind.set_effects_kind("CONDITIONAL_EFFECTS")
+        supported_kind.set_effects_kind("INCREASE_EFFECTS")
+        supported_kind.set_effects_kind("DECREASE_EFFECTS")
+        supported_kind.set_effects_kind("STATIC_FLUENTS_IN_BOOLEAN_ASSIGNMENTS")
+        supported_kind.set_effects_kind("STATIC_FLUENTS_IN_NUMERIC_ASSIGNMENTS")
+        supported_kind.set_effects_kind("STATIC_FLUENTS_IN_OBJECT_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FLUENTS_IN_BOOLEAN_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FLUENTS_IN_NUMERIC_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FLUENTS_IN_OBJECT_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FORALL_EFFECTS")
+        supported_kind.set_quality_metrics("ACTIONS_COST")
+        supported_kind.set_actions_cost_kind("STATIC_FLUENTS_IN_ACTIONS_COST")
+        supported_kind.set_actions_cost_kind("FLUENTS_IN_ACTIONS_COST")
+        supported_kind.set_quality_metrics("PLAN_LENGTH")
+        supported_kind.set_quality_metrics("OVERSUBSCRIPTION")
+        supported_kind.set_quality_metrics("FINAL_VALUE")
+        supported_kind.set_actions_cost_kind("INT_NUMBERS_IN_ACTIONS_COST")
+        supported_kind.set_actions_cost_kind("REAL_NUMBERS_IN_ACTIONS_COST")
+        supported_kind.set_oversubscription_kind("INT_NUMBERS_IN_OVERSUBSCRIPTION")
+        supported_kind.set_oversubscription_kind("REAL_NUMBERS_IN_OVERSUBSCRIPTION")
+        return supported_kind
+
+    @staticmethod
+    def supports(problem_kind):
+        return problem_kind <= IrrelevantElementsRemover.supported_kind()
+
+    @staticmethod
+    def supports_compilation(compilation_kind: CompilationKind) -> bool:
+        return compilation_kind == CompilationKind.IRRELEVANT_ELEMENTS_REMOVING
+
+    @staticmethod
+    def resulting_problem_kind(
+        problem_kind: ProblemKind, compilation_kind: Optional[CompilationKind] = None
+    ) -> ProblemKind:
+        return problem_kind.clone()
+
+    def _compile(
+        self,
+        problem: "up.model.AbstractProblem",
+        compilation_kind: "up.engines.CompilationKind",
+    ) -> CompilerResult:
+        """
+        Takes an instance of a :class:`~unified_planning.model.Problem` and the wanted :class:`~unified_planning.engines.CompilationKind`
+        and returns a :class:`~unified_planning.engines.results.CompilerResult` where the :meth:`problem<unified_planning.engines.results.CompilerResult.problem>`
+        field does not have the unreachable `Actions`, the static fluents with a known value
+        and the irrelevant fluents, `Actions` and objects.
+
+        :param problem: The instance of the :class:`~unified_planning.model.Problem` that must be returned without irrelevant elements.
+        :param compilation_kind: The :class:`~unified_planning.engines.CompilationKind` that must be applied on the given problem;
+            only :class:`~unified_planning.engines.CompilationKind.IRRELEVANT_ELEMENTS_REMOVING` is supported by this compiler
+        :return: The resulting :class:`~unified_planning.engines.results.CompilerResult` data structure.
+        """
+        assert isinstance(problem, Problem)
+        env = problem.environment
+        fve = env.free_vars_extractor
+
+        # forward reachability from the initial state
+        reachable_values = _ReachableValues(problem)
+        reachable: List[InstantaneousAction] = []
+        unreachable: List[InstantaneousAction] = []
+        for action in problem.actions:
+            assert isinstance(action, InstantaneousAction)
+            unreachable.append(action)
+        size = -1
+        while size != reachable_values.size:
+            size = reachable_values.size
+            still_unreachable = []
+            for action in unreachable:
+                if all(reachable_values.can_be(p, True) for p in action.preconditions):
+                    reachable.append(action)
+                else:
+                    still_unreachable.append(action)
+            unreachable = still_unreachable
+            for action in reachable:
+                for effect in action.effects:
+                    reachable_values.add_effect(effect)
+
+        # static fluents folding
+        modified_fluents = {e.fluent.fluent() for a in reachable for e in a.effects}
+        static_fluents = {f for f in problem.fluents if f not in modified_fluents}
+        constant_fluents: Dict[Fluent, FNode] = {
+            f: v for f, v in problem.fluents_defaults.items() if f in static_fluents
+        }
+        for fluent_exp, value in problem.explicit_initial_values.items():
+            fluent = fluent_exp.fluent()
+            if fluent in constant_fluents and constant_fluents[fluent] != value:
+                del constant_fluents[fluent]
+
+        def fold(expression: FNode) -> FNode:
+            # folding the arguments of a fluent expression can make it ground, so
+            # this is repeated until nothing changes (the fluent expressions with
+            # variables bound by a quantifier are never substituted)
+            while True:
+                substitutions: Dict[FNode, FNode] = {}
+                for fluent_exp in fve.get(expression):
+                    fluent = fluent_exp.fluent()
+                    if fluent in constant_fluents:
+                        substitutions[fluent_exp] = constant_fluents[fluent]
+                    elif fluent in static_fluents and all(
+                        a.is_constant() for a in fluent_exp.args
+                    ):
+                        substitutions[fluent_exp] = problem.initial_value(fluent_exp)
+                folded = expression.substitute(substitutions).simplify()
+                if folded == expression:
+                    return expression
+                expression = folded
+
+        folded_actions: List[Tuple[InstantaneousAction, List[FNode], List[Effect]]] = []
+        for action in reachable:
+            preconditions = [fold(p) for p in action.preconditions]
+            if any(p.is_false() for p in preconditions):
+                continue
+            effects = []
+            for effect in action.effects:
+                condition = fold(effect.condition)
+                if condition.is_false():
+                    continue
+                effects.append(
+                    Effect(
+                        effect.fluent,
+                        fold(effect.value),
+                        condition,
+                        effect.kind,
+                        effect.forall,
+                    )
+                )
+            preconditions = [p for p in preconditions if not p.is_true()]
+            folded_actions.append((action, preconditions, effects))
+        goals = [g for g in map(fold, problem.goals) if not g.is_true()]
+
+        # backward relevance from the goals and the quality metrics
+        relevant_fluents: Set[Fluent] = set()
+
+        def add_relevant_fluents(*expressions: FNode):
+            for expression in expressions:
+                relevant_fluents.update(fe.fluent() for fe in fve.get(expression))
+
+        add_relevant_fluents(*goals)
+        action_costs: Dict[Action, FNode] = {}
+        for qm in problem.quality_metrics:
+            if isinstance(
+                qm, (MinimizeExpressionOnFinalState, MaximizeExpressionOnFinalState)
+            ):
+                add_relevant_fluents(qm.expression)
+            elif isinstance(qm, Oversubscription):
+                add_relevant_fluents(*qm.goals.keys())
+            elif isinstance(qm, MinimizeActionCosts):
+                for action, _, _ in folded_actions:
+                    cost = qm.get_action_cost(action)
+                    if cost is not None:
+                        action_costs[action] = cost
+        # the actions that can decrease the cost of a plan are always relevant
+        costly_actions: Set[Action] = set()
+        for action, cost in action_costs.items():
+            folded_cost = fold(cost)
+            if not folded_cost.is_constant() or folded_cost.constant_value() < 0:
+                costly_actions.add(action)
+        relevant_actions: Set[Action] = set()
+        size = -1
+        while size != len(relevant_fluents) + len(relevant_actions):
+            size = len(relevant_fluents) + len(relevant_actions)
+            for action, preconditions, effects in folded_actions:
+                if action not in relevant_actions and (
+                    action in costly_actions
+                    or any(e.fluent.fluent() in relevant_fluents for e in effects)
+                ):
+                    relevant_actions.add(action)
+                    add_relevant_fluents(*preconditions)
+                    if action in action_costs:
+                        add_relevant_fluents(action_costs[action])
+                if action in relevant_actions:
+                    for effect in effects:
+                        if effect.fluent.fluent() in relevant_fluents:
+                            add_relevant_fluents(
+                                effect.fluent, effect.condition, effect.value
+                            )
+
+        new_actions: List[InstantaneousAction] = []
+        new_to_old: Dict[Action, Optional[Action]] = {}
+        for action, preconditions, effects in folded_actions:
+            if action not in relevant_actions:
+                continue
+            new_action = action.clone()
+            new_action.clear_preconditions()
+            for precondition in preconditions:
+                new_action.add_precondition(precondition)
+            new_action.clear_effects()
+            for effect in effects:
+                if effect.fluent.fluent() in relevant_fluents:
+                    new_action._add_effect_instance(effect)
+            new_actions.append(new_action)
+            new_to_old[new_action] = action
+
+        # unused objects
+        expressions = list(goals)
+        for qm in problem.quality_metrics:
+            if isinstance(
+                qm, (MinimizeExpressionOnFinalState, MaximizeExpressionOnFinalState)
+            ):
+                expressions.append(qm.expression)
+            elif isinstance(qm, Oversubscription):
+                expressions.extend(qm.goals.keys())
+            elif isinstance(qm, MinimizeActionCosts):
+                expressions.extend(
+                    action_costs[a] for a in relevant_actions if a in action_costs
+                )
+        used_types: Set[Type] = set()
+        for action in new_actions:
+            expressions.extend(action.preconditions)
+            used_types.update(p.type for p in action.parameters)
+            for effect in action.effects:
+                expressions.extend((effect.fluent, effect.value, effect.condition))
+                used_types.update(v.type for v in effect.forall)
+        used_objects = _add_objects_and_variable_types(expressions, used_types)
+        for fluent in relevant_fluents:
+            used_types.update(p.type for p in fluent.signature)
+            used_types.add(fluent.type)
+        compatible: Dict[Type, bool] = {}
+        new_objects: List[Object] = []
+        for obj in problem.all_objects:
+            if obj.type not in compatible:
+                compatible[obj.type] = any(
+                    t.is_compatible(obj.type) for t in used_types
+                )
+            if compatible[obj.type] or obj in used_objects:
+                new_objects.append(obj)
+        new_objects_set = set(new_objects)
+
+        new_problem = Problem(f"{problem.name}_{self.name}", env)
+        with new_problem.bulk_load():
+            new_problem.add_objects(new_objects)
+            for fluent in problem.fluents:
+                if fluent in relevant_fluents:
+                    new_problem.add_fluent(
+                        fluent,
+                        default_initial_value=problem.fluents_defaults.get(fluent),
+                    )
+            new_problem.add_actions(new_actions)
+            for fluent_exp, value in problem.explicit_initial_values.items():
+                if fluent_exp.fluent() in relevant_fluents and all(
+                    not a.is_object_exp() or a.object() in new_objects_set
+                    for a in fluent_exp.args
+                ):
+                    new_problem.set_initial_value(fluent_exp, value)
+        for goal in goals:
+            new_problem.add_goal(goal)
+        for qm in problem.quality_metrics:
+            if isinstance(qm, MinimizeActionCosts):
+                new_problem.add_quality_metric(
+                    updated_minimize_action_costs(qm, new_to_old, env)
+                )
+            else:
+                new_problem.add_quality_metric(qm)
+
+        return CompilerResult(
+            new_problem, partial(replace_action, map=new_to_old), self.name
+        )
@@ -100,6 +100,9 @@ class NegativeConditionsRemover(engines.engine.Engine, CompilerMixin):
     def name(self):
         return "ncrm"
 
+    def _compilation_configuration(self) -> Optional[str]:
+        return ""
+
     @staticmethod
     def supported_kind() -> ProblemKind:
         supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
@@ -72,6 +72,9 @@ class QuantifiersRemover(engines.engine.Engine, CompilerMixin):
     def name(self):
         return "qurm"
 
+    def _compilation_configuration(self) -> Optional[str]:
+        return ""
+
     @staticmethod
     def supported_kind() -> ProblemKind:
         supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
@@ -151,7 +154,7 @@ class QuantifiersRemover(engines.engine.Engine, CompilerMixin):
         new_kind.unset_conditions_kind("UNIVERSAL_CONDITIONS")
         new_kind.unset_effects_kind("FORALL_EFFECTS")
         if problem_kind.has_existential_conditions():
-            new_kind.set_conditions("DISJUNCTIVE_CONDITIONS")
+            new_kind.set_conditions_kind("DISJUNCTIVE_CONDITIONS")
         return new_kind
 
     def _compile(
@@ -51,6 +51,9 @@ class StateInvariantsRemover(engines.engine.Engine, CompilerMixin):
     def name(self):
         return "gcrm"
 
+    def _compilation_configuration(self) -> Optional[str]:
+        return ""
+
     @staticmethod
     def supported_kind() -> ProblemKind:
         supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
@@ -61,6 +61,9 @@ class TrajectoryConstraintsRemover(engines.engine.Engine, CompilerMixin):
     def name(self):
         return "TrajectoryConstraintsRemover"
 
+    def _compilation_configuration(self) -> Optional[str]:
+        return ""
+
     @staticmethod
     def supports(problem_kind):
         return problem_kind <= TrajectoryConstraintsRemover.supported_kind()
@@ -151,7 +154,7 @@ class TrajectoryConstraintsRemover(engines.engine.Engine, CompilerMixin):
         new_problem = grounded_problem.clone()
         assert isinstance(new_problem, Problem)
         new_problem.name = f"{self.name}_{problem.name}"
-        I = new_problem.initial_values
+        I = dict(new_problem.initial_values)
         C = []
         for c in new_problem.trajectory_constraints:
             new_c = expression_quantifier_remover.remove_quantifiers(c, new_problem)
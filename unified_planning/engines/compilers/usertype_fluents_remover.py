@@ -72,6 +72,9 @@ class UsertypeFluentsRemover(engines.engine.Engine, CompilerMixin):
     def name(self):
         return "utfr"
 
+    def _compilation_configuration(self) -> Optional[str]:
+        return ""
+
     @staticmethod
     def supported_kind() -> ProblemKind:
         supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
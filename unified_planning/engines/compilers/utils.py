@@ -16,6 +16,7 @@
 
 
 from fractions import Fraction
+from functools import partial
 import unified_planning as up
 from unified_planning.exceptions import UPConflictingEffectsException, UPUsageError
 from unified_planning.environment import Environment
@@ -162,7 +163,8 @@ def create_action_with_given_subs(
     c_subs = cast(Dict[Parameter, FNode], subs)
     if isinstance(old_action, InstantaneousAction):
         new_action = InstantaneousAction(
-            get_fresh_name(problem, old_action.name, naming_list)
+            get_fresh_name(problem, old_action.name, naming_list),
+            _env=problem.environment,
         )
         for p in old_action.preconditions:
             new_action.add_precondition(p.substitute(subs))
@@ -200,7 +202,8 @@ def create_action_with_given_subs(
         return new_action
     elif isinstance(old_action, DurativeAction):
         new_durative_action = DurativeAction(
-            get_fresh_name(problem, old_action.name, naming_list)
+            get_fresh_name(problem, old_action.name, naming_list),
+            _env=problem.environment,
         )
         old_duration = old_action.duration
         new_duration = DurationInterval(
@@ -304,6 +307,88 @@ def replace_action(
         return None
 
 
+# An entry of a composed map back table; the action of the original problem
+# (or None if the action has no counterpart) and the fixed parameters of the
+# ActionInstance (or None if the parameters are kept unchanged).
+MapBackEntry = Optional[
+    Tuple["up.model.Action", Optional[Tuple["up.model.FNode", ...]]]
+]
+
+
+def compose_map_back_tables(
+    map_back_functions: Sequence[Callable[[ActionInstance], Optional[ActionInstance]]],
+) -> Optional[Dict["up.model.Action", MapBackEntry]]:
+    """
+    Composes the lookup tables of the given map back functions in a single table.
+
+    The given functions are in the order they must be applied (so the map back of the
+    last compiler of the pipeline comes first); the composition is possible only if every
+    function is a `partial` of :func:`~unified_planning.engines.compilers.utils.replace_action`
+    or of :func:`~unified_planning.engines.compilers.utils.lift_action_instance`.
+
+    :param map_back_functions: The map back functions to compose.
+    :return: The composed table or `None` if the given functions can't be composed.
+    """
+    tables: List[Tuple[bool, Dict]] = []
+    for f in map_back_functions:
+        if not isinstance(f, partial) or "map" not in f.keywords or f.args:
+            return None
+        if f.func is replace_action:
+            tables.append((False, f.keywords["map"]))
+        elif f.func is lift_action_instance:
+            tables.append((True, f.keywords["map"]))
+        else:
+            return None
+    if not tables:
+        return None
+    composed: Dict["up.model.Action", MapBackEntry] = {}
+    for action in tables[0][1]:
+        entry: MapBackEntry = (action, None)
+        is_valid = True
+        for is_lift, table in tables:
+            assert entry is not None
+            current_action, params = entry
+            if current_action not in table:
+                # the chained map back would fail on this action, so it is
+                # left out of the composed table and the lookup fails
+                is_valid = False
+                break
+            if is_lift:
+                lifted_action, lifted_params = table[current_action]
+                entry = (lifted_action, tuple(lifted_params))
+            elif table[current_action] is None:
+                entry = None
+                break
+            else:
+                entry = (table[current_action], params)
+        if is_valid:
+            composed[action] = entry
+    return composed
+
+
+def map_back_with_table(
+    action: ActionInstance,
+    table: Dict["up.model.Action", MapBackEntry],
+) -> Optional[ActionInstance]:
+    try:
+        entry = table[action.action]
+    except KeyError:
+        raise UPUsageError(
+            "The Action of the given ActionInstance does not have a valid replacement."
+        )
+    if entry is None:
+        return None
+    original_action, params = entry
+    if params is None:
+        return ActionInstance(
+            original_action,
+            action.actual_parameters,
+            action.agent,
+            action.motion_paths,
+        )
+    return ActionInstance(original_action, params)
+
+
 def add_invariant_condition_apply_function_to_problem_expressions(
     original_problem: Problem,
     new_problem: Problem,
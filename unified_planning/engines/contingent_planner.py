@@ -0,0 +1,462 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""This module defines the native contingent planner."""
+
+
+import time
+from typing import IO, Callable, Dict, List, Optional, Set, Tuple, cast
+import unified_planning as up
+from unified_planning.engines.engine import Engine
+from unified_planning.engines.heuristics import HFF, RelaxedTask
+from unified_planning.engines.mixins.oneshot_planner import (
+    OneshotPlannerMixin,
+    OptimalityGuarantee,
+)
+from unified_planning.engines.results import (
+    PlanGenerationResult,
+    PlanGenerationResultStatus,
+)
+from unified_planning.engines.sequential_simulator import UPSequentialSimulator
+from unified_planning.exceptions import UPUsageError
+from unified_planning.model import (
+    Action,
+    ContingentProblem,
+    FNode,
+    ProblemKind,
+    SensingAction,
+    UPState,
+)
+from unified_planning.model.fluent import get_all_fluent_exp
+from unified_planning.model.problem_kind_versioning import LATEST_PROBLEM_KIND_VERSION
+from unified_planning.model.walkers import StateEvaluator
+from unified_planning.plans import ActionInstance, ContingentPlan, ContingentPlanNode
+from unified_planning.utils import set_bits
+
+
+GroundedAction = Tuple[Action, Tuple[FNode, ...]]
+Observation = Dict[FNode, FNode]
+
+
+class ContingentPlanner(Engine, OneshotPlannerMixin):
+    """
+    Contingent planner for the :class:`~unified_planning.model.ContingentProblem`, searching
+    the AND-OR graph of the belief states of the problem.
+
+    The hidden fluents are assigned in every possible way that satisfies the `oneof`
+    and `or` initial constraints; every assignment is a world, stored once as a
+    :class:`~unified_planning.model.UPState` of a deterministic copy of the problem and
+    identified by an integer, so a belief state is the bitset of its worlds. An action
+    is applicable in a belief if it is applicable in all its worlds and a
+    :class:`~unified_planning.model.SensingAction` splits the belief by the values
+    of the observed fluents.
+
+    The graph is searched depth-first, ordering the actions by the highest `hff`
+    (see :mod:`~unified_planning.engines.heuristics`) of the worlds they lead to and
+    pruning the dead ends; the solved beliefs are cached, so a belief reached in
+    several branches of the plan shares the same sub-plan and the
+    :class:`~unified_planning.plans.ContingentPlan` returned is a DAG. A heuristic
+    function given to the :func:`solve <unified_planning.engines.mixins.OneshotPlannerMixin.solve>`
+    method replaces `hff` on the worlds.
+    """
+
+    def __init__(
+        self,
+        max_depth: Optional[int] = 500,
+        max_worlds: Optional[int] = None,
+        **kwargs,
+    ):
+        Engine.__init__(self)
+        OneshotPlannerMixin.__init__(self)
+        if max_depth is not None and max_depth <= 0:
+            raise UPUsageError("The max_depth limit must be positive.")
+        if max_worlds is not None and max_worlds <= 0:
+            raise UPUsageError("The max_worlds limit must be positive.")
+        self._max_depth = max_depth
+        self._max_worlds = max_worlds
+
+    @property
+    def name(self) -> str:
+        return "up_contingent_planner"
+
+    @property
+    def max_depth(self) -> Optional[int]:
+        """Returns the maximum number of actions in a branch of the plan, `None` if unlimited."""
+        return self._max_depth
+
+    @property
+    def max_worlds(self) -> Optional[int]:
+        """Returns the maximum number of worlds stored by a search, `None` if unlimited."""
+        return self._max_worlds
+
+    @staticmethod
+    def supported_kind() -> ProblemKind:
+        supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
+        supported_kind.set_problem_class("ACTION_BASED")
+        supported_kind.set_problem_class("CONTINGENT")
+        supported_kind.set_typing("FLAT_TYPING")
+        supported_kind.set_typing("HIERARCHICAL_TYPING")
+        supported_kind.set_parameters("BOOL_FLUENT_PARAMETERS")
+        supported_kind.set_parameters("BOUNDED_INT_FLUENT_PARAMETERS")
+        supported_kind.set_parameters("BOOL_ACTION_PARAMETERS")
+        supported_kind.set_parameters("BOUNDED_INT_ACTION_PARAMETERS")
+        supported_kind.set_numbers("BOUNDED_TYPES")
+        supported_kind.set_problem_type("SIMPLE_NUMERIC_PLANNING")
+        supported_kind.set_problem_type("GENERAL_NUMERIC_PLANNING")
+        supported_kind.set_fluents_type("INT_FLUENTS")
+        supported_kind.set_fluents_type("REAL_FLUENTS")
+        supported_kind.set_fluents_type("OBJECT_FLUENTS")
+        supported_kind.set_conditions_kind("NEGATIVE_CONDITIONS")
+        supported_kind.set_conditions_kind("DISJUNCTIVE_CONDITIONS")
+        supported_kind.set_conditions_kind("EQUALITIES")
+        supported_kind.set_conditions_kind("EXISTENTIAL_CONDITIONS")
+        supported_kind.set_conditions_kind("UNIVERSAL_CONDITIONS")
+        supported_kind.set_effects_kind("CONDITIONAL_EFFECTS")
+        supported_kind.set_effects_kind("INCREASE_EFFECTS")
+        supported_kind.set_effects_kind("DECREASE_EFFECTS")
+        supported_kind.set_effects_kind("STATIC_FLUENTS_IN_BOOLEAN_ASSIGNMENTS")
+        supported_kind.set_effects_kind("STATIC_FLUENTS_IN_NUMERIC_ASSIGNMENTS")
+        supported_kind.set_effects_kind("STATIC_FLUENTS_IN_OBJECT_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FLUENTS_IN_BOOLEAN_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FLUENTS_IN_NUMERIC_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FLUENTS_IN_OBJECT_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FORALL_EFFECTS")
+        return supported_kind
+
+    @staticmethod
+    def supports(problem_kind: ProblemKind) -> bool:
+        return problem_kind <= ContingentPlanner.supported_kind()
+
+    @staticmethod
+    def satisfies(optimality_guarantee: OptimalityGuarantee) -> bool:
+        return optimality_guarantee == OptimalityGuarantee.SATISFICING
+
+    def _solve(
+        self,
+        problem: "up.model.AbstractProblem",
+        heuristic: Optional[Callable[["up.model.state.State"], Optional[float]]] = None,
+        timeout: Optional[float] = None,
+        output_stream: Optional[IO[str]] = None,
+    ) -> PlanGenerationResult:
+        assert isinstance(problem, ContingentProblem)
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        try:
+            space = _BeliefSpace(problem, heuristic, self._max_worlds, deadline)
+            status, root = self._and_or_search(space, deadline)
+        except _Timeout:
+            return PlanGenerationResult(
+                PlanGenerationResultStatus.TIMEOUT, None, self.name
+            )
+        except _Memout:
+            return PlanGenerationResult(
+                PlanGenerationResultStatus.MEMOUT, None, self.name
+            )
+        metrics = {
+            "expanded_beliefs": str(space.expanded),
+            "generated_worlds": str(space.num_worlds),
+        }
+        plan = None
+        if status == PlanGenerationResultStatus.SOLVED_SATISFICING:
+            plan = ContingentPlan(root, problem.environment)
+            if output_stream is not None:
+                output_stream.write(
+                    f"Found a contingent plan after expanding {space.expanded} beliefs "
+                    f"over {space.num_worlds} worlds.\n"
+                )
+        return PlanGenerationResult(status, plan, self.name, metrics)
+
+    def _and_or_search(
+        self, space: "_BeliefSpace", deadline: Optional[float]
+    ) -> Tuple[PlanGenerationResultStatus, Optional[ContingentPlanNode]]:
+        """
+        Searches a plan for the initial belief of the given space with a depth-first
+        search of the AND-OR graph of the beliefs.
+
+        :param space: The belief space of the problem.
+        :param deadline: The `time.perf_counter` value after which the search stops.
+        :return: The status of the search and the root of the plan found, `None` if
+            no plan is found or if the initial belief already satisfies the goals.
+        """
+        solved: Dict[int, Optional[ContingentPlanNode]] = {}
+        failed: Set[int] = set()
+        path: Set[int] = set()
+        depth_limited = False
+
+        def search(belief: int, depth: int) -> Tuple[bool, bool]:
+            # returns if the belief is solved and if the search was cut off by a
+            # cycle or by the depth limit, in which case the failure is not cached
+            nonlocal depth_limited
+            if belief in solved:
+                return True, False
+            if space.is_goal(belief):
+                solved[belief] = None
+                return True, False
+            if belief in failed:
+                return False, False
+            if belief in path:
+                return False, True
+            if self._max_depth is not None and depth >= self._max_depth:
+                depth_limited = True
+                return False, True
+            if deadline is not None and time.perf_counter() > deadline:
+                raise _Timeout
+            path.add(belief)
+            cutoff = False
+            for action, params, outcomes in space.transitions(belief):
+                for _, child in outcomes:
+                    child_solved, child_cutoff = search(child, depth + 1)
+                    cutoff = cutoff or child_cutoff
+                    if not child_solved:
+                        break
+                else:
+                    node = ContingentPlanNode(ActionInstance(action, params))
+                    for observation, child in outcomes:
+                        child_node = solved[child]
+                        if child_node is not None:
+                            node.add_child(observation, child_node)
+                    solved[belief] = node
+                    path.remove(belief)
+                    return True, False
+            path.remove(belief)
+            if not cutoff:
+                failed.add(belief)
+            return False, cutoff
+
+        initial_belief = space.initial_belief
+        if initial_belief is not None:
+            if search(initial_belief, 0)[0]:
+                return (
+                    PlanGenerationResultStatus.SOLVED_SATISFICING,
+                    solved[initial_belief],
+                )
+        # the cycles do not matter once the initial belief fails, as a plan can not
+        # pass twice through the same belief
+        if depth_limited or (space.found_dead_ends and not space.safe_dead_ends):
+            return PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY, None
+        return PlanGenerationResultStatus.UNSOLVABLE_PROVEN, None
+
+
+class _Timeout(Exception):
+    """Raised when the deadline expires during the search."""
+
+
+class _Memout(Exception):
+    """Raised when the search exceeds the maximum number of worlds."""
+
+
+class _BeliefSpace:
+    """
+    Represents the belief states of a :class:`~unified_planning.model.ContingentProblem`
+    as bitsets over the worlds, the states of a deterministic copy of the problem where
+    the hidden fluents are known.
+    """
+
+    def __init__(
+        self,
+        problem: ContingentProblem,
+        heuristic: Optional[Callable[["up.model.state.State"], Optional[float]]],
+        max_worlds: Optional[int],
+        deadline: Optional[float],
+    ):
+        self._max_worlds = max_worlds
+        self._deadline = deadline
+        hidden = {f.arg(0) if f.is_not() else f for f in problem.hidden_fluents}
+        self.problem, self._original_actions = problem.fully_observable_problem()
+        # the hidden fluents might never be modified by the actions, but their
+        # initial value in the copy must not be used to simplify the actions
+        self.simulator = UPSequentialSimulator(
+            self.problem, hidden_fluents={fe.fluent() for fe in hidden}
+        )
+        grounded_actions = []
+        for grounded_action in self.simulator.get_grounded_actions():
+            self._check_deadline()
+            grounded_actions.append(grounded_action)
+        self._se = StateEvaluator(self.problem)
+        # the observed fluents of every grounded sensing action
+        self._observed: Dict[GroundedAction, List[FNode]] = {}
+        for action, params, _ in grounded_actions:
+            original_action = self._original_actions[action]
+            if isinstance(original_action, SensingAction):
+                subs = dict(zip(action.parameters, params))
+                self._observed[(action, params)] = [
+                    self.simulator.simplify(of.substitute(subs))
+                    for of in original_action.observed_fluents
+                ]
+        # a user defined heuristic might mark as dead ends worlds that are not
+        self.safe_dead_ends = heuristic is None
+        self.found_dead_ends = False
+        if heuristic is None:
+            task = RelaxedTask(self.problem, grounded_actions)
+            hff = HFF(task)
+            # the worlds are evaluated once, so the states are not cached by hff
+            heuristic = lambda state: hff.evaluate_mask(task.facts_mask(state))
+        self._heuristic = heuristic
+        self.expanded = 0
+
+        self._worlds: List[UPState] = []
+        # the worlds only differ in the fluents that are hidden or modified by the
+        # actions, so they are identified by the values of those fluents
+        static_fluents = self.problem.get_static_fluents() - {
+            fe.fluent() for fe in hidden
+        }
+        self._dynamic_fluents = [
+            fe
+            for fluent in self.problem.fluents
+            if fluent not in static_fluents
+            for fe in get_all_fluent_exp(self.problem, fluent)
+        ]
+        self._worlds_ids: Dict[Tuple[FNode, ...], int] = {}
+        self._worlds_successors: List[Optional[Dict[GroundedAction, int]]] = []
+        # the successors of the worlds that are not expanded
+        self._applied: Dict[Tuple[int, GroundedAction], Optional[int]] = {}
+        self._worlds_h: List[Optional[float]] = []
+        self._goal_mask = 0
+        self._dead_mask = 0
+
+        self.initial_belief: Optional[int] = 0
+        base_state = UPState(
+            {fe: v for fe, v in problem.initial_values.items() if fe not in hidden}
+        )
+        em = problem.environment.expression_manager
+        for assignment in problem.initial_assignments():
+            world = self._world_id(
+                base_state.make_child(
+                    {fe: em.Bool(value) for fe, value in assignment.items()}
+                )
+            )
+            self.initial_belief |= 1 << world
+        if self.initial_belief == 0 or self.initial_belief & self._dead_mask:
+            self.initial_belief = None
+
+    @property
+    def num_worlds(self) -> int:
+        """Returns the number of worlds generated."""
+        return len(self._worlds)
+
+    def _check_deadline(self):
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _Timeout
+
+    def _world_id(self, state: UPState) -> int:
+        key = tuple(state.get_value(fe) for fe in self._dynamic_fluents)
+        world = self._worlds_ids.get(key, None)
+        if world is None:
+            world = len(self._worlds)
+            if self._max_worlds is not None and world >= self._max_worlds:
+                raise _Memout
+            self._worlds.append(state)
+            self._worlds_ids[key] = world
+            self._worlds_successors.append(None)
+            if self.simulator.is_goal(state):
+                self._goal_mask |= 1 << world
+            h = self._heuristic(state)
+            self._worlds_h.append(h)
+            if h is None:
+                self._dead_mask |= 1 << world
+                self.found_dead_ends = True
+        return world
+
+    def _successors(self, world: int) -> Dict[GroundedAction, int]:
+        successors = self._worlds_successors[world]
+        if successors is None:
+            successors = {}
+            state = self._worlds[world]
+            for action, params, successor in self.simulator.expand([state])[0]:
+                assert isinstance(successor, UPState)
+                successors[(action, params)] = self._world_id(successor)
+            self._worlds_successors[world] = successors
+        return successors
+
+    def _successor(self, world: int, grounded_action: GroundedAction) -> Optional[int]:
+        successors = self._worlds_successors[world]
+        if successors is not None:
+            return successors.get(grounded_action, None)
+        key = (world, grounded_action)
+        if key not in self._applied:
+            successor = self.simulator.apply(self._worlds[world], *grounded_action)
+            self._applied[key] = (
+                None if successor is None else self._world_id(cast(UPState, successor))
+            )
+        return self._applied[key]
+
+    def is_goal(self, belief: int) -> bool:
+        """Returns `True` if all the worlds of the given belief satisfy the goals."""
+        return belief & self._goal_mask == belief
+
+    def transitions(
+        self, belief: int
+    ) -> List[Tuple[Action, Tuple[FNode, ...], List[Tuple[Observation, int]]]]:
+        """
+        Returns the actions applicable in the given belief, in the order they should be
+        tried, with the observations they might produce and the resulting beliefs; the
+        actions leading to dead ends or that do not change the belief are discarded.
+
+        :param belief: The bitset of the worlds of the belief.
+        :return: The list of the original actions, their parameters and the outcomes.
+        """
+        self.expanded += 1
+        self._check_deadline()
+        worlds = list(set_bits(belief))
+        applicable = []
+        # only the first world is expanded, the actions applicable in it are then
+        # applied in the other worlds
+        for grounded_action in self._successors(worlds[0]):
+            observed = self._observed.get(grounded_action, None)
+            outcomes: Dict[Tuple[FNode, ...], int] = {}
+            for world in worlds:
+                successor = self._successor(world, grounded_action)
+                if successor is None:
+                    break
+                if observed is None:
+                    key: Tuple[FNode, ...] = ()
+                else:
+                    state = self._worlds[successor]
+                    key = tuple(self._se.evaluate(of, state) for of in observed)
+                outcomes[key] = outcomes.get(key, 0) | (1 << successor)
+            else:
+                applicable.append((grounded_action, observed, outcomes))
+        candidates = []
+        for grounded_action, observed, outcomes in applicable:
+            if len(outcomes) == 1 and belief in outcomes.values():
+                continue
+            if any(child & self._dead_mask for child in outcomes.values()):
+                continue
+            h_values = [self._belief_h(child) for child in outcomes.values()]
+            action, params = grounded_action
+            candidates.append(
+                (
+                    max(h_values),
+                    -len(h_values),
+                    sum(h_values) / len(h_values),
+                    len(candidates),
+                    self._original_actions[action],
+                    params,
+                    [
+                        ({} if observed is None else dict(zip(observed, key)), child)
+                        for key, child in outcomes.items()
+                    ],
+                )
+            )
+        candidates.sort(key=lambda c: c[:4])
+        return [
+            (action, params, outcomes) for *_, action, params, outcomes in candidates
+        ]
+
+    def _belief_h(self, belief: int) -> float:
+        h = 0.0
+        for world in set_bits(belief):
+            world_h = self._worlds_h[world]
+            assert world_h is not None
+            h = max(h, world_h)
+        return h
@@ -71,6 +71,18 @@ DEFAULT_ENGINES = {
         "unified_planning.engines.sequential_simulator",
         "UPSequentialSimulator",
     ),
+    "up_stochastic_simulator": (
+        "unified_planning.engines.stochastic_simulator",
+        "UPStochasticSimulator",
+    ),
+    "up_heuristic_search": (
+        "unified_planning.engines.heuristic_search_planner",
+        "HeuristicSearchPlanner",
+    ),
+    "up_contingent_planner": (
+        "unified_planning.engines.contingent_planner",
+        "ContingentPlanner",
+    ),
     "up_bounded_types_remover": (
         "unified_planning.engines.compilers.bounded_types_remover",
         "BoundedTypesRemover",
@@ -87,6 +99,10 @@ DEFAULT_ENGINES = {
         "unified_planning.engines.compilers.state_invariants_remover",
         "StateInvariantsRemover",
     ),
+    "up_irrelevant_elements_remover": (
+        "unified_planning.engines.compilers.irrelevant_elements_remover",
+        "IrrelevantElementsRemover",
+    ),
     "up_negative_conditions_remover": (
         "unified_planning.engines.compilers.negative_conditions_remover",
         "NegativeConditionsRemover",
@@ -153,6 +169,7 @@ DEFAULT_ENGINES_PREFERENCE_LIST = [
     "up_quantifiers_remover",
     "up_state_invariants_remover",
     "up_usertype_fluents_remover",
+    "up_irrelevant_elements_remover",
     "tarski_grounder",
     "fast-downward-reachability-grounder",
     "fast-downward-grounder",
@@ -209,6 +226,9 @@ class Factory:
         self._meta_engines: Dict[str, Type["up.engines.meta_engine.MetaEngine"]] = {}
         self._meta_engines_info: List[Tuple[str, str, str]] = []
         self._credit_disclaimer_printed = False
+        self._compilation_cache: Optional[
+            "up.engines.compilation_cache.CompilationCache"
+        ] = None
         for name, (module_name, class_name) in DEFAULT_ENGINES.items():
             try:
                 self._add_engine(name, module_name, class_name)
@@ -293,6 +313,27 @@ class Factory:
         """
         self._preference_list = preference_list
 
+    @property
+    def compilation_cache(
+        self,
+    ) -> Optional["up.engines.compilation_cache.CompilationCache"]:
+        """Returns the `CompilationCache` given to the compilers, or `None` if the caching is disabled."""
+        return self._compilation_cache
+
+    @compilation_cache.setter
+    def compilation_cache(
+        self, cache: Optional["up.engines.compilation_cache.CompilationCache"]
+    ):
+        """
+        Sets the :class:`~unified_planning.engines.compilation_cache.CompilationCache` given to
+        every compiler returned by the :meth:`~unified_planning.engines.Factory.Compiler` operation mode;
+        the compilers use the cache to store the compiled problems and to retrieve them
+        when the same problem is compiled again, also across different processes.
+
+        By default the caching is disabled (the cache is `None`).
+        """
+        self._compilation_cache = cache
+
     def add_engine(self, name: str, module_name: str, class_name: str):
         """
         Adds an :class:`Engine <unified_planning.engines.Engine>` Class to the factory, given the module and the class names.
@@ -630,6 +671,7 @@ class Factory:
         plan_kind: Optional["PlanKind"] = None,
         anytime_guarantee: Optional["AnytimeGuarantee"] = None,
         problem: Optional["up.model.AbstractProblem"] = None,
+        compose_map_back: bool = False,
     ) -> "up.engines.engine.Engine":
         if names is not None and operation_mode != OperationMode.COMPILER:
             assert name is None
@@ -670,9 +712,12 @@ class Factory:
                 all_credits.append(EngineClass.get_credits(**param))
                 compiler = EngineClass(**param)
                 compiler.default = compilation_kind
+                compiler.compilation_cache = self._compilation_cache
                 compilers.append(compiler)
             self._print_credits(all_credits)
-            return up.engines.compilers.compilers_pipeline.CompilersPipeline(compilers)
+            return up.engines.compilers.compilers_pipeline.CompilersPipeline(
+                compilers, compose_map_back=compose_map_back
+            )
         else:
             assert names is None
             error_failed_checks = name is None
@@ -717,6 +762,7 @@ class Factory:
                 assert isinstance(res, CompilerMixin)
                 if compilation_kind is not None:
                     res.default = compilation_kind
+                res.compilation_cache = self._compilation_cache
             elif (
                 operation_mode == OperationMode.ONESHOT_PLANNER
                 or operation_mode == OperationMode.PLAN_REPAIRER
@@ -864,6 +910,7 @@ class Factory:
         problem_kind: ProblemKind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION),
         compilation_kind: Optional[Union["CompilationKind", str]] = None,
         compilation_kinds: Optional[Sequence[Union["CompilationKind", str]]] = None,
+        compose_map_back: bool = False,
     ) -> "up.engines.engine.Engine":
         """
         Returns a compiler or a pipeline of compilers.
@@ -881,6 +928,10 @@ class Factory:
             | e.g. ``Compiler(names=['up_quantifiers_remover', 'up_grounder'], params=[{'opt1': 'val1'}, {'opt2': 'val2'}], compilation_kinds=[QUANTIFIERS_REMOVING, GROUNDING])``
         *   | using ``problem_kind`` and ``compilation_kinds`` parameters.
             | e.g. ``Compiler(problem_kind=problem.kind, compilation_kinds=[QUANTIFIERS_REMOVING, GROUNDING])``
+
+        When a pipeline of compilers is returned, the ``compose_map_back`` flag derives the kinds of the intermediate problems and composes
+        the map back functions of the compilers, as documented in the
+        :class:`~unified_planning.engines.compilers.CompilersPipeline`.
         """
         if isinstance(compilation_kind, str):
             try:
@@ -909,6 +960,7 @@ class Factory:
             problem_kind,
             compilation_kind=compilation_kind,
             compilation_kinds=kinds,
+            compose_map_back=compose_map_back,
         )
 
     def SequentialSimulator(
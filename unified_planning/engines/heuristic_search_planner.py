@@ -0,0 +1,502 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""This module defines the native heuristic search planner."""
+
+
+import heapq
+import time
+from fractions import Fraction
+from itertools import count
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import unified_planning as up
+from unified_planning.engines.engine import Engine
+from unified_planning.engines.heuristics import (
+    HAdd,
+    HFF,
+    HMax,
+    LandmarkCount,
+    RelaxedTask,
+)
+from unified_planning.engines.mixins.anytime_planner import (
+    AnytimeGuarantee,
+    AnytimePlannerMixin,
+)
+from unified_planning.engines.mixins.oneshot_planner import (
+    OneshotPlannerMixin,
+    OptimalityGuarantee,
+)
+from unified_planning.engines.results import (
+    PlanGenerationResult,
+    PlanGenerationResultStatus,
+)
+from unified_planning.engines.sequential_simulator import UPSequentialSimulator
+from unified_planning.exceptions import UPUsageError
+from unified_planning.model import (
+    Action,
+    FNode,
+    MinimizeActionCosts,
+    Problem,
+    ProblemKind,
+    UPState,
+)
+from unified_planning.model.problem_kind_versioning import LATEST_PROBLEM_KIND_VERSION
+from unified_planning.model.walkers import StateEvaluator
+from unified_planning.plans import ActionInstance, SequentialPlan
+
+
+SEARCH_ALGORITHMS = ("gbfs", "astar")
+HEURISTICS = ("goal_count", "hadd", "hmax", "hff", "landmarks", "blind")
+
+RELAXATION_HEURISTICS = {
+    "hadd": HAdd,
+    "hmax": HMax,
+    "hff": HFF,
+    "landmarks": LandmarkCount,
+}
+
+# the weights used by the anytime search after the first solution is found
+ANYTIME_WEIGHTS = (5, 3, 2, 1.5, 1)
+
+Cost = Union[int, float, Fraction]
+
+
+class HeuristicSearchPlanner(Engine, OneshotPlannerMixin, AnytimePlannerMixin):
+    """
+    Forward state-space planner built on top of the :class:`~unified_planning.engines.UPSequentialSimulator`,
+    so it solves every problem the simulator can handle, including the ones with simulated
+    effects, bounded numeric types and state invariants.
+
+    The states are expanded in best-first order with greedy best-first search (`"gbfs"`) or
+    weighted A* (`"astar"`), keeping a closed list keyed on the (hashable) states. The
+    heuristics available are:
+
+    *   | ``goal_count``: the number of unsatisfied goals;
+    *   | ``hadd``, ``hmax``, ``hff`` and ``landmarks``: the additive, max, FF and
+        | landmark-count heuristics of the :mod:`~unified_planning.engines.heuristics` module,
+        | computed on the delete relaxation of the boolean fluents of the grounded problem;
+    *   | ``blind``: 0 for every state.
+
+    A heuristic function given to the :func:`solve <unified_planning.engines.mixins.OneshotPlannerMixin.solve>`
+    method replaces the configured heuristic. The cost of a plan is its length or, when the
+    problem has a :class:`~unified_planning.model.metrics.MinimizeActionCosts` metric, the sum
+    of the costs of its actions.
+
+    When used as an `AnytimePlanner`, after the first plan is found the search is repeated
+    with A* and decreasing weights, pruning the states that are not cheaper than the best plan;
+    when a search terminates without finding a cheaper plan, the last plan is optimal.
+    """
+
+    def __init__(
+        self,
+        search: str = "gbfs",
+        heuristic: str = "hadd",
+        weight: float = 1,
+        max_states: Optional[int] = None,
+        **kwargs,
+    ):
+        Engine.__init__(self)
+        OneshotPlannerMixin.__init__(self)
+        AnytimePlannerMixin.__init__(self)
+        if search not in SEARCH_ALGORITHMS:
+            raise UPUsageError(
+                f"Unknown search algorithm {search}; the available ones are {', '.join(SEARCH_ALGORITHMS)}."
+            )
+        if heuristic not in HEURISTICS:
+            raise UPUsageError(
+                f"Unknown heuristic {heuristic}; the available ones are {', '.join(HEURISTICS)}."
+            )
+        if weight < 1:
+            raise UPUsageError("The weight of the A* search must be at least 1.")
+        if max_states is not None and max_states <= 0:
+            raise UPUsageError("The max_states limit must be positive.")
+        self._search = search
+        self._heuristic = heuristic
+        self._weight = weight
+        self._max_states = max_states
+
+    @property
+    def name(self) -> str:
+        return "up_heuristic_search"
+
+    @property
+    def search(self) -> str:
+        """Returns the search algorithm used by this planner."""
+        return self._search
+
+    @property
+    def heuristic(self) -> str:
+        """Returns the name of the heuristic used by this planner."""
+        return self._heuristic
+
+    @property
+    def max_states(self) -> Optional[int]:
+        """Returns the maximum number of states stored by a search, `None` if unlimited."""
+        return self._max_states
+
+    @staticmethod
+    def supported_kind() -> ProblemKind:
+        supported_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
+        supported_kind.set_problem_class("ACTION_BASED")
+        supported_kind.set_typing("FLAT_TYPING")
+        supported_kind.set_typing("HIERARCHICAL_TYPING")
+        supported_kind.set_parameters("BOOL_FLUENT_PARAMETERS")
+        supported_kind.set_parameters("BOUNDED_INT_FLUENT_PARAMETERS")
+        supported_kind.set_parameters("BOOL_ACTION_PARAMETERS")
+        supported_kind.set_parameters("BOUNDED_INT_ACTION_PARAMETERS")
+        supported_kind.set_numbers("BOUNDED_TYPES")
+        supported_kind.set_problem_type("SIMPLE_NUMERIC_PLANNING")
+        supported_kind.set_problem_type("GENERAL_NUMERIC_PLANNING")
+        supported_kind.set_fluents_type("INT_FLUENTS")
+        supported_kind.set_fluents_type("REAL_FLUENTS")
+        supported_kind.set_fluents_type("OBJECT_FLUENTS")
+        supported_kind.set_conditions_kind("NEGATIVE_CONDITIONS")
+        supported_kind.set_conditions_kind("DISJUNCTIVE_CONDITIONS")
+        supported_kind.set_conditions_kind("EQUALITIES")
+        supported_kind.set_conditions_kind("EXISTENTIAL_CONDITIONS")
+        supported_kind.set_conditions_kind("UNIVERSAL_CONDITIONS")
+        supported_kind.set_effects_kind("CONDITIONAL_EFFECTS")
+        supported_kind.set_effects_kind("INCREASE_EFFECTS")
+        supported_kind.set_effects_kind("DECREASE_EFFECTS")
+        supported_kind.set_effects_kind("STATIC_FLUENTS_IN_BOOLEAN_ASSIGNMENTS")
+        supported_kind.set_effects_kind("STATIC_FLUENTS_IN_NUMERIC_ASSIGNMENTS")
+        supported_kind.set_effects_kind("STATIC_FLUENTS_IN_OBJECT_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FLUENTS_IN_BOOLEAN_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FLUENTS_IN_NUMERIC_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FLUENTS_IN_OBJECT_ASSIGNMENTS")
+        supported_kind.set_effects_kind("FORALL_EFFECTS")
+        supported_kind.set_simulated_entities("SIMULATED_EFFECTS")
+        supported_kind.set_constraints_kind("STATE_INVARIANTS")
+        supported_kind.set_quality_metrics("ACTIONS_COST")
+        supported_kind.set_actions_cost_kind("STATIC_FLUENTS_IN_ACTIONS_COST")
+        supported_kind.set_actions_cost_kind("FLUENTS_IN_ACTIONS_COST")
+        supported_kind.set_actions_cost_kind("INT_NUMBERS_IN_ACTIONS_COST")
+        supported_kind.set_actions_cost_kind("REAL_NUMBERS_IN_ACTIONS_COST")
+        supported_kind.set_quality_metrics("PLAN_LENGTH")
+        return supported_kind
+
+    @staticmethod
+    def supports(problem_kind: ProblemKind) -> bool:
+        return problem_kind <= HeuristicSearchPlanner.supported_kind()
+
+    @staticmethod
+    def satisfies(optimality_guarantee: OptimalityGuarantee) -> bool:
+        return optimality_guarantee == OptimalityGuarantee.SATISFICING
+
+    @staticmethod
+    def ensures(anytime_guarantee: AnytimeGuarantee) -> bool:
+        return anytime_guarantee == AnytimeGuarantee.INCREASING_QUALITY
+
+    def _solve(
+        self,
+        problem: "up.model.AbstractProblem",
+        heuristic: Optional[Callable[["up.model.state.State"], Optional[float]]] = None,
+        timeout: Optional[float] = None,
+        output_stream: Optional[IO[str]] = None,
+    ) -> PlanGenerationResult:
+        assert isinstance(problem, Problem)
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        try:
+            task = _SearchTask(problem, self._heuristic, heuristic, deadline)
+        except _Timeout:
+            return PlanGenerationResult(
+                PlanGenerationResultStatus.TIMEOUT, None, self.name
+            )
+        weight = None if self._search == "gbfs" else self._weight
+        status, plan, _, metrics = self._best_first_search(task, weight, None, deadline)
+        if plan is not None:
+            self._log(output_stream, plan, metrics)
+            if weight == 1 and task.admissible and problem.quality_metrics:
+                status = PlanGenerationResultStatus.SOLVED_OPTIMALLY
+        return PlanGenerationResult(status, plan, self.name, metrics)
+
+    def _get_solutions(
+        self,
+        problem: "up.model.AbstractProblem",
+        timeout: Optional[float] = None,
+        output_stream: Optional[IO[str]] = None,
+    ) -> Iterator[PlanGenerationResult]:
+        assert isinstance(problem, Problem)
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        try:
+            task = _SearchTask(problem, self._heuristic, None, deadline)
+        except _Timeout:
+            yield PlanGenerationResult(
+                PlanGenerationResultStatus.TIMEOUT, None, self.name
+            )
+            return
+        weight: Optional[float] = None if self._search == "gbfs" else self._weight
+        next_weights = iter(w for w in ANYTIME_WEIGHTS if weight is None or w < weight)
+        best_plan: Optional[SequentialPlan] = None
+        best_cost: Optional[Cost] = None
+        while True:
+            status, plan, cost, metrics = self._best_first_search(
+                task, weight, best_cost, deadline
+            )
+            if plan is not None:
+                assert cost is not None
+                self._log(output_stream, plan, metrics)
+                best_plan, best_cost = plan, cost
+                yield PlanGenerationResult(
+                    PlanGenerationResultStatus.INTERMEDIATE, plan, self.name, metrics
+                )
+                weight = next(next_weights, weight)
+                continue
+            if best_plan is not None:
+                if (
+                    status == PlanGenerationResultStatus.UNSOLVABLE_PROVEN
+                    and problem.quality_metrics
+                ):
+                    # the search was bounded by the cost of the best plan
+                    status = PlanGenerationResultStatus.SOLVED_OPTIMALLY
+                else:
+                    status = PlanGenerationResultStatus.SOLVED_SATISFICING
+            yield PlanGenerationResult(status, best_plan, self.name, metrics)
+            return
+
+    def _log(
+        self,
+        output_stream: Optional[IO[str]],
+        plan: SequentialPlan,
+        metrics: Dict[str, str],
+    ):
+        if output_stream is not None:
+            output_stream.write(
+                f"Found a plan with {len(plan.actions)} actions and cost {metrics['plan_cost']} "
+                f"after expanding {metrics['expanded_states']} states.\n"
+            )
+
+    def _best_first_search(
+        self,
+        task: "_SearchTask",
+        weight: Optional[float],
+        bound: Optional[Cost],
+        deadline: Optional[float],
+    ) -> Tuple[
+        PlanGenerationResultStatus,
+        Optional[SequentialPlan],
+        Optional[Cost],
+        Dict[str, str],
+    ]:
+        """
+        Searches a plan with greedy best-first search, when `weight` is `None`, or with
+        weighted A*, re-opening the states reached with a lower cost.
+
+        :param task: The problem and the functions used by the search.
+        :param weight: The weight of the heuristic in A*, `None` for greedy best-first search.
+        :param bound: If not `None`, the states reached with a cost greater or equal to
+            `bound` are pruned.
+        :param deadline: The `time.perf_counter` value after which the search stops.
+        :return: The status of the search, the plan found and its cost, and the metrics
+            of the search.
+        """
+        simulator = task.simulator
+        initial_state = simulator.get_initial_state()
+        assert isinstance(initial_state, UPState)
+        g_values: Dict[UPState, Cost] = {initial_state: 0}
+        parents: Dict[UPState, Tuple[UPState, Action, Tuple[FNode, ...]]] = {}
+        h_values: Dict[UPState, Optional[float]] = {}
+        counter = count()
+        expanded, incomplete = 0, False
+
+        def metrics(plan_cost: Optional[Cost] = None) -> Dict[str, str]:
+            res = {
+                "expanded_states": str(expanded),
+                "generated_states": str(len(g_values)),
+            }
+            if plan_cost is not None:
+                res["plan_cost"] = str(plan_cost)
+            return res
+
+        def priority(g: Cost, h: float) -> Cost:
+            return h if weight is None else g + weight * h
+
+        h = task.heuristic(initial_state)
+        if h is None:
+            status = (
+                PlanGenerationResultStatus.UNSOLVABLE_PROVEN
+                if task.safe_dead_ends
+                else PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY
+            )
+            return status, None, None, metrics()
+        open_list = [(priority(0, h), h, next(counter), 0, initial_state)]
+        while open_list:
+            if deadline is not None and time.perf_counter() > deadline:
+                return PlanGenerationResultStatus.TIMEOUT, None, None, metrics()
+            _, _, _, g, state = heapq.heappop(open_list)
+            if g > g_values[state]:
+                continue  # reached again with a lower cost
+            if simulator.is_goal(state):
+                plan = self._extract_plan(task.problem, state, parents)
+                return (
+                    PlanGenerationResultStatus.SOLVED_SATISFICING,
+                    plan,
+                    g,
+                    metrics(g),
+                )
+            expanded += 1
+            for action, params, successor in simulator.expand([state])[0]:
+                assert isinstance(successor, UPState)
+                successor_g = g + task.action_cost(state, action, params)
+                if bound is not None and successor_g >= bound:
+                    continue
+                old_g = g_values.get(successor, None)
+                if old_g is not None and (weight is None or old_g <= successor_g):
+                    continue
+                if successor in h_values:
+                    h = h_values[successor]
+                else:
+                    h = task.successor_heuristic(state, action, params, successor)
+                    h_values[successor] = h
+                if h is None:
+                    incomplete = incomplete or not task.safe_dead_ends
+                    continue
+                if old_g is None and self._max_states is not None:
+                    if len(g_values) >= self._max_states:
+                        return PlanGenerationResultStatus.MEMOUT, None, None, metrics()
+                g_values[successor] = successor_g
+                parents[successor] = (state, action, params)
+                heapq.heappush(
+                    open_list,
+                    (
+                        priority(successor_g, h),
+                        h,
+                        next(counter),
+                        successor_g,
+                        successor,
+                    ),
+                )
+        if incomplete:
+            return (
+                PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY,
+                None,
+                None,
+                metrics(),
+            )
+        return PlanGenerationResultStatus.UNSOLVABLE_PROVEN, None, None, metrics()
+
+    def _extract_plan(
+        self,
+        problem: Problem,
+        state: UPState,
+        parents: Dict[UPState, Tuple[UPState, Action, Tuple[FNode, ...]]],
+    ) -> SequentialPlan:
+        actions: List[ActionInstance] = []
+        while state in parents:
+            state, action, params = parents[state]
+            actions.append(ActionInstance(action, params))
+        actions.reverse()
+        return SequentialPlan(actions, problem.environment)
+
+
+class _Timeout(Exception):
+    """Raised when the deadline expires while a search is set up."""
+
+
+class _SearchTask:
+    """
+    Collects, for a problem, the simulator, the heuristic function and the action costs
+    used by the searches of the :class:`HeuristicSearchPlanner`.
+    """
+
+    def __init__(
+        self,
+        problem: Problem,
+        heuristic_name: str,
+        heuristic: Optional[Callable[["up.model.state.State"], Optional[float]]],
+        deadline: Optional[float],
+    ):
+        self.problem = problem
+        self.simulator = UPSequentialSimulator(problem)
+        # the simulator caches the grounded actions, so every action is grounded
+        # once, checking the deadline in between
+        grounded_actions = []
+        for grounded_action in self.simulator.get_grounded_actions():
+            if deadline is not None and time.perf_counter() > deadline:
+                raise _Timeout
+            grounded_actions.append(grounded_action)
+        self._se = StateEvaluator(problem)
+        self._metric: Optional[MinimizeActionCosts] = None
+        for qm in problem.quality_metrics:
+            if isinstance(qm, MinimizeActionCosts):
+                self._metric = qm
+        self._costs: Dict[Tuple[Action, Tuple[FNode, ...]], FNode] = {}
+        # a user defined heuristic might mark as dead ends states that are not
+        self.safe_dead_ends = heuristic is None
+        self.admissible = heuristic is None and heuristic_name in ("hmax", "blind")
+        self.heuristic: Callable[["up.model.state.State"], Optional[float]]
+        # the heuristic of a successor, given the state, the action and its parameters
+        self.successor_heuristic: Callable[
+            [
+                "up.model.state.State",
+                Action,
+                Tuple[FNode, ...],
+                "up.model.state.State",
+            ],
+            Optional[float],
+        ] = lambda state, action, params, successor: self.heuristic(successor)
+        if heuristic is not None:
+            self.heuristic = heuristic
+        elif heuristic_name == "goal_count":
+            self.heuristic = self._goal_count
+        elif heuristic_name == "blind":
+            self.heuristic = lambda state: 0
+        else:
+            task = RelaxedTask(problem, grounded_actions, self._static_cost)
+            relaxation_heuristic = RELAXATION_HEURISTICS[heuristic_name](task)
+            self.heuristic = relaxation_heuristic
+            # only the facts modified by the action are read from the successors
+            self.successor_heuristic = relaxation_heuristic.evaluate_successor
+
+    def _goal_count(self, state: "up.model.state.State") -> float:
+        return len(self.simulator.get_unsatisfied_goals(state))
+
+    def _grounded_cost(
+        self, action: Action, params: Tuple[FNode, ...]
+    ) -> Optional[FNode]:
+        if self._metric is None:
+            return None
+        key = (action, params)
+        cost = self._costs.get(key, None)
+        if cost is None:
+            lifted_cost = self._metric.get_action_cost(action)
+            if lifted_cost is None:
+                raise UPUsageError(
+                    f"The cost of the action {action.name} is not set in the MinimizeActionCosts metric."
+                )
+            cost = self.simulator.simplify(
+                lifted_cost.substitute(dict(zip(action.parameters, params)))
+            )
+            self._costs[key] = cost
+        return cost
+
+    def action_cost(
+        self, state: "up.model.state.State", action: Action, params: Tuple[FNode, ...]
+    ) -> Cost:
+        """Returns the cost of applying the given grounded action in the given state."""
+        cost = self._grounded_cost(action, params)
+        if cost is None:
+            return 1
+        if not cost.is_constant():
+            cost = self._se.evaluate(cost, state)
+        return cost.constant_value()
+
+    def _static_cost(self, action: Action, params: Tuple[FNode, ...]) -> Cost:
+        # the costs depending on the state are relaxed to 0
+        cost = self._grounded_cost(action, params)
+        if cost is None:
+            return 1
+        if cost.is_constant():
+            return max(cost.constant_value(), 0)
+        return 0
@@ -0,0 +1,555 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+This module defines the heuristics computed on the delete relaxation of a grounded
+:class:`~unified_planning.model.Problem`.
+
+The problem is compiled once in a :class:`RelaxedTask`, where facts and actions are
+integers, and the heuristics evaluate the :class:`States <unified_planning.model.State>`
+on it; for example, with the states of the :class:`~unified_planning.engines.UPSequentialSimulator`:
+
+    task = RelaxedTask(problem)
+    h_ff = HFF(task)
+    state = simulator.get_initial_state()
+    h_ff(state)
+"""
+
+
+import heapq
+from abc import ABC, abstractmethod
+from collections import deque
+from fractions import Fraction
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+import unified_planning as up
+from unified_planning.engines.compilers import GrounderHelper
+from unified_planning.model import Action, FNode, Problem
+from unified_planning.utils import set_bits
+
+
+Cost = Union[int, float, Fraction]
+GroundedAction = Tuple[Action, Tuple[FNode, ...]]
+
+
+class RelaxedTask:
+    """
+    Represents the delete relaxation of a grounded :class:`~unified_planning.model.Problem`
+    with integer-indexed structures.
+
+    The facts are the grounded boolean fluents that appear positively in the conjunctions
+    of the preconditions, of the conditions of the effects and of the goals; every other
+    condition is ignored, so the relaxation is an over-approximation of the problem.
+    A relaxed operator is created for every grounded action and every condition of its
+    effects, adding the facts that the effects might set to `True`; the simulated
+    effects add every boolean fluent they might modify and the alternative effects
+    of a :class:`~unified_planning.model.nondeterministicAction.NondeterministicAction`
+    are all considered, so the relaxation also applies to the all-outcomes determinization
+    of non-deterministic and contingent problems.
+
+    :param problem: The `Problem` to relax.
+    :param grounded_actions: The grounded actions of the problem, as returned by
+        :func:`GrounderHelper.get_grounded_actions <unified_planning.engines.compilers.GrounderHelper.get_grounded_actions>`;
+        by default the `problem` is grounded by a new `GrounderHelper`.
+    :param action_cost: The function returning the non-negative cost of a grounded
+        action, given the original action and its parameters; by default every action
+        costs `1`.
+    """
+
+    def __init__(
+        self,
+        problem: Problem,
+        grounded_actions: Optional[
+            Iterable[Tuple[Action, Tuple[FNode, ...], Optional[Action]]]
+        ] = None,
+        action_cost: Optional[Callable[[Action, Tuple[FNode, ...]], Cost]] = None,
+    ):
+        if grounded_actions is None:
+            grounded_actions = GrounderHelper(problem).get_grounded_actions()
+        self._problem = problem
+        self._facts: Dict[FNode, int] = {}
+        self._facts_exps: List[FNode] = []
+        self._goal = tuple(
+            sorted({self._add_fact(a) for g in problem.goals for a in _atoms(g)})
+        )
+        self._actions: List[GroundedAction] = []
+        self._actions_ids: Dict[GroundedAction, int] = {}
+        self._actions_costs: List[Cost] = []
+        actions_effects = []
+        for original_action, params, grounded_action in grounded_actions:
+            if grounded_action is None:
+                continue
+            assert isinstance(grounded_action, up.model.InstantaneousAction)
+            pre = {
+                self._add_fact(a)
+                for c in grounded_action.preconditions
+                for a in _atoms(c)
+            }
+            effects = [
+                e
+                for effect in grounded_action.effects
+                for e in effect.expand_effect(problem)
+            ]
+            for e in effects:
+                for a in _atoms(e.condition):
+                    self._add_fact(a)
+            cost = 1 if action_cost is None else action_cost(original_action, params)
+            self._actions_ids[(original_action, params)] = len(self._actions)
+            self._actions.append((original_action, params))
+            self._actions_costs.append(max(cost, 0))
+            actions_effects.append((pre, effects, grounded_action.simulated_effect))
+
+        facts_by_fluent: Dict["up.model.Fluent", List[int]] = {}
+        for fluent_exp, fact in self._facts.items():
+            facts_by_fluent.setdefault(fluent_exp.fluent(), []).append(fact)
+
+        def modified_facts(fluent_exp: FNode) -> Optional[List[int]]:
+            if all(a.is_constant() for a in fluent_exp.args):
+                fact = self._facts.get(fluent_exp, None)
+                return [] if fact is None else [fact]
+            return None  # the fluent instance depends on the state
+
+        self._op_pre: List[Tuple[int, ...]] = []
+        self._op_adds: List[Tuple[int, ...]] = []
+        self._op_cost: List[Cost] = []
+        self._op_action: List[int] = []
+        # for every action, the facts it might modify or None if they are unknown
+        self._action_modifies: List[Optional[Tuple[int, ...]]] = []
+        true_exp = problem.environment.expression_manager.TRUE()
+        for action_id, (pre, effects, simulated_effect) in enumerate(actions_effects):
+            adds: Dict[FNode, Set[int]] = {}
+            modifies: Optional[Set[int]] = set()
+            modified_fluents = [e.fluent for e in effects]
+            if simulated_effect is not None:
+                modified_fluents.extend(simulated_effect.fluents)
+            for fluent_exp in modified_fluents:
+                facts = modified_facts(fluent_exp)
+                if facts is None:
+                    modifies = None
+                elif modifies is not None:
+                    modifies.update(facts)
+            for e in effects:
+                if e.fluent.type.is_bool_type() and not e.value.is_false():
+                    facts = modified_facts(e.fluent)
+                    if facts is None:
+                        facts = facts_by_fluent.get(e.fluent.fluent(), [])
+                    adds.setdefault(e.condition, set()).update(facts)
+            if simulated_effect is not None:
+                for fluent_exp in simulated_effect.fluents:
+                    if fluent_exp.type.is_bool_type():
+                        facts = modified_facts(fluent_exp)
+                        if facts is None:
+                            facts = facts_by_fluent.get(fluent_exp.fluent(), [])
+                        adds.setdefault(true_exp, set()).update(facts)
+            self._action_modifies.append(
+                None if modifies is None else tuple(sorted(modifies))
+            )
+            for condition, condition_adds in adds.items():
+                if condition_adds:
+                    op_pre = pre | {self._facts[a] for a in _atoms(condition)}
+                    self._op_pre.append(tuple(sorted(op_pre)))
+                    self._op_adds.append(tuple(sorted(condition_adds)))
+                    self._op_cost.append(self._actions_costs[action_id])
+                    self._op_action.append(action_id)
+        self._pre_of: List[List[int]] = [[] for _ in self._facts_exps]
+        for op, op_pre in enumerate(self._op_pre):
+            for fact in op_pre:
+                self._pre_of[fact].append(op)
+        self._no_pre = tuple(op for op, op_pre in enumerate(self._op_pre) if not op_pre)
+
+    def _add_fact(self, fluent_exp: FNode) -> int:
+        fact = self._facts.get(fluent_exp, None)
+        if fact is None:
+            fact = len(self._facts_exps)
+            self._facts[fluent_exp] = fact
+            self._facts_exps.append(fluent_exp)
+        return fact
+
+    @property
+    def problem(self) -> Problem:
+        """Returns the relaxed `Problem`."""
+        return self._problem
+
+    @property
+    def facts(self) -> List[FNode]:
+        """Returns the facts of the relaxation; the index of a fact is its id."""
+        return self._facts_exps
+
+    @property
+    def actions(self) -> List[GroundedAction]:
+        """Returns the grounded actions of the relaxation as `(action, parameters)`; the index of an action is its id."""
+        return self._actions
+
+    @property
+    def actions_costs(self) -> List[Cost]:
+        """Returns the cost of every action, indexed by action id."""
+        return self._actions_costs
+
+    @property
+    def goal(self) -> Tuple[int, ...]:
+        """Returns the ids of the facts in the goals."""
+        return self._goal
+
+    @property
+    def num_operators(self) -> int:
+        """Returns the number of relaxed operators."""
+        return len(self._op_pre)
+
+    def fact_id(self, fluent_exp: FNode) -> Optional[int]:
+        """Returns the id of the given fact, `None` if it is not a fact of the relaxation."""
+        return self._facts.get(fluent_exp, None)
+
+    def facts_mask(self, state: "up.model.State") -> int:
+        """
+        Returns the bitmask of the facts that are `True` in the given state.
+
+        :param state: The state to read.
+        :return: The integer with the bit of every `True` fact set.
+        """
+        mask = 0
+        for fact, fluent_exp in enumerate(self._facts_exps):
+            if state.get_value(fluent_exp).is_true():
+                mask |= 1 << fact
+        return mask
+
+    def successor_facts_mask(
+        self,
+        mask: int,
+        action: Action,
+        params: Tuple[FNode, ...],
+        successor: "up.model.State",
+    ) -> int:
+        """
+        Returns the bitmask of the facts that are `True` in the state obtained applying
+        the given grounded action in a state with the given bitmask, reading from the
+        successor only the facts the action might modify.
+
+        :param mask: The facts bitmask of the state where the action is applied.
+        :param action: The applied action.
+        :param params: The parameters of the applied action.
+        :param successor: The state obtained applying the action.
+        :return: The facts bitmask of `successor`.
+        """
+        action_id = self._actions_ids.get((action, params), None)
+        modifies = None if action_id is None else self._action_modifies[action_id]
+        if modifies is None:
+            return self.facts_mask(successor)
+        for fact in modifies:
+            if successor.get_value(self._facts_exps[fact]).is_true():
+                mask |= 1 << fact
+            else:
+                mask &= ~(1 << fact)
+        return mask
+
+    def relaxed_costs(
+        self, mask: int, additive: bool
+    ) -> Tuple[List[Cost], List[Optional[int]]]:
+        """
+        Computes the cost of reaching every fact from the given facts in the relaxation,
+        where the cost of a set of facts is the sum (or the maximum) of their costs.
+
+        :param mask: The bitmask of the initial facts.
+        :param additive: `True` for the additive cost, `False` for the max cost.
+        :return: The cost of every fact (`inf` if unreachable) and, for every fact, the
+            relaxed operator achieving it with the minimum cost (`None` for the initial
+            or unreachable facts).
+        """
+        inf = float("inf")
+        costs: List[Cost] = [inf] * len(self._facts_exps)
+        supporters: List[Optional[int]] = [None] * len(self._facts_exps)
+        queue: List[Tuple[Cost, int]] = []
+        for fact in set_bits(mask):
+            costs[fact] = 0
+            queue.append((0, fact))
+        for op in self._no_pre:
+            for fact in self._op_adds[op]:
+                if self._op_cost[op] < costs[fact]:
+                    costs[fact] = self._op_cost[op]
+                    supporters[fact] = op
+                    queue.append((self._op_cost[op], fact))
+        heapq.heapify(queue)
+        missing = [len(op_pre) for op_pre in self._op_pre]
+        pre_costs: List[Cost] = [0] * len(self._op_pre)
+        op_adds, op_cost, pre_of = self._op_adds, self._op_cost, self._pre_of
+        # generalized Dijkstra: every fact is expanded once, with its final cost
+        while queue:
+            cost, fact = heapq.heappop(queue)
+            if cost > costs[fact]:
+                continue
+            for op in pre_of[fact]:
+                missing[op] -= 1
+                if additive:
+                    pre_costs[op] += cost
+                elif cost > pre_costs[op]:
+                    pre_costs[op] = cost
+                if missing[op] == 0:
+                    new_cost = pre_costs[op] + op_cost[op]
+                    for added in op_adds[op]:
+                        if new_cost < costs[added]:
+                            costs[added] = new_cost
+                            supporters[added] = op
+                            heapq.heappush(queue, (new_cost, added))
+        return costs, supporters
+
+    def relaxed_plan(self, mask: int, supporters: Sequence[Optional[int]]) -> List[int]:
+        """
+        Extracts a relaxed plan for the goals from the supporters computed by
+        :func:`relaxed_costs`.
+
+        :param mask: The bitmask of the initial facts.
+        :param supporters: The supporter of every fact.
+        :return: The ids of the actions in the relaxed plan, in an executable order.
+        """
+        plan: List[int] = []
+        in_plan: Set[int] = set()
+        visited = mask
+        stack: List[Tuple[int, bool]] = [(g, False) for g in reversed(self._goal)]
+        while stack:
+            fact, expanded = stack.pop()
+            op = supporters[fact]
+            if expanded:
+                assert op is not None
+                action_id = self._op_action[op]
+                if action_id not in in_plan:
+                    in_plan.add(action_id)
+                    plan.append(action_id)
+                continue
+            if visited & (1 << fact):
+                continue
+            visited |= 1 << fact
+            assert op is not None, "the goals must be reachable"
+            stack.append((fact, True))
+            stack.extend((p, False) for p in self._op_pre[op])
+        return plan
+
+    def landmarks(self, mask: int) -> List[Optional[int]]:
+        """
+        Computes, for every fact, the bitmask of the facts that must be true at some point
+        in every relaxed plan reaching it from the given facts; the fact itself is a
+        landmark of itself.
+
+        :param mask: The bitmask of the initial facts.
+        :return: The landmarks bitmask of every fact, `None` for the unreachable facts.
+        """
+        landmarks: List[Optional[int]] = [None] * len(self._facts_exps)
+        for fact in set_bits(mask):
+            landmarks[fact] = 1 << fact
+        queue = deque(range(len(self._op_pre)))
+        queued = [True] * len(self._op_pre)
+        op_pre, op_adds, pre_of = self._op_pre, self._op_adds, self._pre_of
+        # fixpoint of: LM(p) = {p} | intersection over the achievers a of p of union of LM(pre(a))
+        while queue:
+            op = queue.popleft()
+            queued[op] = False
+            pre_landmarks = 0
+            for fact in op_pre[op]:
+                fact_landmarks = landmarks[fact]
+                if fact_landmarks is None:
+                    break
+                pre_landmarks |= fact_landmarks
+            else:
+                for fact in op_adds[op]:
+                    old = landmarks[fact]
+                    new = pre_landmarks | (1 << fact)
+                    if old is not None:
+                        new &= old
+                    if new != old:
+                        landmarks[fact] = new
+                        for next_op in pre_of[fact]:
+                            if not queued[next_op]:
+                                queued[next_op] = True
+                                queue.append(next_op)
+        return landmarks
+
+
+class RelaxationHeuristic(ABC):
+    """
+    Base class of the heuristics computed on a :class:`RelaxedTask`.
+
+    A heuristic is a function from a `State` to its estimated distance from the goals,
+    `None` if the goals are unreachable from the state; so it can be given directly to
+    :func:`OneshotPlannerMixin.solve <unified_planning.engines.mixins.OneshotPlannerMixin.solve>`.
+    The values are cached by set of true facts, so the states that differ only for the
+    numeric or object fluents are evaluated once, and :func:`evaluate_successor` reads
+    only the facts modified by the applied action.
+    """
+
+    def __init__(self, task: RelaxedTask):
+        self._task = task
+        self._values: Dict[int, Optional[float]] = {}
+        self._masks: Dict["up.model.State", int] = {}
+
+    @property
+    def task(self) -> RelaxedTask:
+        """Returns the `RelaxedTask` where this heuristic is computed."""
+        return self._task
+
+    def __call__(self, state: "up.model.State") -> Optional[float]:
+        return self.evaluate(state)
+
+    def evaluate(self, state: "up.model.State") -> Optional[float]:
+        """
+        Returns the heuristic value of the given state.
+
+        :param state: The state to evaluate.
+        :return: The heuristic value, `None` if the goals are unreachable from `state`.
+        """
+        mask = self._masks.get(state, None)
+        if mask is None:
+            mask = self._task.facts_mask(state)
+            self._masks[state] = mask
+        return self.evaluate_mask(mask)
+
+    def evaluate_successor(
+        self,
+        state: "up.model.State",
+        action: Action,
+        params: Tuple[FNode, ...],
+        successor: "up.model.State",
+    ) -> Optional[float]:
+        """
+        Returns the heuristic value of the state obtained applying the given grounded
+        action in the given state; if `state` has already been evaluated, only the
+        facts modified by the action are read from `successor`.
+
+        :param state: The state where the action is applied.
+        :param action: The applied action.
+        :param params: The parameters of the applied action.
+        :param successor: The state to evaluate.
+        :return: The heuristic value, `None` if the goals are unreachable from `successor`.
+        """
+        mask = self._masks.get(successor, None)
+        if mask is None:
+            parent_mask = self._masks.get(state, None)
+            if parent_mask is None:
+                mask = self._task.facts_mask(successor)
+            else:
+                mask = self._task.successor_facts_mask(
+                    parent_mask, action, params, successor
+                )
+            self._masks[successor] = mask
+        return self.evaluate_mask(mask)
+
+    def evaluate_mask(self, mask: int) -> Optional[float]:
+        """
+        Returns the heuristic value of the states where exactly the facts in the given
+        bitmask are `True`.
+        """
+        if mask in self._values:
+            return self._values[mask]
+        value = self._compute(mask)
+        self._values[mask] = value
+        return value
+
+    def clear_cache(self):
+        """Removes all the values and the facts bitmasks cached by this heuristic."""
+        self._values.clear()
+        self._masks.clear()
+
+    @abstractmethod
+    def _compute(self, mask: int) -> Optional[float]:
+        raise NotImplementedError
+
+
+class HMax(RelaxationHeuristic):
+    """
+    The max heuristic: the maximum relaxed cost of the goals, where the cost of a set of
+    facts is the maximum of their costs. It is admissible.
+    """
+
+    def _compute(self, mask: int) -> Optional[float]:
+        costs, _ = self._task.relaxed_costs(mask, additive=False)
+        return _combine((costs[g] for g in self._task.goal), max)
+
+
+class HAdd(RelaxationHeuristic):
+    """
+    The additive heuristic: the sum of the relaxed costs of the goals, where the cost of
+    a set of facts is the sum of their costs.
+    """
+
+    def _compute(self, mask: int) -> Optional[float]:
+        costs, _ = self._task.relaxed_costs(mask, additive=True)
+        return _combine((costs[g] for g in self._task.goal), sum)
+
+
+class HFF(RelaxationHeuristic):
+    """
+    The FF heuristic: the cost of a relaxed plan extracted from the supporters of the
+    additive heuristic.
+    """
+
+    def _compute(self, mask: int) -> Optional[float]:
+        task = self._task
+        costs, supporters = task.relaxed_costs(mask, additive=True)
+        if any(costs[g] == float("inf") for g in task.goal):
+            return None
+        relaxed_plan = task.relaxed_plan(mask, supporters)
+        return float(sum(task.actions_costs[a] for a in relaxed_plan))
+
+    def relaxed_plan(self, state: "up.model.State") -> Optional[List[GroundedAction]]:
+        """
+        Returns the relaxed plan of the given state as a list of `(action, parameters)`,
+        `None` if the goals are unreachable.
+        """
+        task = self._task
+        mask = task.facts_mask(state)
+        costs, supporters = task.relaxed_costs(mask, additive=True)
+        if any(costs[g] == float("inf") for g in task.goal):
+            return None
+        return [task.actions[a] for a in task.relaxed_plan(mask, supporters)]
+
+
+class LandmarkCount(RelaxationHeuristic):
+    """
+    The landmark-count heuristic: the number of the fact landmarks of the goals, computed
+    on the relaxation from the evaluated state, that are not `True` in the state.
+    """
+
+    def _compute(self, mask: int) -> Optional[float]:
+        landmarks = self._task.landmarks(mask)
+        goal_landmarks = 0
+        for g in self._task.goal:
+            fact_landmarks = landmarks[g]
+            if fact_landmarks is None:
+                return None
+            goal_landmarks |= fact_landmarks
+        return float(bin(goal_landmarks & ~mask).count("1"))
+
+
+def _combine(costs: Iterable[Cost], combine: Callable) -> Optional[float]:
+    costs = list(costs)
+    if not costs:
+        return 0.0
+    value = combine(costs)
+    return None if value == float("inf") else float(value)
+
+
+def _atoms(condition: FNode) -> Iterator[FNode]:
+    """Returns the grounded boolean fluents that must be true to satisfy `condition`."""
+    if condition.is_and():
+        for arg in condition.args:
+            yield from _atoms(arg)
+    elif condition.is_fluent_exp() and all(a.is_constant() for a in condition.args):
+        yield condition
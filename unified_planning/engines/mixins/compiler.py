@@ -38,6 +38,7 @@ class CompilationKind(Enum):
     MA_SL_ROBUSTNESS_VERIFICATION = auto()
     MA_SL_SOCIAL_LAW = auto()
     SA_MA_CONVERSION = auto()
+    IRRELEVANT_ELEMENTS_REMOVING = auto()
 
 
 class CompilerMixin(ABC):
@@ -45,6 +46,9 @@ class CompilerMixin(ABC):
 
     def __init__(self, default: Optional[CompilationKind] = None):
         self._default = default
+        self._compilation_cache: Optional[
+            "up.engines.compilation_cache.CompilationCache"
+        ] = None
 
     def compile(
         self,
@@ -90,7 +94,37 @@ class CompilerMixin(ABC):
                 raise up.exceptions.UPUsageError(msg)
             else:
                 warn(msg)
-        return self._compile(problem, compilation_kind)
+        return self._cached_compile(problem, compilation_kind)
+
+    def _cached_compile(
+        self, problem: "up.model.AbstractProblem", compilation_kind: CompilationKind
+    ) -> "up.engines.results.CompilerResult":
+        """
+        Calls :func:`~unified_planning.engines.mixins.CompilerMixin._compile`, looking up
+        the result in the :func:`compilation_cache <unified_planning.engines.mixins.CompilerMixin.compilation_cache>`
+        first, if it is set.
+        """
+        assert isinstance(self, up.engines.engine.Engine)
+        cache = getattr(self, "_compilation_cache", None)
+        if cache is None:
+            return self._compile(problem, compilation_kind)
+        key = cache.key(problem, self, compilation_kind)
+        res = cache.get(key, problem)
+        if res is None:
+            res = self._compile(problem, compilation_kind)
+            cache.put(key, res)
+        return res
+
+    def _compilation_configuration(self) -> Optional[str]:
+        """
+        Returns a representation of the options of this compiler that change its
+        results, stable across process restarts, used in the key of the
+        :func:`compilation_cache <unified_planning.engines.mixins.CompilerMixin.compilation_cache>`.
+
+        The default `None` means that the results of this compiler are not cached; the
+        compilers opt in to the cache by overriding this method.
+        """
+        return None
 
     @property
     def default(self) -> Optional[CompilationKind]:
@@ -112,6 +146,29 @@ class CompilerMixin(ABC):
         """
         self._default = default
 
+    @property
+    def compilation_cache(
+        self,
+    ) -> Optional["up.engines.compilation_cache.CompilationCache"]:
+        """
+        Returns the :class:`~unified_planning.engines.compilation_cache.CompilationCache` used by
+        this compiler, or `None` if the results of this compiler are not cached.
+
+        :return: The `CompilationCache` used by this compiler.
+        """
+        return getattr(self, "_compilation_cache", None)
+
+    @compilation_cache.setter
+    def compilation_cache(
+        self, cache: Optional["up.engines.compilation_cache.CompilationCache"]
+    ):
+        """
+        Sets the compilation cache.
+
+        :param cache: The `CompilationCache` to use, or `None` to disable the caching.
+        """
+        self._compilation_cache = cache
+
     @staticmethod
     def is_compiler() -> bool:
         """Returns True."""
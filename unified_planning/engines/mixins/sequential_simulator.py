@@ -204,6 +204,95 @@ class SequentialSimulatorMixin(ABC):
         """
         raise NotImplementedError
 
+    def expand(
+        self, states: Sequence["up.model.State"]
+    ) -> List[
+        List[Tuple["up.model.Action", Tuple["up.model.FNode", ...], "up.model.State"]]
+    ]:
+        """
+        Returns, for every given `State`, the list of its successors, together with the
+        `action + parameters` that generates them.
+
+        This is equivalent to calling :func:`apply <unified_planning.engines.mixins.SequentialSimulatorMixin.apply>`
+        with every applicable action returned by :func:`get_applicable_actions <unified_planning.engines.mixins.SequentialSimulatorMixin.get_applicable_actions>`,
+        but the simulators can share the work done on the whole frontier.
+
+        :param states: The `States` to expand.
+        :return: For every state, the list of the `(action, parameters, successor)` tuples.
+        """
+        return self._expand(states)
+
+    def _expand(
+        self, states: Sequence["up.model.State"]
+    ) -> List[
+        List[Tuple["up.model.Action", Tuple["up.model.FNode", ...], "up.model.State"]]
+    ]:
+        """
+        Method called by the up.engines.mixins.sequential_simulator.SequentialSimulatorMixin.expand.
+        """
+        successors = []
+        for state in states:
+            state_successors = []
+            for action, params in self._get_applicable_actions(state):
+                successor = self._apply(state, action, params)
+                if successor is not None:
+                    state_successors.append((action, params, successor))
+            successors.append(state_successors)
+        return successors
+
+    def apply_many(
+        self,
+        state: "up.model.State",
+        actions: Sequence[
+            Union[
+                "up.plans.ActionInstance",
+                Tuple["up.model.Action", Sequence["up.model.Expression"]],
+            ]
+        ],
+    ) -> List[Optional["up.model.State"]]:
+        """
+        Applies every given action to the given `state`, as the :func:`apply <unified_planning.engines.mixins.SequentialSimulatorMixin.apply>`
+        method does.
+
+        :param state: The state in which the actions are applied.
+        :param actions: The `ActionInstances` or the couples `(action, parameters)` to apply.
+        :return: For every action, `None` if it is not applicable in the given `state`,
+            the new `State` generated otherwise.
+        """
+        grounded_actions = []
+        for action in actions:
+            if isinstance(action, up.plans.ActionInstance):
+                grounded_actions.append(self._get_action_and_parameters(action))
+            else:
+                grounded_actions.append(self._get_action_and_parameters(*action))
+        return self._apply_many(state, grounded_actions)
+
+    def _apply_many(
+        self,
+        state: "up.model.State",
+        actions: Sequence[Tuple["up.model.Action", Tuple["up.model.FNode", ...]]],
+    ) -> List[Optional["up.model.State"]]:
+        """
+        Method called by the up.engines.mixins.sequential_simulator.SequentialSimulatorMixin.apply_many.
+        """
+        return [self._apply(state, action, params) for action, params in actions]
+
+    def goal_mask(self, states: Sequence["up.model.State"]) -> List[bool]:
+        """
+        Returns, for every given `State`, `True` if it satisfies the problem goals,
+        as the :func:`is_goal <unified_planning.engines.mixins.SequentialSimulatorMixin.is_goal>` method does.
+
+        :param states: The `States` in which the goals are evaluated.
+        :return: The list of the `is_goal` results, one for every state.
+        """
+        return self._goal_mask(states)
+
+    def _goal_mask(self, states: Sequence["up.model.State"]) -> List[bool]:
+        """
+        Method called by the up.engines.mixins.sequential_simulator.SequentialSimulatorMixin.goal_mask.
+        """
+        return [self._is_goal(state) for state in states]
+
     @staticmethod
     def is_sequential_simulator():
         return True
@@ -27,6 +27,7 @@ from unified_planning.engines.results import (
     PlanGenerationResultStatus,
 )
 from unified_planning.io import PDDLWriter
+from unified_planning.io.pddl_reader import PlanLineParser
 from unified_planning.plans import Plan
 
 # This module implements two different mechanisms to execute a PDDL planner in a
@@ -54,7 +55,8 @@ class Writer(up.AnyBaseClass):
         self._output_stream: IO[str] = output_stream
         self._engine: "PDDLAnytimePlanner" = engine
         self.problem = problem
-        self.current_plan: List[str] = []
+        self.current_plan: List = []
+        self.plan_line_parser: Optional[PlanLineParser] = None
         self.storing: bool = False
         self.res_queue: Queue[PlanGenerationResult] = res_queue
         self.last_plan_found: Optional[Plan] = None
@@ -126,17 +128,31 @@ class PDDLAnytimePlanner(engines.pddl_planner.PDDLPlanner, mixins.AnytimePlanner
         - writer.current_plan: The List of ActionInstances (or Tuple[Fraction, ActionInstance, Optional[Fraction]]
             for temporal problems) that currently contains the plan being parsed; must be set to an empty when the
             plan is generated and added to the Queue.
+        - writer.plan_line_parser: The PlanLineParser of the plan lines, created when the first plan starts.
         - writer.last_plan_found: The last complete plan found and parsed.
         """
         assert isinstance(self._writer, PDDLWriter)
+        # the lines are parsed as they are printed, unless the engine parses
+        # the whole plan with its own _plan_from_str
+        incremental = (
+            type(self)._plan_from_str is engines.pddl_planner.PDDLPlanner._plan_from_str
+        )
         for l in planner_output.splitlines():
             if self._starting_plan_str() in l:
                 writer.storing = True
+                if incremental and writer.plan_line_parser is None:
+                    writer.plan_line_parser = PlanLineParser(
+                        writer.problem, self._writer.get_item_named
+                    )
             elif writer.storing and self._ending_plan_str() in l:
-                plan_str = "\n".join(writer.current_plan)
-                plan = self._plan_from_str(
-                    writer.problem, plan_str, self._writer.get_item_named
-                )
+                if incremental:
+                    assert writer.plan_line_parser is not None
+                    plan = writer.plan_line_parser.plan(writer.current_plan)
+                else:
+                    plan_str = "\n".join(writer.current_plan)
+                    plan = self._plan_from_str(
+                        writer.problem, plan_str, self._writer.get_item_named
+                    )
                 res = PlanGenerationResult(
                     PlanGenerationResultStatus.INTERMEDIATE,
                     plan=plan,
@@ -146,7 +162,14 @@ class PDDLAnytimePlanner(engines.pddl_planner.PDDLPlanner, mixins.AnytimePlanner
                 writer.current_plan = []
                 writer.storing = False
             elif writer.storing and l:
-                writer.current_plan.append(self._parse_plan_line(l))
+                plan_line = self._parse_plan_line(l)
+                if incremental:
+                    assert writer.plan_line_parser is not None
+                    action = writer.plan_line_parser.parse_line(plan_line)
+                    if action is not None:
+                        writer.current_plan.append(action)
+                else:
+                    writer.current_plan.append(plan_line)
 
     def _starting_plan_str(self) -> str:
         """
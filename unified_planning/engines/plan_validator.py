@@ -487,7 +487,7 @@ class TimeTriggeredPlanValidator(engines.engine.Engine, mixins.PlanValidatorMixi
             next_id += 1
 
         time = Fraction(0)
-        last_state = UPState(problem.initial_values)
+        last_state = UPState(dict(problem.initial_values))
         trace: Dict[Fraction, State] = {Fraction(-1): last_state}
         scheduled_effects.sort(key=lambda x: x[0])
         while len(start_actions) + len(scheduled_effects) > 0:
@@ -0,0 +1,290 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+This module defines the evaluation of the policies of a :class:`~unified_planning.model.Problem`
+with probabilistic outcomes, given by the
+:class:`~unified_planning.model.nondeterministicAction.NondeterministicAction`.
+
+A policy is either a :class:`~unified_planning.plans.ContingentPlan` or a function from a
+:class:`~unified_planning.model.State` to the :class:`~unified_planning.plans.ActionInstance`
+to execute, where `None` stops the execution; for example:
+
+    evaluator = PolicyEvaluator(problem)
+    evaluation = evaluator.evaluate(lambda state: choose_action(state))
+    evaluation.success_probability, evaluation.expected_cost
+"""
+
+
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import unified_planning as up
+from unified_planning.engines.stochastic_simulator import (
+    Policy,
+    UPStochasticSimulator,
+    _next_node,
+)
+from unified_planning.exceptions import UPUsageError
+from unified_planning.model import (
+    Action,
+    ContingentProblem,
+    FNode,
+    Problem,
+    UPState,
+)
+from unified_planning.model.fluent import get_all_fluent_exp
+from unified_planning.plans import ActionInstance, ContingentPlan, ContingentPlanNode
+
+
+Cost = Union[int, float, Fraction]
+
+
+@dataclass
+class PolicyEvaluation:
+    """
+    Represents the evaluation of a policy.
+
+    The `success_probability` is the probability of reaching a goal state and the
+    `expected_cost` is the expected cost of the actions executed until the execution
+    ends, in a goal state or because the policy stops or chooses an inapplicable
+    action; it is infinite if the execution does not end with probability `1`.
+    """
+
+    success_probability: float
+    expected_cost: float
+    num_states: int
+    iterations: int
+
+
+class PolicyEvaluator:
+    """
+    Evaluates the policies of a :class:`~unified_planning.model.Problem` where the
+    :class:`~unified_planning.model.nondeterministicAction.NondeterministicAction`
+    have exactly one of their outcomes, with the given probability, and the other actions
+    are deterministic.
+
+    The states reachable executing the policy are enumerated once, identified by the
+    values of the fluents modified by the actions, then the success probability and
+    the expected cost are computed by value iteration on the sparse transitions
+    between them. The initial states of a :class:`~unified_planning.model.ContingentProblem`
+    are the assignments of the hidden fluents satisfying the initial constraints,
+    considered equally likely.
+
+    :param problem: The `Problem` of the evaluated policies.
+    :param action_cost: The function returning the cost of a grounded action, given the
+        action and its parameters; by default the costs of the
+        :class:`~unified_planning.model.metrics.MinimizeActionCosts` metric of the
+        `problem` are used, if any, and otherwise every action costs `1`.
+    """
+
+    def __init__(
+        self,
+        problem: Problem,
+        action_cost: Optional[Callable[[Action, Tuple[FNode, ...]], Cost]] = None,
+    ):
+        self._problem = problem
+        em = problem.environment.expression_manager
+        hidden = set()
+        # the actions of the simulated problem given the ones of the policies
+        self._actions: Dict[Action, Action] = {}
+        if isinstance(problem, ContingentProblem):
+            hidden = {f.arg(0) if f.is_not() else f for f in problem.hidden_fluents}
+            simulated_problem, original_actions = problem.fully_observable_problem()
+            self._actions = {a: copy for copy, a in original_actions.items()}
+        else:
+            simulated_problem = problem
+        hidden_fluents = {fe.fluent() for fe in hidden}
+        self._simulator = UPStochasticSimulator(
+            simulated_problem, hidden_fluents=hidden_fluents
+        )
+        self._initial_states: List[UPState] = []
+        if isinstance(problem, ContingentProblem):
+            base_state = UPState(
+                {fe: v for fe, v in problem.initial_values.items() if fe not in hidden}
+            )
+            for assignment in problem.initial_assignments():
+                self._initial_states.append(
+                    base_state.make_child(
+                        {fe: em.Bool(value) for fe, value in assignment.items()}
+                    )
+                )
+        else:
+            initial_state = self._simulator.get_initial_state()
+            assert isinstance(initial_state, UPState)
+            self._initial_states.append(initial_state)
+        static_fluents = simulated_problem.get_static_fluents() - hidden_fluents
+        self._dynamic_fluents = [
+            fe
+            for fluent in simulated_problem.fluents
+            if fluent not in static_fluents
+            for fe in get_all_fluent_exp(simulated_problem, fluent)
+        ]
+        self._action_cost = action_cost
+
+    @property
+    def problem(self) -> Problem:
+        """Returns the `Problem` of the evaluated policies."""
+        return self._problem
+
+    def _cost(self, state: UPState, action_instance: ActionInstance) -> float:
+        action = action_instance.action
+        params = action_instance.actual_parameters
+        if self._action_cost is not None:
+            return float(self._action_cost(action, params))
+        # the metric of the simulated problem refers to its copies of the actions
+        action = self._actions.get(action, action)
+        return self._simulator.action_cost(state, action, params)
+
+    def _outcomes(
+        self, state: UPState, action_instance: ActionInstance
+    ) -> List[Tuple[UPState, float]]:
+        action = self._actions.get(action_instance.action, action_instance.action)
+        res = []
+        for successor, probability in self._simulator.outcomes(
+            state, action, action_instance.actual_parameters
+        ):
+            assert isinstance(successor, UPState)
+            res.append((successor, probability))
+        return res
+
+    def evaluate(
+        self,
+        policy: Union[ContingentPlan, Policy],
+        epsilon: float = 1e-9,
+        max_iterations: Optional[int] = None,
+    ) -> PolicyEvaluation:
+        """
+        Evaluates the given policy; a `ContingentPlan` ends when no child of the
+        current node is consistent with the values of the state reached.
+
+        :param policy: The `ContingentPlan` or the function returning the `ActionInstance`
+            to execute in a given `State`, or `None` to stop the execution.
+        :param epsilon: The value iteration stops when no value changes by more than `epsilon`.
+        :param max_iterations: If not `None`, the maximum number of iterations over the
+            states.
+        :return: The `PolicyEvaluation` of the given policy.
+        """
+        if epsilon <= 0:
+            raise UPUsageError("The epsilon of the value iteration must be positive.")
+        states: List[Tuple[UPState, Optional[ContingentPlanNode]]] = []
+        ids: Dict[Tuple[Tuple[FNode, ...], int], int] = {}
+
+        def state_id(state: UPState, node: Optional[ContingentPlanNode]) -> int:
+            key = (tuple(state.get_value(fe) for fe in self._dynamic_fluents), id(node))
+            res = ids.get(key, None)
+            if res is None:
+                res = len(states)
+                ids[key] = res
+                states.append((state, node))
+            return res
+
+        is_plan = isinstance(policy, ContingentPlan)
+        root = policy.root_node if isinstance(policy, ContingentPlan) else None
+        initial: Dict[int, float] = {}
+        for state in self._initial_states:
+            i = state_id(state, root)
+            initial[i] = initial.get(i, 0) + 1 / len(self._initial_states)
+
+        # the sparse transitions, the costs and the goals of the reachable states
+        transitions: List[List[Tuple[int, float]]] = []
+        costs: List[float] = []
+        goals: List[bool] = []
+        while len(transitions) < len(states):
+            state, node = states[len(transitions)]
+            successors: Dict[int, float] = {}
+            cost = 0.0
+            is_goal = self._simulator.is_goal(state)
+            action_instance = None
+            if not is_goal:
+                if is_plan:
+                    action_instance = None if node is None else node.action_instance
+                else:
+                    assert callable(policy)
+                    action_instance = policy(state)
+            if action_instance is not None:
+                cost = self._cost(state, action_instance)
+                for successor, probability in self._outcomes(state, action_instance):
+                    next_node = None if node is None else _next_node(node, successor)
+                    j = state_id(successor, next_node)
+                    successors[j] = successors.get(j, 0) + probability
+            transitions.append(list(successors.items()))
+            costs.append(cost)
+            goals.append(is_goal)
+
+        # the states from which the execution can end; if all of them can, the
+        # execution ends with probability 1 and the expected cost is finite
+        predecessors: List[List[int]] = [[] for _ in states]
+        for i, successors_list in enumerate(transitions):
+            for j, _ in successors_list:
+                predecessors[j].append(i)
+        can_end = [not t for t in transitions]
+        stack = [i for i, end in enumerate(can_end) if end]
+        while stack:
+            j = stack.pop()
+            for i in predecessors[j]:
+                if not can_end[i]:
+                    can_end[i] = True
+                    stack.append(i)
+        finite_cost = all(can_end)
+
+        # the successors are updated before their predecessors, so an acyclic
+        # policy is evaluated in a single iteration
+        order: List[int] = []
+        visited = [False] * len(states)
+        for i in initial:
+            if visited[i]:
+                continue
+            visited[i] = True
+            dfs = [(i, iter(transitions[i]))]
+            while dfs:
+                current, it = dfs[-1]
+                for j, _ in it:
+                    if not visited[j]:
+                        visited[j] = True
+                        dfs.append((j, iter(transitions[j])))
+                        break
+                else:
+                    dfs.pop()
+                    order.append(current)
+        order = [i for i in order if transitions[i] and can_end[i]]
+
+        success = [1.0 if g else 0.0 for g in goals]
+        expected_cost = [0.0] * len(states)
+        iterations = 0
+        while order and (max_iterations is None or iterations < max_iterations):
+            iterations += 1
+            delta = 0.0
+            for i in order:
+                value = sum(p * success[j] for j, p in transitions[i])
+                delta = max(delta, abs(value - success[i]))
+                success[i] = value
+                if finite_cost:
+                    value = costs[i] + sum(
+                        p * expected_cost[j] for j, p in transitions[i]
+                    )
+                    delta = max(delta, abs(value - expected_cost[i]))
+                    expected_cost[i] = value
+            if delta < epsilon:
+                break
+        return PolicyEvaluation(
+            success_probability=sum(p * success[i] for i, p in initial.items()),
+            expected_cost=(
+                sum(p * expected_cost[i] for i, p in initial.items())
+                if finite_cost
+                else float("inf")
+            ),
+            num_states=len(states),
+            iterations=iterations,
+        )
@@ -16,7 +16,9 @@
 
 from enum import Enum, auto
 from fractions import Fraction
+from functools import reduce
 from itertools import product
+import numpy as np
 from warnings import warn
 import unified_planning as up
 from unified_planning.engines.compilers import Grounder, GrounderHelper
@@ -48,10 +50,16 @@ from unified_planning.model import (
     Variable,
 )
 from unified_planning.model.types import _RealType
-from unified_planning.model.walkers import StateEvaluator, ExpressionQuantifiersRemover
+from unified_planning.model.walkers import (
+    BatchEvaluator,
+    StateEvaluator,
+    ExpressionQuantifiersRemover,
+)
 from typing import (
     Callable,
     Dict,
+    FrozenSet,
+    Iterable,
     Iterator,
     List,
     Optional,
@@ -90,10 +98,22 @@ class UPSequentialSimulator(Engine, SequentialSimulatorMixin):
 
     This SequentialSimulator, when considering if a state is goal or not, ignores the
     quality metrics.
+
+    :param problem: The simulated `Problem`.
+    :param error_on_failed_checks: If `True`, the failed checks on the `problem` raise
+        an error, otherwise they only warn.
+    :param hidden_fluents: The fluents whose initial values in the `problem` are only
+        placeholders, like the hidden fluents of a :class:`~unified_planning.model.ContingentProblem`;
+        they are never considered static, so the actions are not simplified with their
+        initial values and the states can give them any value.
     """
 
     def __init__(
-        self, problem: "up.model.Problem", error_on_failed_checks: bool = True, **kwargs
+        self,
+        problem: "up.model.Problem",
+        error_on_failed_checks: bool = True,
+        hidden_fluents: Iterable["up.model.Fluent"] = (),
+        **kwargs,
     ):
         Engine.__init__(self)
         SequentialSimulatorMixin.__init__(self, problem, error_on_failed_checks)
@@ -106,6 +126,10 @@ class UPSequentialSimulator(Engine, SequentialSimulatorMixin):
                 warn(msg)
         assert isinstance(self._problem, up.model.Problem)
         self._grounder = GrounderHelper(problem)
+        hidden_fluents = set(hidden_fluents)
+        if hidden_fluents:
+            simplifier = self._grounder.simplifier
+            simplifier.static_fluents = simplifier.static_fluents - hidden_fluents
         self._actions = set(self._problem.actions)
         self._se = StateEvaluator(self._problem)
         self._initial_state: Optional[UPState] = None
@@ -148,6 +172,46 @@ class UPSequentialSimulator(Engine, SequentialSimulatorMixin):
         self._fluents_in_state_invariants: Set[Fluent] = set(
             (fe.fluent() for fe in self._fluent_exps_in_state_invariants)
         )
+        # For every state invariant, the grounded fluent expressions it depends on,
+        # or None if it contains a fluent in the parameters of a fluent; used by the
+        # batch methods to check only the state invariants affected by an action
+        fve = self._problem.environment.free_vars_extractor
+        self._state_invariants_fluents: List[Optional[FrozenSet[FNode]]] = []
+        for si in self._state_invariants:
+            si_fluents = fve.get(si)
+            if all(a.is_constant() for fe in si_fluents for a in fe.args):
+                self._state_invariants_fluents.append(si_fluents)
+            else:
+                self._state_invariants_fluents.append(None)
+        self._batch_evaluator: Optional[BatchEvaluator] = None
+
+    def get_grounded_actions(
+        self,
+    ) -> Iterator[
+        Tuple["up.model.Action", Tuple["up.model.FNode", ...], Optional[Action]]
+    ]:
+        """
+        Returns a lazy `Iterator` over all the grounded actions of the simulated problem;
+        the groundings are cached and shared with this simulator.
+
+        Every tuple is made of the original `Action`, the parameters used to ground it
+        and the grounded `Action`, that is `None` if the grounding is invalid or
+        meaningless, as in :func:`~unified_planning.engines.compilers.grounder.GrounderHelper.get_grounded_actions`.
+
+        :return: The `Iterator` over the grounded actions.
+        """
+        return self._grounder.get_grounded_actions()
+
+    def simplify(self, expression: "up.model.FNode") -> "up.model.FNode":
+        """
+        Simplifies the given expression replacing the static fluents of the simulated
+        problem, except the hidden ones, with their initial values, as done on the
+        grounded actions.
+
+        :param expression: The expression to simplify.
+        :return: The simplified expression.
+        """
+        return self._grounder.simplifier.simplify(expression)
 
     def _ground_action(
         self, action: "up.model.Action", params: Tuple["up.model.FNode", ...]
@@ -180,7 +244,7 @@ class UPSequentialSimulator(Engine, SequentialSimulatorMixin):
         """
         assert isinstance(self._problem, Problem), "supported_kind not respected"
         if self._initial_state is None:
-            self._initial_state = UPState(self._problem.initial_values)
+            self._initial_state = UPState(dict(self._problem.initial_values))
             for si in self._state_invariants:
                 if not self._se.evaluate(si, self._initial_state).bool_constant_value():
                     raise UPProblemDefinitionError(
@@ -276,6 +340,28 @@ class UPSequentialSimulator(Engine, SequentialSimulatorMixin):
         if grounded_action is None:
             raise UPInvalidActionError("Apply_unsafe got an inapplicable action.")
         assert isinstance(action, up.model.InstantaneousAction)
+        return self._apply_grounded_action(state, grounded_action)
+
+    def _apply_grounded_action(
+        self,
+        state: "up.model.UPState",
+        grounded_action: "up.model.InstantaneousAction",
+        check_all_state_invariants: bool = True,
+    ) -> "up.model.UPState":
+        """
+        Returns the new `State` created by the given grounded action; the action
+        conditions are not checked.
+
+        :param state: The state in which the effects are evaluated.
+        :param grounded_action: The grounded action to apply.
+        :param check_all_state_invariants: If `False`, the given state is assumed
+            to satisfy the state invariants, so only the ones depending on the fluents
+            modified by the action are checked.
+        :return: The new `State` created by the given action.
+        :raises UPConflictingEffectsException: If to the same fluent are assigned 2 different
+            values.
+        :raises UPInvalidActionError: If the action violates some state invariants.
+        """
         updated_values: Dict["up.model.FNode", "up.model.FNode"] = {}
         assigned_fluent: Set["up.model.FNode"] = set()
         em = self._problem.environment.expression_manager
@@ -300,7 +386,15 @@ class UPSequentialSimulator(Engine, SequentialSimulatorMixin):
                     updated_values[fluent] = value
 
         new_state = state.make_child(updated_values)
-        for si in self._state_invariants:
+        for si, si_fluents in zip(
+            self._state_invariants, self._state_invariants_fluents
+        ):
+            if (
+                not check_all_state_invariants
+                and si_fluents is not None
+                and si_fluents.isdisjoint(updated_values)
+            ):
+                continue
             if not self._se.evaluate(si, new_state).bool_constant_value():
                 raise UPInvalidActionError(
                     "The given action is not applicable because it violates state invariants.",
@@ -416,6 +510,58 @@ class UPSequentialSimulator(Engine, SequentialSimulatorMixin):
             if self._is_applicable(state, original_action, params):
                 yield (original_action, params)
 
+    def _expand(
+        self, states: Sequence["up.model.State"]
+    ) -> List[List[Tuple["up.model.Action", Tuple["up.model.FNode", ...], UPState]]]:
+        """
+        Expands the given states iterating over the grounded actions computed once;
+        the given states are assumed to satisfy the state invariants, as every state
+        generated by this simulator does, so only the state invariants depending on the
+        fluents modified by an action are checked in its successors.
+        """
+        if self._grounded_actions is None:
+            self._grounded_actions = list(self._grounder.get_grounded_actions())
+        successors = []
+        for state in states:
+            if not isinstance(state, up.model.UPState):
+                raise UPUsageError(
+                    f"The UPSequentialSimulator uses the UPState but {type(state).__name__} is given."
+                )
+            state_successors = []
+            for original_action, params, grounded_action in self._grounded_actions:
+                if grounded_action is None:
+                    continue
+                assert isinstance(grounded_action, up.model.InstantaneousAction)
+                if not all(
+                    self._se.evaluate(c, state).is_true()
+                    for c in grounded_action.preconditions
+                ):
+                    continue
+                try:
+                    successor = self._apply_grounded_action(
+                        state, grounded_action, check_all_state_invariants=False
+                    )
+                except (UPInvalidActionError, UPConflictingEffectsException):
+                    continue
+                state_successors.append((original_action, params, successor))
+            successors.append(state_successors)
+        return successors
+
+    def _goal_mask(self, states: Sequence["up.model.State"]) -> List[bool]:
+        """
+        Evaluates the goals on all the given states at once with a `BatchEvaluator`;
+        the exact semantic is used, so the mask agrees with :func:`is_goal` on the
+        real-valued goals.
+        """
+        assert isinstance(self._problem, Problem)
+        goals = self._problem.goals
+        if not goals:
+            return [True] * len(states)
+        if self._batch_evaluator is None:
+            self._batch_evaluator = BatchEvaluator(self._problem, exact=True)
+        goals_values = self._batch_evaluator.evaluate(goals, states)
+        return [bool(v) for v in reduce(np.logical_and, goals_values)]
+
     def get_unsatisfied_conditions(
         self,
         state: "up.model.State",
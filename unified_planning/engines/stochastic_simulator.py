@@ -0,0 +1,493 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""This module defines the simulator sampling the outcomes of the nondeterministic actions."""
+
+
+import math
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+import unified_planning as up
+from unified_planning.engines.sequential_simulator import UPSequentialSimulator
+from unified_planning.exceptions import (
+    UPConflictingEffectsException,
+    UPInvalidActionError,
+    UPUsageError,
+)
+from unified_planning.model import (
+    Action,
+    FNode,
+    InstantaneousAction,
+    MinimizeActionCosts,
+    UPState,
+)
+from unified_planning.model.nondeterministicAction import NondeterministicAction
+from unified_planning.plans import ActionInstance, ContingentPlan, ContingentPlanNode
+
+
+Policy = Callable[["up.model.state.State"], Optional[ActionInstance]]
+
+
+@dataclass
+class RolloutStatistics:
+    """
+    Represents the aggregate statistics of the rollouts of a policy.
+
+    The intervals are the confidence intervals, at the confidence level requested,
+    of the success rate, computed with the Wilson score, and of the mean cost,
+    computed with the normal approximation. A rollout is `truncated` when it reaches
+    the maximum number of steps; its cost is the cost of the actions executed so far.
+    """
+
+    num_rollouts: int
+    successes: int
+    truncated: int
+    success_rate: float
+    success_interval: Tuple[float, float]
+    cost_mean: float
+    cost_interval: Tuple[float, float]
+
+
+class UPStochasticSimulator(UPSequentialSimulator):
+    """
+    Sequential simulator where every :class:`~unified_planning.model.nondeterministicAction.NondeterministicAction`
+    has exactly one of its outcomes, sampled according to the outcomes probabilities
+    with a random number generator seeded at construction time; the other actions are
+    applied as in the :class:`~unified_planning.engines.UPSequentialSimulator`.
+
+    The method :func:`rollouts <unified_planning.engines.UPStochasticSimulator.rollouts>`
+    runs batches of independent executions of a policy, possibly in parallel processes,
+    and returns their aggregate statistics.
+
+    :param problem: The simulated `Problem`.
+    :param seed: The seed of the random number generator; if `None`, the generator is
+        seeded from the system.
+    :param hidden_fluents: The fluents whose initial values in the `problem` are only
+        placeholders, as in the :class:`~unified_planning.engines.UPSequentialSimulator`.
+    """
+
+    def __init__(
+        self,
+        problem: "up.model.Problem",
+        error_on_failed_checks: bool = True,
+        seed: Optional[int] = None,
+        **kwargs,
+    ):
+        UPSequentialSimulator.__init__(self, problem, error_on_failed_checks, **kwargs)
+        self._rng = random.Random(seed)
+        # every outcome of a nondeterministic action is simulated as a deterministic
+        # action with the same parameters and preconditions and a single effect
+        self._outcome_actions: Dict[
+            Action, Tuple[InstantaneousAction, List[Tuple[InstantaneousAction, float]]]
+        ] = {}
+        for action in self._problem.actions:
+            if isinstance(action, NondeterministicAction):
+                self._outcome_actions[action] = (
+                    self._outcome_action(action, None),
+                    [(self._outcome_action(action, e), p) for e, p in action.outcomes],
+                )
+        self._outcome_actions_set = {
+            a for _, outcomes in self._outcome_actions.values() for a, _ in outcomes
+        }
+        self._outcome_actions_set.update(a for a, _ in self._outcome_actions.values())
+        self._nondeterministic_groundings: Optional[
+            List[Tuple[Action, Tuple[FNode, ...]]]
+        ] = None
+        self._metric: Optional[MinimizeActionCosts] = None
+        for qm in self._problem.quality_metrics:
+            if isinstance(qm, MinimizeActionCosts):
+                self._metric = qm
+        self._costs: Dict[Tuple[Action, Tuple[FNode, ...]], FNode] = {}
+
+    @property
+    def name(self) -> str:
+        return "up_stochastic_simulator"
+
+    @staticmethod
+    def _outcome_action(
+        action: NondeterministicAction, effect: Optional["up.model.Effect"]
+    ) -> InstantaneousAction:
+        res = InstantaneousAction(
+            action.name,
+            OrderedDict((p.name, p.type) for p in action.parameters),
+            action.environment,
+        )
+        for c in action.preconditions:
+            res.add_precondition(c)
+        if effect is not None:
+            res._add_effect_instance(effect.clone())
+        return res
+
+    def _ground_action(
+        self, action: "up.model.Action", params: Tuple["up.model.FNode", ...]
+    ) -> Optional["up.model.InstantaneousAction"]:
+        outcome_actions = self._outcome_actions.get(action, None)
+        if outcome_actions is not None:
+            # the conditions of a nondeterministic action are the ones of its outcomes
+            action = outcome_actions[0]
+        elif action not in self._outcome_actions_set:
+            return UPSequentialSimulator._ground_action(self, action, params)
+        grounded_action = self._grounder.ground_action(action, params)
+        assert (
+            isinstance(grounded_action, InstantaneousAction) or grounded_action is None
+        )
+        return grounded_action
+
+    def apply_unsafe(
+        self,
+        state: "up.model.State",
+        action_or_action_instance: Union["up.model.Action", "up.plans.ActionInstance"],
+        parameters: Optional[Sequence["up.model.Expression"]] = None,
+    ) -> "up.model.State":
+        """
+        Returns a new `State`, which is a copy of the given `state` but the applicable `effects` of the
+        `action` are applied; the outcome of a `NondeterministicAction` is sampled.
+        IMPORTANT NOTE: Assumes that `self.is_applicable(state, event)` returns `True`.
+
+        :param state: The state in which the given action's conditions are checked and the effects evaluated.
+        :param action_or_action_instance: The `ActionInstance` or the `Action` of which conditions are checked
+            and effects evaluated.
+        :param parameters: The parameters to ground the given `Action`. This param must be `None` if
+            an `ActionInstance` is given instead.
+        :return: The new `State` created by the given action.
+        :raises UPConflictingEffectsException: If to the same fluent are assigned 2 different
+            values.
+        :raises UPInvalidActionError: If the action is invalid or if it violates some state invariants.
+        """
+        action, params = self._get_action_and_parameters(
+            action_or_action_instance, parameters
+        )
+        if action not in self._outcome_actions:
+            return UPSequentialSimulator.apply_unsafe(self, state, action, params)
+        outcomes = self._outcome_actions[action][1]
+        outcome_action = self._rng.choices(
+            [a for a, _ in outcomes], [p for _, p in outcomes]
+        )[0]
+        return UPSequentialSimulator.apply_unsafe(self, state, outcome_action, params)
+
+    def outcomes(
+        self,
+        state: "up.model.State",
+        action_or_action_instance: Union["up.model.Action", "up.plans.ActionInstance"],
+        parameters: Optional[Sequence["up.model.Expression"]] = None,
+    ) -> List[Tuple["up.model.State", float]]:
+        """
+        Returns all the `States` that the given action might create from the given `state`,
+        with their probabilities, or an empty list if the action is not applicable;
+        the outcomes with probability `0` are not returned.
+
+        :param state: The state in which the given action's conditions are checked and the effects evaluated.
+        :param action_or_action_instance: The `ActionInstance` or the `Action` to apply.
+        :param parameters: The parameters to ground the given `Action`. This param must be `None` if
+            an `ActionInstance` is given instead.
+        :return: The `States` created by the given action with their probabilities.
+        """
+        action, params = self._get_action_and_parameters(
+            action_or_action_instance, parameters
+        )
+        if action not in self._outcome_actions:
+            successor = self.apply(state, action, params)
+            return [] if successor is None else [(successor, 1.0)]
+        if not self.is_applicable(state, action, params):
+            return []
+        res = []
+        for outcome_action, probability in self._outcome_actions[action][1]:
+            if probability == 0:
+                continue
+            try:
+                successor = UPSequentialSimulator.apply_unsafe(
+                    self, state, outcome_action, params
+                )
+            except (UPInvalidActionError, UPConflictingEffectsException):
+                return []
+            res.append((successor, probability))
+        return res
+
+    def _expand(
+        self, states: Sequence["up.model.State"]
+    ) -> List[List[Tuple["up.model.Action", Tuple["up.model.FNode", ...], UPState]]]:
+        """
+        Expands the given states; the nondeterministic actions generate one successor
+        with a sampled outcome, after the successors of the deterministic actions.
+        """
+        if self._nondeterministic_groundings is None:
+            if self._grounded_actions is None:
+                self._grounded_actions = list(self._grounder.get_grounded_actions())
+            self._nondeterministic_groundings = [
+                (action, params)
+                for action, params, _ in self._grounded_actions
+                if action in self._outcome_actions
+            ]
+            # the groundings of the nondeterministic actions apply all the outcomes,
+            # so they are not expanded as the deterministic ones
+            self._grounded_actions = [
+                (action, params, None if action in self._outcome_actions else ga)
+                for action, params, ga in self._grounded_actions
+            ]
+        successors = UPSequentialSimulator._expand(self, states)
+        for state, state_successors in zip(states, successors):
+            for action, params in self._nondeterministic_groundings:
+                successor = self.apply(state, action, params)
+                if successor is not None:
+                    assert isinstance(successor, UPState)
+                    state_successors.append((action, params, successor))
+        return successors
+
+    def action_cost(
+        self,
+        state: "up.model.State",
+        action: "up.model.Action",
+        parameters: Tuple["up.model.FNode", ...],
+    ) -> float:
+        """
+        Returns the cost of applying the given grounded action in the given state: the
+        cost defined by the :class:`~unified_planning.model.metrics.MinimizeActionCosts`
+        metric of the problem, if any, otherwise `1`.
+
+        :param state: The state in which the action is applied.
+        :param action: The applied action.
+        :param parameters: The parameters used to ground the action.
+        :return: The cost of the action.
+        """
+        if self._metric is None:
+            return 1.0
+        key = (action, parameters)
+        cost = self._costs.get(key, None)
+        if cost is None:
+            lifted_cost = self._metric.get_action_cost(action)
+            if lifted_cost is None:
+                raise UPUsageError(
+                    f"The cost of the action {action.name} is not set in the MinimizeActionCosts metric."
+                )
+            cost = lifted_cost.substitute(dict(zip(action.parameters, parameters)))
+            self._costs[key] = cost
+        if not cost.is_constant():
+            cost = self._se.evaluate(cost, state)
+        return float(cost.constant_value())
+
+    def rollouts(
+        self,
+        policy: Union[ContingentPlan, Policy],
+        num_rollouts: int,
+        max_steps: int = 1000,
+        processes: int = 1,
+        seed: Optional[int] = None,
+        confidence: float = 0.95,
+    ) -> RolloutStatistics:
+        """
+        Executes the given policy `num_rollouts` times from the initial state, sampling
+        the outcomes of the nondeterministic actions, and returns the aggregate statistics.
+
+        An execution ends in a goal state, when the policy stops or chooses an inapplicable
+        action, or after `max_steps` actions; a `ContingentPlan` stops when no child of the
+        current node is consistent with the values of the state reached.
+        Every rollout has its own random number generator, seeded from `seed` and the rollout
+        index, so the statistics do not depend on the number of processes; only their
+        running aggregates are kept, so the memory does not grow with `num_rollouts`.
+        When more `processes` are used, the policy and this simulator must be transferable
+        to the worker processes, which is always the case where processes are forked.
+
+        :param policy: The `ContingentPlan` or the function returning the `ActionInstance`
+            to execute in a given `State`, or `None` to stop the execution.
+        :param num_rollouts: The number of executions.
+        :param max_steps: The maximum number of actions of an execution.
+        :param processes: The number of worker processes running the rollouts.
+        :param seed: The seed of the rollouts; if `None`, it is sampled from the random
+            number generator of this simulator.
+        :param confidence: The confidence level of the intervals.
+        :return: The statistics of the rollouts.
+        """
+        if num_rollouts <= 0 or max_steps < 0 or processes <= 0:
+            raise UPUsageError(
+                "num_rollouts and processes must be positive and max_steps non-negative."
+            )
+        if not 0 < confidence < 1:
+            raise UPUsageError("The confidence must be between 0 and 1.")
+        if seed is None:
+            seed = self._rng.getrandbits(64)
+        processes = min(processes, num_rollouts)
+        bounds = [num_rollouts * i // processes for i in range(processes + 1)]
+        chunks = list(zip(bounds, bounds[1:]))
+        if processes == 1:
+            aggregates = [self._run_rollouts(policy, seed, 0, num_rollouts, max_steps)]
+        else:
+            # the simulator and the policy are given to the workers when they start,
+            # so they are not pickled where the processes are forked; a worker killed
+            # makes the results raise a BrokenProcessPool instead of waiting forever
+            with ProcessPoolExecutor(
+                processes,
+                initializer=_init_rollouts_worker,
+                initargs=(self, policy),
+            ) as executor:
+                futures = [
+                    executor.submit(_run_rollouts, seed, start, end, max_steps)
+                    for start, end in chunks
+                ]
+                try:
+                    aggregates = [future.result() for future in futures]
+                finally:
+                    for future in futures:
+                        future.cancel()
+        # the aggregates are merged in the order of the rollouts
+        total = _RunningStatistics()
+        for aggregate in aggregates:
+            total.merge(aggregate)
+        return total.statistics(confidence)
+
+    def _run_rollouts(
+        self,
+        policy: Union[ContingentPlan, Policy],
+        seed: int,
+        start: int,
+        end: int,
+        max_steps: int,
+    ) -> "_RunningStatistics":
+        res = _RunningStatistics()
+        initial_state = self.get_initial_state()
+        rng = self._rng
+        try:
+            for index in range(start, end):
+                # the rollout streams are independent, as string seeds are hashed
+                self._rng = random.Random(f"{seed}-{index}")
+                self._rollout(policy, initial_state, max_steps, res)
+        finally:
+            self._rng = rng
+        return res
+
+    def _rollout(
+        self,
+        policy: Union[ContingentPlan, Policy],
+        initial_state: "up.model.State",
+        max_steps: int,
+        res: "_RunningStatistics",
+    ):
+        state = initial_state
+        node = policy.root_node if isinstance(policy, ContingentPlan) else None
+        cost, steps = 0.0, 0
+        while True:
+            if self.is_goal(state):
+                res.add(True, False, cost)
+                break
+            if steps == max_steps:
+                res.add(False, True, cost)
+                break
+            if isinstance(policy, ContingentPlan):
+                action_instance = None if node is None else node.action_instance
+            else:
+                action_instance = policy(state)
+            successor = None
+            if action_instance is not None:
+                successor = self.apply(state, action_instance)
+            if successor is None:
+                res.add(False, False, cost)
+                break
+            assert action_instance is not None
+            cost += self.action_cost(
+                state, action_instance.action, action_instance.actual_parameters
+            )
+            steps += 1
+            state = successor
+            if node is not None:
+                node = _next_node(node, state)
+
+
+def _next_node(
+    node: ContingentPlanNode, state: "up.model.State"
+) -> Optional[ContingentPlanNode]:
+    """Returns the first child of the given node consistent with the given state."""
+    for observation, child in node.children:
+        if all(state.get_value(fe) == v for fe, v in observation.items()):
+            return child
+    return None
+
+
+class _RunningStatistics:
+    """
+    The running aggregates of the rollouts: the number of successes and the mean and
+    the sum of the squared deviations of the costs, merged as in Chan et al.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.successes = 0
+        self.truncated = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, success: bool, truncated: bool, cost: float):
+        self.count += 1
+        self.successes += success
+        self.truncated += truncated
+        delta = cost - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (cost - self.mean)
+
+    def merge(self, oth: "_RunningStatistics"):
+        count = self.count + oth.count
+        if count == 0:
+            return
+        delta = oth.mean - self.mean
+        self.m2 += oth.m2 + delta * delta * self.count * oth.count / count
+        self.mean += delta * oth.count / count
+        self.count = count
+        self.successes += oth.successes
+        self.truncated += oth.truncated
+
+    def statistics(self, confidence: float) -> RolloutStatistics:
+        n = self.count
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        rate = self.successes / n
+        center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+        half_width = (
+            z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        )
+        std = math.sqrt(self.m2 / (n - 1)) if n > 1 else 0.0
+        cost_half_width = z * std / math.sqrt(n)
+        return RolloutStatistics(
+            num_rollouts=n,
+            successes=self.successes,
+            truncated=self.truncated,
+            success_rate=rate,
+            success_interval=(
+                max(0.0, center - half_width),
+                min(1.0, center + half_width),
+            ),
+            cost_mean=self.mean,
+            cost_interval=(self.mean - cost_half_width, self.mean + cost_half_width),
+        )
+
+
+# The simulator and the policy of the rollouts of a worker process.
+_worker_rollouts: Optional[
+    Tuple[UPStochasticSimulator, Union[ContingentPlan, Policy]]
+] = None
+
+
+def _init_rollouts_worker(
+    simulator: UPStochasticSimulator, policy: Union[ContingentPlan, Policy]
+):
+    global _worker_rollouts
+    _worker_rollouts = (simulator, policy)
+
+
+def _run_rollouts(
+    seed: int, start: int, end: int, max_steps: int
+) -> "_RunningStatistics":
+    assert _worker_rollouts is not None
+    simulator, policy = _worker_rollouts
+    return simulator._run_rollouts(policy, seed, start, end, max_steps)
@@ -21,7 +21,8 @@ such as the :func:`ExpressionManager <unified_planning.Environment.expression_ma
 
 
 import sys
-from typing import IO, Optional
+from contextlib import ExitStack, contextmanager
+from typing import IO, Dict, Iterator, Optional
 import unified_planning
 
 
@@ -132,6 +133,53 @@ class Environment:
         """Returns the environment's `NamesExtractor`."""
         return self._names_extractor
 
+    def _memoizing_walkers(
+        self,
+    ) -> Dict[str, "unified_planning.model.walkers.DagWalker"]:
+        return {
+            "type_checker": self._tc,
+            "free_vars_oracle": self._free_vars_oracle,
+            "simplifier": self._simplifier,
+            "substituter": self._substituter,
+            "free_vars_extractor": self._free_vars_extractor,
+            "names_extractor": self._names_extractor,
+        }
+
+    def set_memoization_limit(self, limit: Optional[int]):
+        """
+        Sets the maximum number of results memoized by each of the environment's
+        walkers; when the limit is exceeded, the least recently used results are
+        discarded. `None` makes the memoization unbounded, as by default.
+
+        :param limit: The maximum number of memoized results per walker.
+        """
+        for walker in self._memoizing_walkers().values():
+            walker.memoization_limit = limit
+
+    @property
+    def memoization_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the memoization statistics (`hits`, `misses` and `size`) of the
+        environment's walkers, indexed by the name of the walker.
+        """
+        return {
+            name: walker.memoization_stats
+            for name, walker in self._memoizing_walkers().items()
+        }
+
+    @contextmanager
+    def memoization_scope(self) -> Iterator[None]:
+        """
+        Returns a context manager that, on exit, discards the results memoized by the
+        environment's walkers while it was active; for example, a long running process
+        can handle every problem in a scope, so the memoization does not grow
+        with the number of problems handled.
+        """
+        with ExitStack() as stack:
+            for walker in self._memoizing_walkers().values():
+                stack.enter_context(walker.memoization_scope())
+            yield
+
     @property
     def credits_stream(self) -> "Optional[IO[str]]":
         """Returns the stream where the :class:`Engines <unified_planning.engines.Engine>` :func:`credits <unified_planning.engines.Engine.get_credits>` are printed."""
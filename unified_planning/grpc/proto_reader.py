@@ -14,8 +14,9 @@
 #
 # type: ignore
 from functools import partial
-from typing import Tuple, Union, Optional
+from typing import Any, Dict, Hashable, List, Tuple, Union, Optional
 import fractions
+import weakref
 from typing import OrderedDict
 
 import unified_planning.grpc.generated.unified_planning_pb2 as proto
@@ -106,26 +107,135 @@ def op_to_node_type(op: str) -> OperatorKind:
     raise ValueError(f"Unknown operator `{op}`")
 
 
+class _SymbolTable:
+    """
+    The symbols of a `Problem` indexed by name, used by the `ProtobufReader` to
+    resolve the types, objects and fluents of the `Problem` in constant time, and
+    the memo of the leaf expressions (and of the state variables over them) already
+    converted for the `Problem`.
+
+    The indexes are extended lazily, when the `Problem` grows.
+    """
+
+    def __init__(self, problem: model.AbstractProblem, tables: Dict[int, Any]):
+        key = id(problem)
+
+        def forget(_, key=key, tables=tables):
+            if tables.get(key) is self:
+                del tables[key]
+
+        self.problem_ref = weakref.ref(problem, forget)
+        self.types: Dict[str, model.Type] = {}
+        self.objects: Dict[str, model.Object] = {}
+        self.fluents: Dict[str, model.Fluent] = {}
+        self.nodes: Dict[Hashable, Any] = {}
+        self._objects_count = 0
+        self._fluents_count = 0
+
+    @property
+    def problem(self) -> model.AbstractProblem:
+        problem = self.problem_ref()
+        assert problem is not None
+        return problem
+
+    def type(self, s: str) -> model.Type:
+        t = self.types.get(s, None)
+        if t is None:
+            t = convert_type_str(s, self.problem)
+            self.types[s] = t
+        return t
+
+    def object(self, name: str) -> Optional[model.Object]:
+        objects = self.problem.all_objects
+        if len(objects) != self._objects_count:
+            self._objects_count = _extend_index(
+                self.objects, objects, self._objects_count
+            )
+        return self.objects.get(name, None)
+
+    def fluent(self, name: str) -> Optional[model.Fluent]:
+        fluents = self.problem.fluents
+        if len(fluents) != self._fluents_count:
+            self._fluents_count = _extend_index(
+                self.fluents, fluents, self._fluents_count
+            )
+        return self.fluents.get(name, None)
+
+
+def _extend_index(index: Dict[str, Any], elements: List[Any], count: int) -> int:
+    """Indexes by name the `elements` after the first `count` and returns their number."""
+    if len(elements) < count:
+        index.clear()
+        count = 0
+    for e in elements[count:]:
+        index.setdefault(e.name, e)
+    return len(elements)
+
+
+_CONSTANT = proto.ExpressionKind.Value("CONSTANT")
+_PARAMETER = proto.ExpressionKind.Value("PARAMETER")
+_VARIABLE = proto.ExpressionKind.Value("VARIABLE")
+_STATE_VARIABLE = proto.ExpressionKind.Value("STATE_VARIABLE")
+_FUNCTION_APPLICATION = proto.ExpressionKind.Value("FUNCTION_APPLICATION")
+_FLUENT_SYMBOL = proto.ExpressionKind.Value("FLUENT_SYMBOL")
+_FUNCTION_SYMBOL = proto.ExpressionKind.Value("FUNCTION_SYMBOL")
+
+
+def _atom_key(msg: proto.Atom) -> Hashable:
+    field = msg.WhichOneof("content")
+    if field == "real":
+        return (field, msg.real.numerator, msg.real.denominator)
+    return (field, getattr(msg, field))
+
+
+def _leaf_key(msg: proto.Expression) -> Optional[Hashable]:
+    """
+    Returns the key in the memo of the given leaf expression, `None` if the
+    expression is not a constant, a parameter or a variable.
+    """
+    kind = msg.kind
+    if kind == _CONSTANT:
+        return _atom_key(msg.atom)
+    elif kind == _PARAMETER or kind == _VARIABLE:
+        return (kind, msg.atom.symbol, msg.type)
+    return None
+
+
 class ProtobufReader(Converter):
     """
     ProtobufReader: This class uses the convert method to take the protobuf representation of a
     unified_planning Problem and return the equivalent unified_planning Problem instance.
+
+    The symbols of every converted `Problem` are indexed in a table, that is reused
+    by the following conversions referring to the same `Problem` (for example of
+    its plans); the messages given to the reader are never modified.
     """
 
+    def __init__(self):
+        Converter.__init__(self)
+        self._tables: Dict[int, _SymbolTable] = {}
+
+    def _symbols(self, problem: model.AbstractProblem) -> _SymbolTable:
+        table = self._tables.get(id(problem), None)
+        if table is None or table.problem_ref() is not problem:
+            table = _SymbolTable(problem, self._tables)
+            self._tables[id(problem)] = table
+        return table
+
     @handles(proto.Parameter)
     def _convert_parameter(
         self, msg: proto.Parameter, problem: Problem
     ) -> model.Parameter:
         return model.Parameter(
-            msg.name, convert_type_str(msg.type, problem), problem.environment
+            msg.name, self._symbols(problem).type(msg.type), problem.environment
         )
 
     @handles(proto.Fluent)
     def _convert_fluent(self, msg: proto.Fluent, problem: Problem) -> model.Fluent:
-        value_type: model.types.Type = convert_type_str(msg.value_type, problem)
+        value_type: model.types.Type = self._symbols(problem).type(msg.value_type)
         sig: list = []
         for p in msg.parameters:
-            sig.append(self.convert(p, problem))
+            sig.append(self._convert_parameter(p, problem))
         fluent = model.Fluent(msg.name, value_type, sig, problem.environment)
         return fluent
 
@@ -133,80 +243,106 @@ class ProtobufReader(Converter):
     def _convert_object(
         self, msg: proto.ObjectDeclaration, problem: Problem
     ) -> model.Object:
-        return model.Object(msg.name, convert_type_str(msg.type, problem))
+        return model.Object(
+            msg.name, self._symbols(problem).type(msg.type), problem.environment
+        )
 
     @handles(proto.Expression)
     def _convert_expression(
         self, msg: proto.Expression, problem: Problem
     ) -> model.Expression:
-        if msg.kind == proto.ExpressionKind.Value("CONSTANT"):
+        symbols = self._symbols(problem)
+        kind = msg.kind
+        if kind == _STATE_VARIABLE:
+            # the state variables over leaves are memoized with them, keyed by the
+            # name of the fluent and the keys of the arguments
+            fluent = msg.list[0]
+            key: Optional[Hashable] = (kind, fluent.atom.symbol)
+            for m in msg.list[1:]:
+                arg_key = _leaf_key(m)
+                if arg_key is None:
+                    key = None
+                    break
+                key += (arg_key,)
+        else:
+            key = _leaf_key(msg)
+        if key is None:
+            return self._convert_expression_node(msg, symbols)
+        node = symbols.nodes.get(key, None)
+        if node is None:
+            node = self._convert_expression_node(msg, symbols)
+            symbols.nodes[key] = node
+        return node
+
+    def _convert_expression_node(
+        self, msg: proto.Expression, symbols: _SymbolTable
+    ) -> model.Expression:
+        problem = symbols.problem
+        em = problem.environment.expression_manager
+        kind = msg.kind
+        if kind == _CONSTANT:
             assert msg.atom is not None
-            return self.convert(msg.atom, problem)
+            return self._convert_atom(msg.atom, problem)
 
-        elif msg.kind == proto.ExpressionKind.Value("PARAMETER"):
-            return problem.environment.expression_manager.ParameterExp(
+        elif kind == _PARAMETER:
+            return em.ParameterExp(
                 param=Parameter(
                     msg.atom.symbol,
-                    convert_type_str(msg.type, problem),
+                    symbols.type(msg.type),
                     problem.environment,
                 ),
             )
-        elif msg.kind == proto.ExpressionKind.Value("VARIABLE"):
-            return problem.environment.expression_manager.VariableExp(
+        elif kind == _VARIABLE:
+            return em.VariableExp(
                 var=Variable(
                     msg.atom.symbol,
-                    convert_type_str(msg.type, problem),
+                    symbols.type(msg.type),
                     problem.environment,
                 ),
             )
-        elif msg.kind == proto.ExpressionKind.Value("STATE_VARIABLE"):
-            args = []
+        elif kind == _STATE_VARIABLE:
             payload = None
 
-            fluent = msg.list.pop(0)
-            if fluent.kind == proto.ExpressionKind.Value("FLUENT_SYMBOL"):
-                payload = self.convert(fluent.atom, problem)
+            fluent = msg.list[0]
+            if fluent.kind == _FLUENT_SYMBOL:
+                payload = self._convert_atom(fluent.atom, problem)
 
-            args.extend([self.convert(m, problem) for m in msg.list])
             if payload is not None:
-                return problem.environment.expression_manager.FluentExp(
-                    payload, tuple(args)
-                )
+                args = tuple(self._convert_expression(m, problem) for m in msg.list[1:])
+                return em.FluentExp(payload, args)
             else:
                 raise UPException(f"Unable to form fluent expression {msg}")
-        elif (
-            msg.kind == proto.ExpressionKind.Value("FUNCTION_APPLICATION")
-            and msg.type != "up:time"
-        ):
+        elif kind == _FUNCTION_APPLICATION and msg.type != "up:time":
             node_type = None
-            args = []
             payload = None
 
-            symbol = msg.list.pop(0)
-            if symbol.kind == proto.ExpressionKind.Value("FUNCTION_SYMBOL"):
+            symbol = msg.list[0]
+            if symbol.kind == _FUNCTION_SYMBOL:
                 node_type = op_to_node_type(symbol.atom.symbol)
 
             if node_type in [OperatorKind.EXISTS, OperatorKind.FORALL]:
-                variables = msg.list[:-1]
+                variables = msg.list[1:-1]
                 quantified_expression = msg.list[-1]
-                args.append(self.convert(quantified_expression, problem))
+                args: Tuple[model.FNode, ...] = (
+                    self._convert_expression(quantified_expression, problem),
+                )
                 payload = tuple(
-                    [self.convert(var, problem).variable() for var in variables]
+                    [
+                        self._convert_expression(var, problem).variable()
+                        for var in variables
+                    ]
                 )
             else:
-                args.extend([self.convert(m, problem) for m in msg.list])
+                args = tuple(self._convert_expression(m, problem) for m in msg.list[1:])
 
             assert node_type is not None
 
-            return problem.environment.expression_manager.create_node(
+            return em.create_node(
                 node_type=node_type,
-                args=tuple(args),
+                args=args,
                 payload=payload,
             )
-        elif (
-            msg.kind == proto.ExpressionKind.Value("FUNCTION_APPLICATION")
-            and msg.type == "up:time"
-        ):
+        elif kind == _FUNCTION_APPLICATION and msg.type == "up:time":
             if (
                 len(msg.list) == 3
             ):  # Expect something of the form (up:plus (QUALIFIER [CONTAINER]) DELAY)
@@ -239,9 +375,7 @@ class ProtobufReader(Converter):
             if len(timepoint_expr) > 1:
                 container = timepoint_expr[1].atom.symbol
             tp = model.timing.Timepoint(kd, container)
-            return problem.environment.expression_manager.TimingExp(
-                model.Timing(dl, tp)
-            )
+            return em.TimingExp(model.Timing(dl, tp))
 
         raise ValueError(f"Unknown expression kind `{msg.kind}`")
 
@@ -263,12 +397,22 @@ class ProtobufReader(Converter):
         else:
             # If atom symbols, return the equivalent UP alternative
             # Note that parameters are directly handled at expression level
-            if problem.has_object(value):
-                return problem.environment.expression_manager.ObjectExp(
-                    obj=problem.object(value)
-                )
-            else:
-                return problem.fluent(value)
+            symbols = self._symbols(problem)
+            # the objects are memoized with the key of their constant expressions
+            key = (field, value)
+            node = symbols.nodes.get(key, None)
+            if node is not None:
+                return node
+            obj = symbols.object(value)
+            if obj is not None:
+                node = problem.environment.expression_manager.ObjectExp(obj=obj)
+                symbols.nodes[key] = node
+                return node
+            fluent = symbols.fluent(value)
+            if fluent is not None:
+                return fluent
+            # raises the error of the problem for the undefined symbol
+            return problem.fluent(value)
 
     @handles(proto.TypeDeclaration)
     def _convert_type_declaration(
@@ -291,7 +435,9 @@ class ProtobufReader(Converter):
             )
         else:
             father = (
-                problem.user_type(msg.parent_type) if msg.parent_type != "" else None
+                self._symbols(problem).type(msg.parent_type)
+                if msg.parent_type != ""
+                else None
             )
             return problem.environment.type_manager.UserType(
                 name=msg.type_name, father=father
@@ -303,6 +449,20 @@ class ProtobufReader(Converter):
     ) -> model.AbstractProblem:
         if msg.HasField("scheduling_extension"):
             return self._convert_scheduling_problem(msg, environment)
+        problem = self._empty_problem(msg, environment)
+        # the message describes a well formed problem: the names and the initial
+        # values are checked at once, when all the elements are added
+        with problem.bulk_load():
+            self._add_problem_elements(msg, problem)
+        return problem
+
+    def _empty_problem(
+        self, msg: proto.Problem, environment: Optional[Environment] = None
+    ) -> Problem:
+        """
+        Returns the `Problem` (or `HierarchicalProblem`) with the name and the
+        settings of the given message, without its elements.
+        """
         problem_name = str(msg.problem_name) if str(msg.problem_name) != "" else None
         if msg.HasField("hierarchy"):
             problem = model.htn.HierarchicalProblem(
@@ -310,7 +470,14 @@ class ProtobufReader(Converter):
             )
         else:
             problem = Problem(name=problem_name, environment=environment)
+        problem.discrete_time = msg.discrete_time
+        problem.self_overlapping = msg.self_overlapping
+        if msg.HasField("epsilon"):
+            problem.epsilon = self.convert(msg.epsilon)
+        return problem
 
+    def _add_problem_elements(self, msg: proto.Problem, problem: Problem):
+        """Adds to the given `Problem` the elements in the given message."""
         for t in msg.types:
             problem._add_user_type(self.convert(t, problem))
         for obj in msg.objects:
@@ -358,13 +525,6 @@ class ProtobufReader(Converter):
                 msg.hierarchy.initial_task_network, problem
             )
 
-        problem.discrete_time = msg.discrete_time
-        problem.self_overlapping = msg.self_overlapping
-        if msg.HasField("epsilon"):
-            problem.epsilon = self.convert(msg.epsilon)
-
-        return problem
-
     def _convert_scheduling_problem(
         self, msg: proto.Problem, environment: Optional[Environment] = None
     ) -> model.scheduling.SchedulingProblem:
@@ -419,7 +579,7 @@ class ProtobufReader(Converter):
                 prefix = pa.name + "."
                 assert p.name.startswith(prefix)
                 name = p.name[len(prefix) :]  # remove prefix
-                a.add_parameter(name, convert_type_str(p.type, problem))
+                a.add_parameter(name, self._symbols(problem).type(p.type))
             for cond in pa.conditions:
                 a.add_condition(
                     self.convert(cond.span, problem), self.convert(cond.cond, problem)
@@ -493,7 +653,7 @@ class ProtobufReader(Converter):
     ) -> model.htn.TaskNetwork:
         tn = model.htn.TaskNetwork(problem.environment)
         for v in msg.variables:
-            tn.add_variable(v.name, convert_type_str(v.type, problem))
+            tn.add_variable(v.name, self._symbols(problem).type(v.type))
         for st in msg.subtasks:
             tn.add_subtask(self.convert(st, problem))
         for c in msg.constraints:
@@ -522,35 +682,38 @@ class ProtobufReader(Converter):
                 default=self.convert(msg.default_action_cost, problem)
                 if msg.HasField("default_action_cost")
                 else None,
+                environment=problem.environment,
             )
 
         elif msg.kind == proto.Metric.MINIMIZE_SEQUENTIAL_PLAN_LENGTH:
-            return metrics.MinimizeSequentialPlanLength()
+            return metrics.MinimizeSequentialPlanLength(problem.environment)
 
         elif msg.kind == proto.Metric.MINIMIZE_MAKESPAN:
-            return metrics.MinimizeMakespan()
+            return metrics.MinimizeMakespan(problem.environment)
 
         elif msg.kind == proto.Metric.MINIMIZE_EXPRESSION_ON_FINAL_STATE:
             return metrics.MinimizeExpressionOnFinalState(
-                expression=self.convert(msg.expression, problem)
+                expression=self.convert(msg.expression, problem),
+                environment=problem.environment,
             )
 
         elif msg.kind == proto.Metric.MAXIMIZE_EXPRESSION_ON_FINAL_STATE:
             return metrics.MaximizeExpressionOnFinalState(
-                expression=self.convert(msg.expression, problem)
+                expression=self.convert(msg.expression, problem),
+                environment=problem.environment,
             )
         elif msg.kind == proto.Metric.OVERSUBSCRIPTION:
             goals = {}
             for g in msg.goals:
                 goals[self.convert(g.goal, problem)] = self.convert(g.weight)
-            return metrics.Oversubscription(goals)
+            return metrics.Oversubscription(goals, problem.environment)
         elif msg.kind == proto.Metric.TEMPORAL_OVERSUBSCRIPTION:
             timed_goals = {}
             for g in msg.timed_goals:
                 timed_goals[
                     (self.convert(g.timing, problem), self.convert(g.goal, problem))
                 ] = self.convert(g.weight)
-            return metrics.TemporalOversubscription(timed_goals)
+            return metrics.TemporalOversubscription(timed_goals, problem.environment)
         else:
             raise UPException(f"Unknown metric kind `{msg.kind}`")
 
@@ -558,15 +721,16 @@ class ProtobufReader(Converter):
     def _convert_action(self, msg: proto.Action, problem: Problem) -> model.Action:
         action: model.Action
 
+        symbols = self._symbols(problem)
         parameters = OrderedDict()
         for param in msg.parameters:
-            parameters[param.name] = convert_type_str(param.type, problem)
+            parameters[param.name] = symbols.type(param.type)
 
         if msg.HasField("duration"):
-            action = DurativeAction(msg.name, parameters)
+            action = DurativeAction(msg.name, parameters, problem.environment)
             action.set_duration_constraint(self.convert(msg.duration, problem))
         else:
-            action = InstantaneousAction(msg.name, parameters)
+            action = InstantaneousAction(msg.name, parameters, problem.environment)
 
         conditions = []
         for condition in msg.conditions:
@@ -692,17 +856,7 @@ class ProtobufReader(Converter):
             assert len(msg.actions) == 0
             return self._convert_schedule(msg.schedule, problem)
         actions = [self._convert_action_instance(a, problem) for a in msg.actions]
-        if all(a[2] is not None for a in actions):
-            # If all actions have temporal term, we can assume that they are
-            # (id, action, (absolute start time, duration))
-            time_triggered_actions = [
-                (start, action, duration) for _, action, (start, duration) in actions
-            ]
-            flat_plan = unified_planning.plans.TimeTriggeredPlan(time_triggered_actions)
-        else:
-            # Otherwise, we assume they are a sequence of actions (id, action, None)
-            action_sequence = [action for _, action, _ in actions]
-            flat_plan = unified_planning.plans.SequentialPlan(actions=action_sequence)
+        flat_plan = self._flat_plan(actions)
 
         if msg.HasField("hierarchy"):
             assert isinstance(problem, HierarchicalProblem)
@@ -745,6 +899,30 @@ class ProtobufReader(Converter):
         else:
             return flat_plan
 
+    def _flat_plan(
+        self,
+        actions: List[
+            Tuple[
+                str,
+                ActionInstance,
+                Optional[Tuple[fractions.Fraction, Optional[fractions.Fraction]]],
+            ]
+        ],
+    ) -> Union[
+        unified_planning.plans.SequentialPlan, unified_planning.plans.TimeTriggeredPlan
+    ]:
+        if all(a[2] is not None for a in actions):
+            # If all actions have temporal term, we can assume that they are
+            # (id, action, (absolute start time, duration))
+            time_triggered_actions = [
+                (start, action, duration) for _, action, (start, duration) in actions
+            ]
+            return unified_planning.plans.TimeTriggeredPlan(time_triggered_actions)
+        else:
+            # Otherwise, we assume they are a sequence of actions (id, action, None)
+            action_sequence = [action for _, action, _ in actions]
+            return unified_planning.plans.SequentialPlan(actions=action_sequence)
+
     @handles(proto.ActionInstance)
     def _convert_action_instance(
         self, msg: proto.ActionInstance, problem: Problem
@@ -0,0 +1,337 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+This module defines the chunked protobuf encoding of the problems and of the plans,
+used to exchange elements whose monolithic messages would be too big (protobuf and
+gRPC limit a message to 2GB, and a monolithic message must be kept in memory at once).
+
+A problem is encoded as a stream of partial `proto.Problem` messages:
+
+* a header, with the name, the settings, the features and the user types of the
+  problem (and an empty hierarchy for the hierarchical problems);
+* the batches of objects, of fluents (after the objects, that can be their default
+  values), of actions, of initial assignments and of goals;
+* a trailer, with the timed effects, the trajectory constraints, the quality metrics
+  and the hierarchy of the problem.
+
+A plan is encoded as a stream of partial `proto.Plan` messages, each with a batch of
+action instances.
+
+Since the repeated fields of protobuf messages are concatenated when they are
+merged, merging all the chunks of a stream gives the monolithic message of the
+`ProtobufWriter`. The chunks can be sent and received as gRPC streams or written
+to and read from files, each chunk prefixed by its size, for example:
+
+    with open("problem.bin", "wb") as f:
+        ProtobufStreamWriter().write_problem(problem, f)
+    with open("problem.bin", "rb") as f:
+        problem = ProtobufStreamReader().read_problem(f)
+"""
+
+
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Type, TypeVar, Union
+
+from google.protobuf.message import DecodeError, Message
+
+import unified_planning.grpc.generated.unified_planning_pb2 as proto
+from unified_planning.environment import Environment
+from unified_planning.exceptions import UPUsageError
+from unified_planning.grpc.proto_reader import ProtobufReader  # type: ignore[attr-defined]
+from unified_planning.grpc.proto_writer import ProtobufWriter, map_feature  # type: ignore[attr-defined]
+from unified_planning.model import Problem
+from unified_planning.model.htn import HierarchicalProblem
+from unified_planning.plans import SequentialPlan, TimeTriggeredPlan
+
+
+DEFAULT_CHUNK_SIZE = 10000
+
+M = TypeVar("M", bound=Message)
+
+
+def _batches(elements: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(elements)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def write_delimited(messages: Iterable[Message], stream: BinaryIO):
+    """
+    Writes the given messages in the given binary stream, each prefixed by its size
+    encoded as a varint.
+
+    :param messages: The messages to write.
+    :param stream: The binary stream where the messages are written.
+    """
+    for message in messages:
+        size = message.ByteSize()
+        prefix = bytearray()
+        while True:
+            byte = size & 0x7F
+            size >>= 7
+            if size:
+                prefix.append(byte | 0x80)
+            else:
+                prefix.append(byte)
+                break
+        stream.write(prefix)
+        stream.write(message.SerializeToString())
+
+
+def read_delimited(stream: BinaryIO, message_type: Type[M]) -> Iterator[M]:
+    """
+    Returns the messages of the given type read from the given binary stream, written
+    by :func:`write_delimited`; the messages are read one at a time.
+
+    :param stream: The binary stream where the messages are read.
+    :param message_type: The type of the messages in the stream.
+    :return: The iterator over the messages in the stream.
+    """
+    while True:
+        size, shift = 0, 0
+        while True:
+            byte = stream.read(1)
+            if not byte:
+                if shift == 0:
+                    return
+                raise DecodeError("Truncated size of a delimited message.")
+            size |= (byte[0] & 0x7F) << shift
+            shift += 7
+            if not byte[0] & 0x80:
+                break
+        data = stream.read(size)
+        if len(data) != size:
+            raise DecodeError("Truncated delimited message.")
+        message = message_type()
+        message.ParseFromString(data)
+        yield message
+
+
+class ProtobufStreamWriter:
+    """
+    This class converts the `Problems` and the `Plans` in the streams of protobuf
+    messages of their chunked encoding, where every chunk has at most `chunk_size`
+    elements.
+
+    The expressions converted are memoized for at most `chunk_size` nodes, so the
+    memory needed does not grow with the size of the problem.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size <= 0:
+            raise UPUsageError("The chunk size must be positive.")
+        self._chunk_size = chunk_size
+        self._writer = ProtobufWriter()
+        self._writer._fnode2proto.memoization_limit = chunk_size
+
+    def problem_chunks(self, problem: Problem) -> Iterator[proto.Problem]:
+        """
+        Returns the chunks of the given `Problem`; every chunk is created when
+        requested.
+
+        :param problem: The `Problem` to convert.
+        :return: The iterator over the chunks of the `Problem`.
+        """
+        if not isinstance(problem, Problem):
+            raise UPUsageError(
+                f"The chunked encoding does not support problems of type {type(problem)}."
+            )
+        writer = self._writer
+        problem_name = str(problem.name) if problem.name is not None else ""
+        header = proto.Problem(
+            domain_name=problem_name + "_domain",
+            problem_name=problem_name,
+            types=[writer.convert(t) for t in problem.user_types],
+            features=[map_feature(feature) for feature in problem.kind.features],
+            discrete_time=problem.discrete_time,
+            self_overlapping=problem.self_overlapping,
+            epsilon=writer.convert(problem.epsilon)
+            if problem.epsilon is not None
+            else None,
+        )
+        if isinstance(problem, HierarchicalProblem):
+            header.hierarchy.SetInParent()
+        yield header
+
+        for objects in _batches(problem.all_objects, self._chunk_size):
+            yield proto.Problem(objects=[writer.convert(o) for o in objects])
+        for fluents in _batches(problem.fluents, self._chunk_size):
+            yield proto.Problem(fluents=[writer.convert(f, problem) for f in fluents])
+        for actions in _batches(problem.actions, self._chunk_size):
+            yield proto.Problem(actions=[writer.convert(a) for a in actions])
+        for assignments in _batches(
+            problem.explicit_initial_values.items(), self._chunk_size
+        ):
+            yield proto.Problem(
+                initial_state=[
+                    proto.Assignment(fluent=writer.convert(x), value=writer.convert(v))
+                    for x, v in assignments
+                ]
+            )
+        goals = (proto.Goal(goal=writer.convert(g)) for g in problem.goals)
+        for goals_batch in _batches(goals, self._chunk_size):
+            yield proto.Problem(goals=goals_batch)
+        timed_goals = (
+            proto.Goal(goal=writer.convert(g), timing=writer.convert(t))
+            for t, gs in problem.timed_goals.items()
+            for g in gs
+        )
+        for goals_batch in _batches(timed_goals, self._chunk_size):
+            yield proto.Problem(goals=goals_batch)
+
+        trailer = proto.Problem(
+            timed_effects=[
+                proto.TimedEffect(
+                    effect=writer.convert(eff), occurrence_time=writer.convert(timing)
+                )
+                for timing, effects in problem.timed_effects.items()
+                for eff in effects
+            ],
+            trajectory_constraints=[
+                writer.convert(tc) for tc in problem.trajectory_constraints
+            ],
+            metrics=[writer.convert(m) for m in problem.quality_metrics],
+        )
+        if isinstance(problem, HierarchicalProblem):
+            trailer.hierarchy.CopyFrom(writer._build_hierarchy(problem))
+        yield trailer
+
+    def plan_chunks(
+        self, plan: Union[SequentialPlan, TimeTriggeredPlan]
+    ) -> Iterator[proto.Plan]:
+        """
+        Returns the chunks of the given `SequentialPlan` or `TimeTriggeredPlan`;
+        every chunk is created when requested.
+
+        :param plan: The `Plan` to convert.
+        :return: The iterator over the chunks of the `Plan`.
+        """
+        if isinstance(plan, SequentialPlan):
+            actions = plan.actions
+            make_plan = SequentialPlan
+        elif isinstance(plan, TimeTriggeredPlan):
+            actions = plan.timed_actions
+            make_plan = TimeTriggeredPlan
+        else:
+            raise UPUsageError(
+                f"The chunked encoding does not support plans of type {type(plan)}."
+            )
+        if not actions:
+            yield proto.Plan()
+        for batch in _batches(actions, self._chunk_size):
+            yield self._writer.convert(make_plan(batch, plan.environment))
+
+    def write_problem(self, problem: Problem, stream: BinaryIO):
+        """
+        Writes the chunks of the given `Problem` in the given binary stream.
+
+        :param problem: The `Problem` to write.
+        :param stream: The binary stream where the chunks are written.
+        """
+        write_delimited(self.problem_chunks(problem), stream)
+
+    def write_plan(
+        self, plan: Union[SequentialPlan, TimeTriggeredPlan], stream: BinaryIO
+    ):
+        """
+        Writes the chunks of the given `Plan` in the given binary stream.
+
+        :param plan: The `Plan` to write.
+        :param stream: The binary stream where the chunks are written.
+        """
+        write_delimited(self.plan_chunks(plan), stream)
+
+
+class ProtobufStreamReader:
+    """
+    This class converts the streams of protobuf messages of the chunked encoding in
+    the equivalent `Problems` and `Plans`; every chunk is converted and discarded
+    before the following one is requested.
+    """
+
+    def __init__(self):
+        self._reader = ProtobufReader()
+
+    def read_problem_chunks(
+        self,
+        chunks: Iterable[proto.Problem],
+        environment: Optional[Environment] = None,
+    ) -> Problem:
+        """
+        Returns the `Problem` encoded by the given chunks.
+
+        :param chunks: The chunks of the `Problem`, for example a gRPC stream.
+        :param environment: The `Environment` of the returned `Problem`.
+        :return: The `Problem` encoded by the chunks.
+        """
+        reader = self._reader
+        iterator = iter(chunks)
+        header = next(iterator, None)
+        if header is None:
+            raise UPUsageError("The stream of the problem chunks is empty.")
+        problem = reader._empty_problem(header, environment)
+        with problem.bulk_load():
+            reader._add_problem_elements(header, problem)
+            for chunk in iterator:
+                reader._add_problem_elements(chunk, problem)
+        return problem
+
+    def read_plan_chunks(
+        self, chunks: Iterable[proto.Plan], problem: Problem
+    ) -> Union[SequentialPlan, TimeTriggeredPlan]:
+        """
+        Returns the `Plan` of the given `Problem` encoded by the given chunks.
+
+        :param chunks: The chunks of the `Plan`, for example a gRPC stream.
+        :param problem: The `Problem` of the `Plan`.
+        :return: The `Plan` encoded by the chunks.
+        """
+        reader = self._reader
+        actions = []
+        for chunk in chunks:
+            actions.extend(
+                reader._convert_action_instance(a, problem) for a in chunk.actions
+            )
+        return reader._flat_plan(actions)
+
+    def read_problem(
+        self, stream: BinaryIO, environment: Optional[Environment] = None
+    ) -> Problem:
+        """
+        Returns the `Problem` written in the given binary stream by
+        :func:`ProtobufStreamWriter.write_problem`.
+
+        :param stream: The binary stream where the `Problem` is read.
+        :param environment: The `Environment` of the returned `Problem`.
+        :return: The `Problem` read.
+        """
+        return self.read_problem_chunks(
+            read_delimited(stream, proto.Problem), environment
+        )
+
+    def read_plan(
+        self, stream: BinaryIO, problem: Problem
+    ) -> Union[SequentialPlan, TimeTriggeredPlan]:
+        """
+        Returns the `Plan` written in the given binary stream by
+        :func:`ProtobufStreamWriter.write_plan`.
+
+        :param stream: The binary stream where the `Plan` is read.
+        :param problem: The `Problem` of the `Plan`.
+        :return: The `Plan` read.
+        """
+        return self.read_plan_chunks(read_delimited(stream, proto.Plan), problem)
@@ -886,7 +886,7 @@ class ProtobufWriter(Converter):
 
         return proto.PlanGenerationResult(
             status=self.convert(result.status),
-            plan=self.convert(result.plan),
+            plan=self.convert(result.plan) if result.plan is not None else None,
             engine=proto.Engine(name=result.engine_name),
             metrics=result.metrics,
             log_messages=log_messages,
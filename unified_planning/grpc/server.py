@@ -0,0 +1,510 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+This module defines a server exposing the engines of the
+:class:`~unified_planning.engines.Factory` of an :class:`~unified_planning.environment.Environment`
+through the `UnifiedPlanning` gRPC service, for example:
+
+    server, port = start_server("localhost:0")
+    stub = UnifiedPlanningStub(grpc.insecure_channel(f"localhost:{port}"))
+    answer = stub.planOneShot(proto.PlanRequest(problem=ProtobufWriter().convert(problem)))
+    server.stop(None)
+
+The :class:`AsyncUnifiedPlanningServicer` and :func:`start_aio_server` are the
+equivalent for a `grpc.aio` server.
+"""
+
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent import futures
+from contextlib import nullcontext
+from typing import (
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import grpc  # type: ignore[import]
+import grpc.aio  # type: ignore[import]
+
+import unified_planning as up
+import unified_planning.grpc.generated.unified_planning_pb2 as proto
+from unified_planning.engines import (
+    CompilationKind,
+    LogLevel,
+    LogMessage,
+    OptimalityGuarantee,
+    PlanGenerationResult,
+    PlanGenerationResultStatus,
+    ValidationResult,
+    ValidationResultStatus,
+)
+from unified_planning.environment import Environment
+from unified_planning.exceptions import UPNoSuitableEngineAvailableException
+from unified_planning.grpc.generated.unified_planning_pb2_grpc import (
+    UnifiedPlanningServicer as _UnifiedPlanningServicer,
+    add_UnifiedPlanningServicer_to_server,
+)
+from unified_planning.grpc.proto_reader import ProtobufReader  # type: ignore[attr-defined]
+from unified_planning.grpc.proto_writer import ProtobufWriter  # type: ignore[attr-defined]
+
+
+class _RequestError(Exception):
+    """Raised when a request can not be answered, with the gRPC status code to return."""
+
+    def __init__(self, code: grpc.StatusCode, details: str):
+        super().__init__(details)
+        self.code = code
+        self.details = details
+
+
+class _ThreadState:
+    """The `Environment`, the converters and the cache of the problems of a thread."""
+
+    def __init__(self, environment: Environment):
+        self.environment = environment
+        self.reader = ProtobufReader()
+        self.writer = ProtobufWriter()
+        self.cache: "OrderedDict[bytes, up.model.AbstractProblem]" = OrderedDict()
+
+
+class UnifiedPlanningServicer(_UnifiedPlanningServicer):
+    """
+    Implements the `UnifiedPlanning` gRPC service with the engines of the `Factory` of
+    an `Environment`.
+
+    The expressions and the walkers of an `Environment` are not thread-safe, so by
+    default every thread serving the requests has its own `Environment`, created by
+    `environment_factory`, with its own converters and its own cache of the converted
+    problems, and the requests are served concurrently.
+    The problems received are converted once per thread and cached, indexed by the hash
+    of their serialized message, so that the requests on the same problem do not convert
+    it again.
+    If an `environment` is given, it is shared by all the threads and the work on it is
+    serialized by a lock, taken by the anytime planners only while they compute each
+    solution.
+
+    :param environment: The `Environment` shared by all the requests, for the converted
+        problems and for the `Factory` selecting the engines; by default every thread
+        has its own.
+    :param environment_factory: The function creating the `Environment` of each thread,
+        when the `environment` is not given; defaults to the `Environment` constructor.
+    :param planner_name: The name of the engine used for `planOneShot`; by default the
+        `Factory` selects an engine supporting the problem.
+    :param anytime_planner_name: The name of the engine used for `planAnytime`; by default
+        the `Factory` selects an engine supporting the problem.
+    :param validator_name: The name of the engine used for `validatePlan`; by default the
+        `Factory` selects an engine supporting the problem.
+    :param compiler_name: The name of the engine used for `compile`; by default the
+        `Factory` selects an engine supporting the problem and the `compilation_kind`.
+    :param compilation_kind: The `CompilationKind` of the `compile` requests.
+    :param cache_size: The maximum number of converted problems kept in the cache of
+        each thread.
+    """
+
+    def __init__(
+        self,
+        environment: Optional[Environment] = None,
+        *,
+        environment_factory: Callable[[], Environment] = Environment,
+        planner_name: Optional[str] = None,
+        anytime_planner_name: Optional[str] = None,
+        validator_name: Optional[str] = None,
+        compiler_name: Optional[str] = None,
+        compilation_kind: CompilationKind = CompilationKind.GROUNDING,
+        cache_size: int = 128,
+    ):
+        self._shared_env = environment
+        self._environment_factory = environment_factory
+        self._planner_name = planner_name
+        self._anytime_planner_name = anytime_planner_name
+        self._validator_name = validator_name
+        self._compiler_name = compiler_name
+        self._compilation_kind = compilation_kind
+        self._cache_size = cache_size
+        self._local = threading.local()
+        self._states: List[_ThreadState] = []
+        self._stats_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._env_lock: ContextManager = (
+            threading.RLock() if environment is not None else nullcontext()
+        )
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Returns the `hits`, `misses` and `size` of the caches of the converted problems,
+        summed over the threads.
+        """
+        with self._stats_lock:
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "size": sum(len(s.cache) for s in self._states),
+            }
+
+    def _state(self) -> _ThreadState:
+        state = getattr(self._local, "state", None)
+        if state is None:
+            environment = self._shared_env
+            if environment is None:
+                environment = self._environment_factory()
+            state = self._local.state = _ThreadState(environment)
+            with self._stats_lock:
+                self._states.append(state)
+        return state
+
+    def _problem(
+        self, state: _ThreadState, msg: proto.Problem
+    ) -> "up.model.AbstractProblem":
+        """Returns the problem of the given message, converting it if it is not cached."""
+        key = hashlib.sha256(msg.SerializeToString(deterministic=True)).digest()
+        problem = state.cache.get(key, None)
+        if problem is not None:
+            state.cache.move_to_end(key)
+            with self._stats_lock:
+                self._cache_hits += 1
+            return problem
+        with self._stats_lock:
+            self._cache_misses += 1
+        try:
+            problem = state.reader.convert(msg, state.environment)
+        except Exception as e:
+            raise _RequestError(
+                grpc.StatusCode.INVALID_ARGUMENT, f"Invalid problem: {e}"
+            ) from e
+        if self._cache_size > 0:
+            with self._stats_lock:
+                state.cache[key] = problem
+                while len(state.cache) > self._cache_size:
+                    state.cache.popitem(last=False)
+        return problem
+
+    def _params(
+        self, name: Optional[str], request: proto.PlanRequest
+    ) -> Optional[Dict[str, str]]:
+        if len(request.engine_options) == 0:
+            return None
+        if name is None:
+            raise _RequestError(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                "The engine_options require the server to be configured with an engine name.",
+            )
+        return dict(request.engine_options)
+
+    def _failure(
+        self,
+        state: _ThreadState,
+        status: PlanGenerationResultStatus,
+        error: Exception,
+    ) -> proto.PlanGenerationResult:
+        log = LogMessage(LogLevel.ERROR, str(error))
+        result = PlanGenerationResult(status, None, "", log_messages=[log])
+        return state.writer.convert(result)
+
+    def _plan_one_shot(self, request: proto.PlanRequest) -> proto.PlanGenerationResult:
+        with self._env_lock:
+            return self._plan_one_shot_locked(request)
+
+    def _plan_one_shot_locked(
+        self, request: proto.PlanRequest
+    ) -> proto.PlanGenerationResult:
+        state = self._state()
+        problem = self._problem(state, request.problem)
+        params = self._params(self._planner_name, request)
+        guarantee = None
+        if request.resolution_mode == proto.PlanRequest.Mode.Value("SOLVED_OPTIMALLY"):
+            guarantee = OptimalityGuarantee.SOLVED_OPTIMALLY
+        timeout = request.timeout if request.timeout > 0 else None
+        try:
+            with state.environment.factory.OneshotPlanner(
+                name=self._planner_name,
+                params=params,
+                problem_kind=problem.kind,
+                optimality_guarantee=guarantee,
+            ) as planner:
+                result = planner.solve(problem, timeout=timeout)
+        except UPNoSuitableEngineAvailableException as e:
+            return self._failure(
+                state, PlanGenerationResultStatus.UNSUPPORTED_PROBLEM, e
+            )
+        except Exception as e:
+            return self._failure(state, PlanGenerationResultStatus.INTERNAL_ERROR, e)
+        return state.writer.convert(result)
+
+    def _plan_anytime(
+        self, request: proto.PlanRequest
+    ) -> Iterator[proto.PlanGenerationResult]:
+        """
+        Yields the answers of a `planAnytime` request; it must be consumed by a single
+        thread, as it uses the `Environment` of the thread that starts it.
+        """
+        with self._env_lock:
+            state = self._state()
+            problem = self._problem(state, request.problem)
+            params = self._params(self._anytime_planner_name, request)
+            timeout = request.timeout if request.timeout > 0 else None
+            failure = None
+            try:
+                planner = state.environment.factory.AnytimePlanner(
+                    name=self._anytime_planner_name,
+                    params=params,
+                    problem_kind=problem.kind,
+                )
+            except UPNoSuitableEngineAvailableException as e:
+                failure = self._failure(
+                    state, PlanGenerationResultStatus.UNSUPPORTED_PROBLEM, e
+                )
+            except Exception as e:
+                failure = self._failure(
+                    state, PlanGenerationResultStatus.INTERNAL_ERROR, e
+                )
+        if failure is not None:
+            yield failure
+            return
+        solutions = planner.get_solutions(problem, timeout=timeout)
+        try:
+            while True:
+                # with a shared environment, the lock is released between the
+                # solutions, while they are sent
+                with self._env_lock:
+                    try:
+                        result = next(solutions, None)
+                        if result is None:
+                            return
+                        answer = state.writer.convert(result)
+                    except Exception as e:
+                        answer = self._failure(
+                            state, PlanGenerationResultStatus.INTERNAL_ERROR, e
+                        )
+                        result = None
+                yield answer
+                if result is None:
+                    return
+        finally:
+            with self._env_lock:
+                solutions.close()
+                planner.destroy()
+
+    def _validate_plan(
+        self, request: proto.ValidationRequest
+    ) -> proto.ValidationResult:
+        with self._env_lock:
+            return self._validate_plan_locked(request)
+
+    def _validate_plan_locked(
+        self, request: proto.ValidationRequest
+    ) -> proto.ValidationResult:
+        state = self._state()
+        problem = self._problem(state, request.problem)
+        try:
+            plan = state.reader.convert(request.plan, problem)
+        except Exception as e:
+            raise _RequestError(
+                grpc.StatusCode.INVALID_ARGUMENT, f"Invalid plan: {e}"
+            ) from e
+        try:
+            with state.environment.factory.PlanValidator(
+                name=self._validator_name,
+                problem_kind=problem.kind,
+                plan_kind=plan.kind,
+            ) as validator:
+                result = validator.validate(problem, plan)
+        except Exception as e:
+            log = LogMessage(LogLevel.ERROR, str(e))
+            result = ValidationResult(ValidationResultStatus.UNKNOWN, "", [log])
+        return state.writer.convert(result)
+
+    def _compile(self, request: proto.Problem) -> proto.CompilerResult:
+        with self._env_lock:
+            return self._compile_locked(request)
+
+    def _compile_locked(self, request: proto.Problem) -> proto.CompilerResult:
+        state = self._state()
+        problem = self._problem(state, request)
+        try:
+            with state.environment.factory.Compiler(
+                name=self._compiler_name,
+                problem_kind=problem.kind,
+                compilation_kind=self._compilation_kind,
+            ) as compiler:
+                result = compiler.compile(problem, self._compilation_kind)
+        except Exception as e:
+            raise _RequestError(grpc.StatusCode.FAILED_PRECONDITION, str(e)) from e
+        return state.writer.convert(result)
+
+    def planOneShot(self, request, context):
+        try:
+            return self._plan_one_shot(request)
+        except _RequestError as e:
+            context.abort(e.code, e.details)
+
+    def planAnytime(self, request, context):
+        try:
+            for answer in self._plan_anytime(request):
+                if not context.is_active():
+                    return  # the client cancelled the request
+                yield answer
+        except _RequestError as e:
+            context.abort(e.code, e.details)
+
+    def validatePlan(self, request, context):
+        try:
+            return self._validate_plan(request)
+        except _RequestError as e:
+            context.abort(e.code, e.details)
+
+    def compile(self, request, context):
+        try:
+            return self._compile(request)
+        except _RequestError as e:
+            context.abort(e.code, e.details)
+
+
+class AsyncUnifiedPlanningServicer(_UnifiedPlanningServicer):
+    """
+    Implements the `UnifiedPlanning` gRPC service for a `grpc.aio` server; the requests
+    are answered by the given :class:`UnifiedPlanningServicer` in the threads of an
+    executor, so the engines do not block the event loop.
+
+    :param servicer: The `UnifiedPlanningServicer` answering the requests; by default
+        one creating a new `Environment` for every thread, with its `environment_factory`.
+    :param max_workers: The maximum number of requests served at the same time.
+    """
+
+    def __init__(
+        self,
+        servicer: Optional[UnifiedPlanningServicer] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self._servicer = servicer if servicer is not None else UnifiedPlanningServicer()
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    @property
+    def servicer(self) -> UnifiedPlanningServicer:
+        """Returns the `UnifiedPlanningServicer` answering the requests."""
+        return self._servicer
+
+    async def _run(self, context, function, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, function, *args)
+        except _RequestError as e:
+            await context.abort(e.code, e.details)
+
+    async def planOneShot(self, request, context):
+        return await self._run(context, self._servicer._plan_one_shot, request)
+
+    async def planAnytime(self, request, context):
+        # the answers are computed in a single thread of the executor, as they use the
+        # environment of that thread, and are passed to the event loop with a queue
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Union[proto.PlanGenerationResult, Exception, None]]" = (
+            asyncio.Queue()
+        )
+        cancelled = threading.Event()
+
+        def stream():
+            answers = self._servicer._plan_anytime(request)
+            try:
+                for answer in answers:
+                    loop.call_soon_threadsafe(queue.put_nowait, answer)
+                    if cancelled.is_set():
+                        return
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                answers.close()
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        loop.run_in_executor(self._executor, stream)
+        try:
+            while True:
+                answer = await queue.get()
+                if answer is None:
+                    return
+                if isinstance(answer, _RequestError):
+                    await context.abort(answer.code, answer.details)
+                elif isinstance(answer, Exception):
+                    raise answer
+                yield answer
+        finally:
+            cancelled.set()
+
+    async def validatePlan(self, request, context):
+        return await self._run(context, self._servicer._validate_plan, request)
+
+    async def compile(self, request, context):
+        return await self._run(context, self._servicer._compile, request)
+
+
+def start_server(
+    address: str = "localhost:0",
+    servicer: Optional[UnifiedPlanningServicer] = None,
+    max_workers: Optional[int] = None,
+) -> Tuple[grpc.Server, int]:
+    """
+    Starts a gRPC server implementing the `UnifiedPlanning` service on a thread pool,
+    listening without credentials on the given address.
+
+    :param address: The address of the server; with the port `0` a free port is chosen.
+    :param servicer: The `UnifiedPlanningServicer` answering the requests; by default one
+        creating a new `Environment` for every thread, with its `environment_factory`.
+    :param max_workers: The maximum number of threads serving the requests.
+    :return: The started server, that must be stopped by the caller, and its port.
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    add_UnifiedPlanningServicer_to_server(
+        servicer if servicer is not None else UnifiedPlanningServicer(), server
+    )
+    port = server.add_insecure_port(address)
+    server.start()
+    return server, port
+
+
+async def start_aio_server(
+    address: str = "localhost:0",
+    servicer: Optional[
+        Union[UnifiedPlanningServicer, AsyncUnifiedPlanningServicer]
+    ] = None,
+    max_workers: Optional[int] = None,
+) -> Tuple[grpc.aio.Server, int]:
+    """
+    Starts a `grpc.aio` server implementing the `UnifiedPlanning` service, listening
+    without credentials on the given address.
+
+    :param address: The address of the server; with the port `0` a free port is chosen.
+    :param servicer: The servicer answering the requests; a `UnifiedPlanningServicer` is
+        wrapped in an `AsyncUnifiedPlanningServicer`.
+    :param max_workers: The maximum number of requests served at the same time, if the
+        `servicer` is not an `AsyncUnifiedPlanningServicer`.
+    :return: The started server, that must be stopped by the caller, and its port.
+    """
+    if not isinstance(servicer, AsyncUnifiedPlanningServicer):
+        servicer = AsyncUnifiedPlanningServicer(servicer, max_workers)
+    server = grpc.aio.server()
+    add_UnifiedPlanningServicer_to_server(servicer, server)
+    port = server.add_insecure_port(address)
+    await server.start()
+    return server, port
@@ -401,6 +401,19 @@ class ANMLGrammar:
     def problem(self):
         return self._problem
 
+    def clear(self):
+        """Clears the data structures populated while parsing, to parse another problem."""
+        for results in (
+            self.types,
+            self.constant_fluents,
+            self.fluents,
+            self.actions,
+            self.objects,
+            self.timed_assignments_or_goals,
+            self.timed_assignment_or_goal,
+        ):
+            results.clear()
+
 
 # Utility functions
 def operatorOperands(tokenlist):
@@ -76,7 +76,12 @@ from unified_planning.model import (
 from fractions import Fraction
 from typing import Dict, Sequence, Set, Tuple, Union, Callable, List, Optional
 from pyparsing import ParseResults
-from unified_planning.io.utils import parse_string, parse_file
+from unified_planning.io.utils import GrammarCache, parse_string, parse_file
+
+
+# the parse actions of the ANMLGrammar populate its data structures, so every thread
+# has its own grammar
+_ANML_GRAMMAR: GrammarCache[ANMLGrammar] = GrammarCache(ANMLGrammar, per_thread=True)
 
 
 class ANMLReader:
@@ -236,15 +241,19 @@ class ANMLReader:
         :return: The `Problem` parsed from the given anml file.
         """
 
-        # create the grammar and populate it's data structures
-        grammar = ANMLGrammar()
-        parse_file(grammar.problem, problem_filename, parse_all=True)
         if problem_name is None:
             if isinstance(problem_filename, str):
                 problem_name = problem_filename
             else:
                 problem_name = "_".join(problem_filename)
-        self._problem = self._parse_problem(grammar, problem_name)
+        # populate the data structures of the cached grammar
+        grammar = _ANML_GRAMMAR.get()
+        grammar.clear()
+        try:
+            parse_file(grammar.problem, problem_filename, parse_all=True)
+            self._problem = self._parse_problem(grammar, problem_name)
+        finally:
+            grammar.clear()
         return self._problem
 
     def parse_problem_string(
@@ -260,11 +269,14 @@ class ANMLReader:
         :return: The `Problem` parsed from the given anml file.
         """
 
-        # create the grammar and populate it's data structures
-        grammar = ANMLGrammar()
-        parse_string(grammar.problem, problem_str, parse_all=True)
-
-        self._problem = self._parse_problem(grammar, problem_name)
+        # populate the data structures of the cached grammar
+        grammar = _ANML_GRAMMAR.get()
+        grammar.clear()
+        try:
+            parse_string(grammar.problem, problem_str, parse_all=True)
+            self._problem = self._parse_problem(grammar, problem_name)
+        finally:
+            grammar.clear()
         return self._problem
 
     def _create_types_map(self, types_res) -> Dict[str, "up.model.Type"]:
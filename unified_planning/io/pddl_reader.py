@@ -14,10 +14,12 @@
 #
 
 
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from fractions import Fraction
+import os
 import re
-from typing import Dict, Union, Callable, List, cast, Tuple
+from typing import Dict, Union, Callable, List, cast, Tuple, Deque, Iterable, Iterator
 import typing
 import unified_planning as up
 import unified_planning.model.htn as htn
@@ -29,7 +31,13 @@ from unified_planning.exceptions import (
     UPException,
     UPUnsupportedProblemTypeError,
 )
-from unified_planning.io.utils import parse_string, set_results_name, Located
+from unified_planning.io.pddl_writer import TimedActionInstance
+from unified_planning.io.utils import (
+    GrammarCache,
+    parse_string,
+    set_results_name,
+    Located,
+)
 
 import pyparsing
 from pyparsing import ParseResults
@@ -325,6 +333,11 @@ class PDDLGrammar:
         domain.ignore(";" + rest_of_line)
         problem.ignore(";" + rest_of_line)
 
+        # the grammar is shared by the threads parsing with the cached grammar, so it
+        # is streamlined (modifying it) here instead of at the first parse
+        for element in (domain, problem, parameters):
+            element.streamline()
+
         self._domain = domain
         self._problem = problem
         self._parameters = parameters
@@ -342,6 +355,205 @@ class PDDLGrammar:
         return self._parameters
 
 
+# the PDDLGrammar is not modified by the parsing, so it is shared by all the threads
+_PDDL_GRAMMAR: GrammarCache[PDDLGrammar] = GrammarCache(PDDLGrammar)
+
+
+def _parse_problem_file(problem_filename: str) -> Tuple[str, ParseResults]:
+    """Reads and parses a `PDDL` problem file, in the processes of :func:`PDDLReader.parse_problems`."""
+    with open(problem_filename, "r") as problem_file:
+        problem_str = problem_file.read().replace("\t", " ").lower()
+    problem_res = parse_string(_PDDL_GRAMMAR.get().problem, problem_str, parse_all=True)
+    return problem_str, problem_res
+
+
+def _map_in_processes(
+    function: Callable, elements: Iterable, max_workers: typing.Optional[int]
+) -> Iterator:
+    """
+    Returns the iterator over the results of the given function applied to the given
+    elements by a pool of processes, in the order of the elements.
+
+    At most two elements per process are submitted ahead of the consumer of the
+    iterator, so the results are not accumulated if they are consumed slowly.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers) as executor:
+        try:
+            for element in elements:
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(function, element))
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _share_domain(domain: "up.model.Problem") -> "up.model.Problem":
+    """Returns a copy of the incomplete `Problem` of a domain that shares its `Actions`."""
+    actions, domain._actions = domain._actions, []
+    try:
+        problem = domain.clone()
+    finally:
+        domain._actions = actions
+    problem._actions = actions[:]
+    return problem
+
+
+_PLAN_COMMENT_LINE = re.compile(r"^\s*(;.*)?$")
+_CONTINGENT_NODE_LINE = re.compile(
+    r"^\s*(\d+)\s*\(\s*([\w?-]+)((\s+[\w?-]+)*)\s*\)\s*$"
+)
+_CONTINGENT_EDGE_LINE = re.compile(r"^\s*(\d+)\s*->\s*(\d+)(.*)$")
+_SEQUENTIAL_PLAN_LINE = re.compile(r"^\s*\(\s*([\w?-]+)((\s+[\w?-]+)*)\s*\)\s*$")
+_TIMED_PLAN_LINE = re.compile(
+    r"^\s*(\d+\.?\d*)\s*:\s*\(\s*([\w?-]+)((\s+[\w?-]+)*)\s*\)\s*(\[\s*(\d+\.?\d*)\s*\])?\s*$"
+)
+
+
+class PlanLineParser:
+    """
+    This class parses the lines of the `PDDL` plans of a `Problem` one at a time, so
+    a plan can be parsed while it is read from a file or produced by a planner.
+
+    The `Actions` and the `Objects` are resolved by name through maps, computed once
+    from the `Problem` or filled with the results of `get_item_named`.
+    """
+
+    def __init__(
+        self,
+        problem: "up.model.Problem",
+        get_item_named: typing.Optional[
+            Callable[
+                [str],
+                "up.io.pddl_writer.WithName",
+            ]
+        ] = None,
+    ):
+        """
+        :param problem: The `Problem` of the plans.
+        :param get_item_named: A function that takes a name and returns the original up.model element instance
+            linked to that renaming; if None the problem is used to retrieve the actions and objects in the
+            plan from their name.
+        """
+        self._problem = problem
+        self._get_item_named = get_item_named
+        self._em = problem.environment.expression_manager
+        self._actions: Dict[str, "up.model.Action"] = {}
+        self._objects: Dict[str, "up.model.Object"] = {}
+        if get_item_named is None:
+            self._actions = {a.name: a for a in problem.actions}
+            self._objects = {o.name: o for o in problem.all_objects}
+        self._parameters: Dict[str, "up.model.FNode"] = {}
+
+    def action(self, name: str) -> "up.model.Action":
+        """
+        Returns the `Action` with the given name in the plans.
+
+        :param name: The name of the `Action` in the plans.
+        :return: The `Action` with the given name.
+        """
+        action = self._actions.get(name, None)
+        if action is None:
+            if self._get_item_named is not None:
+                action = self._get_item_named(name)
+            else:
+                action = self._problem.action(name)
+            assert isinstance(action, up.model.Action), "Wrong plan or renaming."
+            self._actions[name] = action
+        return action
+
+    def parameter(self, name: str) -> "up.model.FNode":
+        """
+        Returns the expression of the `Object` with the given name in the plans.
+
+        :param name: The name of the `Object` in the plans.
+        :return: The expression of the `Object` with the given name.
+        """
+        parameter = self._parameters.get(name, None)
+        if parameter is None:
+            obj = self._objects.get(name, None)
+            if obj is None:
+                if self._get_item_named is not None:
+                    obj = self._get_item_named(name)
+                else:
+                    obj = self._problem.object(name)
+            assert isinstance(obj, up.model.Object), "Wrong plan or renaming."
+            parameter = self._em.ObjectExp(obj)
+            self._parameters[name] = parameter
+        return parameter
+
+    def action_instance(
+        self, name: str, parameters_names: List[str]
+    ) -> "up.plans.ActionInstance":
+        """
+        Returns the `ActionInstance` of the `Action` with the given name and of the
+        `Objects` with the given names.
+
+        :param name: The name of the `Action` in the plans.
+        :param parameters_names: The names of the parameters in the plans.
+        :return: The `ActionInstance` with the given names.
+        """
+        return up.plans.ActionInstance(
+            self.action(name), tuple(self.parameter(p) for p in parameters_names)
+        )
+
+    def parse_line(
+        self, line: str
+    ) -> typing.Optional[Union["up.plans.ActionInstance", TimedActionInstance]]:
+        """
+        Parses a line of a `SequentialPlan` or of a `TimeTriggeredPlan`, in the format
+        of :func:`PDDLReader.parse_plan`.
+
+        :param line: The line to parse.
+        :return: The `ActionInstance` of a line of a `SequentialPlan`, the start, the
+            `ActionInstance` and the optional duration of a line of a `TimeTriggeredPlan`
+            or `None` for an empty or a comment line.
+        """
+        if _PLAN_COMMENT_LINE.match(line):
+            return None
+        return self._parse_action_line(line.lower())
+
+    def _parse_action_line(
+        self, line: str
+    ) -> Union["up.plans.ActionInstance", TimedActionInstance]:
+        s_ai = _SEQUENTIAL_PLAN_LINE.match(line)
+        if s_ai:
+            return self.action_instance(s_ai.group(1), s_ai.group(2).split())
+        t_ai = _TIMED_PLAN_LINE.match(line)
+        if t_ai:
+            dur = None
+            if t_ai.group(6) is not None:
+                dur = Fraction(t_ai.group(6))
+            act_instance = self.action_instance(t_ai.group(2), t_ai.group(3).split())
+            return Fraction(t_ai.group(1)), act_instance, dur
+        raise UPException(f"Error parsing the plan line: {line}")
+
+    def plan(
+        self, actions: List[Union["up.plans.ActionInstance", TimedActionInstance]]
+    ) -> Union["up.plans.SequentialPlan", "up.plans.TimeTriggeredPlan"]:
+        """
+        Returns the plan of the given parsed lines.
+
+        :param actions: The results of :func:`parse_line` for the lines of a plan.
+        :return: The `TimeTriggeredPlan` if the lines are timed, the `SequentialPlan`
+            otherwise.
+        """
+        timed = [isinstance(a, tuple) for a in actions]
+        if any(timed):
+            if not all(timed):
+                raise UPException("The plan mixes timed and sequential lines.")
+            return up.plans.TimeTriggeredPlan(
+                cast(List[TimedActionInstance], actions), self._problem.environment
+            )
+        return up.plans.SequentialPlan(
+            cast(List["up.plans.ActionInstance"], actions), self._problem.environment
+        )
+
+
 class PDDLReader:
     """
     Parse a `PDDL` domain file and, optionally, a `PDDL` problem file and generate the equivalent :class:`~unified_planning.model.Problem`.
@@ -377,7 +589,7 @@ class PDDLReader:
             "sometime-after": self._em.SometimeAfter,
             "at-most-once": self._em.AtMostOnce,
         }
-        grammar = PDDLGrammar()
+        grammar = _PDDL_GRAMMAR.get()
         self._pp_domain = grammar.domain
         self._pp_problem = grammar.problem
         self._pp_parameters = grammar.parameters
@@ -1026,13 +1238,14 @@ class PDDLReader:
                 return False
         return True
 
-    def _parse_problem(
-        self,
-        domain_res: ParseResults,
-        domain_str: str,
-        problem_res: typing.Optional[ParseResults],
-        problem_str=typing.Optional[str],
-    ) -> "up.model.Problem":
+    def _parse_domain(
+        self, domain_res: ParseResults, domain_str: str
+    ) -> Tuple["up.model.Problem", TypesMap, bool]:
+        """
+        Returns the incomplete `Problem` of the given parsed domain, with the map from
+        the names of the types to the types and whether the actions of the domain have
+        a cost that can be used by a `MinimizeActionCosts` metric.
+        """
         problem: up.model.Problem
         if ":hierarchy" in set(domain_res.get("features", [])):
             problem = htn.HierarchicalProblem(
@@ -1397,319 +1610,341 @@ class PDDLReader:
                     )
                 )
             problem.add_method(method)
+        return problem, types_map, has_actions_cost
 
-        if problem_res is not None:
-            assert problem_str is not None
-            problem.name = problem_res["name"]
-
-            for g in problem_res.get("objects", []):
-                t = types_map[g[1] if len(g) > 1 else Object]
-                for o in g[0]:
-                    problem.add_object(up.model.Object(o, t, problem.environment))
-
-            tasknet = problem_res.get("htn", None)
-            if tasknet is not None:
-                assert isinstance(problem, htn.HierarchicalProblem)
-
-                for tn_variables in tasknet.get("params", []):
-                    tn_var_type = types_map[
-                        tn_variables.value[1] if len(tn_variables.value) > 1 else Object
-                    ]
-                    for tn_var_name in tn_variables.value[0]:
-                        problem.task_network.add_variable(tn_var_name, tn_var_type)
-
-                ta = tasknet.get("tasks", None)
-                if ta:
-                    subtasks = self._parse_subtasks(
-                        CustomParseResults(ta[0]),
-                        problem.task_network,
-                        problem,
-                        types_map,
-                        problem_str,
-                    )
-                    for task in subtasks:
-                        problem.task_network.add_subtask(task)
-
-                ot = tasknet.get("ordered-tasks", None)
-                if ot:
-                    subtasks = self._parse_subtasks(
-                        CustomParseResults(ot[0]),
-                        problem.task_network,
-                        problem,
-                        types_map,
-                        problem_str,
-                    )
-                    prev = None
-                    for task in subtasks:
-                        cur = problem.task_network.add_subtask(task)
-                        if prev is not None:
-                            problem.task_network.set_strictly_before(prev, cur)
-                        prev = cur
-
-                oq = tasknet.get("ordering", None)
-                stack = []
-                if oq:
-                    stack.append(CustomParseResults(oq[0]))
-                while len(stack) > 0:
-                    ordering = stack.pop(0)
-                    if len(ordering) == 0:
-                        pass
-                    elif ordering[0].value == "and":
-                        # add the rest of the expression to the queue
-                        for i in range(1, len(ordering)):
-                            stack.append(ordering[i])
-                    elif ordering[0].value == "<":
-                        if len(ordering) != 3:
-                            raise SyntaxError(
-                                f"Wrong number of parameters in ordering relation: {ordering}"
-                                + f"Line: {ordering.line_start(domain_str)}, col: {ordering.col_start(domain_str)}",
-                            )
-                        left = problem.task_network.get_subtask(ordering[1].value)
-                        right = problem.task_network.get_subtask(ordering[2].value)
-                        problem.task_network.set_strictly_before(left, right)
-                    else:
+    def _parse_problem_section(
+        self,
+        problem: "up.model.Problem",
+        types_map: TypesMap,
+        has_actions_cost: bool,
+        domain_str: str,
+        problem_res: ParseResults,
+        problem_str: str,
+        shared_actions: bool = False,
+    ):
+        """
+        Adds to the incomplete `Problem` of a domain the elements of the given parsed
+        problem.
+
+        If `shared_actions` is `True`, the actions of the `Problem` are shared with
+        other problems of the same domain, so they are cloned before being modified.
+        """
+        problem.name = problem_res["name"]
+
+        for g in problem_res.get("objects", []):
+            t = types_map[g[1] if len(g) > 1 else Object]
+            for o in g[0]:
+                problem.add_object(up.model.Object(o, t, problem.environment))
+
+        tasknet = problem_res.get("htn", None)
+        if tasknet is not None:
+            assert isinstance(problem, htn.HierarchicalProblem)
+
+            for tn_variables in tasknet.get("params", []):
+                tn_var_type = types_map[
+                    tn_variables.value[1] if len(tn_variables.value) > 1 else Object
+                ]
+                for tn_var_name in tn_variables.value[0]:
+                    problem.task_network.add_variable(tn_var_name, tn_var_type)
+
+            ta = tasknet.get("tasks", None)
+            if ta:
+                subtasks = self._parse_subtasks(
+                    CustomParseResults(ta[0]),
+                    problem.task_network,
+                    problem,
+                    types_map,
+                    problem_str,
+                )
+                for task in subtasks:
+                    problem.task_network.add_subtask(task)
+
+            ot = tasknet.get("ordered-tasks", None)
+            if ot:
+                subtasks = self._parse_subtasks(
+                    CustomParseResults(ot[0]),
+                    problem.task_network,
+                    problem,
+                    types_map,
+                    problem_str,
+                )
+                prev = None
+                for task in subtasks:
+                    cur = problem.task_network.add_subtask(task)
+                    if prev is not None:
+                        problem.task_network.set_strictly_before(prev, cur)
+                    prev = cur
+
+            oq = tasknet.get("ordering", None)
+            stack = []
+            if oq:
+                stack.append(CustomParseResults(oq[0]))
+            while len(stack) > 0:
+                ordering = stack.pop(0)
+                if len(ordering) == 0:
+                    pass
+                elif ordering[0].value == "and":
+                    # add the rest of the expression to the queue
+                    for i in range(1, len(ordering)):
+                        stack.append(ordering[i])
+                elif ordering[0].value == "<":
+                    if len(ordering) != 3:
                         raise SyntaxError(
-                            f"Invalid expression in ordering, expected 'and' or '<' but got '{ordering[0]}"
+                            f"Wrong number of parameters in ordering relation: {ordering}"
                             + f"Line: {ordering.line_start(domain_str)}, col: {ordering.col_start(domain_str)}",
                         )
+                    left = problem.task_network.get_subtask(ordering[1].value)
+                    right = problem.task_network.get_subtask(ordering[2].value)
+                    problem.task_network.set_strictly_before(left, right)
+                else:
+                    raise SyntaxError(
+                        f"Invalid expression in ordering, expected 'and' or '<' but got '{ordering[0]}"
+                        + f"Line: {ordering.line_start(domain_str)}, col: {ordering.col_start(domain_str)}",
+                    )
 
-                cs = tasknet.get("constraints", None)
-                if cs:
-                    constraints = CustomParseResults(cs[0])
-                    for i in range(len(constraints)):
-                        constraint = constraints[i]
-                        problem.task_network.add_constraint(
-                            self._parse_exp(
-                                problem,
-                                problem.task_network,
-                                types_map,
-                                {},
-                                constraint,
-                                problem_str,
-                            )
+            cs = tasknet.get("constraints", None)
+            if cs:
+                constraints = CustomParseResults(cs[0])
+                for i in range(len(constraints)):
+                    constraint = constraints[i]
+                    problem.task_network.add_constraint(
+                        self._parse_exp(
+                            problem,
+                            problem.task_network,
+                            types_map,
+                            {},
+                            constraint,
+                            problem_str,
                         )
+                    )
 
-            init_list = problem_res.get("init", [])
-            if len(init_list) == 1 and list(init_list[0].value[0].value) == ["and"]:
-                init_list = init_list[0].value[1:]
-            for j in init_list:
-                init = CustomParseResults(j)
-                operator = init[0].value
-                if operator == "=":
-                    problem.set_initial_value(
-                        self._parse_exp(
-                            problem, None, types_map, {}, init[1], problem_str
-                        ),
-                        self._parse_exp(
-                            problem, None, types_map, {}, init[2], problem_str
-                        ),
+        init_list = problem_res.get("init", [])
+        if len(init_list) == 1 and list(init_list[0].value[0].value) == ["and"]:
+            init_list = init_list[0].value[1:]
+        for j in init_list:
+            init = CustomParseResults(j)
+            operator = init[0].value
+            if operator == "=":
+                problem.set_initial_value(
+                    self._parse_exp(problem, None, types_map, {}, init[1], problem_str),
+                    self._parse_exp(problem, None, types_map, {}, init[2], problem_str),
+                )
+            elif (
+                len(init) == 3
+                and operator == "at"
+                and init[1].value.replace(".", "", 1).isdigit()
+            ):
+                try:
+                    ti = up.model.StartTiming(Fraction(init[1].value))
+                except ValueError:
+                    start_line, start_col = init.line_start(
+                        problem_str
+                    ), init.col_start(problem_str)
+                    end_line, end_col = init.line_end(problem_str), init.col_end(
+                        problem_str
                     )
-                elif (
-                    len(init) == 3
-                    and operator == "at"
-                    and init[1].value.replace(".", "", 1).isdigit()
-                ):
-                    try:
-                        ti = up.model.StartTiming(Fraction(init[1].value))
-                    except ValueError:
-                        start_line, start_col = init.line_start(
-                            problem_str
-                        ), init.col_start(problem_str)
-                        end_line, end_col = init.line_end(problem_str), init.col_end(
-                            problem_str
-                        )
-                        raise SyntaxError(
-                            f"Expected number, found {init[1].value} in expression from line: {start_line}, col {start_col} to line: {end_line}, col {end_col}"
-                        )
-                    if init[2][0].value in ["assign", "increase", "decrease"]:
-                        fe = self._parse_exp(
-                            problem, None, types_map, {}, init[2][1], problem_str
-                        )
-                        va = self._parse_exp(
-                            problem, None, types_map, {}, init[2][2], problem_str
-                        )
-                        if init[2][0].value == "assign":
-                            problem.add_timed_effect(ti, fe, va)
-                        elif init[2][0].value == "increase":
-                            problem.add_increase_effect(ti, fe, va)
-                        elif init[2][0].value == "decrease":
-                            problem.add_decrease_effect(ti, fe, va)
+                    raise SyntaxError(
+                        f"Expected number, found {init[1].value} in expression from line: {start_line}, col {start_col} to line: {end_line}, col {end_col}"
+                    )
+                if init[2][0].value in ["assign", "increase", "decrease"]:
+                    fe = self._parse_exp(
+                        problem, None, types_map, {}, init[2][1], problem_str
+                    )
+                    va = self._parse_exp(
+                        problem, None, types_map, {}, init[2][2], problem_str
+                    )
+                    if init[2][0].value == "assign":
+                        problem.add_timed_effect(ti, fe, va)
+                    elif init[2][0].value == "increase":
+                        problem.add_increase_effect(ti, fe, va)
+                    elif init[2][0].value == "decrease":
+                        problem.add_decrease_effect(ti, fe, va)
+                else:
+                    va = self._parse_exp(
+                        problem, None, types_map, {}, init[2], problem_str
+                    )
+                    if va.is_fluent_exp():
+                        problem.add_timed_effect(ti, va, self._em.TRUE())
+                    elif va.is_not():
+                        problem.add_timed_effect(ti, va.arg(0), self._em.FALSE())
                     else:
-                        va = self._parse_exp(
-                            problem, None, types_map, {}, init[2], problem_str
-                        )
-                        if va.is_fluent_exp():
-                            problem.add_timed_effect(ti, va, self._em.TRUE())
-                        elif va.is_not():
-                            problem.add_timed_effect(ti, va.arg(0), self._em.FALSE())
-                        else:
-                            raise SyntaxError(
-                                f"Not able to handle this TIL {init}"
-                                + f"Line: {init.line_start(problem_str)}, col: {init.col_start(problem_str)}",
-                            )
-                elif operator == "oneof":
-                    assert isinstance(problem, ContingentProblem)
-                    fluents = [
-                        self._parse_exp(
-                            problem, None, types_map, {}, init[x], problem_str
-                        )
-                        for x in range(1, len(init))
-                    ]
-                    problem.add_oneof_initial_constraint(fluents)
-                elif operator == "or":
-                    assert isinstance(problem, ContingentProblem)
-                    fluents = [
-                        self._parse_exp(
-                            problem, None, types_map, {}, init[x], problem_str
-                        )
-                        for x in range(1, len(init))
-                    ]
-                    problem.add_or_initial_constraint(fluents)
-                elif operator == "unknown":
-                    assert isinstance(problem, ContingentProblem)
-                    if len(init) != 2:
                         raise SyntaxError(
-                            "`unknown` constraint requires exactly one argument."
+                            f"Not able to handle this TIL {init}"
                             + f"Line: {init.line_start(problem_str)}, col: {init.col_start(problem_str)}",
                         )
-                    arg = self._parse_exp(
-                        problem, None, types_map, {}, init[1], problem_str
-                    )
-                    problem.add_unknown_initial_constraint(arg)
-                else:
-                    exp = self._parse_exp(
-                        problem, None, types_map, {}, init, problem_str
+            elif operator == "oneof":
+                assert isinstance(problem, ContingentProblem)
+                fluents = [
+                    self._parse_exp(problem, None, types_map, {}, init[x], problem_str)
+                    for x in range(1, len(init))
+                ]
+                problem.add_oneof_initial_constraint(fluents)
+            elif operator == "or":
+                assert isinstance(problem, ContingentProblem)
+                fluents = [
+                    self._parse_exp(problem, None, types_map, {}, init[x], problem_str)
+                    for x in range(1, len(init))
+                ]
+                problem.add_or_initial_constraint(fluents)
+            elif operator == "unknown":
+                assert isinstance(problem, ContingentProblem)
+                if len(init) != 2:
+                    raise SyntaxError(
+                        "`unknown` constraint requires exactly one argument."
+                        + f"Line: {init.line_start(problem_str)}, col: {init.col_start(problem_str)}",
                     )
-                    if not exp.is_not():
-                        if not exp.is_fluent_exp():
-                            raise SyntaxError(
-                                f"In init expected predicate, found {exp}\n"
-                                + f"Line: {init.line_start(problem_str)}, col: {init.col_start(problem_str)}",
-                            )
-                        problem.set_initial_value(
-                            exp,
-                            self._em.TRUE(),
-                        )
-                    elif not exp.arg(0).is_fluent_exp():
+                arg = self._parse_exp(
+                    problem, None, types_map, {}, init[1], problem_str
+                )
+                problem.add_unknown_initial_constraint(arg)
+            else:
+                exp = self._parse_exp(problem, None, types_map, {}, init, problem_str)
+                if not exp.is_not():
+                    if not exp.is_fluent_exp():
                         raise SyntaxError(
-                            f"In init expected (not predicate), found {exp}\n"
+                            f"In init expected predicate, found {exp}\n"
                             + f"Line: {init.line_start(problem_str)}, col: {init.col_start(problem_str)}",
                         )
-            if "goal" in problem_res:
-                problem.add_goal(
+                    problem.set_initial_value(
+                        exp,
+                        self._em.TRUE(),
+                    )
+                elif not exp.arg(0).is_fluent_exp():
+                    raise SyntaxError(
+                        f"In init expected (not predicate), found {exp}\n"
+                        + f"Line: {init.line_start(problem_str)}, col: {init.col_start(problem_str)}",
+                    )
+        if "goal" in problem_res:
+            problem.add_goal(
+                self._parse_exp(
+                    problem,
+                    None,
+                    types_map,
+                    {},
+                    CustomParseResults(problem_res["goal"][0]),
+                    problem_str,
+                )
+            )
+        elif not isinstance(problem, htn.HierarchicalProblem):
+            raise SyntaxError("Missing goal section in problem file.")
+
+        if "constraints" in problem_res:
+            for tc in problem_res["constraints"]:
+                problem.add_trajectory_constraint(
                     self._parse_exp(
                         problem,
                         None,
                         types_map,
                         {},
-                        CustomParseResults(problem_res["goal"][0]),
+                        CustomParseResults(tc),
                         problem_str,
                     )
                 )
-            elif not isinstance(problem, htn.HierarchicalProblem):
-                raise SyntaxError("Missing goal section in problem file.")
-
-            if "constraints" in problem_res:
-                for tc in problem_res["constraints"]:
-                    problem.add_trajectory_constraint(
-                        self._parse_exp(
-                            problem,
-                            None,
-                            types_map,
-                            {},
-                            CustomParseResults(tc),
-                            problem_str,
-                        )
-                    )
-
-            has_actions_cost = has_actions_cost and self._problem_has_actions_cost(
-                problem
-            )
-            optimization = problem_res.get("optimization", None)
-            m = problem_res.get("metric", None)
 
-            if m is not None:
-                metric = CustomParseResults(m[0])
+        has_actions_cost = has_actions_cost and self._problem_has_actions_cost(problem)
+        optimization = problem_res.get("optimization", None)
+        m = problem_res.get("metric", None)
+
+        if m is not None:
+            metric = CustomParseResults(m[0])
+            if (
+                optimization == "minimize"
+                and len(metric) == 1
+                and metric[0].value == "total-time"
+            ):
+                problem.add_quality_metric(up.model.metrics.MinimizeMakespan())
+            else:
+                metric_exp = self._parse_exp(
+                    problem, None, types_map, {}, metric, problem_str
+                )
                 if (
-                    optimization == "minimize"
-                    and len(metric) == 1
-                    and metric[0].value == "total-time"
+                    has_actions_cost
+                    and optimization == "minimize"
+                    and metric_exp == self._totalcost
                 ):
-                    problem.add_quality_metric(up.model.metrics.MinimizeMakespan())
-                else:
-                    metric_exp = self._parse_exp(
-                        problem, None, types_map, {}, metric, problem_str
+                    costs: Dict[up.model.Action, up.model.Expression] = {}
+                    problem._fluents.remove(self._totalcost.fluent())
+                    if self._totalcost in problem._initial_value:
+                        problem._initial_value.pop(self._totalcost)
+                    start_timing, end_timing = (
+                        up.model.StartTiming(),
+                        up.model.EndTiming(),
                     )
-                    if (
-                        has_actions_cost
-                        and optimization == "minimize"
-                        and metric_exp == self._totalcost
-                    ):
-                        costs: Dict[up.model.Action, up.model.Expression] = {}
-                        problem._fluents.remove(self._totalcost.fluent())
-                        if self._totalcost in problem._initial_value:
-                            problem._initial_value.pop(self._totalcost)
-                        start_timing, end_timing = (
-                            up.model.StartTiming(),
-                            up.model.EndTiming(),
-                        )
-                        for a in problem.actions:
-                            if isinstance(a, up.model.InstantaneousAction):
-                                cost = None
-                                for e in a.effects:
-                                    if e.fluent == self._totalcost:
-                                        cost = e
-                                        break
-                                if cost is not None:
-                                    costs[a] = cost.value
-                                    a._effects.remove(cost)
-                                    if cost.value != 1:
-                                        use_plan_length = False
-                                else:
+                    if shared_actions:
+                        # the cost effects are removed from the actions
+                        problem._actions = [a.clone() for a in problem.actions]
+                    for a in problem.actions:
+                        if isinstance(a, up.model.InstantaneousAction):
+                            cost = None
+                            for e in a.effects:
+                                if e.fluent == self._totalcost:
+                                    cost = e
+                                    break
+                            if cost is not None:
+                                costs[a] = cost.value
+                                a._effects.remove(cost)
+                                if cost.value != 1:
                                     use_plan_length = False
                             else:
-                                assert isinstance(a, up.model.DurativeAction)
                                 use_plan_length = False
-                                cost, effects_list = None, None
-                                for timing, el in a.effects.items():
-                                    if timing in (start_timing, end_timing):
-                                        for e in el:
-                                            if e.fluent == self._totalcost:
-                                                if cost is not None:
-                                                    raise UPUnsupportedProblemTypeError(
-                                                        f"Action {a.name} has more than one effect modifying it's cost"
-                                                    )
-                                                cost, effects_list = e, el
-                                                break
-                                if cost is not None:
-                                    assert effects_list is not None
-                                    costs[a] = cost.value
-                                    effects_list.remove(cost)
-                                else:
-                                    use_plan_length = False
-                        if use_plan_length:
-                            problem.add_quality_metric(
-                                up.model.metrics.MinimizeSequentialPlanLength()
-                            )
                         else:
-                            problem.add_quality_metric(
-                                up.model.metrics.MinimizeActionCosts(
-                                    costs, self._em.Int(0)
-                                )
-                            )
+                            assert isinstance(a, up.model.DurativeAction)
+                            use_plan_length = False
+                            cost, effects_list = None, None
+                            for timing, el in a.effects.items():
+                                if timing in (start_timing, end_timing):
+                                    for e in el:
+                                        if e.fluent == self._totalcost:
+                                            if cost is not None:
+                                                raise UPUnsupportedProblemTypeError(
+                                                    f"Action {a.name} has more than one effect modifying it's cost"
+                                                )
+                                            cost, effects_list = e, el
+                                            break
+                            if cost is not None:
+                                assert effects_list is not None
+                                costs[a] = cost.value
+                                effects_list.remove(cost)
+                            else:
+                                use_plan_length = False
+                    if use_plan_length:
+                        problem.add_quality_metric(
+                            up.model.metrics.MinimizeSequentialPlanLength()
+                        )
                     else:
-                        if optimization == "minimize":
-                            problem.add_quality_metric(
-                                up.model.metrics.MinimizeExpressionOnFinalState(
-                                    metric_exp
-                                )
-                            )
-                        elif optimization == "maximize":
-                            problem.add_quality_metric(
-                                up.model.metrics.MaximizeExpressionOnFinalState(
-                                    metric_exp
-                                )
-                            )
+                        problem.add_quality_metric(
+                            up.model.metrics.MinimizeActionCosts(costs, self._em.Int(0))
+                        )
+                else:
+                    if optimization == "minimize":
+                        problem.add_quality_metric(
+                            up.model.metrics.MinimizeExpressionOnFinalState(metric_exp)
+                        )
+                    elif optimization == "maximize":
+                        problem.add_quality_metric(
+                            up.model.metrics.MaximizeExpressionOnFinalState(metric_exp)
+                        )
+
+    def _parse_problem(
+        self,
+        domain_res: ParseResults,
+        domain_str: str,
+        problem_res: typing.Optional[ParseResults],
+        problem_str: typing.Optional[str] = None,
+    ) -> "up.model.Problem":
+        problem, types_map, has_actions_cost = self._parse_domain(
+            domain_res, domain_str
+        )
+        if problem_res is not None:
+            assert problem_str is not None
+            self._parse_problem_section(
+                problem,
+                types_map,
+                has_actions_cost,
+                domain_str,
+                problem_res,
+                problem_str,
+            )
         return problem
 
     def parse_problem(
@@ -1767,6 +2002,66 @@ class PDDLReader:
 
         return self._parse_problem(domain_res, domain_str, problem_res, problem_str)
 
+    def parse_problems(
+        self,
+        domain_filename: str,
+        problem_filenames: Iterable[str],
+        max_workers: typing.Optional[int] = None,
+    ) -> Iterator["up.model.Problem"]:
+        """
+        Takes in input a filename containing the `PDDL` domain and the filenames of many
+        `PDDL` problems of that domain and returns the iterator over the parsed
+        `Problems`, in the order of the problem filenames.
+
+        The domain is parsed once, while the problem files are parsed by a pool of
+        `max_workers` processes (by default, the number of processors); if `max_workers`
+        is `1`, the problem files are parsed in this process. Every `Problem` is created
+        when requested, as soon as its file is parsed.
+
+        The returned `Problems` share the types, the `Fluents`, the constants and the
+        `Actions` of the domain, so those must not be modified; only the `Problems` with
+        a `MinimizeActionCosts` metric have their own copies of the `Actions`, because
+        the cost effects are removed from them.
+
+        Note: due to PDDL case-insensitivity, everything in the PDDL files will be turned to
+        lower case, so the names of fluents, actions etc. and the error report will all be
+        in lower-case.
+
+        :param domain_filename: The path to the file containing the `PDDL` domain.
+        :param problem_filenames: The paths to the files containing the `PDDL` problems.
+        :param max_workers: The maximum number of processes parsing the problem files.
+        :return: The iterator over the `Problems` parsed from the given pddl domain and
+            problems.
+        """
+        if max_workers is not None and max_workers <= 0:
+            raise UPUsageError("The number of workers must be positive.")
+        with open(domain_filename, "r") as domain_file:
+            domain_str = domain_file.read().replace("\t", " ").lower()
+        domain_res = parse_string(self._pp_domain, domain_str, parse_all=True)
+        domain, types_map, has_actions_cost = self._parse_domain(domain_res, domain_str)
+
+        def problems() -> Iterator["up.model.Problem"]:
+            if max_workers == 1:
+                parsed = map(_parse_problem_file, problem_filenames)
+            else:
+                parsed = _map_in_processes(
+                    _parse_problem_file, problem_filenames, max_workers
+                )
+            for problem_str, problem_res in parsed:
+                problem = _share_domain(domain)
+                self._parse_problem_section(
+                    problem,
+                    types_map,
+                    has_actions_cost,
+                    domain_str,
+                    problem_res,
+                    problem_str,
+                    shared_actions=True,
+                )
+                yield problem
+
+        return problems()
+
     def parse_plan(
         self,
         problem: "up.model.Problem",
@@ -1785,6 +2080,11 @@ class PDDLReader:
         ``(action-name param1 param2 ... paramN)`` in each line for SequentialPlans
         ``start-time: (action-name param1 param2 ... paramN) [duration]`` in each line for TimeTriggeredPlans,
         where ``[duration]`` is optional and not specified for InstantaneousActions.
+        ContingentPlans are written with a line ``node-id (action-name param1 param2 ... paramN)``
+        for every node, the root being the first one, and a line ``node-id -> child-id literal1 ... literalN``
+        for every edge, where the literals are the observation leading to the child, in the form
+        ``(fluent-name param1 ... paramN)``, ``(not (fluent-name param1 ... paramN))`` or
+        ``(= (fluent-name param1 ... paramN) value)``.
 
         :param problem: The up.model.problem.Problem instance for which the plan is generated.
         :param plan_filename: The path of the file in which the plan is written.
@@ -1814,6 +2114,11 @@ class PDDLReader:
         ``(action-name param1 param2 ... paramN)`` in each line for SequentialPlans
         ``start-time: (action-name param1 param2 ... paramN) [duration]`` in each line for TimeTriggeredPlans,
         where ``[duration]`` is optional and not specified for InstantaneousActions.
+        ContingentPlans are written with a line ``node-id (action-name param1 param2 ... paramN)``
+        for every node, the root being the first one, and a line ``node-id -> child-id literal1 ... literalN``
+        for every edge, where the literals are the observation leading to the child, in the form
+        ``(fluent-name param1 ... paramN)``, ``(not (fluent-name param1 ... paramN))`` or
+        ``(= (fluent-name param1 ... paramN) value)``.
 
         :param problem: The up.model.problem.Problem instance for which the plan is generated.
         :param plan_str: The plan in string.
@@ -1821,55 +2126,143 @@ class PDDLReader:
             linked to that renaming; if None the problem is used to retrieve the actions and objects in the
             plan from their name.:return: The up.plans.Plan corresponding to the parsed plan from the string
         """
+        line_parser = PlanLineParser(problem, get_item_named)
         actions: List = []
-        is_tt = False
+        contingent_nodes: Dict[str, "up.plans.ContingentPlanNode"] = {}
+        contingent_edges: List[Tuple[str, str, str]] = []
         for line in plan_str.splitlines():
-            if re.match(r"^\s*(;.*)?$", line):
+            if _PLAN_COMMENT_LINE.match(line):
                 continue
             line = line.lower()
-            s_ai = re.match(r"^\s*\(\s*([\w?-]+)((\s+[\w?-]+)*)\s*\)\s*$", line)
-            t_ai = re.match(
-                r"^\s*(\d+\.?\d*)\s*:\s*\(\s*([\w?-]+)((\s+[\w?-]+)*)\s*\)\s*(\[\s*(\d+\.?\d*)\s*\])?\s*$",
-                line,
-            )
-            if s_ai:
-                assert is_tt == False
-                name = s_ai.group(1)
-                params_name = s_ai.group(2).split()
-            elif t_ai:
-                is_tt = True
-                start = Fraction(t_ai.group(1))
-                name = t_ai.group(2)
-                params_name = t_ai.group(3).split()
-                dur = None
-                if t_ai.group(6) is not None:
-                    dur = Fraction(t_ai.group(6))
-            else:
+            c_edge = _CONTINGENT_EDGE_LINE.match(line)
+            if c_edge:
+                contingent_edges.append(
+                    (c_edge.group(1), c_edge.group(2), c_edge.group(3))
+                )
+                continue
+            c_node = _CONTINGENT_NODE_LINE.match(line)
+            if c_node:
+                contingent_nodes[c_node.group(1)] = up.plans.ContingentPlanNode(
+                    line_parser.action_instance(
+                        c_node.group(2), c_node.group(3).split()
+                    )
+                )
+                continue
+            actions.append(line_parser._parse_action_line(line))
+        if contingent_nodes or contingent_edges:
+            if actions:
                 raise UPException(
                     "Error parsing plan generated by " + self.__class__.__name__
                 )
-
-            action = (
-                get_item_named(name)
-                if get_item_named is not None
-                else problem.action(name)
+            return self._parse_contingent_plan(
+                problem, contingent_nodes, contingent_edges, get_item_named
             )
-            assert isinstance(action, up.model.Action), "Wrong plan or renaming."
-            parameters = []
-            for p in params_name:
-                obj = (
-                    get_item_named(p)
-                    if get_item_named is not None
-                    else problem.object(p)
-                )
+        return line_parser.plan(actions)
+
+    def parse_plan_lines(
+        self,
+        problem: "up.model.Problem",
+        plan_lines: Iterable[str],
+        get_item_named: typing.Optional[
+            Callable[
+                [str],
+                "up.io.pddl_writer.WithName",
+            ]
+        ] = None,
+    ) -> Iterator[Union["up.plans.ActionInstance", TimedActionInstance]]:
+        """
+        Takes a problem, the lines of a plan and optionally a map of renaming and returns the iterator
+        over the actions of the plan, parsed one line at a time; so a plan can be parsed while it is
+        read, for example from an open file or from the output pipe of a subprocess.
+
+        The lines are in the format of :func:`parse_plan` for SequentialPlans and TimeTriggeredPlans;
+        the iterator yields the ``ActionInstance`` of every line of a SequentialPlan and the
+        ``(start-time, ActionInstance, duration)`` tuple of every line of a TimeTriggeredPlan.
+
+        :param problem: The up.model.problem.Problem instance for which the plan is generated.
+        :param plan_lines: The lines of the plan.
+        :param get_item_named: A function that takes a name and returns the original up.model element instance
+            linked to that renaming; if None the problem is used to retrieve the actions and objects in the
+            plan from their name.
+        :return: The iterator over the actions of the plan.
+        """
+        line_parser = PlanLineParser(problem, get_item_named)
+        for line in plan_lines:
+            action = line_parser.parse_line(line)
+            if action is not None:
+                yield action
+
+    def _parse_contingent_plan(
+        self,
+        problem: "up.model.Problem",
+        nodes: Dict[str, "up.plans.ContingentPlanNode"],
+        edges: List[Tuple[str, str, str]],
+        get_item_named: typing.Optional[
+            Callable[
+                [str],
+                "up.io.pddl_writer.WithName",
+            ]
+        ],
+    ) -> "up.plans.ContingentPlan":
+        em = problem.environment.expression_manager
+        name = r"[\w?-]+"
+        atom = rf"\(\s*({name})((?:\s+{name})*)\s*\)"
+        literal = re.compile(
+            rf"\s*(?:\(\s*not\s*{atom}\s*\)|\(\s*=\s*{atom}\s+([\w?.-]+)\s*\)|{atom})"
+        )
+
+        def get_fluent(item_name: str):
+            if get_item_named is not None:
+                return get_item_named(item_name)
+            return problem.fluent(item_name)
+
+        def get_object(item_name: str):
+            if get_item_named is not None:
+                return get_item_named(item_name)
+            return problem.object(item_name)
+
+        def parse_atom(fluent_name: str, params: str) -> "up.model.FNode":
+            fluent = get_fluent(fluent_name)
+            assert isinstance(fluent, up.model.Fluent), "Wrong plan or renaming."
+            args = []
+            for p in params.split():
+                obj = get_object(p)
                 assert isinstance(obj, up.model.Object), "Wrong plan or renaming."
-                parameters.append(problem.environment.expression_manager.ObjectExp(obj))
-            act_instance = up.plans.ActionInstance(action, tuple(parameters))
-            if is_tt:
-                actions.append((start, act_instance, dur))
-            else:
-                actions.append(act_instance)
-        if is_tt:
-            return up.plans.TimeTriggeredPlan(actions)
-        else:
-            return up.plans.SequentialPlan(actions)
+                args.append(em.ObjectExp(obj))
+            return em.FluentExp(fluent, args)
+
+        def parse_value(value: str) -> "up.model.FNode":
+            if re.match(r"^-?\d+$", value):
+                return em.Int(int(value))
+            elif re.match(r"^-?\d*\.?\d+$", value):
+                return em.Real(Fraction(value))
+            obj = get_object(value)
+            assert isinstance(obj, up.model.Object), "Wrong plan or renaming."
+            return em.ObjectExp(obj)
+
+        for parent, child, literals in edges:
+            if parent not in nodes or child not in nodes:
+                raise UPException(
+                    "Error parsing plan generated by " + self.__class__.__name__
+                )
+            observation: Dict["up.model.FNode", "up.model.FNode"] = {}
+            position = 0
+            literals = literals.rstrip()
+            while position < len(literals):
+                match = literal.match(literals, position)
+                if match is None:
+                    raise UPException(
+                        "Error parsing plan generated by " + self.__class__.__name__
+                    )
+                if match.group(1) is not None:
+                    observation[parse_atom(match.group(1), match.group(2))] = em.FALSE()
+                elif match.group(3) is not None:
+                    observation[
+                        parse_atom(match.group(3), match.group(4))
+                    ] = parse_value(match.group(5))
+                else:
+                    observation[parse_atom(match.group(6), match.group(7))] = em.TRUE()
+                position = match.end()
+            nodes[parent].add_child(observation, nodes[child])
+        root = next(iter(nodes.values()), None)
+        return up.plans.ContingentPlan(root, problem.environment)
@@ -44,10 +44,12 @@ from unified_planning.model.types import _UserType
 from unified_planning.plans import (
     SequentialPlan,
     TimeTriggeredPlan,
+    ContingentPlan,
+    ContingentPlanNode,
     Plan,
     ActionInstance,
 )
-from typing import Callable, Dict, IO, List, Optional, Set, Union, cast
+from typing import Callable, Dict, IO, Iterable, List, Optional, Set, Tuple, Union, cast
 from io import StringIO
 from functools import reduce
 
@@ -147,6 +149,10 @@ WithName = Union[
     "up.model.htn.Method",
     "up.model.htn.Task",
 ]
+
+# the start, the action instance and the optional duration of a TimeTriggeredPlan action
+TimedActionInstance = Tuple[Fraction, ActionInstance, Optional[Fraction]]
+
 MangleFunction = Callable[[WithName], str]
 
 
@@ -800,27 +806,82 @@ class PDDLWriter:
             )
         out.write(")\n")
 
-    def _write_plan(self, plan: Plan, out: IO[str]):
-        def _format_action_instance(action_instance: ActionInstance) -> str:
-            param_str = ""
-            if action_instance.actual_parameters:
-                param_str = f" {' '.join((self._get_mangled_name(p.object()) for p in action_instance.actual_parameters))}"
-            return f"({self._get_mangled_name(action_instance.action)}{param_str})"
+    def _format_action_instance(self, action_instance: ActionInstance) -> str:
+        param_str = ""
+        if action_instance.actual_parameters:
+            param_str = f" {' '.join((self._get_mangled_name(p.object()) for p in action_instance.actual_parameters))}"
+        return f"({self._get_mangled_name(action_instance.action)}{param_str})"
+
+    def _format_plan_line(
+        self, action: Union[ActionInstance, TimedActionInstance]
+    ) -> str:
+        if isinstance(action, ActionInstance):
+            return f"{self._format_action_instance(action)}\n"
+        s, ai, dur = action
+        start = s.numerator if s.denominator == 1 else float(s)
+        if dur is None:
+            return f"{start}: {self._format_action_instance(ai)}\n"
+        duration = dur.numerator if dur.denominator == 1 else float(dur)
+        return f"{start}: {self._format_action_instance(ai)}[{duration}]\n"
 
+    def _write_plan(self, plan: Plan, out: IO[str]):
         if isinstance(plan, SequentialPlan):
-            for ai in plan.actions:
-                out.write(f"{_format_action_instance(ai)}\n")
+            self.write_plan_lines(plan.actions, out)
         elif isinstance(plan, TimeTriggeredPlan):
-            for s, ai, dur in plan.timed_actions:
-                start = s.numerator if s.denominator == 1 else float(s)
-                out.write(f"{start}: {_format_action_instance(ai)}")
-                if dur is not None:
-                    duration = dur.numerator if dur.denominator == 1 else float(dur)
-                    out.write(f"[{duration}]")
-                out.write("\n")
+            self.write_plan_lines(plan.timed_actions, out)
+        elif isinstance(plan, ContingentPlan):
+            self._write_contingent_plan(plan, out, self._format_action_instance)
         else:
             raise NotImplementedError
 
+    def _write_contingent_plan(
+        self,
+        plan: ContingentPlan,
+        out: IO[str],
+        format_action_instance: Callable[[ActionInstance], str],
+    ):
+        # Every node is written once as "id (action p1 ... pn)", with the root
+        # having id 0, and every edge as "id -> child_id literal1 ... literalN";
+        # the nodes shared by many parents are not duplicated, so the size of the
+        # output is linear in the size of the plan DAG.
+        def _format_fnode(fnode: "up.model.FNode") -> str:
+            if fnode.is_object_exp():
+                return self._get_mangled_name(fnode.object())
+            elif fnode.is_int_constant():
+                return str(fnode.constant_value())
+            elif fnode.is_real_constant():
+                value = fnode.constant_value()
+                return str(value.numerator if value.denominator == 1 else float(value))
+            elif fnode.is_fluent_exp():
+                args = "".join(f" {_format_fnode(a)}" for a in fnode.args)
+                return f"({self._get_mangled_name(fnode.fluent())}{args})"
+            raise UPException(f"{fnode} can not be written in a PDDL plan.")
+
+        def _format_literal(fluent: "up.model.FNode", value: "up.model.FNode") -> str:
+            if value.is_bool_constant():
+                if value.bool_constant_value():
+                    return _format_fnode(fluent)
+                return f"(not {_format_fnode(fluent)})"
+            return f"(= {_format_fnode(fluent)} {_format_fnode(value)})"
+
+        if plan.root_node is None:
+            return
+        ids: Dict[int, int] = {id(plan.root_node): 0}
+        nodes: List[ContingentPlanNode] = [plan.root_node]
+        for node in nodes:
+            for _, child in node.children:
+                if id(child) not in ids:
+                    ids[id(child)] = len(nodes)
+                    nodes.append(child)
+        for i, node in enumerate(nodes):
+            out.write(f"{i} {format_action_instance(node.action_instance)}\n")
+        for i, node in enumerate(nodes):
+            for observation, child in node.children:
+                literals = "".join(
+                    f" {_format_literal(f, v)}" for f, v in observation.items()
+                )
+                out.write(f"{i} -> {ids[id(child)]}{literals}\n")
+
     def print_domain(self):
         """Prints to std output the `PDDL` domain."""
         self._write_domain(sys.stdout)
@@ -866,6 +927,26 @@ class PDDLWriter:
         with open(filename, "w") as f:
             self._write_plan(plan, f)
 
+    def write_plan_lines(
+        self,
+        actions: Iterable[Union[ActionInstance, TimedActionInstance]],
+        out: IO[str],
+    ):
+        """
+        Writes to the given text stream the `PDDL` line of every action of a plan, as
+        soon as it is produced by the given iterable; so a plan can be written while
+        it is generated, for example to a file or to the input pipe of a subprocess.
+
+        The actions are the ``ActionInstances`` of a `SequentialPlan` or the
+        ``(start, ActionInstance, duration)`` tuples of a `TimeTriggeredPlan`, and can
+        be read back with :func:`PDDLReader.parse_plan_lines`.
+
+        :param actions: The actions of the plan.
+        :param out: The text stream where the lines are written.
+        """
+        for action in actions:
+            out.write(self._format_plan_line(action))
+
     def _get_mangled_name(
         self,
         item: WithName,
@@ -14,8 +14,100 @@
 #
 
 
+import threading
 import pyparsing
-from typing import Union, Sequence, List
+from typing import Callable, Generic, Optional, TypeVar, Union, Sequence, List
+from unified_planning.exceptions import UPUsageError
+
+
+G = TypeVar("G")
+
+
+class GrammarCache(Generic[G]):
+    """
+    This class caches the grammar created by the given function, so that the readers
+    do not create it again for every instance.
+
+    The grammar is created at the first request; if `per_thread` is `True` every
+    thread gets its own grammar, needed when parsing modifies the grammar (for
+    example, with parse actions populating its data structures), otherwise a single
+    grammar is shared by all the threads.
+
+    The cached grammars are discarded by :func:`configure_pyparsing`, since the
+    `pyparsing` settings are read when the grammars are created.
+    """
+
+    _generation = 0
+
+    def __init__(self, create_grammar: Callable[[], G], per_thread: bool = False):
+        self._create_grammar = create_grammar
+        self._per_thread = per_thread
+        self._lock = threading.Lock()
+        self._shared: Optional[G] = None
+        self._shared_generation = -1
+        self._local = threading.local()
+
+    def get(self) -> G:
+        """Returns the cached grammar, creating it if needed."""
+        generation = GrammarCache._generation
+        if self._per_thread:
+            grammar = getattr(self._local, "grammar", None)
+            if grammar is None or self._local.generation != generation:
+                grammar = self._create_grammar()
+                self._local.grammar = grammar
+                self._local.generation = generation
+            return grammar
+        grammar = self._shared
+        if grammar is None or self._shared_generation != generation:
+            with self._lock:
+                if self._shared is None or self._shared_generation != generation:
+                    self._shared = self._create_grammar()
+                    self._shared_generation = generation
+                grammar = self._shared
+        return grammar
+
+    @staticmethod
+    def clear_all():
+        """Discards the grammars of all the caches; they are created again when requested."""
+        GrammarCache._generation += 1
+
+
+def configure_pyparsing(
+    cache_size: Optional[int] = 128,
+    left_recursion: bool = False,
+    whitespace_chars: Optional[str] = None,
+):
+    """
+    Configures the memoization and the whitespace handling of `pyparsing`, used by the
+    :class:`~unified_planning.io.PDDLReader` and the :class:`~unified_planning.io.ANMLReader`.
+
+    The memoization of `pyparsing` is global: by default the packrat parsing is used,
+    with a cache of `128` results, that is reset at every parse, so larger caches pay
+    off only for large files. The left recursion memoization can be used instead, it
+    is exclusive with the packrat parsing.
+
+    :param cache_size: The number of results in the memoization cache; `None` means
+        unbounded.
+    :param left_recursion: `True` to use the left recursion memoization instead of
+        the packrat parsing; requires `pyparsing` 3.
+    :param whitespace_chars: If not `None`, the characters skipped between the
+        tokens of the grammars; the cached grammars are created again with them.
+    """
+    ParserElement = pyparsing.ParserElement
+    if pyparsing.__version__ < "3.0.0":
+        if left_recursion:
+            raise UPUsageError("Left recursion memoization requires pyparsing 3.")
+        ParserElement.enablePackrat(cache_size)
+    elif left_recursion:
+        ParserElement.enable_left_recursion(cache_size, force=True)
+    else:
+        ParserElement.enable_packrat(cache_size, force=True)
+    if whitespace_chars is not None:
+        if pyparsing.__version__ < "3.0.0":
+            ParserElement.setDefaultWhitespaceChars(whitespace_chars)
+        else:
+            ParserElement.set_default_whitespace_chars(whitespace_chars)
+    GrammarCache.clear_all()
 
 
 def parse_string(obj, problem_str, parse_all):
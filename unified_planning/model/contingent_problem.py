@@ -16,8 +16,10 @@
 import unified_planning as up
 from unified_planning.model.problem import Problem
 from unified_planning.model.expression import ConstantExpression
+from unified_planning.model.fnode import FNode
 from unified_planning.model.fluent import get_all_fluent_exp
-from typing import Dict, Optional, Iterable, Set, List, Union
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Iterable, Set, List, Tuple, Union
 
 
 class ContingentProblem(Problem):
@@ -171,3 +173,132 @@ class ContingentProblem(Problem):
     def hidden_fluents(self) -> Set["up.model.fnode.FNode"]:
         """Returns the hidden fluents."""
         return self._hidden_fluents
+
+    def initial_assignments(self) -> Iterator[Dict[FNode, bool]]:
+        """
+        Yields the assignments of the hidden fluents satisfying the initial constraints,
+        that are the possible initial states of the problem.
+
+        A `oneof` constraint is a choice of the only true literal, then the remaining
+        hidden fluents are assigned checking the `or` constraints as soon as they are
+        complete.
+
+        :return: The values of the hidden fluents in every possible initial state.
+        """
+        hidden = sorted(
+            {f.arg(0) if f.is_not() else f for f in self._hidden_fluents}, key=str
+        )
+
+        def literal(exp: FNode) -> Tuple[FNode, bool]:
+            return (exp.arg(0), False) if exp.is_not() else (exp, True)
+
+        oneofs = [[literal(e) for e in c] for c in self._oneof_initial_constraints]
+        ors = [[literal(e) for e in c] for c in self._or_initial_constraints]
+        position = {fe: i for i, fe in enumerate(hidden)}
+        # the or constraints indexed by the hidden fluent completing them
+        ors_by_last: Dict[FNode, List[List[Tuple[FNode, bool]]]] = {}
+        for c in ors:
+            last = max((fe for fe, _ in c), key=position.__getitem__)
+            ors_by_last.setdefault(last, []).append(c)
+
+        assignment: Dict[FNode, bool] = {}
+
+        def satisfied(c: List[Tuple[FNode, bool]]) -> bool:
+            return any(assignment[fe] == value for fe, value in c)
+
+        def assign_oneof(i: int) -> Iterator[Dict[FNode, bool]]:
+            if i == len(oneofs):
+                yield from assign_free(0)
+                return
+            for chosen in range(len(oneofs[i])):
+                added = []
+                consistent = True
+                for j, (fe, value) in enumerate(oneofs[i]):
+                    value = value if j == chosen else not value
+                    old_value = assignment.get(fe, None)
+                    if old_value is None:
+                        assignment[fe] = value
+                        added.append(fe)
+                    elif old_value != value:
+                        consistent = False
+                        break
+                if consistent:
+                    yield from assign_oneof(i + 1)
+                for fe in added:
+                    del assignment[fe]
+
+        def assign_free(i: int) -> Iterator[Dict[FNode, bool]]:
+            if i == len(hidden):
+                if all(satisfied(c) for c in ors):
+                    yield dict(assignment)
+                return
+            fe = hidden[i]
+            if fe in assignment:
+                yield from assign_free(i + 1)
+                return
+            for value in (False, True):
+                assignment[fe] = value
+                # the hidden fluents before fe are all assigned
+                if all(satisfied(c) for c in ors_by_last.get(fe, [])):
+                    yield from assign_free(i + 1)
+                del assignment[fe]
+
+        yield from assign_oneof(0)
+
+    def fully_observable_problem(
+        self,
+    ) -> Tuple[Problem, Dict["up.model.action.Action", "up.model.action.Action"]]:
+        """
+        Returns a copy of this problem without the initial constraints and the sensing
+        actions, where the hidden fluents are initially `False`, and the map from the
+        actions of the copy to the ones of this problem; the costs of the
+        :class:`~unified_planning.model.metrics.MinimizeActionCosts` metric refer to
+        the actions of the copy.
+
+        The states of the copy where the hidden fluents take the values of one of the
+        :func:`initial_assignments <unified_planning.model.ContingentProblem.initial_assignments>`
+        are the possible worlds of this problem; the hidden fluents might be static in
+        the copy, but their initial value must not be used to simplify it.
+
+        :return: The copy of this problem and the map from its actions to the ones of
+            this problem.
+        """
+        hidden = {f.arg(0) if f.is_not() else f for f in self._hidden_fluents}
+        res = Problem(self.name, self._env)
+        for fluent in self.fluents:
+            res.add_fluent(
+                fluent, default_initial_value=self.fluents_defaults.get(fluent, None)
+            )
+        res.add_objects(self.all_objects)
+        for fe, value in self.explicit_initial_values.items():
+            if fe not in hidden:
+                res.set_initial_value(fe, value)
+        for fe in hidden:
+            res.set_initial_value(fe, False)
+        original_actions: Dict["up.model.action.Action", "up.model.action.Action"] = {}
+        for action in self.actions:
+            new_action = action
+            if isinstance(action, up.model.action.SensingAction):
+                new_action = up.model.action.InstantaneousAction(
+                    action.name,
+                    OrderedDict((p.name, p.type) for p in action.parameters),
+                    action.environment,
+                )
+                for c in action.preconditions:
+                    new_action.add_precondition(c)
+                for e in action.effects:
+                    new_action._add_effect_instance(e.clone())
+            res.add_action(new_action)
+            original_actions[new_action] = action
+        for goal in self.goals:
+            res.add_goal(goal)
+        for qm in self.quality_metrics:
+            if isinstance(qm, up.model.metrics.MinimizeActionCosts):
+                costs = {
+                    new_action: qm.get_action_cost(action)
+                    for new_action, action in original_actions.items()
+                    if qm.get_action_cost(action) is not None
+                }
+                qm = up.model.metrics.MinimizeActionCosts(costs, environment=self._env)
+            res.add_quality_metric(qm)
+        return res, original_actions
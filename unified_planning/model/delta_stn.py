@@ -17,11 +17,27 @@
 from collections import deque
 from dataclasses import dataclass
 from fractions import Fraction
-from typing import Deque, Dict, List, Optional, Any, Generic, Set, Tuple, TypeVar, cast
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Any,
+    Generic,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
+from unified_planning.exceptions import UPUsageError
 
 
 T = TypeVar("T", Fraction, float, int)
 
+# Marker used in the trail for a key that was not present in the dict.
+_MISSING = object()
+
 
 @dataclass
 class DeltaNeighbors(Generic[T]):
@@ -53,6 +69,12 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
     with small differences one-another are created and used to check for
     consistency, in order to determine if it exists a scheduling of all the
     given `Events` or not.
+
+    To support search algorithms that branch and backtrack, the STN offers a
+    trail-based undo: after a :func:`checkpoint <unified_planning.model.DeltaSimpleTemporalNetwork.checkpoint>`
+    every modification is recorded in a trail, and :func:`backtrack <unified_planning.model.DeltaSimpleTemporalNetwork.backtrack>`
+    restores the state of a previous checkpoint, with a cost proportional to the
+    number of changes instead of the size of the network.
     """
 
     def __init__(
@@ -68,6 +90,13 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
         self._distances: Dict[Any, T] = distances if distances is not None else {}
         self._is_sat = is_sat
         self._epsilon: T = epsilon
+        # The trail is None until the first checkpoint is taken; every entry
+        # is a (dict, key, old_value) triple, where the dict is None for the
+        # entries recording the old value of _is_sat.
+        self._trail: Optional[List[Tuple[Optional[Dict], Any, Any]]] = None
+        # The events whose distance has already been saved in the trail since
+        # the last checkpoint; only the first change must be recorded.
+        self._saved_distances: Set[Any] = set()
 
     def __repr__(self) -> str:
         res = []
@@ -101,6 +130,74 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
             self._epsilon,
         )
 
+    def checkpoint(self) -> int:
+        """
+        Returns a checkpoint of the current state of this STN; from now on, every
+        modification is recorded in a trail so that :func:`backtrack <unified_planning.model.DeltaSimpleTemporalNetwork.backtrack>`
+        can restore the state of the returned checkpoint.
+
+        A checkpoint stays valid until the STN is backtracked to a previous checkpoint
+        or until the trail is discarded with :func:`commit <unified_planning.model.DeltaSimpleTemporalNetwork.commit>`.
+
+        :return: The checkpoint of the current state.
+        """
+        if self._trail is None:
+            self._trail = []
+        self._saved_distances = set()
+        return len(self._trail)
+
+    def backtrack(self, checkpoint: int):
+        """
+        Restores the state this STN had when the given checkpoint was taken,
+        undoing all the modifications done after it.
+
+        :param checkpoint: A checkpoint returned by :func:`checkpoint <unified_planning.model.DeltaSimpleTemporalNetwork.checkpoint>`.
+        """
+        trail = self._trail
+        if trail is None or checkpoint < 0 or checkpoint > len(trail):
+            raise UPUsageError(f"{checkpoint} is not a valid checkpoint of this STN.")
+        while len(trail) > checkpoint:
+            d, key, old_value = trail.pop()
+            if d is None:
+                self._is_sat = old_value
+            elif old_value is _MISSING:
+                del d[key]
+            else:
+                d[key] = old_value
+        self._saved_distances = set()
+
+    def commit(self):
+        """
+        Discards the trail, invalidating all the checkpoints taken; after this
+        method is called, the modifications are not recorded anymore.
+        """
+        self._trail = None
+        self._saved_distances = set()
+
+    def _set(self, d: Dict, key: Any, value: Any):
+        if self._trail is not None:
+            self._trail.append((d, key, d.get(key, _MISSING)))
+        d[key] = value
+
+    def _set_distance(self, event: Any, distance: T):
+        if self._trail is not None and event not in self._saved_distances:
+            self._saved_distances.add(event)
+            self._trail.append((self._distances, event, self._distances[event]))
+        self._distances[event] = distance
+
+    def _set_default(self, d: Dict, key: Any, value: Any):
+        if key not in d:
+            if self._trail is not None:
+                self._trail.append((d, key, _MISSING))
+                if d is self._distances:
+                    self._saved_distances.add(key)
+            d[key] = value
+
+    def _set_sat(self, is_sat: bool):
+        if self._trail is not None and is_sat != self._is_sat:
+            self._trail.append((None, None, self._is_sat))
+        self._is_sat = is_sat
+
     def add(self, x: Any, y: Any, b: T):
         """
         Adds the constraint `x - y <= b`. This gives an upper bound to the time
@@ -114,14 +211,47 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
             event `x`.
         """
         if self._is_sat:
-            self._distances.setdefault(x, cast(T, 0))
-            self._distances.setdefault(y, cast(T, 0))
-            x_constraints = self._constraints.get(x, None)
-            self._constraints.setdefault(y, None)
-            if not self._is_subsumed(x, y, b):
-                neighbor = DeltaNeighbors(y, b, x_constraints)
-                self._constraints[x] = neighbor
-                self._is_sat = self._inc_check(x, y, b)
+            if self._insert_constraint(x, y, b):
+                self._set_sat(self._inc_check(x, y, b))
+
+    def add_many(self, constraints: Iterable[Tuple[Any, Any, T]]):
+        """
+        Adds all the given constraints; every constraint is a tuple `(x, y, b)`
+        representing the constraint `x - y <= b`, like in the :func:`add <unified_planning.model.DeltaSimpleTemporalNetwork.add>`
+        method.
+
+        Differently from calling `add` for every constraint, the distances are
+        propagated only once for the whole batch.
+
+        :param constraints: The constraints to add.
+        """
+        if not self._is_sat:
+            return
+        distances = self._distances
+        queue: Deque[Any] = deque()
+        in_queue: Set[Any] = set()
+        for x, y, b in constraints:
+            if self._insert_constraint(x, y, b):
+                x_plus_b = distances[x] + b
+                if x_plus_b < distances[y]:
+                    self._set_distance(y, x_plus_b)
+                    if y not in in_queue:
+                        in_queue.add(y)
+                        queue.append(y)
+        if queue:
+            self._set_sat(self._batch_check(queue, in_queue))
+
+    def _insert_constraint(self, x: Any, y: Any, b: T) -> bool:
+        # Inserts the constraint x - y <= b and returns True if it is not
+        # subsumed by the constraints already in the STN.
+        self._set_default(self._distances, x, cast(T, 0))
+        self._set_default(self._distances, y, cast(T, 0))
+        self._set_default(self._constraints, y, None)
+        if self._is_subsumed(x, y, b):
+            return False
+        neighbor = DeltaNeighbors(y, b, self._constraints.get(x, None))
+        self._set(self._constraints, x, neighbor)
+        return True
 
     def check_stn(self) -> bool:
         """Checks the consistency of this STN."""
@@ -149,7 +279,7 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
         x_dist = self._distances[x]
         x_plus_b = x_dist + b
         if x_plus_b < self._distances[y]:
-            self._distances[y] = x_plus_b
+            self._set_distance(y, x_plus_b)
             queue: Deque[Any] = deque()
             queue.append(y)
             while queue:
@@ -159,11 +289,63 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
                     if self._distances[c] + n.bound < self._distances[n.dst]:
                         if n.dst == y and abs(n.bound - b) <= self._epsilon:
                             return False
-                        self._distances[n.dst] = self._distances[c] + n.bound
+                        self._set_distance(n.dst, self._distances[c] + n.bound)
                         queue.append(n.dst)
                     n = n.next
         return True
 
+    def _batch_check(self, queue: Deque[Any], in_queue: Set[Any]) -> bool:
+        # Queue-based Bellman-Ford from all the events updated by a batch of
+        # constraints, with the small label first heuristic. With this queue
+        # discipline an event enqueued more times than the number of events
+        # does not prove that a negative cycle exists, so the check is left
+        # to the classic Bellman-Ford.
+        distances = self._distances
+        max_enqueues = len(distances)
+        enqueues: Dict[Any, int] = {c: 1 for c in queue}
+        while queue:
+            c = queue.popleft()
+            in_queue.discard(c)
+            c_dist = distances[c]
+            n = self._constraints[c]
+            while n is not None:
+                new_dist = c_dist + n.bound
+                if new_dist < distances[n.dst] - self._epsilon:
+                    self._set_distance(n.dst, new_dist)
+                    if n.dst not in in_queue:
+                        count = enqueues.get(n.dst, 0) + 1
+                        if count > max_enqueues:
+                            return self._bellman_ford()
+                        enqueues[n.dst] = count
+                        in_queue.add(n.dst)
+                        # small label first: the events with a smaller
+                        # distance are likely to update more events
+                        if queue and new_dist < distances[queue[0]]:
+                            queue.appendleft(n.dst)
+                        else:
+                            queue.append(n.dst)
+                n = n.next
+        return True
+
+    def _bellman_ford(self) -> bool:
+        # Relaxes all the constraints for as many rounds as the number of
+        # events; if a distance is still updated in the last round, a negative
+        # cycle exists.
+        distances = self._distances
+        for _ in range(len(distances)):
+            updated = False
+            for c, n in self._constraints.items():
+                c_dist = distances[c]
+                while n is not None:
+                    new_dist = c_dist + n.bound
+                    if new_dist < distances[n.dst] - self._epsilon:
+                        self._set_distance(n.dst, new_dist)
+                        updated = True
+                    n = n.next
+            if not updated:
+                return True
+        return False
+
     def insert_interval(
         self,
         left_event: Any,
@@ -195,8 +377,8 @@ class DeltaSimpleTemporalNetwork(Generic[T]):
         if right_bound is not None:
             self.add(right_event, left_event, right_bound)
         if left_bound is None and right_bound is None:
-            self._distances.setdefault(left_event, cast(T, 0))
-            self._distances.setdefault(right_event, cast(T, 0))
+            self._set_default(self._distances, left_event, cast(T, 0))
+            self._set_default(self._distances, right_event, cast(T, 0))
 
     def get_constraints(self) -> Dict[Any, List[Tuple[T, Any]]]:
         """
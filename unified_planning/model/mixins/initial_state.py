@@ -13,7 +13,19 @@
 # limitations under the License.
 #
 from collections import Counter
-from typing import Union, Dict, Any, List, Optional
+from collections.abc import ItemsView
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import unified_planning as up
 from unified_planning.exceptions import (
@@ -25,6 +37,120 @@ from unified_planning.model.mixins import ObjectsSetMixin, FluentsSetMixin
 from unified_planning.model.types import domain_size
 
 
+class InitialValuesView(Mapping["up.model.fnode.FNode", "up.model.fnode.FNode"]):
+    """
+    A read-only view of all the initial values of an :class:`~unified_planning.model.mixins.InitialStateMixin`:
+    the values explicitly set in the initial state and the default values of the grounded
+    fluents with no explicit value.
+
+    The default values are resolved on demand, so lookups and the length of the view
+    do not ground the fluents; the iteration yields the explicit values first and then
+    grounds, one at a time, only the fluents that have a default value for some of
+    their grounded expressions.
+    """
+
+    def __init__(self, initial_state: "InitialStateMixin"):
+        self._initial_state = initial_state
+        # caches of the problem's objects and of the number of grounded expressions of
+        # the fluents with a default value, valid while the objects and fluents lists
+        # are the same and have the same length
+        self._objects_key: Optional[Tuple[int, int]] = None
+        self._objects: Set["up.model.object.Object"] = set()
+        self._sizes_key: Optional[Tuple[int, int, int, int]] = None
+        self._ground_sizes: Dict["up.model.fluent.Fluent", int] = {}
+
+    def _problem_objects(self) -> Set["up.model.object.Object"]:
+        objects = self._initial_state._object_set._objects
+        key = (id(objects), len(objects))
+        if key != self._objects_key:
+            self._objects = set(objects)
+            self._objects_key = key
+        return self._objects
+
+    def _defaults_ground_sizes(self) -> Dict["up.model.fluent.Fluent", int]:
+        object_set = self._initial_state._object_set
+        fluent_set = self._initial_state._fluent_set
+        objects, fluents = object_set._objects, fluent_set._fluents
+        key = (id(objects), len(objects), id(fluents), len(fluents))
+        if key != self._sizes_key:
+            self._ground_sizes = {}
+            for fluent in fluent_set.fluents_defaults:
+                ground_size = 1
+                for p in fluent.signature:
+                    ground_size *= domain_size(object_set, p.type)
+                self._ground_sizes[fluent] = ground_size
+            self._sizes_key = key
+        return self._ground_sizes
+
+    def _is_grounded_expression(self, fluent_exp: "up.model.fnode.FNode") -> bool:
+        """Returns `True` if the given expression is one of the grounded fluents of the problem."""
+        for param, arg in zip(fluent_exp.fluent().signature, fluent_exp.args):
+            if not arg.is_constant() or not param.type.is_compatible(arg.type):
+                return False
+            if arg.is_object_exp() and arg.object() not in self._problem_objects():
+                return False
+        return True
+
+    def __getitem__(self, fluent_exp: "up.model.fnode.FNode") -> "up.model.fnode.FNode":
+        explicit_values = self._initial_state._initial_value
+        value = explicit_values.get(fluent_exp, None)
+        if value is not None:
+            return value
+        if isinstance(fluent_exp, up.model.fnode.FNode) and fluent_exp.is_fluent_exp():
+            default = self._initial_state._fluent_set.fluents_defaults.get(
+                fluent_exp.fluent(), None
+            )
+            if default is not None and self._is_grounded_expression(fluent_exp):
+                return default
+        raise KeyError(fluent_exp)
+
+    def __len__(self) -> int:
+        counts = self._initial_state._explicit_values_count()
+        res = len(self._initial_state._initial_value)
+        for fluent, ground_size in self._defaults_ground_sizes().items():
+            res += ground_size - counts.get(fluent, 0)
+        return res
+
+    def __iter__(self) -> Iterator["up.model.fnode.FNode"]:
+        yield from self._initial_state._initial_value
+        yield from self._default_keys()
+
+    def _default_keys(self) -> Iterator["up.model.fnode.FNode"]:
+        """Yields the grounded fluents with no explicit value and a default value."""
+        explicit_values = self._initial_state._initial_value
+        counts = self._initial_state._explicit_values_count()
+        for fluent, ground_size in self._defaults_ground_sizes().items():
+            if counts.get(fluent, 0) >= ground_size:
+                continue  # every grounded expression has an explicit value
+            for fluent_exp in get_all_fluent_exp(
+                self._initial_state._object_set, fluent
+            ):
+                if fluent_exp not in explicit_values:
+                    yield fluent_exp
+
+    def items(self) -> "_InitialValuesItems":
+        return _InitialValuesItems(self)
+
+    def copy(self) -> Dict["up.model.fnode.FNode", "up.model.fnode.FNode"]:
+        """Returns a `dict` with all the initial values."""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"InitialValuesView({dict(self.items())})"
+
+
+class _InitialValuesItems(ItemsView):
+    """The items of an `InitialValuesView`, iterated without looking up every key."""
+
+    def __iter__(self):
+        view = self._mapping
+        explicit_values = view._initial_state._initial_value
+        defaults = view._initial_state._fluent_set.fluents_defaults
+        yield from explicit_values.items()
+        for fluent_exp in view._default_keys():
+            yield fluent_exp, defaults[fluent_exp.fluent()]
+
+
 class InitialStateMixin:
     """A Problem mixin that allows setting and infering the value of fluents in the initial state."""
 
@@ -38,6 +164,14 @@ class InitialStateMixin:
         self._fluent_set = fluent_set
         self._env = environment
         self._initial_value: Dict["up.model.fnode.FNode", "up.model.fnode.FNode"] = {}
+        # the number of explicit initial values of every fluent
+        self._explicit_counts: Counter = Counter()
+        self._initial_values_view = InitialValuesView(self)
+        # the fluents set while the type checks of the initial values are deferred,
+        # mapped to their previous initial value, if any
+        self._deferred_initial_values: Optional[
+            Dict["up.model.fnode.FNode", Optional["up.model.fnode.FNode"]]
+        ] = None
 
     def set_initial_value(
         self,
@@ -59,8 +193,14 @@ class InitialStateMixin:
         """
         fluent_exp, value_exp = self._env.expression_manager.auto_promote(fluent, value)
         assert fluent_exp.is_fluent_exp(), "fluent field must be a fluent"
-        if not fluent_exp.type.is_compatible(value_exp.type):
+        if self._deferred_initial_values is not None:
+            self._deferred_initial_values.setdefault(
+                fluent_exp, self._initial_value.get(fluent_exp, None)
+            )
+        elif not fluent_exp.type.is_compatible(value_exp.type):
             raise UPTypeError("Initial value assignment has not compatible types!")
+        if fluent_exp not in self._initial_value:
+            self._explicit_counts[fluent_exp.fluent()] += 1
         self._initial_value[fluent_exp] = value_exp
 
     def initial_value(
@@ -86,20 +226,16 @@ class InitialStateMixin:
             return None
 
     @property
-    def initial_values(self) -> Dict["up.model.fnode.FNode", "up.model.fnode.FNode"]:
+    def initial_values(self) -> InitialValuesView:
         """
         Gets the initial value of all the grounded fluents present in the `Problem`.
 
-        IMPORTANT NOTE: this property does a lot of computation, so it should be called as
-        seldom as possible.
+        The returned mapping is a read-only view where the default values are resolved on
+        demand; iterating over it grounds the fluents with a default value, so callers
+        that only need the values set explicitly should use
+        :func:`explicit_initial_values <unified_planning.model.Problem.explicit_initial_values>`.
         """
-        res = self._initial_value
-        for f in self._fluent_set.fluents:
-            for f_exp in get_all_fluent_exp(self._object_set, f):
-                value = self.initial_value(f_exp)
-                if value is not None:
-                    res[f_exp] = value
-        return res
+        return self._initial_values_view
 
     @property
     def explicit_initial_values(
@@ -117,6 +253,12 @@ class InitialStateMixin:
         """Returns true iff the two initial states are equivalent."""
         if not isinstance(oth, InitialStateMixin):
             return False
+        if (
+            self._initial_value == oth._initial_value
+            and self._fluent_set.fluents_defaults == oth._fluent_set.fluents_defaults
+            and set(self._object_set._objects) == set(oth._object_set._objects)
+        ):
+            return True
         oth_initial_values = oth.initial_values
         initial_values = self.initial_values
         if len(initial_values) != len(oth_initial_values):
@@ -134,12 +276,42 @@ class InitialStateMixin:
 
     def _clone_to(self, other: "InitialStateMixin"):
         other._initial_value = self._initial_value.copy()
+        other._explicit_counts = self._explicit_counts.copy()
+
+    def _check_initial_values(self, fluent_exps: Iterable["up.model.fnode.FNode"]):
+        """Checks that the initial values of the given fluents have compatible types."""
+        for fluent_exp in fluent_exps:
+            if not fluent_exp.type.is_compatible(self._initial_value[fluent_exp].type):
+                raise UPTypeError(
+                    f"Initial value assignment of {fluent_exp} has not compatible types!"
+                )
+
+    def _restore_initial_values(
+        self,
+        previous_values: Dict["up.model.fnode.FNode", Optional["up.model.fnode.FNode"]],
+    ):
+        """
+        Restores the given initial values, where `None` means that the fluent had no
+        explicit initial value.
+        """
+        for fluent_exp, value in previous_values.items():
+            if value is not None:
+                self._initial_value[fluent_exp] = value
+            elif self._initial_value.pop(fluent_exp, None) is not None:
+                self._explicit_counts[fluent_exp.fluent()] -= 1
+
+    def _explicit_values_count(self) -> Counter:
+        """Returns the number of explicit initial values of every fluent."""
+        if sum(self._explicit_counts.values()) != len(self._initial_value):
+            # the explicit values were not set with set_initial_value
+            self._explicit_counts = Counter(fe.fluent() for fe in self._initial_value)
+        return self._explicit_counts
 
     def _fluents_with_undefined_values(self) -> List["up.model.fluent.Fluent"]:
         """Returns a list of fluents that have at least one undefined value in the initial state"""
         undef_fluents = []
         # gather a count of all explicit initial values for each fluent
-        inits = Counter([x.fluent() for x in self.explicit_initial_values])
+        inits = self._explicit_values_count()
         for fluent in self._fluent_set.fluents:
             if fluent in self._fluent_set.fluents_defaults:
                 continue  # fluent has a default values and thus can not be undefined
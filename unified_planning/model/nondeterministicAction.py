@@ -1,21 +1,105 @@
+from math import isclose
 from typing import List, Tuple
 
 import unified_planning as up
-from unified_planning.model import InstantaneousAction
-from unified_planning.shortcuts import TRUE, Effect, Fluent, FluentExp, Bool
+from unified_planning.exceptions import UPUsageError
+from unified_planning.model import Effect, Fluent, InstantaneousAction
 
 
 class NondeterministicAction(InstantaneousAction):
+    """
+    Represents an action with alternative outcomes: when the action is applied exactly
+    one of its effects happens, with the probability given for it.
+
+    :param _name: The name of the action.
+    :param effects: The outcomes of the action as `(fluent, probability, value)` tuples,
+        meaning that the action sets the boolean `fluent` to `value` with the given
+        `probability`; the probabilities must sum up to `1`.
+    """
+
     @property
     def effects(self):
         return self._effects
 
-    def __init__(self, _name: str, effects: List[Tuple[Fluent, float, bool]], **kwargs: "up.model.types.Type"):
+    def __init__(
+        self,
+        _name: str,
+        effects: List[Tuple[Fluent, float, bool]],
+        **kwargs: "up.model.types.Type",
+    ):
         super().__init__(_name, **kwargs)
         self.name = _name
+        em = self._environment.expression_manager
         self._effects = [
-            Effect(FluentExp(fluent), TRUE(), Bool(value)) for fluent, _, value in effects
+            Effect(em.FluentExp(fluent), em.TRUE(), em.Bool(value))
+            for fluent, _, value in effects
         ]
+        probabilities = [probability for _, probability, _ in effects]
+        self._check_probabilities(probabilities)
+        self._probabilities = probabilities
+
+    def _check_probabilities(self, probabilities: List[float]):
+        if any(p < 0 for p in probabilities) or (
+            probabilities and not isclose(sum(probabilities), 1, abs_tol=1e-9)
+        ):
+            raise UPUsageError(
+                f"The probabilities of the outcomes of {self.name} must be non-negative and sum up to 1."
+            )
+
+    @property
+    def probabilities(self) -> List[float]:
+        """Returns the probabilities of the effects of this action, in the same order."""
+        return self._probabilities
+
+    @property
+    def outcomes(self) -> List[Tuple["up.model.Effect", float]]:
+        """Returns the alternative effects of this action with their probabilities."""
+        assert len(self._effects) == len(self._probabilities)
+        return list(zip(self._effects, self._probabilities))
+
+    def set_outcomes(self, outcomes: List[Tuple["up.model.Effect", float]]):
+        """
+        Replaces the alternative effects of this action with the given ones.
+
+        :param outcomes: The new effects with their probabilities; the probabilities
+            must be non-negative and sum up to `1`.
+        """
+        probabilities = [probability for _, probability in outcomes]
+        self._check_probabilities(probabilities)
+        self._effects = [effect for effect, _ in outcomes]
+        self._probabilities = probabilities
+
+    def clear_effects(self):
+        super().clear_effects()
+        self._probabilities = []
+
+    def _add_effect_instance(self, effect: "up.model.effect.Effect"):
+        # an additional outcome would leave the probabilities summing up to 1
+        # without it, so the outcomes can only be replaced all together
+        raise UPUsageError(
+            f"The outcomes of {self.name} have probabilities, use set_outcomes to change them."
+        )
+
+    def __eq__(self, oth: object) -> bool:
+        if isinstance(oth, NondeterministicAction):
+            return (
+                super().__eq__(oth)
+                and self._effects == oth._effects
+                and self._probabilities == oth._probabilities
+            )
+        return False
+
+    def __hash__(self) -> int:
+        return super().__hash__() + hash(tuple(self._probabilities))
+
+    def clone(self):
+        new_action = NondeterministicAction(
+            self.name, [], **{p.name: p.type for p in self.parameters}
+        )
+        new_action._preconditions = self._preconditions[:]
+        new_action._effects = [e.clone() for e in self._effects]
+        new_action._probabilities = self._probabilities[:]
+        return new_action
 
     def generate_effects(self):
         """
@@ -25,23 +109,43 @@ class NondeterministicAction(InstantaneousAction):
 
     @effects.setter
     def effects(self, value):
+        # the new effects replace the old ones keeping their probabilities
+        if len(value) != len(self._effects):
+            raise UPUsageError(
+                f"{self.name} has {len(self._effects)} outcomes but {len(value)} effects are given, use set_outcomes to change their number."
+            )
         self._effects = value
 
     def generate_branches(self):
         """
         Returns all possible branches obtained from this action.
         """
+        return [
+            (fluent_name, value)
+            for fluent_name, value, _ in self.generate_weighted_branches()
+        ]
+
+    def generate_weighted_branches(self):
+        """
+        Returns all possible branches obtained from this action, with their probabilities.
+        """
         branches = []
-        for effect in self._effects:
+        for effect, probability in zip(self._effects, self._probabilities):
 
             if effect.condition.is_true():
                 fluent = effect.fluent
                 value = effect.value.bool_constant_value()
                 fluent_name = fluent.fluent().name
 
-                branches.append((fluent_name, value))
+                branches.append((fluent_name, value, probability))
             else:
-                branches.append((effect.fluent.fluent().name, not effect.value.bool_constant_value()))
+                branches.append(
+                    (
+                        effect.fluent.fluent().name,
+                        not effect.value.bool_constant_value(),
+                        probability,
+                    )
+                )
         return branches
 
     def generate_sequences(self, current_state, remaining_actions, path=[]):
@@ -51,7 +155,9 @@ class NondeterministicAction(InstantaneousAction):
         sequences = []
 
         # Check on preconditions satisfiability
-        if all(current_state.get(pre.fluent().name, False) for pre in self.preconditions):
+        if all(
+            current_state.get(pre.fluent().name, False) for pre in self.preconditions
+        ):
             branches = self.generate_branches()
             for fluent_name, value in branches:
                 new_state = current_state.copy()
@@ -61,11 +167,13 @@ class NondeterministicAction(InstantaneousAction):
 
                 if remaining_actions:
                     for action in remaining_actions:
-                        sequences.extend(action.generate_sequences(
-                            new_state,
-                            [a for a in remaining_actions if a != action],
-                            new_path
-                        ))
+                        sequences.extend(
+                            action.generate_sequences(
+                                new_state,
+                                [a for a in remaining_actions if a != action],
+                                new_path,
+                            )
+                        )
 
                 if not remaining_actions:
                     sequences.append(new_path)
@@ -15,7 +15,9 @@
 """This module defines the problem class."""
 
 
+from contextlib import contextmanager
 from itertools import chain, product
+from warnings import warn
 import unified_planning as up
 import unified_planning.model.tamp
 from unified_planning.model import Fluent
@@ -32,7 +34,7 @@ from unified_planning.model.mixins import (
 from unified_planning.model.expression import ConstantExpression
 from unified_planning.model.operators import OperatorKind
 from unified_planning.model.problem_kind_versioning import LATEST_PROBLEM_KIND_VERSION
-from unified_planning.model.types import _IntType
+from unified_planning.model.types import _IntType, _UserType
 from unified_planning.exceptions import (
     UPProblemDefinitionError,
     UPTypeError,
@@ -43,7 +45,18 @@ from unified_planning.exceptions import (
 
 import networkx as nx
 from fractions import Fraction
-from typing import Any, Optional, List, Dict, Set, Tuple, Union, cast, Iterable
+from typing import (
+    Any,
+    Optional,
+    List,
+    Dict,
+    Set,
+    Tuple,
+    Union,
+    cast,
+    Iterable,
+    Iterator,
+)
 
 
 class Problem(  # type: ignore[misc]
@@ -262,6 +275,103 @@ class Problem(  # type: ignore[misc]
             or self.has_type(name)
         )
 
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """
+        Returns a context manager to add many elements to the `Problem` at once.
+
+        While it is active, the names of the added `UserTypes`, `Fluents`, `Actions`
+        and `Objects` are not checked against the names already in the `Problem`,
+        and the types of the initial values set are not checked against the types of
+        their fluents; those checks are done in a single pass, based on hash tables,
+        when the context manager exits, where the errors are raised.
+
+        The bulk load is atomic: if a check fails, or an exception is raised while it
+        is active, the elements added and the initial values set in the bulk load are
+        removed from the `Problem` before the error is propagated.
+
+        Example
+        --------
+        >>> from unified_planning.shortcuts import *
+        >>> location = UserType("Location")
+        >>> visited = Fluent("visited", BoolType(), l=location)
+        >>> problem = Problem()
+        >>> problem.add_fluent(visited, default_initial_value=False)
+        bool visited[l=Location]
+        >>> with problem.bulk_load():
+        ...     for i in range(1000):
+        ...         problem.set_initial_value(visited(problem.add_object(f"l{i}", location)), True)
+        >>> len(problem.all_objects)
+        1000
+        """
+        if self._deferred_initial_values is not None:
+            raise UPUsageError("The problem is already in a bulk load.")
+        sizes = (
+            len(self._user_types),
+            len(self._fluents),
+            len(self._actions),
+            len(self._objects),
+        )
+        has_name_method = self._has_name_method
+        self._has_name_method = lambda name: False
+        self._deferred_initial_values = {}
+        try:
+            try:
+                yield
+            finally:
+                self._has_name_method = has_name_method
+                deferred_initial_values = self._deferred_initial_values
+                self._deferred_initial_values = None
+            self._check_names(sizes)
+            self._check_initial_values(deferred_initial_values)
+        except BaseException:
+            self._rollback(sizes, deferred_initial_values)
+            raise
+
+    def _rollback(
+        self,
+        sizes: Tuple[int, int, int, int],
+        previous_values: Dict["up.model.fnode.FNode", Optional["up.model.fnode.FNode"]],
+    ):
+        """
+        Restores the `Problem` as it was before a failed bulk load, given the number
+        of `UserTypes`, `Fluents`, `Actions` and `Objects` before it and the previous
+        initial values of the fluents set in it.
+        """
+        self._restore_initial_values(previous_values)
+        for fluent in self._fluents[sizes[1] :]:
+            self._fluents_defaults.pop(fluent, None)
+        del self._user_types[sizes[0] :]
+        del self._fluents[sizes[1] :]
+        del self._actions[sizes[2] :]
+        del self._objects[sizes[3] :]
+
+    def _check_names(self, sizes: Tuple[int, int, int, int]):
+        """
+        Checks the names of the elements added to the `Problem` in a bulk load, given
+        the number of `UserTypes`, `Fluents`, `Actions` and `Objects` before it.
+        """
+        elements = [
+            [cast(_UserType, t).name for t in self._user_types],
+            [f.name for f in self._fluents],
+            [a.name for a in self._actions],
+            [o.name for o in self._objects],
+        ]
+        # the kinds of elements (as indexes in elements) with every name
+        names: Dict[str, Set[int]] = {}
+        for kind, (kind_names, size) in enumerate(zip(elements, sizes)):
+            for name in kind_names[:size]:
+                names.setdefault(name, set()).add(kind)
+        for kind, (kind_names, size) in enumerate(zip(elements, sizes)):
+            for name in kind_names[size:]:
+                kinds = names.setdefault(name, set())
+                if kinds:
+                    msg = f"Name {name} already defined! Different elements of a problem can have the same name if the environment flag error_used_name is disabled."
+                    if self._env.error_used_name or kind in kinds:
+                        raise UPProblemDefinitionError(msg)
+                    warn(msg)
+                kinds.add(kind)
+
     def normalize_plan(self, plan: "up.plans.Plan") -> "up.plans.Plan":
         """
         Normalizes the given `Plan`, that is potentially the result of another
@@ -15,7 +15,7 @@
 
 from functools import lru_cache, partialmethod, total_ordering
 from itertools import chain
-from typing import Dict, Iterable, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from warnings import warn
 import unified_planning as up
 
@@ -133,6 +133,24 @@ FEATURES = {
 
 all_features = set(chain(*FEATURES.values()))
 
+# Every feature is represented by a bit of the mask of a ProblemKind
+FEATURES_BITS: Dict[str, int] = {
+    f: 1 << i for i, f in enumerate(chain(*FEATURES.values()))
+}
+
+
+def _features_mask(features: Iterable[str]) -> int:
+    """Returns the mask of the given features."""
+    mask = 0
+    for f in features:
+        mask |= FEATURES_BITS[f]
+    return mask
+
+
+def _mask_features(mask: int) -> Set[str]:
+    """Returns the features of the given mask."""
+    return {f for f, bit in FEATURES_BITS.items() if mask & bit}
+
 
 @lru_cache(maxsize=None)
 def get_valid_features(version: int) -> Set[str]:
@@ -155,6 +173,26 @@ def get_valid_features(version: int) -> Set[str]:
     return valid_features
 
 
+# The masks of the valid features and of the features added in every version
+VALID_FEATURES_MASKS: Dict[int, int] = {
+    v: _features_mask(get_valid_features(v))
+    for v in range(1, LATEST_PROBLEM_KIND_VERSION + 1)
+}
+ADDED_FEATURES_MASKS: Dict[int, int] = {
+    v: _features_mask(
+        f for f in all_features if FEATURES_VERSIONS.get(f, (1, None))[0] == v
+    )
+    for v in range(1, LATEST_PROBLEM_KIND_VERSION + 1)
+}
+
+
+def _valid_features_mask(version: int) -> int:
+    mask = VALID_FEATURES_MASKS.get(version, None)
+    if mask is None:
+        mask = _features_mask(get_valid_features(version))
+    return mask
+
+
 class ProblemKindMeta(type):
     """Meta class used to interpret the nodehandler decorator."""
 
@@ -165,24 +203,39 @@ class ProblemKindMeta(type):
             assert (
                 self._version is None or added_feature_version <= self._version
             ), f"ProblemKind's declared version: {self._version} but {feature} is added in version {added_feature_version}"
-            self._features.add(feature)
+            self._mask |= FEATURES_BITS[feature]
 
         def _unset(self, feature, possible_features):
             assert feature in possible_features
-            self._features.discard(feature)
+            self._mask &= ~FEATURES_BITS[feature]
 
-        def _has(self, features):
-            return len(self._features.intersection(features)) > 0
+        def _has(self, features_mask):
+            return self._mask & features_mask != 0
 
         obj = type.__new__(cls, name, bases, dct)
         for m, l in FEATURES.items():
-            setattr(obj, "set_" + m.lower(), partialmethod(_set, possible_features=l))
+            possible_features = frozenset(l)
+            setattr(
+                obj,
+                "set_" + m.lower(),
+                partialmethod(_set, possible_features=possible_features),
+            )
+            setattr(
+                obj,
+                "unset_" + m.lower(),
+                partialmethod(_unset, possible_features=possible_features),
+            )
             setattr(
-                obj, "unset_" + m.lower(), partialmethod(_unset, possible_features=l)
+                obj,
+                "has_" + m.lower(),
+                partialmethod(_has, features_mask=_features_mask(l)),
             )
-            setattr(obj, "has_" + m.lower(), partialmethod(_has, features=l))
             for f in l:
-                setattr(obj, "has_" + f.lower(), partialmethod(_has, features=[f]))
+                setattr(
+                    obj,
+                    "has_" + f.lower(),
+                    partialmethod(_has, features_mask=FEATURES_BITS[f]),
+                )
         return obj
 
 
@@ -194,39 +247,39 @@ class ProblemKind(up.AnyBaseClass, metaclass=ProblemKindMeta):
     some assumptions to be made.
 
     The `ProblemKind` of a `Problem` is calculated by it's :func:`kind <unified_planning.model.Problem.kind>` property.
+
+    The features are stored as the bits of an integer mask, so the comparisons between
+    `ProblemKinds` of the same version are bitwise operations.
     """
 
     def __init__(
         self, features: Optional[Iterable[str]] = None, version: Optional[int] = None
     ):
-        self._features: Set[str] = set() if features is None else set(features)
-        for f in self._features:
+        features = () if features is None else tuple(features)
+        for f in features:
             assert f in all_features, f"Feature {f} not in defined features"
+        self._mask = _features_mask(features)
         self._version = version
         if self._version is not None:
             assert self._version > 0 and isinstance(
                 self._version, int
             ), "Error, the ProblemKind version must be a positive integer"
-            for feature in self._features:
+            for feature in self.features:
                 added_feature_version, _ = FEATURES_VERSIONS.get(feature, (1, None))
                 assert (
                     added_feature_version <= self._version
                 ), f"ProblemKind's declared version: {self._version} but {feature} is added in version {added_feature_version}"
 
     def __repr__(self) -> str:
-        features_gen = (f"'{feature}'" for feature in self._features)
+        features_gen = (f"'{feature}'" for feature in self.features)
         return f'ProblemKind([{", ".join(features_gen)}], version={self._version})'
 
     def __str__(self) -> str:
         features_mapped: Dict[str, List[str]] = {}
         for k, fl in FEATURES.items():
-            for feature in self._features:
-                if feature in fl:
-                    feature_list = features_mapped.get(k, None)
-                    if feature_list is None:
-                        features_mapped[k] = [feature]
-                    else:
-                        feature_list.append(feature)
+            for feature in fl:
+                if self._mask & FEATURES_BITS[feature]:
+                    features_mapped.setdefault(k, []).append(feature)
         result_str: List[str] = [f"{k}: {fl}" for k, fl in features_mapped.items()]
         return "\n".join(result_str)
 
@@ -237,35 +290,41 @@ class ProblemKind(up.AnyBaseClass, metaclass=ProblemKindMeta):
                 or oth._version is None
                 or self._version == oth._version
             ):
-                if self.version != oth.version:
+                version = self.version
+                if version != oth.version:
                     return False
-                valid_features = get_valid_features(self.version)
-                self_feat = self._features.intersection(valid_features)
-                oth_feat = oth._features.intersection(valid_features)
-                return self_feat == oth_feat
+                valid_mask = _valid_features_mask(version)
+                return (self._mask ^ oth._mask) & valid_mask == 0
         return False
 
     def __hash__(self) -> int:
-        return sum(map(hash, self._features))
+        return hash(self._mask & _valid_features_mask(self.version))
 
     def __le__(self, oth: object):
         if not isinstance(oth, ProblemKind):
             raise ValueError(f"Unable to compare a ProblemKind with a {type(oth)}")
+        self_mask, oth_mask, version = self._equalize_versions(oth)
+        return self_mask & ~oth_mask & _valid_features_mask(version) == 0
+
+    def _equalize_versions(self, oth: "ProblemKind") -> Tuple[int, int, int]:
+        """Returns the masks of the features of this `ProblemKind` and of `oth` in the same version."""
+        version, oth_version = self.version, oth.version
+        if version == oth_version:
+            return self._mask, oth._mask, version
         self_feat, oth_feat, version = equalize_versions(
-            self._features, oth._features, self.version, oth.version
+            self.features, oth.features, version, oth_version
         )
-        valid_version_features = get_valid_features(version)
-        self_feat.intersection_update(valid_version_features)
-        oth_feat.intersection_update(valid_version_features)
-        return self_feat.issubset(oth_feat)
+        return _features_mask(self_feat), _features_mask(oth_feat), version
 
     def clone(self) -> "ProblemKind":
-        return ProblemKind(self._features, self._version)
+        res = ProblemKind(version=self._version)
+        res._mask = self._mask
+        return res
 
     @property
     def features(self) -> Set[str]:
         """Returns the features contained by this `ProblemKind`."""
-        return self._features
+        return _mask_features(self._mask)
 
     @property
     def version(self) -> int:
@@ -276,9 +335,9 @@ class ProblemKind(up.AnyBaseClass, metaclass=ProblemKindMeta):
         if self._version is not None:
             return self._version
         max_version = 1
-        for f in self._features:
-            added_feature_version, _ = FEATURES_VERSIONS.get(f, (1, None))
-            max_version = max(max_version, added_feature_version)
+        for v, added_mask in ADDED_FEATURES_MASKS.items():
+            if self._mask & added_mask:
+                max_version = max(max_version, v)
         assert (
             max_version <= LATEST_PROBLEM_KIND_VERSION
         ), "Calculated version is > that the LATEST declared version"
@@ -300,10 +359,10 @@ class ProblemKind(up.AnyBaseClass, metaclass=ProblemKindMeta):
         :param oth: the `ProblemKind` that must be united to this `ProblemKind`.
         :return: a new `ProblemKind` that is the union of this `ProblemKind` and `oth`
         """
-        self_feat, oth_feat, version = equalize_versions(
-            self._features, oth._features, self.version, oth.version
-        )
-        return ProblemKind(self_feat.union(oth_feat), version=version)
+        self_mask, oth_mask, version = self._equalize_versions(oth)
+        res = ProblemKind(version=version)
+        res._mask = self_mask | oth_mask
+        return res
 
     def intersection(self, oth: "ProblemKind") -> "ProblemKind":
         """
@@ -313,10 +372,10 @@ class ProblemKind(up.AnyBaseClass, metaclass=ProblemKindMeta):
         :param oth: the `ProblemKind` that must be intersected with this `ProblemKind`.
         :return: a new `ProblemKind` that is the intersection between this `ProblemKind` and `oth`
         """
-        self_feat, oth_feat, version = equalize_versions(
-            self._features, oth._features, self.version, oth.version
-        )
-        return ProblemKind(self_feat.intersection(oth_feat), version=version)
+        self_mask, oth_mask, version = self._equalize_versions(oth)
+        res = ProblemKind(version=version)
+        res._mask = self_mask & oth_mask
+        return res
 
 
 basic_classical_kind = ProblemKind(version=LATEST_PROBLEM_KIND_VERSION)
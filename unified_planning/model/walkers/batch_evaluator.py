@@ -0,0 +1,270 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from fractions import Fraction
+from functools import reduce
+from typing import Any, Dict, List, Sequence, Tuple, Union
+import numpy as np
+import unified_planning as up
+import unified_planning.model.walkers as walkers
+from unified_planning.model.fnode import FNode
+from unified_planning.model.operators import OperatorKind
+from unified_planning.model.walkers.dag import DagWalker
+from unified_planning.model.walkers.state_evaluator import StateEvaluator
+
+
+# the operators evaluated state by state
+_NOT_VECTORIZED = frozenset(OperatorKind) - frozenset(
+    [
+        OperatorKind.AND,
+        OperatorKind.OR,
+        OperatorKind.NOT,
+        OperatorKind.IMPLIES,
+        OperatorKind.IFF,
+        OperatorKind.FLUENT_EXP,
+        OperatorKind.OBJECT_EXP,
+        OperatorKind.BOOL_CONSTANT,
+        OperatorKind.INT_CONSTANT,
+        OperatorKind.REAL_CONSTANT,
+        OperatorKind.PLUS,
+        OperatorKind.MINUS,
+        OperatorKind.TIMES,
+        OperatorKind.DIV,
+        OperatorKind.LE,
+        OperatorKind.LT,
+        OperatorKind.EQUALS,
+    ]
+)
+
+
+class StateBatch:
+    """
+    Represents a sequence of :class:`States <unified_planning.model.State>` in a
+    columnar format: every grounded fluent is mapped to the `numpy` array of its values
+    in the states.
+
+    The columns are computed the first time they are needed and are shared by all the
+    evaluations done on the same `StateBatch`. Boolean fluents are stored as `bool`
+    arrays, numeric fluents as `int64` or `float64` arrays (or as arrays of `int` and
+    `Fraction` objects when the exact semantic is required) and object fluents as
+    arrays of object expressions.
+    """
+
+    def __init__(self, states: Sequence["up.model.State"]):
+        self._states = list(states)
+        self._columns: Dict[Tuple[FNode, bool], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @property
+    def states(self) -> List["up.model.State"]:
+        """Returns the `States` of this batch."""
+        return self._states
+
+    def column(self, fluent_exp: FNode, exact: bool = False) -> np.ndarray:
+        """
+        Returns the array of the values of the given grounded fluent in the states of
+        this batch.
+
+        :param fluent_exp: The grounded fluent expression.
+        :param exact: `True` if the numeric values must be kept as `int` and `Fraction`.
+        :return: The array of the values of `fluent_exp`, one for every state.
+        """
+        key = (fluent_exp, exact)
+        column = self._columns.get(key, None)
+        if column is None:
+            values = (_to_value(s.get_value(fluent_exp), exact) for s in self._states)
+            column = _to_array(list(values), exact)
+            self._columns[key] = column
+        return column
+
+
+class BatchEvaluator(DagWalker):
+    """
+    Evaluates grounded expressions over a batch of :class:`States <unified_planning.model.State>`
+    of the :class:`~unified_planning.model.Problem` given at construction time.
+
+    Every operator is applied to the whole columns of the batch, so the expression is
+    walked once for all the states; the numeric operators work on `int64` and `float64`
+    arrays unless the exact semantic is required, in which case the values are kept
+    as `int` and `Fraction`, like in the :class:`~unified_planning.model.walkers.StateEvaluator`.
+    The sub-expressions that can't be vectorized (quantifiers, nested fluents and the
+    other operators without a vectorized implementation) are evaluated state by state
+    with a `StateEvaluator`.
+    """
+
+    def __init__(self, problem: "up.model.problem.Problem", exact: bool = False):
+        DagWalker.__init__(self)
+        self._problem = problem
+        self._exact = exact
+        self._state_evaluator = StateEvaluator(problem)
+        self._batch = StateBatch([])
+
+    @property
+    def exact(self) -> bool:
+        """Returns `True` if the numeric values are evaluated with the exact semantic."""
+        return self._exact
+
+    def evaluate(
+        self,
+        expressions: Union[FNode, Sequence[FNode]],
+        states: Union[StateBatch, Sequence["up.model.State"]],
+    ) -> Union[np.ndarray, List[np.ndarray]]:
+        """
+        Evaluates the given grounded expressions in the given states.
+
+        :param expressions: The expression, or the list of expressions, to evaluate.
+        :param states: The `States`, or the `StateBatch`, where the expressions are evaluated;
+            reusing the same `StateBatch` avoids reading again the values of the fluents.
+        :return: For every expression, the array of its values, one for every state.
+        """
+        self._batch = states if isinstance(states, StateBatch) else StateBatch(states)
+        try:
+            if isinstance(expressions, FNode):
+                return self._evaluate(expressions)
+            return [self._evaluate(e) for e in expressions]
+        finally:
+            self.memoization.clear()
+            self._batch = StateBatch([])
+
+    def _evaluate(self, expression: FNode) -> np.ndarray:
+        res = self.walk(expression)
+        if isinstance(res, np.ndarray):
+            return res
+        return _to_array([res] * len(self._batch), self._exact)
+
+    def _push_with_children_to_stack(self, expression: FNode, **kwargs):
+        if expression.node_type in _NOT_VECTORIZED or expression.is_fluent_exp():
+            self.stack.append((True, expression))
+        else:
+            super()._push_with_children_to_stack(expression, **kwargs)
+
+    def _compute_node_result(self, expression: FNode, **kwargs):
+        if expression.node_type in _NOT_VECTORIZED or expression.is_fluent_exp():
+            if expression not in self.memoization:
+                f = self.functions[expression.node_type]
+                self.memoization[expression] = f(expression, args=[])
+        else:
+            super()._compute_node_result(expression, **kwargs)
+
+    @walkers.handles(_NOT_VECTORIZED)
+    def walk_per_state(self, expression: FNode, args: List[Any]) -> np.ndarray:
+        values = [
+            _to_value(self._state_evaluator.evaluate(expression, s), self._exact)
+            for s in self._batch.states
+        ]
+        return _to_array(values, self._exact)
+
+    def walk_fluent_exp(self, expression: FNode, args: List[Any]) -> np.ndarray:
+        if all(a.is_constant() for a in expression.args):
+            return self._batch.column(expression, self._exact)
+        # nested fluents
+        return self.walk_per_state(expression, args)
+
+    def walk_object_exp(self, expression: FNode, args: List[Any]) -> FNode:
+        return expression
+
+    def walk_bool_constant(self, expression: FNode, args: List[Any]) -> bool:
+        return expression.bool_constant_value()
+
+    def walk_int_constant(self, expression: FNode, args: List[Any]) -> int:
+        return expression.int_constant_value()
+
+    def walk_real_constant(
+        self, expression: FNode, args: List[Any]
+    ) -> Union[Fraction, float]:
+        return _to_value(expression, self._exact)
+
+    def walk_and(self, expression: FNode, args: List[Any]) -> Any:
+        return reduce(np.logical_and, args, True)
+
+    def walk_or(self, expression: FNode, args: List[Any]) -> Any:
+        return reduce(np.logical_or, args, False)
+
+    def walk_not(self, expression: FNode, args: List[Any]) -> Any:
+        return np.logical_not(args[0])
+
+    def walk_implies(self, expression: FNode, args: List[Any]) -> Any:
+        return np.logical_or(np.logical_not(args[0]), args[1])
+
+    def walk_iff(self, expression: FNode, args: List[Any]) -> Any:
+        return np.equal(args[0], args[1])
+
+    def walk_plus(self, expression: FNode, args: List[Any]) -> Any:
+        return reduce(lambda a, b: a + b, args, 0)
+
+    def walk_minus(self, expression: FNode, args: List[Any]) -> Any:
+        return args[0] - args[1]
+
+    def walk_times(self, expression: FNode, args: List[Any]) -> Any:
+        return reduce(lambda a, b: a * b, args, 1)
+
+    def walk_div(self, expression: FNode, args: List[Any]) -> Any:
+        left, right = args
+        if not self._exact:
+            return np.true_divide(left, right)
+        if isinstance(left, np.ndarray) or isinstance(right, np.ndarray):
+            return _exact_div(left, right)
+        return Fraction(left) / right
+
+    def walk_le(self, expression: FNode, args: List[Any]) -> Any:
+        return _to_bool(args[0] <= args[1])
+
+    def walk_lt(self, expression: FNode, args: List[Any]) -> Any:
+        return _to_bool(args[0] < args[1])
+
+    def walk_equals(self, expression: FNode, args: List[Any]) -> Any:
+        left, right = args
+        if not isinstance(left, np.ndarray):
+            # the arrays handle the comparison with objects expressions
+            left, right = right, left
+        return _to_bool(left == right)
+
+
+_exact_div = np.frompyfunc(lambda a, b: Fraction(a) / b, 2, 1)
+
+
+def _to_bool(value: Any) -> Any:
+    if isinstance(value, np.ndarray) and value.dtype != bool:
+        return value.astype(bool)
+    return value
+
+
+def _to_value(constant: FNode, exact: bool) -> Union[bool, int, float, Fraction, FNode]:
+    """Returns the python value of the given constant expression."""
+    if constant.is_bool_constant():
+        return constant.bool_constant_value()
+    elif constant.is_int_constant():
+        return constant.int_constant_value()
+    elif constant.is_real_constant():
+        value = constant.real_constant_value()
+        return value if exact else float(value)
+    assert constant.is_object_exp()
+    return constant
+
+
+def _to_array(values: List[Any], exact: bool) -> np.ndarray:
+    """Returns the array of the given python values."""
+    if all(isinstance(v, (bool, np.bool_)) for v in values):
+        return np.array(values, dtype=bool)
+    if not exact and all(isinstance(v, (int, float, np.number)) for v in values):
+        return np.array(values)
+    # exact numbers and object expressions are stored as objects
+    array = np.empty(len(values), dtype=object)
+    for i, v in enumerate(values):
+        array[i] = v
+    return array
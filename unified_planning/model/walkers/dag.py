@@ -12,6 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional
+from unified_planning.exceptions import UPUsageError
 from unified_planning.model.walkers.generic import Walker
 from unified_planning.model.fnode import FNode
 
@@ -27,8 +31,16 @@ class DagWalker(Walker):
     :func _get_key needs to be defined if additional arguments via
     keywords need to be shared. This function should return the key to
     be used in memoization. See substituter for an example.
+
+    The memoization can be bounded with the :func:`memoization_limit <unified_planning.model.walkers.DagWalker.memoization_limit>`
+    property, in which case the least recently used results are discarded at the
+    end of every walk, and scoped with :func:`memoization_scope <unified_planning.model.walkers.DagWalker.memoization_scope>`.
     """
 
+    _memoization_limit: Optional[int] = None
+    _memoization_hits: int = 0
+    _memoization_misses: int = 0
+
     def __init__(self, invalidate_memoization=False):
         """The flag ``invalidate_memoization`` can be used to clear the cache
         after the walk has been completed: the cache is one-time use.
@@ -38,19 +50,87 @@ class DagWalker(Walker):
         self.memoization = {}
         self.invalidate_memoization = invalidate_memoization
         self.stack = []
+        self._memoization_limit = None
+        self._memoization_hits = 0
+        self._memoization_misses = 0
         return
 
+    @property
+    def memoization_limit(self) -> Optional[int]:
+        """Returns the maximum number of results kept in the memoization, `None` if unbounded."""
+        return self._memoization_limit
+
+    @memoization_limit.setter
+    def memoization_limit(self, limit: Optional[int]):
+        """
+        Sets the maximum number of results kept in the memoization; when the limit is
+        exceeded at the end of a walk, the least recently used results are discarded.
+        `None` makes the memoization unbounded.
+        """
+        if limit is not None and limit < 0:
+            raise UPUsageError("The memoization limit can't be negative.")
+        self._memoization_limit = limit
+        self._shrink_memoization()
+
+    @property
+    def memoization_stats(self) -> Dict[str, int]:
+        """
+        Returns the statistics of the memoization: the number of walks answered by the
+        memoization (`hits`), the number of walks computed (`misses`) and the number
+        of results currently memoized (`size`).
+        """
+        return {
+            "hits": self._memoization_hits,
+            "misses": self._memoization_misses,
+            "size": len(self.memoization),
+        }
+
+    @contextmanager
+    def memoization_scope(self) -> Iterator[None]:
+        """
+        Returns a context manager that, on exit, discards from the memoization all
+        the results added while it was active.
+
+        Entering and exiting the scope is linear in the size of the memoization.
+        """
+        outer_keys = set(self.memoization)
+        try:
+            yield
+        finally:
+            for key in [k for k in self.memoization if k not in outer_keys]:
+                del self.memoization[key]
+
+    def _shrink_memoization(self):
+        limit = self._memoization_limit
+        if limit is not None and len(self.memoization) > limit:
+            # the memoization is kept in least recently used order
+            for key in list(islice(self.memoization, len(self.memoization) - limit)):
+                del self.memoization[key]
+
+    def _refresh_memoization(self, key: Any):
+        """
+        Moves the result of the given key at the end of the memoization, to keep the
+        least recently used order; the memoizations that are not a plain `dict`, like
+        the scoped ones built on a `ChainMap`, are not ordered and are left untouched.
+        """
+        memoization = self.memoization
+        if type(memoization) is dict:
+            memoization[key] = memoization.pop(key)
+
     def _get_children(self, expression: FNode):
         return expression.args
 
     def _push_with_children_to_stack(self, expression: FNode, **kwargs):
         """Add children to the stack."""
         self.stack.append((True, expression))
+        memoization = self.memoization
         for s in self._get_children(expression):
             # Add only if not memoized already
             key = self._get_key(s, **kwargs)
-            if key not in self.memoization:
+            if key not in memoization:
                 self.stack.append((False, s))
+            elif self._memoization_limit is not None:
+                self._refresh_memoization(key)
 
     def _compute_node_result(self, expression: FNode, **kwargs):
         """Apply function to the node and memoize the result.
@@ -96,12 +176,18 @@ class DagWalker(Walker):
 
     def walk(self, expression: FNode, **kwargs):
         if expression in self.memoization:
+            self._memoization_hits += 1
+            if self._memoization_limit is not None:
+                self._refresh_memoization(expression)
             return self.memoization[expression]
 
+        self._memoization_misses += 1
         res = self.iter_walk(expression, **kwargs)
 
         if self.invalidate_memoization:
             self.memoization.clear()
+        else:
+            self._shrink_memoization()
         return res
 
     def _get_key(self, expression: FNode, **kwargs):
@@ -14,8 +14,8 @@
 #
 
 
-from typing import Dict, List, Optional
-from itertools import product
+from collections import ChainMap
+from typing import Dict, List, Optional, Set, Tuple
 
 import unified_planning as up
 import unified_planning.environment
@@ -101,20 +101,105 @@ class QuantifierSimplifier(Simplifier):
         else:
             pass
 
-    def _deep_subs_simplify(
+    def _scoped_walk(
         self,
         expression: "FNode",
         variables_assignments: Dict["Expression", "Expression"],
     ) -> "FNode":
-        new_qsimplifier = QuantifierSimplifier(self._env, self._problem)
+        """
+        Walks the given expression with this walker, extending the current
+        variable assignments with the given ones.
+
+        The stack, the memoization and the variable assignments of the current walk
+        are restored afterwards; the results memoized by the current walk are visible
+        inside the scope, unless a variable is bound again, while the results computed
+        inside the scope are discarded.
+        """
         assert self._variable_assignments is not None
-        assert self._assignments is not None
-        copy = self._variable_assignments.copy()
-        copy.update(variables_assignments)
-        r = new_qsimplifier.qsimplify(expression, self._assignments, copy)
+        outer_scope = (self.stack, self.memoization, self._variable_assignments)
+        shadowing = any(v in self._variable_assignments for v in variables_assignments)
+        self._variable_assignments = self._variable_assignments.copy()
+        self._variable_assignments.update(variables_assignments)
+        self.stack = []
+        self.memoization = {} if shadowing else ChainMap({}, self.memoization)
+        try:
+            r = self.iter_walk(expression)
+        finally:
+            self.stack, self.memoization, self._variable_assignments = outer_scope
         assert r.is_constant()
         return r
 
+    def _find_assignment(
+        self,
+        variables: List["up.model.variable.Variable"],
+        body: "FNode",
+        expected: bool,
+    ) -> bool:
+        """
+        Returns `True` if there is an assignment of the given variables that makes
+        the given body evaluate to `expected`.
+
+        The body is split in conjuncts, each one with the value it must take; the
+        variables are bound one at a time and every conjunct is evaluated as soon as
+        all its variables are bound, so a partial assignment is discarded as soon as
+        it falsifies one of them.
+        """
+        assert self._problem is not None
+        fvo = self._env.free_vars_oracle
+        conjuncts = _split_conjuncts(body, expected)
+        conjuncts_vars = [
+            fvo.get_free_variables(c).intersection(variables) for c, _ in conjuncts
+        ]
+        domains: Dict["up.model.variable.Variable", List[FNode]] = {}
+        for v in variables:
+            domains[v] = [
+                self.manager.ObjectExp(o) for o in self._problem.objects(v.type)
+            ]
+            if not domains[v]:
+                return False
+        # greedily bind first the variables that allow to evaluate more conjuncts
+        order: List["up.model.variable.Variable"] = []
+        bound: Set["up.model.variable.Variable"] = set()
+        while len(order) < len(variables):
+            v = max(
+                (v for v in variables if v not in bound),
+                key=lambda v: (
+                    sum(1 for cv in conjuncts_vars if v in cv and cv <= bound | {v}),
+                    -len(domains[v]),
+                ),
+            )
+            order.append(v)
+            bound.add(v)
+        # conjuncts_at_depth[d] contains the conjuncts evaluable after binding order[:d]
+        conjuncts_at_depth: List[List[Tuple[FNode, bool]]] = [
+            [] for _ in range(len(order) + 1)
+        ]
+        for conjunct, cv in zip(conjuncts, conjuncts_vars):
+            depth = max((order.index(v) + 1 for v in cv), default=0)
+            conjuncts_at_depth[depth].append(conjunct)
+
+        def satisfied(depth: int, assignment: Dict["Expression", "Expression"]) -> bool:
+            for conjunct, value in conjuncts_at_depth[depth]:
+                result = self._scoped_walk(conjunct, assignment)
+                assert result.is_bool_constant()
+                if result.bool_constant_value() != value:
+                    return False
+            return True
+
+        def search(depth: int, assignment: Dict["Expression", "Expression"]) -> bool:
+            if not satisfied(depth, assignment):
+                return False
+            if depth == len(order):
+                return True
+            for o in domains[order[depth]]:
+                assignment[order[depth]] = o
+                if search(depth + 1, assignment):
+                    return True
+            del assignment[order[depth]]
+            return False
+
+        return search(0, {})
+
     def walk_exists(self, expression: "FNode", args: List["FNode"]) -> "FNode":
         assert self._problem is not None
         assert len(args) == 1
@@ -122,22 +207,9 @@ class QuantifierSimplifier(Simplifier):
             if args[0].bool_constant_value():
                 return self.manager.TRUE()
             return self.manager.FALSE()
-        vars = expression.variables()
-        type_list = [v.type for v in vars]
-        possible_objects: List[List["up.model.object.Object"]] = [
-            list(self._problem.objects(t)) for t in type_list
-        ]
-        # product of n iterables returns a generator of tuples where
-        # every tuple has n elements and the tuples make every possible
-        # combination of 1 item for each iterable. For example:
-        # product([1,2], [3,4], [5,6], [7]) =
-        # (1,3,5,7) (1,3,6,7) (1,4,5,7) (1,4,6,7) (2,3,5,7) (2,3,6,7) (2,4,5,7) (2,4,6,7)
-        for o in product(*possible_objects):
-            subs: Dict["Expression", "Expression"] = dict(zip(vars, list(o)))
-            result = self._deep_subs_simplify(args[0], subs)
-            assert result.is_bool_constant()
-            if result.bool_constant_value():
-                return self.manager.TRUE()
+        # search for a witness
+        if self._find_assignment(list(expression.variables()), args[0], True):
+            return self.manager.TRUE()
         return self.manager.FALSE()
 
     def walk_forall(self, expression: "FNode", args: List["FNode"]) -> "FNode":
@@ -147,22 +219,9 @@ class QuantifierSimplifier(Simplifier):
             if args[0].bool_constant_value():
                 return self.manager.TRUE()
             return self.manager.FALSE()
-        vars = expression.variables()
-        type_list = [v.type for v in vars]
-        possible_objects: List[List["up.model.object.Object"]] = [
-            list(self._problem.objects(t)) for t in type_list
-        ]
-        # product of n iterables returns a generator of tuples where
-        # every tuple has n elements and the tuples make every possible
-        # combination of 1 item for each iterable. For example:
-        # product([1,2], [3,4], [5,6], [7]) =
-        # (1,3,5,7) (1,3,6,7) (1,4,5,7) (1,4,6,7) (2,3,5,7) (2,3,6,7) (2,4,5,7) (2,4,6,7)
-        for o in product(*possible_objects):
-            subs: Dict["Expression", "Expression"] = dict(zip(vars, list(o)))
-            result = self._deep_subs_simplify(args[0], subs)
-            assert result.is_bool_constant()
-            if not result.bool_constant_value():
-                return self.manager.FALSE()
+        # search for a counterexample
+        if self._find_assignment(list(expression.variables()), args[0], False):
+            return self.manager.FALSE()
         return self.manager.TRUE()
 
     def walk_fluent_exp(self, expression: "FNode", args: List["FNode"]) -> "FNode":
@@ -201,3 +260,20 @@ class QuantifierSimplifier(Simplifier):
             raise UPProblemDefinitionError(
                 f"Value of Parameter {str(expression)} not found in {str(self._assignments)}"
             )
+
+
+def _split_conjuncts(expression: FNode, value: bool) -> List[Tuple[FNode, bool]]:
+    """
+    Returns the list of couples `(conjunct, conjunct_value)` such that the given
+    expression evaluates to the given value iff every conjunct evaluates to its value.
+    """
+    if expression.is_not():
+        return _split_conjuncts(expression.arg(0), not value)
+    elif value and expression.is_and():
+        return [c for arg in expression.args for c in _split_conjuncts(arg, True)]
+    elif not value and expression.is_or():
+        return [c for arg in expression.args for c in _split_conjuncts(arg, False)]
+    elif not value and expression.is_implies():
+        left, right = expression.args
+        return _split_conjuncts(left, True) + _split_conjuncts(right, False)
+    return [(expression, value)]
@@ -56,23 +56,6 @@ class StateEvaluator(QuantifierSimplifier):
         assert r.is_constant()
         return r
 
-    def _deep_subs_simplify(
-        self,
-        expression: "FNode",
-        variables_assignments: Dict["Expression", "Expression"],
-    ) -> "FNode":
-        """
-        This method needs to be updated from the QuantifierRemover in order to use the StateEvaluator inside the
-        quantifiers and not the QuantifierSimplifier.
-        """
-        new_state_evaluator = StateEvaluator(self._problem)
-        assert self._variable_assignments is not None
-        copy = self._variable_assignments.copy()
-        copy.update(variables_assignments)
-        r = new_state_evaluator.evaluate(expression, self._state, copy)
-        assert r.is_constant()
-        return r
-
     def walk_fluent_exp(self, expression: "FNode", args: List["FNode"]) -> "FNode":
         new_exp = self.manager.FluentExp(expression.fluent(), tuple(args))
         return self._state.get_value(new_exp)
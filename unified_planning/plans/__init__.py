@@ -17,7 +17,11 @@ from unified_planning.plans.plan import Plan, ActionInstance, PlanKind
 from unified_planning.plans.sequential_plan import SequentialPlan
 from unified_planning.plans.time_triggered_plan import TimeTriggeredPlan
 from unified_planning.plans.partial_order_plan import PartialOrderPlan
-from unified_planning.plans.contingent_plan import ContingentPlanNode, ContingentPlan
+from unified_planning.plans.contingent_plan import (
+    ContingentPlanNode,
+    ContingentPlan,
+    ContingentPlanExecutor,
+)
 from unified_planning.plans.stn_plan import STNPlanNode, STNPlan
 from unified_planning.plans.hierarchical_plan import HierarchicalPlan
 from unified_planning.plans.schedule import Schedule
@@ -31,6 +35,7 @@ __all__ = [
     "PartialOrderPlan",
     "ContingentPlanNode",
     "ContingentPlan",
+    "ContingentPlanExecutor",
     "STNPlanNode",
     "STNPlan",
     "HierarchicalPlan",
@@ -16,18 +16,35 @@
 import unified_planning as up
 import unified_planning.plans as plans
 from unified_planning.exceptions import UPUsageError
-from typing import Callable, Dict, Iterator, Optional, List, Set, Tuple, Deque
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    Optional,
+    List,
+    Set,
+    Tuple,
+    Deque,
+)
 from collections import deque
 
 
 class ContingentPlanNode:
-    """This class represent a node in the tree representing a contingent plan."""
+    """
+    This class represent a node in the tree representing a contingent plan.
+
+    The structural hash of a node is computed once and cached, so a node must not
+    be modified after it is hashed or compared, directly or as a descendant of
+    another node.
+    """
 
     def __init__(self, action_instance: "plans.plan.ActionInstance"):
         self._action_instance = action_instance
         self._children: List[
             Tuple[Dict["up.model.FNode", "up.model.FNode"], "ContingentPlanNode"]
         ] = []
+        self._hash: Optional[int] = None
 
     @property
     def action_instance(self) -> "plans.plan.ActionInstance":
@@ -55,6 +72,7 @@ class ContingentPlanNode:
             ):
                 raise UPUsageError("Different environments can not be mixed.")
         self._children.append((observation, node))
+        self._hash = None
 
     def replace_action_instances(
         self,
@@ -87,30 +105,61 @@ class ContingentPlanNode:
             return c.replace_action_instances(replace_function)
 
     def __eq__(self, oth: object) -> bool:
-        if isinstance(oth, ContingentPlanNode):
-            if not self._action_instance.is_semantically_equivalent(
-                oth.action_instance
+        if not isinstance(oth, ContingentPlanNode):
+            return False
+        # the pairs of nodes are compared without recursion, as the plans can be
+        # very deep, and the shared sub-plans are compared once
+        stack = [(self, oth)]
+        compared: Set[Tuple[int, int]] = set()
+        while stack:
+            node, oth_node = stack.pop()
+            if node is oth_node or (id(node), id(oth_node)) in compared:
+                continue
+            compared.add((id(node), id(oth_node)))
+            if hash(node) != hash(oth_node):
+                return False
+            if not node._action_instance.is_semantically_equivalent(
+                oth_node.action_instance
             ):
                 return False
-            if not len(self._children) == len(oth.children):
+            if len(node._children) != len(oth_node.children):
                 return False
-            for c in self._children:
-                if c not in oth.children:
+            for o, c in node._children:
+                matching = [
+                    oc
+                    for oo, oc in oth_node.children
+                    if hash(oc) == hash(c) and oo == o
+                ]
+                if not matching:
                     return False
-            return True
-        else:
-            return False
+                stack.append((c, matching[0]))
+        return True
 
     def __hash__(self) -> int:
-        count: int = 0
-        count += hash(self._action_instance.action) + hash(
-            self._action_instance.actual_parameters
-        )
-        for o, c in self._children:
-            count += hash(c)
-            for k, v in o.items():
-                count += hash(k) + hash(v)
-        return count
+        if self._hash is None:
+            # the hashes are computed bottom-up without recursion and cached, so
+            # every node of the plan is hashed once
+            stack = [self]
+            while stack:
+                node = stack[-1]
+                missing = [c for _, c in node._children if c._hash is None]
+                if missing:
+                    stack.extend(missing)
+                    continue
+                stack.pop()
+                if node._hash is None:
+                    count: int = 0
+                    count += hash(node._action_instance.action) + hash(
+                        node._action_instance.actual_parameters
+                    )
+                    for o, c in node._children:
+                        assert c._hash is not None
+                        count += c._hash
+                        for k, v in o.items():
+                            count += hash(k) + hash(v)
+                    node._hash = count
+        assert self._hash is not None
+        return self._hash
 
     def __contains__(self, item: object) -> bool:
         if isinstance(item, plans.plan.ActionInstance):
@@ -147,7 +196,7 @@ class ContingentPlan(plans.plan.Plan):
         self._root_node = root_node
 
     def __eq__(self, oth: object) -> bool:
-        if isinstance(oth, ContingentPlan) and self.environment == self.environment:
+        if isinstance(oth, ContingentPlan) and self.environment == oth.environment:
             return self.root_node == oth.root_node
         else:
             return False
@@ -206,6 +255,46 @@ class ContingentPlan(plans.plan.Plan):
         """Returns the ContingentPlanNode."""
         return self._root_node
 
+    def compact(self) -> "ContingentPlan":
+        """
+        Returns an equivalent `ContingentPlan` in which the identical sub-plans
+        are merged, so that the plan is represented as a DAG where every distinct
+        sub-plan is a single `ContingentPlanNode`, possibly with many parents.
+
+        The nodes are hash-consed bottom-up, so the cost is linear in the number
+        of distinct nodes of this plan.
+
+        :return: The compacted `ContingentPlan`.
+        """
+        if self._root_node is None:
+            return ContingentPlan(None, self._environment)
+        canonical: Dict[int, ContingentPlanNode] = {}
+        table: Dict[Tuple, ContingentPlanNode] = {}
+        stack = [self._root_node]
+        while stack:
+            node = stack[-1]
+            missing = [c for _, c in node.children if id(c) not in canonical]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            if id(node) in canonical:
+                continue
+            children = [(o, canonical[id(c)]) for o, c in node.children]
+            key = (
+                node.action_instance.action,
+                node.action_instance.actual_parameters,
+                frozenset((frozenset(o.items()), id(c)) for o, c in children),
+            )
+            new_node = table.get(key, None)
+            if new_node is None:
+                new_node = ContingentPlanNode(node.action_instance)
+                for o, c in children:
+                    new_node.add_child(o, c)
+                table[key] = new_node
+            canonical[id(node)] = new_node
+        return ContingentPlan(canonical[id(self._root_node)], self._environment)
+
     def replace_action_instances(
         self,
         replace_function: Callable[
@@ -257,3 +346,98 @@ def visit_tree(root_node: Optional[ContingentPlanNode]) -> Iterator[ContingentPl
             get_second_element = lambda x: x[1]
             stack.extend(map(get_second_element, current_element.children))
             yield current_element
+
+
+class ContingentPlanExecutor:
+    """
+    This class executes a `ContingentPlan` at runtime, following the observations
+    received after every sensing action.
+
+    The plan is indexed once when the executor is created, with a cost linear in
+    its number of nodes and edges; then every step only looks up the values of
+    the fluents observed by the current node. The execution ends when no child
+    of the current node is consistent with the observation.
+    """
+
+    def __init__(self, plan: ContingentPlan):
+        self._plan = plan
+        # for every node, the fluents it observes and its children indexed by
+        # the values of those fluents
+        self._index: Dict[
+            int,
+            Tuple[
+                List["up.model.FNode"],
+                Dict[
+                    FrozenSet[Tuple["up.model.FNode", "up.model.FNode"]],
+                    ContingentPlanNode,
+                ],
+            ],
+        ] = {}
+        stack: List[ContingentPlanNode] = []
+        if plan.root_node is not None:
+            stack.append(plan.root_node)
+        while stack:
+            node = stack.pop()
+            if id(node) in self._index:
+                continue
+            observed: Set["up.model.FNode"] = set()
+            for o, _ in node.children:
+                observed.update(o.keys())
+            children: Dict[
+                FrozenSet[Tuple["up.model.FNode", "up.model.FNode"]],
+                ContingentPlanNode,
+            ] = {}
+            for o, c in node.children:
+                if len(o) != len(observed):
+                    raise UPUsageError(
+                        "The children of a ContingentPlanNode must observe the same fluents."
+                    )
+                children.setdefault(frozenset(o.items()), c)
+                stack.append(c)
+            self._index[id(node)] = (list(observed), children)
+        self._current_node = plan.root_node
+
+    @property
+    def plan(self) -> ContingentPlan:
+        """Returns the executed `ContingentPlan`."""
+        return self._plan
+
+    @property
+    def current_node(self) -> Optional[ContingentPlanNode]:
+        """Returns the `ContingentPlanNode` to execute, or `None` if the execution ended."""
+        return self._current_node
+
+    @property
+    def current_action_instance(self) -> Optional["plans.plan.ActionInstance"]:
+        """Returns the `ActionInstance` to execute, or `None` if the execution ended."""
+        if self._current_node is None:
+            return None
+        return self._current_node.action_instance
+
+    def reset(self):
+        """Restarts the execution from the root of the plan."""
+        self._current_node = self._plan.root_node
+
+    def step(
+        self, observation: Optional[Dict["up.model.FNode", "up.model.FNode"]] = None
+    ) -> Optional["plans.plan.ActionInstance"]:
+        """
+        Moves the execution past the current action, following the given observation,
+        and returns the next `ActionInstance` to execute.
+
+        :param observation: The values of the fluents observed after executing the
+            current action; it must contain every fluent observed by the current
+            action, while the other values are ignored.
+        :return: The next `ActionInstance` to execute, or `None` if the execution ended.
+        """
+        if self._current_node is None:
+            raise UPUsageError("The execution of the ContingentPlan already ended.")
+        observed, children = self._index[id(self._current_node)]
+        if observation is None:
+            observation = {}
+        try:
+            key = frozenset((f, observation[f]) for f in observed)
+        except KeyError as e:
+            raise UPUsageError(f"The observation does not contain {e.args[0]}.")
+        self._current_node = children.get(key, None)
+        return self.current_action_instance
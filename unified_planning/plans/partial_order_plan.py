@@ -14,6 +14,8 @@
 #
 
 
+import heapq
+import random
 import networkx as nx
 import unified_planning as up
 import unified_planning.plans as plans
@@ -21,7 +23,8 @@ from unified_planning.environment import Environment
 from unified_planning.exceptions import UPUsageError
 from unified_planning.plans.plan import ActionInstance
 from unified_planning.plans.sequential_plan import SequentialPlan
-from typing import Callable, Dict, Iterator, List, Optional
+from itertools import count, islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 
 class PartialOrderPlan(plans.plan.Plan):
@@ -85,6 +88,13 @@ class PartialOrderPlan(plans.plan.Plan):
             self._graph = nx.convert.from_dict_of_lists(
                 adjacency_list, create_using=nx.DiGraph
             )
+        # compact representation of the graph and linearization counts, computed lazily
+        self._dag: Optional[
+            Tuple[List[ActionInstance], List[Tuple[int, ...]], List[int]]
+        ] = None
+        self._counts: Optional[Dict[int, int]] = None
+        # the largest limit of the counted bitmasks known to be exceeded
+        self._exceeded_downsets = 0
 
     def __repr__(self) -> str:
         return f"PartialOrderPlan({repr(self.get_adjacency_list)})"
@@ -220,11 +230,324 @@ class PartialOrderPlan(plans.plan.Plan):
         else:
             raise UPUsageError(f"{type(self)} can't be converted to {plan_kind}.")
 
-    def all_sequential_plans(self) -> Iterator[SequentialPlan]:
-        """Returns all possible `SequentialPlans` that respects the ordering constraints given by this `PartialOrderPlan`."""
-        for sorted_plan in nx.all_topological_sorts(self._graph):
+    def all_sequential_plans(
+        self, max_plans: Optional[int] = None
+    ) -> Iterator[SequentialPlan]:
+        """
+        Returns all possible `SequentialPlans` that respects the ordering constraints given by this `PartialOrderPlan`.
+
+        :param max_plans: If given, the maximum number of `SequentialPlans` generated.
+        :return: A lazy `Iterator` over the `SequentialPlans`.
+        """
+        sorted_plans = nx.all_topological_sorts(self._graph)
+        for sorted_plan in islice(sorted_plans, max_plans):
             yield SequentialPlan(list(sorted_plan), self._environment)
 
+    def count_sequential_plans(
+        self, exact: bool = True, samples: int = 1000, seed: Optional[int] = None
+    ) -> int:
+        """
+        Returns the number of `SequentialPlans` that respects the ordering constraints
+        given by this `PartialOrderPlan`.
+
+        The exact count is computed with a dynamic programming over the sets of
+        `ActionInstances` that can be executed first, so it is exponential in the
+        width of the plan; the approximate count is the average of `samples`
+        unbiased estimates, each one computed on a random linearization.
+
+        :param exact: `True` to compute the exact count, `False` for an estimate.
+        :param samples: The number of estimates averaged when `exact` is `False`.
+        :param seed: The seed of the random generator used for the estimates.
+        :return: The (estimated) number of linearizations of this plan.
+        """
+        if exact:
+            counts = self._linearization_counts()
+            assert counts is not None
+            return counts[0]
+        if samples <= 0:
+            raise UPUsageError("The number of samples must be positive.")
+        rng = random.Random(seed)
+        total = 0
+        for _ in range(samples):
+            # Knuth's estimator: the product of the number of choices on a random path
+            estimate = 1
+            mask, available = 0, self._initial_available()
+            while available:
+                estimate *= len(available)
+                v = rng.choice(available)
+                mask, available = self._next_available(mask, available, v)
+            total += estimate
+        return round(total / samples)
+
+    def random_sequential_plans(
+        self,
+        seed: Optional[int] = None,
+        exact: Optional[bool] = None,
+        max_downsets: int = 10**4,
+        mixing_steps: Optional[int] = None,
+    ) -> Iterator[SequentialPlan]:
+        """
+        Returns an infinite `Iterator` over `SequentialPlans` sampled at random between
+        the ones that respects the ordering constraints given by this `PartialOrderPlan`.
+
+        The exact sampling is uniform and linear in the number of `ActionInstances` for
+        every sample, but it needs the count of the linearizations of every set of
+        `ActionInstances` that can be executed first, see
+        :func:`count_sequential_plans <unified_planning.plans.PartialOrderPlan.count_sequential_plans>`,
+        whose number is exponential in the width of the plan.
+
+        The approximate sampling is a lazy Markov chain over the linearizations, whose
+        moves swap two adjacent `ActionInstances` that are not ordered by the plan; its
+        stationary distribution is the uniform one, but consecutive samples are
+        correlated when `mixing_steps` is smaller than the mixing time of the chain,
+        that is `O(n^3 log(n))` in the worst case.
+
+        :param seed: The seed of the random generator.
+        :param exact: `True` for the exact sampling, `False` for the approximate one;
+            by default the sampling is exact if there are at most `max_downsets` sets of
+            `ActionInstances` that can be executed first.
+        :param max_downsets: The maximum number of sets of `ActionInstances` counted
+            before falling back to the approximate sampling, when `exact` is `None`.
+        :param mixing_steps: The number of moves of the Markov chain between two
+            samples; defaults to `n^2`, where `n` is the number of `ActionInstances`.
+        :return: The `Iterator` over the sampled `SequentialPlans`.
+        """
+        if mixing_steps is not None and mixing_steps < 0:
+            raise UPUsageError("The number of mixing steps must be non-negative.")
+        rng = random.Random(seed)
+        counts = None
+        if exact is None:
+            counts = self._linearization_counts(max_downsets)
+        elif exact:
+            counts = self._linearization_counts()
+        if counts is not None:
+            return self._exact_sequential_plans(rng, counts)
+        return self._approximate_sequential_plans(rng, mixing_steps)
+
+    def _exact_sequential_plans(
+        self, rng: random.Random, counts: Dict[int, int]
+    ) -> Iterator[SequentialPlan]:
+        nodes, _, _ = self._compact_dag()
+        while True:
+            actions = []
+            mask, available = 0, self._initial_available()
+            while available:
+                # every action is chosen with a probability proportional to the number
+                # of linearizations of the remaining plan
+                r = rng.randrange(counts[mask])
+                for v in available:
+                    r -= counts[mask | (1 << v)]
+                    if r < 0:
+                        break
+                actions.append(nodes[v])
+                mask, available = self._next_available(mask, available, v)
+            yield SequentialPlan(actions, self._environment)
+
+    def _approximate_sequential_plans(
+        self, rng: random.Random, mixing_steps: Optional[int]
+    ) -> Iterator[SequentialPlan]:
+        nodes, successors, _ = self._compact_dag()
+        n = len(nodes)
+        if n < 2:
+            mixing_steps = 0
+        elif mixing_steps is None:
+            mixing_steps = n * n
+        successor_sets = [frozenset(succ) for succ in successors]
+        order = list(range(n))
+        # half of the moves do nothing, so the chain is aperiodic
+        moves = 2 * (n - 1)
+        rand = rng.random
+        while True:
+            for _ in range(mixing_steps):
+                i = int(rand() * moves)
+                if i < n - 1:
+                    a, b = order[i], order[i + 1]
+                    # two adjacent actions are ordered by the plan only if they are linked
+                    if b not in successor_sets[a]:
+                        order[i], order[i + 1] = b, a
+            yield SequentialPlan([nodes[v] for v in order], self._environment)
+
+    def k_best_sequential_plans(
+        self,
+        k: int,
+        cost: Callable[[Optional[ActionInstance], ActionInstance], float],
+    ) -> Iterator[SequentialPlan]:
+        """
+        Returns an `Iterator` over the `k` cheapest `SequentialPlans` that respects the
+        ordering constraints given by this `PartialOrderPlan`, in order of increasing cost.
+
+        The cost of a `SequentialPlan` is the sum of `cost(previous, current)` over all its
+        `ActionInstances`, where `previous` is `None` for the first one; the costs must be
+        non-negative and `cost` is called once for every pair of `ActionInstances` that
+        can be executed one after the other.
+
+        The prefixes are explored with an A* search, using as admissible bound the sum
+        of the cheapest way of executing every remaining `ActionInstance`; between
+        prefixes with the same bound the longest one is preferred and every prefix
+        ending in the same `ActionInstance` after the same set of `ActionInstances` is
+        expanded at most `k` times, so the frontier stays small when many
+        linearizations have the same cost. Finding the cheapest linearization is
+        NP-hard in general, so the search can still be exponential when the bound
+        is far from the real cost.
+
+        :param k: The maximum number of `SequentialPlans` generated.
+        :param cost: The cost of executing an `ActionInstance` after another one.
+        :return: The `Iterator` over the cheapest `SequentialPlans`.
+        """
+        nodes, successors, predecessors = self._compact_dag()
+        n = len(nodes)
+        full = (1 << n) - 1
+        descendants = [0] * n
+        for v in reversed(range(n)):
+            for s in successors[v]:
+                descendants[v] |= (1 << s) | descendants[s]
+        # the cost of every pair that can be consecutive and the cheapest way of
+        # executing every index, whose sum over the remaining indexes is admissible
+        costs: Dict[Tuple[Optional[int], int], float] = {}
+        min_cost: List[float] = []
+        for v in range(n):
+            previous: List[Optional[int]] = [None] if predecessors[v] == 0 else []
+            previous.extend(
+                u for u in range(n) if u != v and not (descendants[v] >> u) & 1
+            )
+            for u in previous:
+                step_cost = cost(None if u is None else nodes[u], nodes[v])
+                if step_cost < 0:
+                    raise UPUsageError(
+                        f"The cost of {nodes[v]} after "
+                        f"{None if u is None else nodes[u]} is negative: {step_cost}"
+                    )
+                costs[(u, v)] = step_cost
+            min_cost.append(min(costs[(u, v)] for u in previous))
+        counter = count()
+        # the prefixes are stored as linked lists, so they share their common part
+        queue: List[
+            Tuple[float, int, int, float, float, int, Tuple[int, ...], Optional[Any]]
+        ] = [
+            (
+                sum(min_cost),
+                0,
+                next(counter),
+                0,
+                sum(min_cost),
+                0,
+                self._initial_available(),
+                None,
+            )
+        ]
+        expansions: Dict[Tuple[int, Optional[int]], int] = {}
+        found = 0
+        while queue and found < k:
+            _, depth, _, g, h, mask, available, prefix = heapq.heappop(queue)
+            if mask == full:
+                actions = []
+                while prefix is not None:
+                    v, prefix = prefix
+                    actions.append(nodes[v])
+                actions.reverse()
+                found += 1
+                yield SequentialPlan(actions, self._environment)
+                continue
+            last = None if prefix is None else prefix[0]
+            # k cheaper prefixes already reached this state, so none of the
+            # completions of this prefix is between the k cheapest plans
+            state = (mask, last)
+            times = expansions.get(state, 0)
+            if times >= k:
+                continue
+            expansions[state] = times + 1
+            for v in available:
+                new_g = g + costs[(last, v)]
+                new_mask, new_available = self._next_available(mask, available, v)
+                new_h = h - min_cost[v] if new_mask != full else 0
+                heapq.heappush(
+                    queue,
+                    (
+                        new_g + new_h,
+                        depth - 1,
+                        next(counter),
+                        new_g,
+                        new_h,
+                        new_mask,
+                        new_available,
+                        (v, prefix),
+                    ),
+                )
+
+    def _compact_dag(
+        self,
+    ) -> Tuple[List[ActionInstance], List[Tuple[int, ...]], List[int]]:
+        """
+        Returns the graph of this plan with the `ActionInstances` replaced by their
+        index in a topological order: the list of `ActionInstances`, the list of the
+        successors of every index and the bitmask of the predecessors of every index.
+        """
+        if self._dag is None:
+            nodes = list(nx.topological_sort(self._graph))
+            index = {ai: i for i, ai in enumerate(nodes)}
+            successors = [
+                tuple(index[s] for s in self._graph.successors(ai)) for ai in nodes
+            ]
+            predecessors = [0] * len(nodes)
+            for i, succ in enumerate(successors):
+                for s in succ:
+                    predecessors[s] |= 1 << i
+            self._dag = (nodes, successors, predecessors)
+        return self._dag
+
+    def _initial_available(self) -> Tuple[int, ...]:
+        _, _, predecessors = self._compact_dag()
+        return tuple(i for i, p in enumerate(predecessors) if p == 0)
+
+    def _next_available(
+        self, mask: int, available: Tuple[int, ...], v: int
+    ) -> Tuple[int, Tuple[int, ...]]:
+        """
+        Given the bitmask of the indexes already executed and the indexes that can be
+        executed next, returns the updated ones after the execution of `v`.
+        """
+        _, successors, predecessors = self._compact_dag()
+        mask |= 1 << v
+        new_available = [a for a in available if a != v]
+        new_available.extend(s for s in successors[v] if predecessors[s] & ~mask == 0)
+        return mask, tuple(new_available)
+
+    def _linearization_counts(
+        self, max_downsets: Optional[int] = None
+    ) -> Optional[Dict[int, int]]:
+        """
+        Returns the mapping from the bitmask of the indexes already executed to the
+        number of linearizations of the remaining `ActionInstances`, or `None` if
+        there are more than `max_downsets` bitmasks.
+        """
+        if self._counts is None:
+            if max_downsets is not None and max_downsets <= self._exceeded_downsets:
+                return None
+            nodes, _, _ = self._compact_dag()
+            counts = {(1 << len(nodes)) - 1: 1}
+            stack = [(0, self._initial_available())]
+            # the bitmasks found so far, tracked only to respect max_downsets
+            found = {0}
+            while stack:
+                mask, available = stack[-1]
+                if mask in counts:
+                    stack.pop()
+                    continue
+                children = [self._next_available(mask, available, v) for v in available]
+                missing = [child for child in children if child[0] not in counts]
+                if missing:
+                    stack.extend(missing)
+                    if max_downsets is not None:
+                        found.update(child_mask for child_mask, _ in missing)
+                        if len(found) > max_downsets:
+                            self._exceeded_downsets = max_downsets
+                            return None
+                else:
+                    counts[mask] = sum(counts[child_mask] for child_mask, _ in children)
+                    stack.pop()
+            self._counts = counts
+        return self._counts
+
     def get_neighbors(
         self, action_instance: ActionInstance
     ) -> Iterator[ActionInstance]:
@@ -21,7 +21,7 @@ import unified_planning.model.walkers as walkers
 from unified_planning.environment import Environment
 from unified_planning.exceptions import UPUsageError
 from unified_planning.model import FNode, InstantaneousAction, Expression
-from typing import Callable, Dict, Optional, Set, List, cast
+from typing import Callable, Dict, Optional, Set, List, Tuple, cast
 
 
 class SequentialPlan(plans.plan.Plan):
@@ -125,96 +125,126 @@ class SequentialPlan(plans.plan.Plan):
         - `AND` the other `ActionInstance` reads or writes on the same `grounded fluent` (reads means that one of his preconditions
             or one of his condition in a conditional effect depends on said fluent).
 
+        The fluents read and written by every action are computed once on the lifted
+        action and grounded by replacing the action parameters; the ordering constraints
+        are transitively reduced while they are collected.
+
         :param problem: The `problem` for which this `SequentialPlan` is created.
         :return: A `PartialOrderPlan` compatible with the given `problem`.
         """
-        subs = self._environment.substituter
-        simp = self._environment.simplifier
-        eqr = walkers.ExpressionQuantifiersRemover(self._environment)
-        fve = self._environment.free_vars_extractor
-        # last_modifier is the mapping from a grounded fluent to the last action instance that assigned a value to
-        # that fluent
-        last_modifier: Dict[FNode, "plans.plan.ActionInstance"] = {}
-        # all_required is the mapping from a grounded fluent to all the action instances that read the value of that
-        # fluent in their preconditions (or in the condition of their conditional effects)
-        all_required: Dict[FNode, List["plans.plan.ActionInstance"]] = {}
-        # graph stores the information gathered through the process
-        graph = nx.DiGraph()
-        for action_instance in self.actions:
-            graph.add_node(action_instance)
+        # lifted_fluents is the mapping from an action to the lifted fluents it
+        # reads and writes, computed the first time the action is met
+        lifted_fluents: Dict[
+            InstantaneousAction, Tuple[Tuple[FNode, ...], Tuple[FNode, ...]]
+        ] = {}
+        # last_modifier is the mapping from a grounded fluent to the index of the last action instance
+        # that assigned a value to that fluent
+        last_modifier: Dict[FNode, int] = {}
+        # readers is the mapping from a grounded fluent to the indexes of the action instances that read
+        # the value of that fluent in their preconditions (or in the condition of their conditional effects)
+        # after its last modifier; the previous ones are ordered before the last modifier
+        readers: Dict[FNode, List[int]] = {}
+        # predecessors[i] is the set of indexes of the action instances that must precede the i-th one
+        predecessors: List[Set[int]] = []
+        for i, action_instance in enumerate(self.actions):
             assert isinstance(action_instance.action, InstantaneousAction)
             inst_action = cast(InstantaneousAction, action_instance.action)
-
-            # required_fluents contains all the grounded fluents that this action_instance "reads"
-            required_fluents: Set[FNode] = set()
-            # same of required_fluents, but the fluents are lifted
-            lifted_required_fluents: Set[FNode] = set()
-            # add free vars of preconditions
-            for prec in inst_action.preconditions:
-                lifted_required_fluents |= fve.get(
-                    eqr.remove_quantifiers(prec, problem)
-                )
-            # add in the required_fluents all the free fluents this action instance deals with
-            for effect in inst_action.effects:
-                for eff in effect.expand_effect(problem):
-                    lifted_required_fluents |= fve.get(
-                        eqr.remove_quantifiers(eff.condition, problem)
-                    )
-                    lifted_required_fluents |= fve.get(
-                        eqr.remove_quantifiers(eff.fluent, problem)
-                    )
-                    lifted_required_fluents |= fve.get(
-                        eqr.remove_quantifiers(eff.value, problem)
-                    )
-
-            assignments: Dict[Expression, Expression] = dict(
+            lifted = lifted_fluents.get(inst_action, None)
+            if lifted is None:
+                lifted = self._lifted_read_and_written_fluents(inst_action, problem)
+                lifted_fluents[inst_action] = lifted
+            lifted_required_fluents, lifted_written_fluents = lifted
+            assignments = dict(
                 zip(inst_action.parameters, action_instance.actual_parameters)
             )
-            for lifted_fluent in lifted_required_fluents:
-                assert lifted_fluent.is_fluent_exp()
-                for (
-                    arg
-                ) in lifted_fluent.args:  # check that we don't have "nested" fluents
-                    if len(fve.get(eqr.remove_quantifiers(arg, problem))) != 0:
-                        raise UPUsageError(
-                            f"The partial deordering of a Sequential Plan does not allow the use of fluents inside the parameter of fluents!\nThe fluent: {lifted_fluent} does violates this contraint."
-                        )
-                required_fluents.add(
-                    simp.simplify(subs.substitute(lifted_fluent, assignments))
-                )
 
-            # for every required fluent, add this action instance to the list of action instances that requires this fluent
-            # and order the current action instance after the last modifier of the fluent
-            for required_fluent in required_fluents:
-                action_instance_list = all_required.setdefault(required_fluent, [])
-                action_instance_list.append(action_instance)
+            preds: Set[int] = set()
+            # order the current action instance after the last modifier of every fluent it reads
+            for lifted_fluent in lifted_required_fluents:
+                required_fluent = self._ground_fluent(lifted_fluent, assignments)
+                readers.setdefault(required_fluent, []).append(i)
                 required_fluent_last_modifier = last_modifier.get(required_fluent, None)
                 if required_fluent_last_modifier is not None:
-                    assert (
-                        required_fluent_last_modifier != action_instance
-                    )  # sanity check
-                    graph.add_edge(required_fluent_last_modifier, action_instance)
+                    preds.add(required_fluent_last_modifier)
 
             # for every effect, set current action instance as the last modifier and the current action instance is ordered
             # after every action instance that requires a fluent the current action instance modifies
-            for effect in inst_action.effects:
-                for eff in effect.expand_effect(problem):
-                    assert eff.fluent.is_fluent_exp()
-                    grounded_fluent = simp.simplify(
-                        subs.substitute(eff.fluent, assignments)
-                    )
-                    last_modifier[grounded_fluent] = action_instance
-                    dependent_action_instance_list = all_required.setdefault(
-                        grounded_fluent, []
-                    )
-                    for dependent_action_instance in dependent_action_instance_list:
-                        if dependent_action_instance != action_instance:
-                            graph.add_edge(dependent_action_instance, action_instance)
+            for lifted_fluent in lifted_written_fluents:
+                grounded_fluent = self._ground_fluent(lifted_fluent, assignments)
+                last_modifier[grounded_fluent] = i
+                # the written fluents are also read, so the following readers
+                # are ordered after this action instance and can be forgotten
+                preds.update(readers.pop(grounded_fluent, ()))
+            preds.discard(i)
+            predecessors.append(preds)
 
-        assert nx.is_directed_acyclic_graph(graph)
-        # remove redundant edges and return the up.plans.partial_order_plan.PartialOrderPlan structure.
+        # Remove the redundant constraints; the indexes are a topological order of
+        # the graph, so a predecessor is redundant if it is an ancestor of a
+        # greater predecessor. The ancestors of every node are stored as a bitmask.
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.actions)
+        ancestors: List[int] = []
+        for i, preds in enumerate(predecessors):
+            reachable = 0
+            for p in sorted(preds, reverse=True):
+                if not (reachable >> p) & 1:
+                    graph.add_edge(self.actions[p], self.actions[i])
+                    reachable |= ancestors[p] | (1 << p)
+            ancestors.append(reachable)
         return up.plans.partial_order_plan.PartialOrderPlan(
-            {}, self._environment, nx.transitive_reduction(graph)
+            {}, self._environment, graph
+        )
+
+    def _lifted_read_and_written_fluents(
+        self,
+        action: InstantaneousAction,
+        problem: "up.model.mixins.ObjectsSetMixin",
+    ) -> Tuple[Tuple[FNode, ...], Tuple[FNode, ...]]:
+        """
+        Returns the lifted fluents read and the lifted fluents written by the given
+        action; the fluents written are also read.
+        """
+        eqr = walkers.ExpressionQuantifiersRemover(self._environment)
+        fve = self._environment.free_vars_extractor
+        read_fluents: Set[FNode] = set()
+        written_fluents: Set[FNode] = set()
+        # add free vars of preconditions
+        for prec in action.preconditions:
+            read_fluents |= fve.get(eqr.remove_quantifiers(prec, problem))
+        # add all the free fluents this action deals with
+        for effect in action.effects:
+            for eff in effect.expand_effect(problem):
+                assert eff.fluent.is_fluent_exp()
+                read_fluents |= fve.get(eqr.remove_quantifiers(eff.condition, problem))
+                read_fluents |= fve.get(eqr.remove_quantifiers(eff.fluent, problem))
+                read_fluents |= fve.get(eqr.remove_quantifiers(eff.value, problem))
+                written_fluents.add(eff.fluent)
+        for lifted_fluent in read_fluents:
+            assert lifted_fluent.is_fluent_exp()
+            for arg in lifted_fluent.args:  # check that we don't have "nested" fluents
+                if len(fve.get(eqr.remove_quantifiers(arg, problem))) != 0:
+                    raise UPUsageError(
+                        f"The partial deordering of a Sequential Plan does not allow the use of fluents inside the parameter of fluents!\nThe fluent: {lifted_fluent} does violates this contraint."
+                    )
+        return tuple(read_fluents), tuple(written_fluents)
+
+    def _ground_fluent(
+        self, lifted_fluent: FNode, assignments: Dict[Expression, Expression]
+    ) -> FNode:
+        """Returns the given lifted fluent with the action parameters replaced by the given assignments."""
+        args = []
+        for arg in lifted_fluent.args:
+            if arg.is_parameter_exp():
+                args.append(assignments[arg.parameter()])
+            elif arg.is_constant():
+                args.append(arg)
+            else:
+                # complex argument, fall back to the substituter and the simplifier
+                subs = self._environment.substituter
+                simp = self._environment.simplifier
+                return simp.simplify(subs.substitute(lifted_fluent, assignments))
+        return self._environment.expression_manager.FluentExp(
+            lifted_fluent.fluent(), args
         )
 
     def convert_to(
@@ -209,7 +209,12 @@ class STNPlan(plans.plan.Plan):
         end_plan = STNPlanNode(TimepointKind.GLOBAL_END)
         assert start_plan is not None and end_plan is not None
         f0 = Fraction(0)
-        self._stn.insert_interval(start_plan, end_plan, left_bound=f0)
+        # The constraints are added in a single batch, so the distances
+        # in the DeltaSTN are propagated only once; every constraint
+        # (x, y, b) represents x - y <= b
+        stn_constraints: List[Tuple[STNPlanNode, STNPlanNode, Fraction]] = [
+            (start_plan, end_plan, f0)
+        ]
         for a_node, lower_bound, upper_bound, b_node in gen:
             if (
                 a_node.environment is not None
@@ -221,25 +226,26 @@ class STNPlan(plans.plan.Plan):
                 raise UPUsageError(
                     "Different environments given inside the same STNPlan!"
                 )
-            if a_node != start_plan:
-                self._stn.insert_interval(start_plan, a_node, left_bound=f0)
-            if a_node != end_plan:
-                self._stn.insert_interval(a_node, end_plan, left_bound=f0)
-            if b_node != start_plan:
-                self._stn.insert_interval(start_plan, b_node, left_bound=f0)
-            if b_node != end_plan:
-                self._stn.insert_interval(b_node, end_plan, left_bound=f0)
-            lb = None
-            if isinstance(lower_bound, Fraction):
-                lb = lower_bound
-            elif lower_bound is not None:
-                lb = Fraction(float(lower_bound))
-            ub = None
-            if isinstance(upper_bound, Fraction):
-                ub = upper_bound
-            elif upper_bound is not None:
-                ub = Fraction(float(upper_bound))
-            self._stn.insert_interval(a_node, b_node, left_bound=lb, right_bound=ub)
+            for node in (a_node, b_node):
+                if node != start_plan:
+                    stn_constraints.append((start_plan, node, f0))
+                if node != end_plan:
+                    stn_constraints.append((node, end_plan, f0))
+            if lower_bound is not None:
+                lb = (
+                    lower_bound
+                    if isinstance(lower_bound, Fraction)
+                    else Fraction(float(lower_bound))
+                )
+                stn_constraints.append((a_node, b_node, -lb))
+            if upper_bound is not None:
+                ub = (
+                    upper_bound
+                    if isinstance(upper_bound, Fraction)
+                    else Fraction(float(upper_bound))
+                )
+                stn_constraints.append((b_node, a_node, ub))
+        self._stn.add_many(stn_constraints)
 
     def __repr__(self) -> str:
         return str(self._stn)
@@ -438,11 +444,13 @@ class STNPlan(plans.plan.Plan):
                     left_nodes.setdefault(r_node, set()).add((l_node, sum_dist))
 
         new_stn: DeltaSimpleTemporalNetwork = DeltaSimpleTemporalNetwork()
-        for r_node, constraints in new_constraints.items():
-            if not r_node in nodes_to_remove:
-                for bound, l_node in constraints:
-                    if not l_node in nodes_to_remove:
-                        new_stn.add(r_node, l_node, bound)
+        new_stn.add_many(
+            (r_node, l_node, bound)
+            for r_node, constraints in new_constraints.items()
+            if not r_node in nodes_to_remove
+            for bound, l_node in constraints
+            if not l_node in nodes_to_remove
+        )
 
         return STNPlan(constraints={}, environment=self._environment, _stn=new_stn)
 
@@ -626,6 +626,7 @@ def Compiler(
     compilation_kinds: Optional[
         Sequence[Union["up.engines.CompilationKind", str]]
     ] = None,
+    compose_map_back: bool = False,
 ) -> "up.engines.engine.Engine":
     """
     Returns a compiler or a pipeline of compilers.
@@ -643,6 +644,10 @@ def Compiler(
         | e.g. ``Compiler(names=['up_quantifiers_remover', 'up_grounder'], params=[{'opt1': 'val1'}, {'opt2': 'val2'}], compilation_kinds=[QUANTIFIERS_REMOVING, GROUNDING])``
     *   | using ``problem_kind`` and ``compilation_kinds`` parameters.
         | e.g. ``Compiler(problem_kind=problem.kind, compilation_kinds=[QUANTIFIERS_REMOVING, GROUNDING])``
+
+    When a pipeline of compilers is returned, the ``compose_map_back`` flag derives the kinds of the intermediate problems and composes
+    the map back functions of the compilers, as documented in the
+    :class:`~unified_planning.engines.compilers.CompilersPipeline`.
     """
     return get_environment().factory.Compiler(
         name=name,
@@ -651,6 +656,7 @@ def Compiler(
         problem_kind=problem_kind,
         compilation_kind=compilation_kind,
         compilation_kinds=compilation_kinds,
+        compose_map_back=compose_map_back,
     )
 
 
@@ -699,6 +699,21 @@ class TestANMLReader(unittest_TestCase):
         reader.parse_problem(problem_filename)
         _problem = reader.parse_problem(problem_filename)
 
+    def test_concurrent_parsing(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        # every thread populates its own cached grammar
+        filenames = [
+            os.path.join(ANML_FILES_PATH, name)
+            for name in ("match.anml", "safe_road.anml", "tils.anml", "forall.anml")
+        ]
+        expected = [ANMLReader().parse_problem(f) for f in filenames]
+        with ThreadPoolExecutor(4) as executor:
+            problems = list(
+                executor.map(lambda f: ANMLReader().parse_problem(f), filenames * 3)
+            )
+        self.assertEqual(expected * 3, problems)
+
     def test_anml_io(self):
         for example in self.problems.values():
             problem = example.problem
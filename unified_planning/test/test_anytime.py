@@ -21,6 +21,7 @@ from unified_planning.model.problem_kind import (
 )
 from unified_planning.io import PDDLReader
 from unified_planning.model.metrics import MinimizeSequentialPlanLength
+from unified_planning.plans import SequentialPlan
 from unified_planning.test import (
     unittest_TestCase,
     main,
@@ -57,3 +58,34 @@ class TestAnytimePlanning(unittest_TestCase):
 
         self.assertEqual(len(solutions), 2)
         self.assertGreater(len(solutions[0].actions), len(solutions[1].actions))
+
+    def test_incremental_plan_parsing(self):
+        from queue import Queue
+        from unified_planning.engines.pddl_anytime_planner import Writer
+        from unified_planning.io import PDDLWriter
+        from unified_planning.test.pddl.enhsp import ENHSP
+
+        reader = PDDLReader()
+        domain_filename = os.path.join(PDDL_DOMAINS_PATH, "counters", "domain.pddl")
+        problem_filename = os.path.join(PDDL_DOMAINS_PATH, "counters", "problem.pddl")
+        problem = reader.parse_problem(domain_filename, problem_filename)
+        increment = problem.action("increment")
+        c0, c1 = problem.object("c0"), problem.object("c1")
+
+        planner = ENHSP()
+        planner._writer = PDDLWriter(problem)
+        planner._writer.get_domain()
+        planner._writer.get_problem()
+        queue: Queue = Queue()
+        writer = Writer(None, queue, planner, problem)
+        # the output of the engine is parsed as it is printed
+        writer.write("Found Plan:\n0.0: (increment c0)\n")
+        self.assertEqual(len(writer.current_plan), 1)
+        self.assertTrue(queue.empty())
+        writer.write("1.0: (increment c1)\nPlan-Length:2\n")
+        self.assertEqual(writer.current_plan, [])
+        result = queue.get_nowait()
+        self.assertEqual(
+            result.status, up.engines.PlanGenerationResultStatus.INTERMEDIATE
+        )
+        self.assertEqual(result.plan, SequentialPlan([increment(c0), increment(c1)]))
@@ -0,0 +1,180 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+from itertools import product
+from unified_planning.shortcuts import *
+from unified_planning.engines import (
+    CompilationCache,
+    CompilationKind,
+    CompilerResult,
+)
+from unified_planning.engines.compilers import Grounder, QuantifiersRemover
+from unified_planning.model.multi_agent import MultiAgentProblem
+from unified_planning.plans import ActionInstance
+from unified_planning.test import unittest_TestCase, skipIfModuleNotInstalled
+from unified_planning.test.examples import get_example_problems
+
+
+class TestCompilationCache(unittest_TestCase):
+    @skipIfModuleNotInstalled("google.protobuf")
+    def setUp(self):
+        unittest_TestCase.setUp(self)
+        self.problems = get_example_problems()
+
+    def _assert_same_map_back(self, res, cached_res):
+        for cached_action in cached_res.problem.actions:
+            action = res.problem.action(cached_action.name)
+            objects = [res.problem.objects(p.type) for p in action.parameters]
+            for params in product(*objects):
+                ai = res.map_back_action_instance(ActionInstance(action, params))
+                cached_ai = cached_res.map_back_action_instance(
+                    ActionInstance(cached_action, params)
+                )
+                self.assertEqual(ai is None, cached_ai is None)
+                if ai is not None:
+                    self.assertEqual(ai.action, cached_ai.action)
+                    self.assertEqual(ai.actual_parameters, cached_ai.actual_parameters)
+
+    def test_hit_and_miss(self):
+        factory = get_environment().factory
+        with tempfile.TemporaryDirectory() as tempdir:
+            try:
+                factory.compilation_cache = CompilationCache(tempdir)
+                for name, kind in [
+                    ("robot_loader_adv", CompilationKind.GROUNDING),
+                    ("basic_conditional", CompilationKind.CONDITIONAL_EFFECTS_REMOVING),
+                    ("basic_forall", CompilationKind.QUANTIFIERS_REMOVING),
+                ]:
+                    problem = self.problems[name].problem
+                    with Compiler(
+                        problem_kind=problem.kind, compilation_kind=kind
+                    ) as c:
+                        res = c.compile(problem)
+                    self.assertEqual(factory.compilation_cache.misses, 1)
+                    self.assertEqual(factory.compilation_cache.hits, 0)
+
+                    # a new cache on the same directory simulates a process restart
+                    factory.compilation_cache = CompilationCache(tempdir)
+                    with Compiler(
+                        problem_kind=problem.kind, compilation_kind=kind
+                    ) as c:
+                        cached_res = c.compile(problem)
+                    self.assertEqual(factory.compilation_cache.misses, 0)
+                    self.assertEqual(factory.compilation_cache.hits, 1)
+                    self.assertEqual(res.problem, cached_res.problem)
+                    self.assertEqual(res.engine_name, cached_res.engine_name)
+                    self._assert_same_map_back(res, cached_res)
+                    factory.compilation_cache = CompilationCache(tempdir)
+            finally:
+                factory.compilation_cache = None
+
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            cache = CompilationCache(tempdir, max_size=1)
+            problem = self.problems["robot_loader_adv"].problem
+            with Compiler(name="up_grounder") as grounder:
+                grounder.compilation_cache = cache
+                grounder.compile(problem, CompilationKind.GROUNDING)
+                grounder.compile(problem, CompilationKind.GROUNDING)
+            self.assertEqual(cache.misses, 2)
+            self.assertEqual(cache.hits, 0)
+            self.assertEqual(cache.evictions, 2)
+            self.assertEqual(cache.size, 0)
+
+    def test_configuration(self):
+        problem = self.problems["robot_loader_adv"].problem
+        with tempfile.TemporaryDirectory() as tempdir:
+            cache = CompilationCache(tempdir)
+            grounder = Grounder()
+            grounder.compilation_cache = cache
+            res = grounder.compile(problem)
+            self.assertGreater(len(res.problem.actions), 0)
+            # a differently configured grounder does not share the entry
+            empty_grounder = Grounder(
+                grounding_actions_map={a: [] for a in problem.actions}
+            )
+            empty_grounder.compilation_cache = cache
+            empty_res = empty_grounder.compile(problem)
+            self.assertEqual(len(empty_res.problem.actions), 0)
+            self.assertEqual(cache.misses, 2)
+            self.assertEqual(cache.hits, 0)
+            cached_res = Grounder()
+            cached_res.compilation_cache = cache
+            self.assertEqual(cached_res.compile(problem).problem, res.problem)
+            self.assertEqual(cache.hits, 1)
+
+    def test_unsupported_problems(self):
+        problem = self.problems["robot_loader_adv"].problem
+        with tempfile.TemporaryDirectory() as tempdir:
+            cache = CompilationCache(tempdir)
+            grounder = Grounder()
+            grounder.compilation_cache = cache
+            res = grounder.compile(problem)
+            # the results of the other problem types are refused up front
+            key = cache.key(problem, grounder, CompilationKind.GROUNDING)
+            self.assertFalse(
+                cache.put(
+                    key,
+                    CompilerResult(
+                        MultiAgentProblem("ma"),
+                        res.map_back_action_instance,
+                        grounder.name,
+                    ),
+                )
+            )
+            self.assertIsNone(
+                cache.key(MultiAgentProblem("ma"), grounder, CompilationKind.GROUNDING)
+            )
+            # a corrupted entry is a miss and it is removed
+            path = os.path.join(tempdir, f"{key}.pb")
+            with open(path, "wb") as f:
+                f.write(b"corrupted")
+            self.assertIsNone(cache.get(key, problem))
+            self.assertFalse(os.path.exists(path))
+
+    def test_opt_in(self):
+        problem = self.problems["basic_forall"].problem
+        keys = []
+
+        class CountingCache(CompilationCache):
+            def key(self, *args):
+                keys.append(args)
+                return CompilationCache.key(self, *args)
+
+        class OpaqueQuantifiersRemover(QuantifiersRemover):
+            def _compilation_configuration(self):
+                return None
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            cache = CountingCache(tempdir)
+            remover = QuantifiersRemover()
+            remover.compilation_cache = cache
+            remover.compile(problem)
+            # a miss computes the key once, for both the lookup and the store
+            self.assertEqual(len(keys), 1)
+            self.assertEqual(cache.misses, 1)
+            remover.compile(problem)
+            self.assertEqual(cache.hits, 1)
+            # the compilers that do not give their configuration are not cached
+            opaque = OpaqueQuantifiersRemover()
+            opaque.compilation_cache = cache
+            self.assertIsNone(
+                cache.key(problem, opaque, CompilationKind.QUANTIFIERS_REMOVING)
+            )
+            opaque.compile(problem)
+            opaque.compile(problem)
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual(cache.misses, 3)
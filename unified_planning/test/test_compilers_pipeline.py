@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import warnings
 from unified_planning.shortcuts import *
 from unified_planning.model.problem_kind import (
     classical_kind,
@@ -24,6 +25,13 @@ from unified_planning.test import (
 )
 from unified_planning.test.examples import get_example_problems
 from unified_planning.engines import CompilationKind
+from unified_planning.engines.compilers import (
+    CompilersPipeline,
+    NegativeConditionsRemover,
+    QuantifiersRemover,
+)
+from unified_planning.exceptions import UPUsageError
+from unified_planning.plans import ActionInstance
 
 
 class TestCompilersPipeline(unittest_TestCase):
@@ -59,3 +67,78 @@ class TestCompilersPipeline(unittest_TestCase):
                 problem_kind=problem.kind, plan_kind=new_plan.kind
             ) as pv:
                 self.assertTrue(pv.validate(problem, new_plan))
+
+    def test_composed_map_back(self):
+        kinds = [
+            CompilationKind.QUANTIFIERS_REMOVING,
+            CompilationKind.CONDITIONAL_EFFECTS_REMOVING,
+            CompilationKind.DISJUNCTIVE_CONDITIONS_REMOVING,
+            CompilationKind.NEGATIVE_CONDITIONS_REMOVING,
+        ]
+        for name in [
+            "basic_conditional",
+            "complex_conditional",
+            "basic_forall",
+        ]:
+            problem = self.problems[name].problem
+            with Compiler(problem_kind=problem.kind, compilation_kinds=kinds) as c:
+                res = c.compile(problem)
+            with Compiler(
+                problem_kind=problem.kind,
+                compilation_kinds=kinds,
+                compose_map_back=True,
+            ) as composed_compiler:
+                self.assertTrue(composed_compiler.compose_map_back)
+                composed_res = composed_compiler.compile(problem)
+            self.assertEqual(res.problem, composed_res.problem)
+            self.assertEqual(res.problem.kind, composed_res.problem.kind)
+
+            for composed_action in composed_res.problem.actions:
+                params = []
+                for p in composed_action.parameters:
+                    params.append(composed_res.problem.objects(p.type)[0])
+                composed_ai = ActionInstance(composed_action, params)
+                ai = ActionInstance(res.problem.action(composed_action.name), params)
+                mapped_back = res.map_back_action_instance(ai)
+                composed_mapped_back = composed_res.map_back_action_instance(
+                    composed_ai
+                )
+                self.assertEqual(mapped_back is None, composed_mapped_back is None)
+                if mapped_back is not None:
+                    self.assertEqual(mapped_back.action, composed_mapped_back.action)
+                    self.assertEqual(
+                        mapped_back.actual_parameters,
+                        composed_mapped_back.actual_parameters,
+                    )
+                    self.assertEqual(
+                        composed_mapped_back.action,
+                        problem.action(composed_mapped_back.action.name),
+                    )
+
+    def test_composed_map_back_checks(self):
+        # the undefined initial values are not supported by the compilers
+        problem = self.problems["basic_undef_bool"].problem
+        compilers = [
+            QuantifiersRemover(),
+            NegativeConditionsRemover(),
+        ]
+        compilers[0].default = CompilationKind.QUANTIFIERS_REMOVING
+        compilers[1].default = CompilationKind.NEGATIVE_CONDITIONS_REMOVING
+        pipeline = CompilersPipeline(compilers, compose_map_back=True)
+        with self.assertRaises(UPUsageError):
+            pipeline.compile(problem)
+        for compiler in compilers:
+            compiler.error_on_failed_checks = False
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            res = pipeline.compile(problem)
+        self.assertEqual(len(caught), 2)
+        self.assertIsNotNone(res.problem)
+        for compiler in compilers:
+            compiler.error_on_failed_checks = True
+            compiler.skip_checks = True
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            skipped_res = pipeline.compile(problem)
+        self.assertEqual(len(caught), 0)
+        self.assertEqual(skipped_res.problem, res.problem)
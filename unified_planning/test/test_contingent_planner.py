@@ -0,0 +1,319 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from itertools import product
+import unified_planning as up
+from unified_planning.shortcuts import *
+from unified_planning.engines import (
+    ContingentPlanner,
+    PlanGenerationResultStatus,
+    UPSequentialSimulator,
+)
+from unified_planning.engines.policy_evaluator import PolicyEvaluator
+from unified_planning.exceptions import UPUsageError
+from unified_planning.io import PDDLReader, PDDLWriter
+from unified_planning.model import ContingentProblem, SensingAction
+from unified_planning.plans import (
+    ContingentPlan,
+    ContingentPlanExecutor,
+    ContingentPlanNode,
+)
+from unified_planning.test import unittest_TestCase, main
+
+
+FILE_PATH = os.path.dirname(os.path.abspath(__file__))
+CONTINGENT_PDDL_DOMAINS_PATH = os.path.join(FILE_PATH, "contingent_pddl")
+
+
+class TestContingentPlanner(unittest_TestCase):
+    def _treasure_problem(self, sensing: bool = True):
+        # the treasure is in one of three rooms and must be brought back to r0
+        Room = UserType("Room")
+        robot_at = Fluent("robot_at", BoolType(), r=Room)
+        treasure_at = Fluent("treasure_at", BoolType(), r=Room)
+        holding = Fluent("holding")
+        delivered = Fluent("delivered")
+        problem = ContingentProblem("treasure")
+        problem.add_fluent(robot_at, default_initial_value=False)
+        problem.add_fluent(treasure_at, default_initial_value=False)
+        problem.add_fluent(holding, default_initial_value=False)
+        problem.add_fluent(delivered, default_initial_value=False)
+        rooms = [Object(f"r{i}", Room) for i in range(4)]
+        problem.add_objects(rooms)
+
+        move = InstantaneousAction("move", f=Room, t=Room)
+        f, t = move.parameters
+        move.add_precondition(robot_at(f))
+        move.add_precondition(Not(robot_at(t)))
+        move.add_effect(robot_at(f), False)
+        move.add_effect(robot_at(t), True)
+        pick = InstantaneousAction("pick", r=Room)
+        (r,) = pick.parameters
+        pick.add_precondition(robot_at(r))
+        pick.add_precondition(treasure_at(r))
+        pick.add_effect(treasure_at(r), False)
+        pick.add_effect(holding, True)
+        deliver = InstantaneousAction("deliver")
+        deliver.add_precondition(robot_at(rooms[0]))
+        deliver.add_precondition(holding)
+        deliver.add_effect(delivered, True)
+        problem.add_actions([move, pick, deliver])
+        if sensing:
+            sense = SensingAction("sense", r=Room)
+            (r,) = sense.parameters
+            sense.add_precondition(robot_at(r))
+            sense.add_observed_fluent(treasure_at(r))
+            problem.add_action(sense)
+
+        problem.set_initial_value(robot_at(rooms[0]), True)
+        problem.add_oneof_initial_constraint([treasure_at(room) for room in rooms[1:]])
+        problem.add_goal(delivered)
+        return problem
+
+    def _initial_states(self, problem):
+        # every assignment of the hidden fluents satisfying the oneof constraints
+        em = problem.environment.expression_manager
+        for choice in product(*problem.oneof_constraints):
+            values = dict(problem.initial_values)
+            for constraint in problem.oneof_constraints:
+                for fe in constraint:
+                    values[fe] = em.FALSE()
+            for fe in choice:
+                values[fe] = em.TRUE()
+            yield up.model.UPState(values)
+
+    def _assert_valid(self, problem, plan):
+        se = up.model.walkers.StateEvaluator(problem)
+        for state in self._initial_states(problem):
+            node = plan.root_node
+            while node is not None:
+                action = node.action_instance.action
+                subs = dict(
+                    zip(action.parameters, node.action_instance.actual_parameters)
+                )
+                for c in action.preconditions:
+                    self.assertTrue(se.evaluate(c.substitute(subs), state).is_true())
+                updates = {}
+                for e in action.effects:
+                    if se.evaluate(e.condition.substitute(subs), state).is_true():
+                        updates[e.fluent.substitute(subs)] = se.evaluate(
+                            e.value.substitute(subs), state
+                        )
+                state = state.make_child(updates)
+                next_node = None
+                for observation, child in node.children:
+                    if all(state.get_value(fe) == v for fe, v in observation.items()):
+                        next_node = child
+                        break
+                node = next_node
+            for goal in problem.goals:
+                self.assertTrue(se.evaluate(goal, state).is_true())
+
+    def _execute(self, problem, plan):
+        # runs the plan with the executor in every world, returning the final states
+        # and the number of actions executed
+        se = up.model.walkers.StateEvaluator(problem)
+        executor = ContingentPlanExecutor(plan)
+        for state in self._initial_states(problem):
+            executor.reset()
+            ai = executor.current_action_instance
+            steps = 0
+            while ai is not None:
+                steps += 1
+                subs = dict(zip(ai.action.parameters, ai.actual_parameters))
+                updates = {}
+                for e in ai.action.effects:
+                    if se.evaluate(e.condition.substitute(subs), state).is_true():
+                        updates[e.fluent.substitute(subs)] = se.evaluate(
+                            e.value.substitute(subs), state
+                        )
+                state = state.make_child(updates)
+                observation = {}
+                if isinstance(ai.action, SensingAction):
+                    for fe in ai.action.observed_fluents:
+                        fe = fe.substitute(subs)
+                        observation[fe] = state.get_value(fe)
+                ai = executor.step(observation)
+            yield state, steps
+
+    def test_treasure(self):
+        problem = self._treasure_problem()
+        with OneshotPlanner(name="up_contingent_planner") as planner:
+            self.assertTrue(planner.supports(problem.kind))
+            res = planner.solve(problem)
+        self.assertEqual(res.status, PlanGenerationResultStatus.SOLVED_SATISFICING)
+        self._assert_valid(problem, res.plan)
+        # the branches picking the treasure meet again in r0, so the plan is a DAG
+        parents = {}
+        stack = [res.plan.root_node]
+        while stack:
+            node = stack.pop()
+            for _, child in node.children:
+                if id(child) not in parents:
+                    stack.append(child)
+                parents.setdefault(id(child), set()).add(id(node))
+        self.assertTrue(any(len(p) > 1 for p in parents.values()))
+
+    def test_possible_worlds(self):
+        problem = self._treasure_problem()
+        # a shortcut to the goal, available only in a lucky room
+        Room = problem.user_type("Room")
+        lucky = Fluent("lucky", BoolType(), r=Room)
+        problem.add_fluent(lucky, default_initial_value=False)
+        shortcut = InstantaneousAction("shortcut", r=Room)
+        shortcut.add_precondition(lucky(shortcut.parameter("r")))
+        shortcut.add_effect(problem.fluent("delivered"), True)
+        problem.add_action(shortcut)
+        r0 = problem.object("r0")
+        problem.add_unknown_initial_constraint(lucky(r0))
+        assignments = list(problem.initial_assignments())
+        # the treasure is in one of the three rooms and lucky is unknown
+        self.assertEqual(len(assignments), 6)
+        treasure_at = problem.fluent("treasure_at")
+        for assignment in assignments:
+            self.assertEqual(
+                sum(assignment[treasure_at(r)] for r in problem.all_objects[1:]), 1
+            )
+
+        copy, original_actions = problem.fully_observable_problem()
+        self.assertNotIsInstance(copy, ContingentProblem)
+        self.assertEqual(
+            [original_actions[a] for a in copy.actions], list(problem.actions)
+        )
+        self.assertFalse(any(isinstance(a, SensingAction) for a in copy.actions))
+        # lucky is static in the copy, but its initial value in r0 is a placeholder
+        # that must not be used to simplify the actions
+        state = UPSequentialSimulator(copy).get_initial_state()
+        state = state.make_child({lucky(r0): TRUE()})
+        for hidden_fluents, applicable in [((), False), ({treasure_at, lucky}, True)]:
+            simulator = UPSequentialSimulator(copy, hidden_fluents=hidden_fluents)
+            actions = [a for a, _, _ in simulator.expand([state])[0]]
+            self.assertEqual(copy.action("shortcut") in actions, applicable)
+
+    def test_plan_dag(self):
+        problem = self._treasure_problem()
+        em = problem.environment.expression_manager
+        with OneshotPlanner(name="up_contingent_planner") as planner:
+            plan = planner.solve(problem).plan
+
+        def copy_tree(node, negate=False):
+            # expands the DAG into a tree, optionally negating the observations
+            res = ContingentPlanNode(node.action_instance)
+            for o, c in node.children:
+                if negate:
+                    o = {k: em.Not(v).simplify() for k, v in o.items()}
+                res.add_child(o, copy_tree(c, negate))
+            return res
+
+        count_nodes = lambda p: len({id(n) for n in _iterate_nodes(p.root_node)})
+        tree = ContingentPlan(copy_tree(plan.root_node), problem.environment)
+        self.assertGreater(count_nodes(tree), count_nodes(plan))
+        self.assertEqual(tree, plan)
+        self.assertEqual(hash(tree), hash(plan))
+        negated = ContingentPlan(copy_tree(plan.root_node, True), problem.environment)
+        self.assertNotEqual(negated, plan)
+
+        compact = tree.compact()
+        self.assertEqual(compact, plan)
+        self.assertEqual(count_nodes(compact), count_nodes(plan))
+        self.assertEqual(count_nodes(negated.compact()), count_nodes(plan))
+
+        lengths = []
+        for state, steps in self._execute(problem, compact):
+            self.assertTrue(state.get_value(problem.fluent("delivered")()).is_true())
+            lengths.append(steps)
+        # the three worlds are equally likely
+        evaluation = PolicyEvaluator(problem).evaluate(compact)
+        self.assertAlmostEqual(evaluation.success_probability, 1)
+        self.assertAlmostEqual(evaluation.expected_cost, sum(lengths) / 3)
+
+        # the costs of the metric are used, sensing actions included
+        deliver, sense = problem.action("deliver"), problem.action("sense")
+        costs = {deliver: 10, sense: 2}
+        problem.add_quality_metric(MinimizeActionCosts(costs, default=1))
+        costed = PolicyEvaluator(problem).evaluate(compact)
+        expected = PolicyEvaluator(
+            problem, lambda action, params: costs.get(action, 1)
+        ).evaluate(compact)
+        self.assertAlmostEqual(costed.expected_cost, expected.expected_cost)
+        self.assertGreater(costed.expected_cost, evaluation.expected_cost + 9)
+
+    def test_plan_io(self):
+        problem = self._treasure_problem()
+        with OneshotPlanner(name="up_contingent_planner") as planner:
+            plan = planner.solve(problem).plan
+        writer = PDDLWriter(problem)
+        plan_str = writer.get_plan(plan)
+        # the shared nodes are written once
+        nodes = {id(n) for n in _iterate_nodes(plan.root_node)}
+        self.assertEqual(
+            len([l for l in plan_str.splitlines() if "->" not in l]), len(nodes)
+        )
+        self.assertIn("(not (treasure_at ", plan_str)
+        parsed = PDDLReader().parse_plan_string(problem, plan_str)
+        self.assertEqual(parsed, plan)
+        parsed = PDDLReader().parse_plan_string(
+            problem, plan_str, writer.get_item_named
+        )
+        self.assertEqual(parsed, plan)
+        self.assertEqual(writer.get_plan(parsed), plan_str)
+
+    def test_unsolvable(self):
+        problem = self._treasure_problem(sensing=False)
+        with OneshotPlanner(name="up_contingent_planner") as planner:
+            res = planner.solve(problem)
+        self.assertEqual(res.status, PlanGenerationResultStatus.UNSOLVABLE_PROVEN)
+        self.assertIsNone(res.plan)
+
+        problem = self._treasure_problem()
+        with OneshotPlanner(
+            name="up_contingent_planner", params={"max_depth": 3}
+        ) as planner:
+            res = planner.solve(problem)
+        self.assertEqual(res.status, PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY)
+        with OneshotPlanner(
+            name="up_contingent_planner", params={"max_worlds": 5}
+        ) as planner:
+            res = planner.solve(problem)
+        self.assertEqual(res.status, PlanGenerationResultStatus.MEMOUT)
+        with self.assertRaises(UPUsageError):
+            ContingentPlanner(max_depth=0)
+
+    def test_logistic_conf(self):
+        reader = PDDLReader()
+        domain_filename = os.path.join(
+            CONTINGENT_PDDL_DOMAINS_PATH, "logistic_conf", "domain.pddl"
+        )
+        problem_filename = os.path.join(
+            CONTINGENT_PDDL_DOMAINS_PATH, "logistic_conf", "problem.pddl"
+        )
+        problem = reader.parse_problem(domain_filename, problem_filename)
+        with OneshotPlanner(name="up_contingent_planner") as planner:
+            res = planner.solve(problem)
+        self.assertEqual(res.status, PlanGenerationResultStatus.SOLVED_SATISFICING)
+        self.assertGreaterEqual(int(res.metrics["generated_worlds"]), 8)
+        self._assert_valid(problem, res.plan)
+
+
+def _iterate_nodes(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(c for _, c in node.children)
+
+
+if __name__ == "__main__":
+    main()
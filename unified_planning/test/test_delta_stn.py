@@ -0,0 +1,80 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import random
+from unified_planning.model import DeltaSimpleTemporalNetwork
+from unified_planning.exceptions import UPUsageError
+from unified_planning.test import unittest_TestCase
+
+
+class TestDeltaSTN(unittest_TestCase):
+    def _random_constraints(self, rng, n_events, n_constraints):
+        res = []
+        for _ in range(n_constraints):
+            x, y = rng.sample(range(n_events), 2)
+            res.append((x, y, rng.randint(-5, 20)))
+        return res
+
+    def test_checkpoint_backtrack(self):
+        stn: DeltaSimpleTemporalNetwork[int] = DeltaSimpleTemporalNetwork()
+        stn.insert_interval("a", "b", left_bound=1, right_bound=5)
+        distances = dict(stn.distances)
+        constraints = stn.get_constraints()
+
+        cp = stn.checkpoint()
+        stn.insert_interval("b", "c", left_bound=2)
+        self.assertTrue(stn.check_stn())
+        self.assertEqual(stn.get_stn_model("c"), 3)
+        inner_cp = stn.checkpoint()
+        stn.add("c", "a", 1)
+        self.assertFalse(stn.check_stn())
+
+        stn.backtrack(inner_cp)
+        self.assertTrue(stn.check_stn())
+        self.assertEqual(stn.get_stn_model("c"), 3)
+
+        stn.backtrack(cp)
+        self.assertTrue(stn.check_stn())
+        self.assertNotIn("c", stn)
+        self.assertEqual(stn.distances, distances)
+        self.assertEqual(stn.get_constraints(), constraints)
+
+        # the checkpoint is still valid for another branch
+        stn.add("b", "a", 2)
+        self.assertTrue(stn.check_stn())
+        stn.backtrack(cp)
+        self.assertEqual(stn.get_constraints(), constraints)
+        with self.assertRaises(UPUsageError):
+            stn.backtrack(inner_cp)
+        stn.commit()
+        with self.assertRaises(UPUsageError):
+            stn.backtrack(cp)
+
+    def test_add_many(self):
+        rng = random.Random(42)
+        for _ in range(50):
+            constraints = self._random_constraints(rng, 10, 25)
+            stn: DeltaSimpleTemporalNetwork[int] = DeltaSimpleTemporalNetwork()
+            for x, y, b in constraints:
+                stn.add(x, y, b)
+            batch_stn: DeltaSimpleTemporalNetwork[int] = DeltaSimpleTemporalNetwork()
+            cp = batch_stn.checkpoint()
+            batch_stn.add_many(constraints)
+            self.assertEqual(stn.check_stn(), batch_stn.check_stn())
+            if stn.check_stn():
+                self.assertEqual(stn.distances, batch_stn.distances)
+            batch_stn.backtrack(cp)
+            self.assertTrue(batch_stn.check_stn())
+            self.assertEqual(batch_stn.distances, {})
@@ -0,0 +1,270 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+from typing import Callable, IO, Optional
+import unified_planning as up
+from unified_planning.shortcuts import *
+from unified_planning.engines import (
+    Engine,
+    PlanGenerationResult,
+    PlanGenerationResultStatus,
+    ValidationResultStatus,
+)
+from unified_planning.engines.mixins import OneshotPlannerMixin
+from unified_planning.environment import Environment
+from unified_planning.model.problem_kind import full_classical_kind
+from unified_planning.test import (
+    unittest_TestCase,
+    main,
+    skipIfModuleNotInstalled,
+)
+from unified_planning.test.examples import get_example_problems
+
+
+class _BlockingPlanner(Engine, OneshotPlannerMixin):
+    """A planner that does not answer until it is released."""
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def __init__(self):
+        Engine.__init__(self)
+        OneshotPlannerMixin.__init__(self)
+
+    @property
+    def name(self) -> str:
+        return "blocking"
+
+    @staticmethod
+    def supported_kind() -> ProblemKind:
+        return full_classical_kind
+
+    @staticmethod
+    def supports(problem_kind: ProblemKind) -> bool:
+        return problem_kind <= _BlockingPlanner.supported_kind()
+
+    def _solve(
+        self,
+        problem: "up.model.AbstractProblem",
+        heuristic: Optional[Callable[["up.model.state.State"], Optional[float]]] = None,
+        timeout: Optional[float] = None,
+        output_stream: Optional[IO[str]] = None,
+    ) -> PlanGenerationResult:
+        _BlockingPlanner.started.set()
+        _BlockingPlanner.release.wait(10)
+        return PlanGenerationResult(PlanGenerationResultStatus.TIMEOUT, None, self.name)
+
+
+def _environment_with_blocking_planner() -> Environment:
+    environment = Environment()
+    environment.factory.add_engine("blocking", __name__, "_BlockingPlanner")
+    return environment
+
+
+class TestGrpcServer(unittest_TestCase):
+    @skipIfModuleNotInstalled("grpc")
+    def setUp(self):
+        unittest_TestCase.setUp(self)
+        self.problems = get_example_problems()
+        from unified_planning.grpc.proto_reader import ProtobufReader  # type: ignore[attr-defined]
+        from unified_planning.grpc.proto_writer import ProtobufWriter  # type: ignore[attr-defined]
+
+        self.pb_writer = ProtobufWriter()
+        self.pb_reader = ProtobufReader()
+
+    def test_server(self):
+        import grpc  # type: ignore[import]
+        import unified_planning.grpc.generated.unified_planning_pb2 as proto
+        from unified_planning.grpc.generated.unified_planning_pb2_grpc import (
+            UnifiedPlanningStub,
+        )
+        from unified_planning.grpc.server import (
+            UnifiedPlanningServicer,
+            start_server,
+        )
+
+        problem = self.problems["robot"].problem
+        problem_pb = self.pb_writer.convert(problem)
+        servicer = UnifiedPlanningServicer(
+            planner_name="up_heuristic_search",
+            anytime_planner_name="up_heuristic_search",
+        )
+        server, port = start_server(servicer=servicer, max_workers=4)
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                stub = UnifiedPlanningStub(channel)
+                request = proto.PlanRequest(problem=problem_pb, timeout=10)
+                result = self.pb_reader.convert(stub.planOneShot(request), problem)
+                self.assertEqual(
+                    result.status, PlanGenerationResultStatus.SOLVED_SATISFICING
+                )
+
+                # the anytime answers are streamed, the last one is final
+                answers = [
+                    self.pb_reader.convert(a, problem)
+                    for a in stub.planAnytime(request)
+                ]
+                self.assertEqual(
+                    answers[0].status, PlanGenerationResultStatus.INTERMEDIATE
+                )
+                self.assertNotEqual(
+                    answers[-1].status, PlanGenerationResultStatus.INTERMEDIATE
+                )
+
+                validation_request = proto.ValidationRequest(
+                    problem=problem_pb, plan=self.pb_writer.convert(result.plan)
+                )
+                validation = self.pb_reader.convert(
+                    stub.validatePlan(validation_request)
+                )
+                self.assertEqual(validation.status, ValidationResultStatus.VALID)
+
+                compiled = self.pb_reader.convert(stub.compile(problem_pb), problem)
+                self.assertEqual(len(compiled.problem.actions), 2)
+
+                # the problem was converted at most once by each thread
+                stats = servicer.cache_stats
+                self.assertEqual(stats["hits"] + stats["misses"], 4)
+                self.assertLessEqual(stats["misses"], 4)
+                self.assertEqual(stats["misses"], stats["size"])
+
+                # the engine errors are answered with their status
+                answer = stub.planOneShot(
+                    proto.PlanRequest(
+                        problem=problem_pb, engine_options={"weight": "a"}
+                    )
+                )
+                result = self.pb_reader.convert(answer, problem)
+                self.assertEqual(
+                    result.status, PlanGenerationResultStatus.INTERNAL_ERROR
+                )
+        finally:
+            server.stop(None)
+
+        server, port = start_server()
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                stub = UnifiedPlanningStub(channel)
+                # the problems not supported are answered with their status
+                other = self.problems["basic"].problem
+                unsupported = proto.PlanRequest(
+                    problem=self.pb_writer.convert(other),
+                    resolution_mode=proto.PlanRequest.Mode.Value("SOLVED_OPTIMALLY"),
+                )
+                answer = stub.planOneShot(unsupported)
+                result = self.pb_reader.convert(answer, other)
+                self.assertEqual(
+                    result.status, PlanGenerationResultStatus.UNSUPPORTED_PROBLEM
+                )
+                self.assertEqual(len(result.log_messages), 1)
+                # the engine options require a planner name
+                with self.assertRaises(grpc.RpcError) as error:
+                    stub.planOneShot(
+                        proto.PlanRequest(
+                            problem=problem_pb, engine_options={"weight": "2"}
+                        )
+                    )
+                self.assertEqual(
+                    error.exception.code(), grpc.StatusCode.INVALID_ARGUMENT
+                )
+        finally:
+            server.stop(None)
+
+    def test_concurrent_requests(self):
+        import grpc  # type: ignore[import]
+        import unified_planning.grpc.generated.unified_planning_pb2 as proto
+        from unified_planning.grpc.generated.unified_planning_pb2_grpc import (
+            UnifiedPlanningStub,
+        )
+        from unified_planning.grpc.server import (
+            UnifiedPlanningServicer,
+            start_server,
+        )
+
+        problem = self.problems["basic"].problem
+        problem_pb = self.pb_writer.convert(problem)
+        plan_pb = self.pb_writer.convert(self.problems["basic"].valid_plans[0])
+        servicer = UnifiedPlanningServicer(
+            environment_factory=_environment_with_blocking_planner,
+            planner_name="blocking",
+        )
+        server, port = start_server(servicer=servicer, max_workers=2)
+        _BlockingPlanner.started.clear()
+        _BlockingPlanner.release.clear()
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                stub = UnifiedPlanningStub(channel)
+                pending = stub.planOneShot.future(proto.PlanRequest(problem=problem_pb))
+                self.assertTrue(_BlockingPlanner.started.wait(10))
+                # a running planner does not block the other requests
+                validation = stub.validatePlan(
+                    proto.ValidationRequest(problem=problem_pb, plan=plan_pb),
+                    timeout=10,
+                )
+                self.assertFalse(pending.done())
+                self.assertEqual(
+                    self.pb_reader.convert(validation).status,
+                    ValidationResultStatus.VALID,
+                )
+                _BlockingPlanner.release.set()
+                result = self.pb_reader.convert(pending.result(10), problem)
+                self.assertEqual(result.status, PlanGenerationResultStatus.TIMEOUT)
+        finally:
+            _BlockingPlanner.release.set()
+            server.stop(None)
+        # each thread converted the problem in its own environment
+        self.assertEqual(servicer.cache_stats["misses"], 2)
+
+    def test_aio_server(self):
+        import grpc  # type: ignore[import]
+        import unified_planning.grpc.generated.unified_planning_pb2 as proto
+        from unified_planning.grpc.generated.unified_planning_pb2_grpc import (
+            UnifiedPlanningStub,
+        )
+        from unified_planning.grpc.server import (
+            UnifiedPlanningServicer,
+            start_aio_server,
+        )
+
+        problem = self.problems["robot"].problem
+        request = proto.PlanRequest(problem=self.pb_writer.convert(problem))
+        servicer = UnifiedPlanningServicer(
+            planner_name="up_heuristic_search",
+            anytime_planner_name="up_heuristic_search",
+        )
+
+        async def run():
+            server, port = await start_aio_server(servicer=servicer)
+            try:
+                async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+                    stub = UnifiedPlanningStub(channel)
+                    answers = await asyncio.gather(
+                        *(stub.planOneShot(request) for _ in range(4))
+                    )
+                    streamed = [a async for a in stub.planAnytime(request)]
+                    return answers, streamed
+            finally:
+                await server.stop(None)
+
+        answers, streamed = asyncio.run(run())
+        for answer in answers + streamed[-1:]:
+            result = self.pb_reader.convert(answer, problem)
+            self.assertIsNotNone(result.plan, (result.status, result.log_messages))
+        self.assertLessEqual(servicer.cache_stats["misses"], 5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unified_planning as up
+from unified_planning.shortcuts import *
+from unified_planning.engines import HeuristicSearchPlanner, PlanGenerationResultStatus
+from unified_planning.exceptions import UPUsageError
+from unified_planning.test import unittest_TestCase, main
+from unified_planning.test.examples import get_example_problems
+
+
+class TestHeuristicSearchPlanner(unittest_TestCase):
+    def setUp(self):
+        unittest_TestCase.setUp(self)
+        self.problems = get_example_problems()
+
+    def _assert_valid(self, problem, plan):
+        with PlanValidator(name="sequential_plan_validator") as validator:
+            self.assertTrue(validator.validate(problem, plan))
+
+    def test_example_problems(self):
+        names = [
+            "basic_conditional",
+            "basic_forall",
+            "robot_loader_adv",
+            "robot_locations_visited",
+            "charge_discharge",
+            "hierarchical_blocks_world",
+            "robot_loader_weak_bridge",
+        ]
+        for name in names:
+            problem = self.problems[name].problem
+            for search, heuristic in [
+                ("gbfs", "hadd"),
+                ("gbfs", "goal_count"),
+                ("gbfs", "hff"),
+                ("gbfs", "landmarks"),
+                ("astar", "hmax"),
+            ]:
+                with OneshotPlanner(
+                    name="up_heuristic_search",
+                    params={"search": search, "heuristic": heuristic},
+                ) as planner:
+                    res = planner.solve(problem)
+                self.assertEqual(
+                    res.status, PlanGenerationResultStatus.SOLVED_SATISFICING
+                )
+                self._assert_valid(problem, res.plan)
+                if search == "astar":
+                    # hmax is admissible, so the plan has the optimal length
+                    optimal_length = min(
+                        len(p.actions) for p in self.problems[name].valid_plans
+                    )
+                    self.assertEqual(len(res.plan.actions), optimal_length)
+
+    def test_costs(self):
+        problem = self.problems["locations_connected_cost_minimize"].problem
+        with OneshotPlanner(
+            name="up_heuristic_search", params={"search": "astar", "heuristic": "hmax"}
+        ) as planner:
+            res = planner.solve(problem)
+        self.assertEqual(res.status, PlanGenerationResultStatus.SOLVED_OPTIMALLY)
+        self._assert_valid(problem, res.plan)
+        self.assertEqual(
+            res.plan, self.problems["locations_connected_cost_minimize"].valid_plans[0]
+        )
+
+    def test_anytime(self):
+        problem = self.problems["locations_connected_cost_minimize"].problem
+        with AnytimePlanner(
+            name="up_heuristic_search", params={"heuristic": "goal_count"}
+        ) as planner:
+            results = list(planner.get_solutions(problem))
+        costs = []
+        for res in results[:-1]:
+            self.assertEqual(res.status, PlanGenerationResultStatus.INTERMEDIATE)
+            self._assert_valid(problem, res.plan)
+            costs.append(int(res.metrics["plan_cost"]))
+        self.assertEqual(costs, sorted(costs, reverse=True))
+        self.assertEqual(len(set(costs)), len(costs))
+        self.assertEqual(
+            results[-1].status, PlanGenerationResultStatus.SOLVED_OPTIMALLY
+        )
+        self.assertEqual(results[-1].plan, results[-2].plan)
+
+        # without a quality metric the plans are not reported as optimal
+        problem = self.problems["robot_loader_adv"].problem
+        with AnytimePlanner(name="up_heuristic_search") as planner:
+            results = list(planner.get_solutions(problem))
+        self.assertEqual(
+            results[-1].status, PlanGenerationResultStatus.SOLVED_SATISFICING
+        )
+        self._assert_valid(problem, results[-1].plan)
+
+    def test_limits(self):
+        problem = self.problems["counter_to_50"].problem
+        with OneshotPlanner(
+            name="up_heuristic_search", params={"max_states": 10}
+        ) as planner:
+            res = planner.solve(problem)
+        self.assertEqual(res.status, PlanGenerationResultStatus.MEMOUT)
+        self.assertIsNone(res.plan)
+
+        problem = problem.clone()
+        counter = problem.fluent("counter")
+        problem.clear_goals()
+        problem.add_goal(Equals(counter, 101))
+        with OneshotPlanner(name="up_heuristic_search") as planner:
+            res = planner.solve(problem)
+        self.assertEqual(res.status, PlanGenerationResultStatus.UNSOLVABLE_PROVEN)
+
+        with self.assertRaises(UPUsageError):
+            HeuristicSearchPlanner(heuristic="h_unknown")
+        with self.assertRaises(UPUsageError):
+            HeuristicSearchPlanner(search="astar", weight=0.5)
+
+    def test_custom_heuristic(self):
+        problem = self.problems["counter_to_50"].problem
+        counter = problem.fluent("counter")
+        evaluated = []
+
+        def heuristic(state):
+            evaluated.append(state)
+            return 50 - state.get_value(counter()).constant_value()
+
+        with OneshotPlanner(name="up_heuristic_search") as planner:
+            res = planner.solve(problem, heuristic=heuristic)
+        self.assertEqual(res.status, PlanGenerationResultStatus.SOLVED_SATISFICING)
+        self.assertEqual(len(res.plan.actions), 50)
+        self.assertGreater(len(evaluated), 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unified_planning.shortcuts import *
+from unified_planning.engines import UPSequentialSimulator
+from unified_planning.engines.heuristics import (
+    HAdd,
+    HFF,
+    HMax,
+    LandmarkCount,
+    RelaxedTask,
+)
+from unified_planning.test import unittest_TestCase, main
+from unified_planning.test.examples import get_example_problems
+
+
+class TestHeuristics(unittest_TestCase):
+    def setUp(self):
+        unittest_TestCase.setUp(self)
+        self.problems = get_example_problems()
+
+    def _chain_problem(self):
+        # p0 -> p1 -> p2 -> g1 and p1 -> g2
+        problem = Problem("chain")
+        fluents = {}
+        for name in ["p0", "p1", "p2", "g1", "g2", "never"]:
+            fluents[name] = Fluent(name)
+            problem.add_fluent(fluents[name], default_initial_value=False)
+        for pre, add in [("p0", "p1"), ("p1", "p2"), ("p2", "g1"), ("p1", "g2")]:
+            action = InstantaneousAction(f"{pre}_{add}")
+            action.add_precondition(fluents[pre])
+            action.add_effect(fluents[add], True)
+            problem.add_action(action)
+        problem.set_initial_value(fluents["p0"], True)
+        problem.add_goal(fluents["g1"])
+        problem.add_goal(fluents["g2"])
+        return problem
+
+    def test_values(self):
+        problem = self._chain_problem()
+        task = RelaxedTask(problem)
+        self.assertEqual(len(task.facts), 5)
+        self.assertEqual(len(task.actions), 4)
+        simulator = UPSequentialSimulator(problem)
+        state = simulator.get_initial_state()
+        self.assertEqual(HMax(task)(state), 3)
+        self.assertEqual(HAdd(task)(state), 5)
+        self.assertEqual(HFF(task)(state), 4)
+        self.assertEqual(LandmarkCount(task)(state), 4)
+
+        relaxed_plan = HFF(task).relaxed_plan(state)
+        self.assertEqual(len(relaxed_plan), 4)
+        for action, params in relaxed_plan:
+            self.assertTrue(simulator.is_applicable(state, action, params))
+            state = simulator.apply(state, action, params)
+        self.assertTrue(simulator.is_goal(state))
+        for heuristic in [HMax(task), HAdd(task), HFF(task), LandmarkCount(task)]:
+            self.assertEqual(heuristic(state), 0)
+
+        costs = {a: 2 for a in problem.actions}
+        task = RelaxedTask(problem, action_cost=lambda action, params: costs[action])
+        state = simulator.get_initial_state()
+        self.assertEqual(HMax(task)(state), 6)
+        self.assertEqual(HAdd(task)(state), 10)
+        self.assertEqual(HFF(task)(state), 8)
+
+        problem.add_goal(problem.fluent("never"))
+        task = RelaxedTask(problem)
+        for heuristic in [HMax(task), HAdd(task), HFF(task), LandmarkCount(task)]:
+            self.assertIsNone(heuristic(state))
+
+    def test_incremental_evaluation(self):
+        for name in ["robot_loader_adv", "hierarchical_blocks_world", "safe_road"]:
+            problem = self.problems[name].problem
+            simulator = UPSequentialSimulator(problem)
+            task = RelaxedTask(problem)
+            incremental, batch = HFF(task), HFF(task)
+            frontier = [simulator.get_initial_state()]
+            incremental(frontier[0])
+            for _ in range(3):
+                new_frontier = []
+                for state, successors in zip(frontier, simulator.expand(frontier)):
+                    for action, params, successor in successors:
+                        self.assertEqual(
+                            incremental.evaluate_successor(
+                                state, action, params, successor
+                            ),
+                            batch(successor),
+                        )
+                        self.assertEqual(
+                            task.successor_facts_mask(
+                                task.facts_mask(state), action, params, successor
+                            ),
+                            task.facts_mask(successor),
+                        )
+                        new_frontier.append(successor)
+                frontier = new_frontier
+
+
+if __name__ == "__main__":
+    main()
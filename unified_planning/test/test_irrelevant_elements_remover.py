@@ -0,0 +1,159 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unified_planning
+from unified_planning.shortcuts import *
+from unified_planning.engines import CompilationKind, ValidationResultStatus
+from unified_planning.engines.compilers import Grounder, IrrelevantElementsRemover
+from unified_planning.plans import ActionInstance, SequentialPlan
+from unified_planning.test import unittest_TestCase, main
+from unified_planning.test.examples import get_example_problems
+
+
+class TestIrrelevantElementsRemover(unittest_TestCase):
+    def setUp(self):
+        unittest_TestCase.setUp(self)
+        self.problems = get_example_problems()
+
+    def _robot_problem(self):
+        Location = UserType("Location")
+        Item = UserType("Item")
+        robot_at = Fluent("robot_at", BoolType(), l=Location)
+        connected = Fluent("connected", BoolType(), l_from=Location, l_to=Location)
+        visited = Fluent("visited", BoolType(), l=Location)
+        holding = Fluent("holding", BoolType(), i=Item)
+        broken = Fluent("broken")
+        move = InstantaneousAction("move", l_from=Location, l_to=Location)
+        l_from, l_to = move.parameters
+        move.add_precondition(robot_at(l_from))
+        move.add_precondition(connected(l_from, l_to))
+        move.add_precondition(Not(broken))
+        move.add_effect(robot_at(l_from), False)
+        move.add_effect(robot_at(l_to), True)
+        move.add_effect(visited(l_to), True)
+        pick = InstantaneousAction("pick", i=Item)
+        pick.add_effect(holding(pick.parameter("i")), True)
+        repair = InstantaneousAction("repair", l=Location)
+        repair.add_precondition(broken)
+        repair.add_effect(robot_at(repair.parameter("l")), True)
+        problem = Problem("robot")
+        for fluent in (robot_at, connected, visited, holding, broken):
+            problem.add_fluent(fluent, default_initial_value=False)
+        problem.add_actions([move, pick, repair])
+        l1, l2, l3 = [Object(f"l{i}", Location) for i in range(1, 4)]
+        problem.add_objects([l1, l2, l3])
+        problem.add_object("i1", Item)
+        problem.set_initial_value(robot_at(l1), True)
+        problem.set_initial_value(connected(l1, l2), True)
+        problem.set_initial_value(connected(l2, l3), True)
+        problem.add_goal(robot_at(l3))
+        return problem
+
+    def test_robot(self):
+        problem = self._robot_problem()
+        with Compiler(
+            problem_kind=problem.kind,
+            compilation_kind=CompilationKind.IRRELEVANT_ELEMENTS_REMOVING,
+        ) as compiler:
+            self.assertEqual(compiler.name, "ierm")
+            res = compiler.compile(problem)
+        compiled_problem = res.problem
+        # repair is unreachable and pick does not change relevant fluents
+        self.assertEqual([a.name for a in compiled_problem.actions], ["move"])
+        self.assertEqual(
+            {f.name for f in compiled_problem.fluents}, {"robot_at", "connected"}
+        )
+        self.assertEqual(
+            {o.name for o in compiled_problem.all_objects}, {"l1", "l2", "l3"}
+        )
+        new_move = compiled_problem.action("move")
+        # broken is static and always False, visited is irrelevant
+        self.assertEqual(len(new_move.preconditions), 2)
+        self.assertEqual(len(new_move.effects), 2)
+        self.assertEqual(len(compiled_problem.explicit_initial_values), 3)
+
+        l1, l2, l3 = compiled_problem.all_objects
+        plan = SequentialPlan([new_move(l1, l2), new_move(l2, l3)])
+        mapped_plan = plan.replace_action_instances(res.map_back_action_instance)
+        move = problem.action("move")
+        self.assertEqual(mapped_plan, SequentialPlan([move(l1, l2), move(l2, l3)]))
+        with PlanValidator(problem_kind=problem.kind) as validator:
+            self.assertEqual(
+                validator.validate(problem, mapped_plan).status,
+                ValidationResultStatus.VALID,
+            )
+            self.assertEqual(
+                validator.validate(compiled_problem, plan).status,
+                ValidationResultStatus.VALID,
+            )
+
+    def test_grounded_robot(self):
+        problem = self._robot_problem()
+        grounded_problem = Grounder().compile(problem).problem
+        res = IrrelevantElementsRemover().compile(grounded_problem)
+        compiled_problem = res.problem
+        # the connections are static and folded in the grounded actions
+        self.assertEqual(
+            sorted(a.name for a in compiled_problem.actions),
+            ["move_l1_l2", "move_l2_l3"],
+        )
+        self.assertEqual([f.name for f in compiled_problem.fluents], ["robot_at"])
+        self.assertEqual(len(compiled_problem.explicit_initial_values), 1)
+        for action in compiled_problem.actions:
+            self.assertEqual(len(action.preconditions), 1)
+
+    def test_examples(self):
+        compiler = IrrelevantElementsRemover()
+        for name, example in self.problems.items():
+            problem = example.problem
+            if not compiler.supports(problem.kind):
+                continue
+            res = compiler.compile(
+                problem, CompilationKind.IRRELEVANT_ELEMENTS_REMOVING
+            )
+            compiled_problem = res.problem
+            self.assertLessEqual(len(compiled_problem.actions), len(problem.actions))
+            self.assertLessEqual(len(compiled_problem.fluents), len(problem.fluents))
+            # the compiled actions keep the names of the original ones
+            old_to_new = {problem.action(a.name): a for a in compiled_problem.actions}
+            with PlanValidator(problem_kind=problem.kind) as validator:
+                for plan in example.valid_plans:
+                    if not isinstance(plan, SequentialPlan):
+                        continue
+                    # the plan without the removed actions is still valid
+                    new_plan = SequentialPlan(
+                        [
+                            ActionInstance(old_to_new[ai.action], ai.actual_parameters)
+                            for ai in plan.actions
+                            if ai.action in old_to_new
+                        ]
+                    )
+                    self.assertEqual(
+                        validator.validate(compiled_problem, new_plan).status,
+                        ValidationResultStatus.VALID,
+                        name,
+                    )
+                    mapped_plan = new_plan.replace_action_instances(
+                        res.map_back_action_instance
+                    )
+                    self.assertEqual(
+                        validator.validate(problem, mapped_plan).status,
+                        ValidationResultStatus.VALID,
+                        name,
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -60,6 +60,42 @@ class TestModel(unittest_TestCase):
             "type of the object does not belong to the same environment of the object",
         )
 
+    def test_environment_memoization(self):
+        env = unified_planning.environment.Environment()
+        simplifier = env.simplifier
+        x = Fluent("x", env.type_manager.IntType(), environment=env)
+        em = env.expression_manager
+        expressions = [em.Plus(x, i) for i in range(10)]
+        simplifier.simplify(expressions[0])
+        simplifier.simplify(expressions[0])
+        stats = env.memoization_stats["simplifier"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+        # the results memoized in the scope are discarded on exit
+        size = stats["size"]
+        with env.memoization_scope():
+            for e in expressions:
+                simplifier.simplify(e)
+            self.assertGreater(env.memoization_stats["simplifier"]["size"], size)
+        self.assertEqual(env.memoization_stats["simplifier"]["size"], size)
+        self.assertIn(expressions[0], simplifier.memoization)
+
+        # the least recently used results are discarded
+        env.set_memoization_limit(4)
+        for e in expressions:
+            simplifier.simplify(e)
+            self.assertLessEqual(env.memoization_stats["simplifier"]["size"], 4)
+        self.assertIn(expressions[-1], simplifier.memoization)
+        self.assertNotIn(expressions[0], simplifier.memoization)
+        # the results used as children of a walk are recently used as well
+        env.set_memoization_limit(3)
+        for e in reversed(expressions):
+            simplifier.simplify(e)
+            self.assertIn(e.arg(0), simplifier.memoization)
+        env.set_memoization_limit(None)
+        with self.assertRaises(UPUsageError):
+            env.set_memoization_limit(-1)
+
     def test_clone_problem_and_action(self):
         for example in self.problems.values():
             problem = example.problem
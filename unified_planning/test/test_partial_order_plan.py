@@ -15,6 +15,9 @@
 
 import unified_planning as up
 from unified_planning.shortcuts import *
+from unified_planning.exceptions import UPUsageError
+from unified_planning.plans import ActionInstance, SequentialPlan
+from typing import Dict
 from unified_planning.model.problem_kind import basic_classical_kind, hierarchical_kind
 from unified_planning.test import (
     unittest_TestCase,
@@ -83,3 +86,102 @@ class TestPartialOrderPlan(unittest_TestCase):
                     up.engines.ValidationResultStatus.VALID,
                     validation_result.status,
                 )
+
+    def test_deordering(self):
+        Lamp = UserType("Lamp")
+        on = Fluent("on", BoolType(), l=Lamp)
+        enabled = Fluent("enabled")
+        switch_on = InstantaneousAction("switch_on", l=Lamp)
+        (l,) = switch_on.parameters
+        switch_on.add_precondition(enabled)
+        switch_on.add_effect(on(l), True)
+        toggle = InstantaneousAction("toggle")
+        toggle.add_effect(enabled, Not(enabled))
+        problem = Problem("lamps")
+        problem.add_fluent(on, default_initial_value=False)
+        problem.add_fluent(enabled, default_initial_value=False)
+        problem.add_actions([switch_on, toggle])
+        l1, l2, l3 = (Object(f"l{i}", Lamp) for i in range(1, 4))
+        problem.add_objects([l1, l2, l3])
+
+        # on_1 and on_2 only depend on the first toggle, on_3 on the second one;
+        # the constraint toggle_1 < toggle_2 is implied by the others
+        toggle_1 = ActionInstance(toggle)
+        on_1 = ActionInstance(switch_on, (l1,))
+        on_2 = ActionInstance(switch_on, (l2,))
+        toggle_2 = ActionInstance(toggle)
+        on_3 = ActionInstance(switch_on, (l3,))
+        plan = SequentialPlan([toggle_1, on_1, on_2, toggle_2, on_3])
+        pop_plan = plan.convert_to(PlanKind.PARTIAL_ORDER_PLAN, problem)
+        assert isinstance(pop_plan, up.plans.PartialOrderPlan)
+        adj_list = pop_plan.get_adjacency_list
+        self.assertEqual(set(adj_list[toggle_1]), {on_1, on_2})
+        self.assertEqual(adj_list[on_1], [toggle_2])
+        self.assertEqual(adj_list[on_2], [toggle_2])
+        self.assertEqual(adj_list[toggle_2], [on_3])
+        self.assertEqual(adj_list[on_3], [])
+
+    def test_linearizations(self):
+        x = InstantaneousAction("x")
+        a, b, c, d, e = (ActionInstance(x) for _ in range(5))
+        names = {a: "a", b: "b", c: "c", d: "d", e: "e"}
+        # diamond a < b, c < d and an independent e
+        pop_plan = up.plans.PartialOrderPlan({a: [b, c], b: [d], c: [d], d: [], e: []})
+        to_str = lambda plan: "".join(names[ai] for ai in plan.actions)
+        all_plans = {to_str(plan) for plan in pop_plan.all_sequential_plans()}
+        self.assertEqual(len(all_plans), 10)
+        self.assertEqual(len(list(pop_plan.all_sequential_plans(max_plans=3))), 3)
+        self.assertEqual(pop_plan.count_sequential_plans(), 10)
+        estimate = pop_plan.count_sequential_plans(exact=False, samples=2000, seed=1)
+        self.assertTrue(8 <= estimate <= 12)
+
+        samples = pop_plan.random_sequential_plans(seed=1)
+        frequencies: Dict[str, int] = {}
+        for _ in range(2000):
+            plan_str = to_str(next(samples))
+            frequencies[plan_str] = frequencies.get(plan_str, 0) + 1
+        self.assertEqual(set(frequencies), all_plans)
+        self.assertTrue(all(120 <= f <= 280 for f in frequencies.values()))
+
+        # the Markov chain converges to the uniform distribution as well
+        samples = pop_plan.random_sequential_plans(seed=1, exact=False)
+        frequencies = {}
+        for _ in range(2000):
+            plan_str = to_str(next(samples))
+            frequencies[plan_str] = frequencies.get(plan_str, 0) + 1
+        self.assertEqual(set(frequencies), all_plans)
+        self.assertTrue(all(120 <= f <= 280 for f in frequencies.values()))
+        with self.assertRaises(UPUsageError):
+            pop_plan.random_sequential_plans(mixing_steps=-1)
+
+        # executing e first is free, executing b right after a costs 1
+        def cost(prev, ai):
+            if ai is e:
+                return 0 if prev is None else 1
+            return 1 if prev is a and ai is b else 0
+
+        best_plans = list(pop_plan.k_best_sequential_plans(3, cost))
+        self.assertEqual(to_str(best_plans[0]), "eacbd")
+        self.assertEqual(len(best_plans), 3)
+        self.assertTrue(all(p in all_plans for p in map(to_str, best_plans)))
+
+    def test_wide_linearizations(self):
+        x = InstantaneousAction("x")
+        actions = [ActionInstance(x) for _ in range(22)]
+        pop_plan = up.plans.PartialOrderPlan({ai: [] for ai in actions})
+        # neither the sampling nor the cheapest plans need all the linearizations;
+        # the 2^22 sets of actions that can be executed first are too many to count
+        # and the sampling falls back to the Markov chain
+        samples = pop_plan.random_sequential_plans(seed=1)
+        sampled = [tuple(next(samples).actions) for _ in range(3)]
+        self.assertEqual(len(set(sampled)), 3)
+        self.assertTrue(all(set(plan) == set(actions) for plan in sampled))
+
+        best_plans = list(pop_plan.k_best_sequential_plans(5, lambda prev, ai: 1))
+        self.assertEqual(len({tuple(p.actions) for p in best_plans}), 5)
+        # the first action is cheaper the earlier it comes in the list
+        index = {ai: i for i, ai in enumerate(actions)}
+        first_cost = lambda prev, ai: index[ai] if prev is None else 1
+        best_plans = list(pop_plan.k_best_sequential_plans(2, first_cost))
+        self.assertTrue(all(plan.actions[0] is actions[0] for plan in best_plans))
+        self.assertEqual(len(best_plans), 2)
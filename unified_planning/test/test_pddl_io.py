@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License
 
+import io
 import os
 import tempfile
 from typing import cast
@@ -25,9 +26,13 @@ from unified_planning.test import (
 )
 from unified_planning.io import PDDLWriter, PDDLReader
 from unified_planning.test.examples import get_example_problems
-from unified_planning.exceptions import UPProblemDefinitionError
+from unified_planning.exceptions import (
+    UPException,
+    UPProblemDefinitionError,
+    UPUsageError,
+)
 from unified_planning.model.metrics import MinimizeSequentialPlanLength
-from unified_planning.plans import SequentialPlan
+from unified_planning.plans import SequentialPlan, TimeTriggeredPlan
 from unified_planning.model.problem_kind import simple_numeric_kind
 from unified_planning.model.types import _UserType
 
@@ -365,6 +370,34 @@ class TestPddlIO(unittest_TestCase):
 
         self.assertEqual(plan, test_plan)
 
+    def test_plan_lines(self):
+        for name in ("robot_loader_weak_bridge", "matchcellar"):
+            problem = self.problems[name].problem
+            plan = self.problems[name].valid_plans[0]
+            if isinstance(plan, SequentialPlan):
+                actions = plan.actions * 100
+            else:
+                assert isinstance(plan, TimeTriggeredPlan)
+                actions = plan.timed_actions * 100
+            w = PDDLWriter(problem)
+            out = io.StringIO()
+            w.write_plan_lines(iter(actions), out)
+            plan_str = out.getvalue()
+            self.assertEqual(len(plan_str.splitlines()), len(actions))
+
+            r = PDDLReader()
+            lines = io.StringIO(f"; a comment\n{plan_str}\n")
+            parsed = r.parse_plan_lines(problem, lines, w.get_item_named)
+            self.assertEqual(type(plan)(actions), type(plan)(list(parsed)))
+            self.assertEqual(
+                type(plan)(actions),
+                r.parse_plan_string(problem, plan_str, w.get_item_named),
+            )
+
+        parsed = r.parse_plan_lines(problem, ["(not a plan line"], w.get_item_named)
+        with self.assertRaises(UPException):
+            next(parsed)
+
     def test_depot_reader(self):
         reader = PDDLReader()
 
@@ -891,6 +924,70 @@ class TestPddlIO(unittest_TestCase):
         self.assertEqual(40, len(grounded_problem.actions))
         self.assertEqual(3, len(problem.actions))
 
+    def test_grammar_cache(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from unified_planning.io.utils import configure_pyparsing
+
+        domain_filename = os.path.join(PDDL_DOMAINS_PATH, "depot", "domain.pddl")
+        problem_filename = os.path.join(PDDL_DOMAINS_PATH, "depot", "problem.pddl")
+        # the readers share the same grammar
+        reader = PDDLReader()
+        self.assertIs(reader._pp_domain, PDDLReader()._pp_domain)
+        expected = reader.parse_problem(domain_filename, problem_filename)
+
+        # and can parse at the same time
+        def parse(_):
+            return PDDLReader().parse_problem(domain_filename, problem_filename)
+
+        with ThreadPoolExecutor(4) as executor:
+            for problem in executor.map(parse, range(8)):
+                self.assertEqual(expected, problem)
+
+        # the grammar is created again with the new settings
+        configure_pyparsing(cache_size=1024)
+        try:
+            other = PDDLReader()
+            self.assertIsNot(reader._pp_domain, other._pp_domain)
+            problem = other.parse_problem(domain_filename, problem_filename)
+            self.assertEqual(expected, problem)
+        finally:
+            configure_pyparsing()
+
+    def test_parse_problems(self):
+        for domain_name, problem_names in (
+            ("counters", ["problem.pddl", "problem2.pddl"]),
+            ("parking_action_cost", ["problem.pddl"]),
+        ):
+            domain_filename = os.path.join(
+                PDDL_DOMAINS_PATH, domain_name, "domain.pddl"
+            )
+            problem_filenames = [
+                os.path.join(PDDL_DOMAINS_PATH, domain_name, name)
+                for name in problem_names * 3
+            ]
+            expected = [
+                PDDLReader().parse_problem(domain_filename, problem_filename)
+                for problem_filename in problem_filenames
+            ]
+            for max_workers in (1, 2):
+                reader = PDDLReader()
+                problems = list(
+                    reader.parse_problems(
+                        domain_filename, problem_filenames, max_workers=max_workers
+                    )
+                )
+                self.assertEqual(expected, problems)
+                # the problems share the elements of the domain
+                first, last = problems[0], problems[-1]
+                for f1, f2 in zip(first.fluents, last.fluents):
+                    self.assertIs(f1, f2)
+                if domain_name == "counters":
+                    for a1, a2 in zip(first.actions, last.actions):
+                        self.assertIs(a1, a2)
+
+        with self.assertRaises(UPUsageError):
+            PDDLReader().parse_problems(domain_filename, problem_filenames, 0)
+
 
 def _have_same_user_types_considering_renamings(
     original_problem: unified_planning.model.Problem,
@@ -0,0 +1,139 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from unified_planning.shortcuts import *
+from unified_planning.engines.policy_evaluator import PolicyEvaluator
+from unified_planning.exceptions import UPUsageError
+from unified_planning.model.nondeterministicAction import NondeterministicAction
+from unified_planning.plans import (
+    ActionInstance,
+    ContingentPlan,
+    ContingentPlanNode,
+)
+from unified_planning.test import unittest_TestCase, main
+
+
+class TestPolicyEvaluator(unittest_TestCase):
+    def _attempt_problem(self):
+        # an attempt succeeds with probability 0.6 and breaks the tool otherwise
+        done = Fluent("done")
+        broken = Fluent("broken")
+        problem = Problem("attempt")
+        problem.add_fluent(done, default_initial_value=False)
+        problem.add_fluent(broken, default_initial_value=False)
+        attempt = NondeterministicAction(
+            "attempt", [(done, 0.6, True), (broken, 0.4, True)]
+        )
+        attempt.add_precondition(Not(broken))
+        repair = InstantaneousAction("repair")
+        repair.add_precondition(broken)
+        repair.add_effect(broken, False)
+        wait = InstantaneousAction("wait")
+        problem.add_actions([attempt, repair, wait])
+        problem.add_goal(done)
+        return problem
+
+    def test_probabilities(self):
+        done = Fluent("done")
+        action = NondeterministicAction("a", [(done, 0.25, True), (done, 0.75, False)])
+        self.assertEqual(action.probabilities, [0.25, 0.75])
+        self.assertEqual(
+            action.generate_weighted_branches(),
+            [("done", True, 0.25), ("done", False, 0.75)],
+        )
+        self.assertEqual(action.generate_branches(), [("done", True), ("done", False)])
+        self.assertEqual(action.clone(), action)
+        other = NondeterministicAction("a", [(done, 0.5, True), (done, 0.5, False)])
+        self.assertNotEqual(other, action)
+        with self.assertRaises(UPUsageError):
+            NondeterministicAction("a", [(done, 0.5, True), (done, 0.6, False)])
+        with self.assertRaises(UPUsageError):
+            NondeterministicAction("a", [(done, -0.5, True), (done, 1.5, False)])
+
+    def test_outcomes_consistency(self):
+        done = Fluent("done")
+        failed = Fluent("failed")
+        action = NondeterministicAction("a", [(done, 0.25, True), (done, 0.75, False)])
+        # an effect can't be added without a probability
+        with self.assertRaises(UPUsageError):
+            action.add_effect(failed, True)
+        self.assertEqual(len(action.effects), 2)
+        self.assertEqual(len(action.outcomes), 2)
+        # replacing the effects keeps the explicit probabilities
+        action.effects = [e.clone() for e in reversed(action.effects)]
+        self.assertEqual(action.probabilities, [0.25, 0.75])
+        with self.assertRaises(UPUsageError):
+            action.effects = []
+        with self.assertRaises(UPUsageError):
+            action.set_outcomes([(action.effects[0], 0.5)])
+        effect = Effect(FluentExp(failed), TRUE(), TRUE())
+        action.set_outcomes([(effect, 1)])
+        self.assertEqual(action.outcomes, [(effect, 1)])
+        action.clear_effects()
+        self.assertEqual(action.outcomes, [])
+
+    def test_policies(self):
+        problem = self._attempt_problem()
+        attempt, repair, wait = problem.actions
+        broken = problem.fluent("broken")
+        evaluator = PolicyEvaluator(problem)
+
+        evaluation = evaluator.evaluate(lambda state: ActionInstance(attempt))
+        self.assertAlmostEqual(evaluation.success_probability, 0.6)
+        self.assertAlmostEqual(evaluation.expected_cost, 1)
+        self.assertEqual(evaluation.num_states, 3)
+
+        def repairing(state):
+            if state.get_value(broken()).bool_constant_value():
+                return ActionInstance(repair)
+            return ActionInstance(attempt)
+
+        # the expected cost c satisfies c = 1 + 0.4 * (1 + c)
+        evaluation = evaluator.evaluate(repairing)
+        self.assertAlmostEqual(evaluation.success_probability, 1)
+        self.assertAlmostEqual(evaluation.expected_cost, 7 / 3)
+        self.assertEqual(evaluation.num_states, 3)
+        self.assertGreater(evaluation.iterations, 1)
+
+        costs = {attempt: 2, repair: 5, wait: 0}
+        evaluator = PolicyEvaluator(problem, lambda action, params: costs[action])
+        evaluation = evaluator.evaluate(repairing)
+        self.assertAlmostEqual(evaluation.expected_cost, (2 + 0.4 * 5) / 0.6)
+
+        # waiting after the tool breaks never ends the execution
+        def waiting(state):
+            if state.get_value(broken()).bool_constant_value():
+                return ActionInstance(wait)
+            return ActionInstance(attempt)
+
+        evaluation = evaluator.evaluate(waiting)
+        self.assertAlmostEqual(evaluation.success_probability, 0.6)
+        self.assertTrue(math.isinf(evaluation.expected_cost))
+
+        # a contingent plan observing the outcome of the attempt
+        root = ContingentPlanNode(ActionInstance(attempt))
+        repair_node = ContingentPlanNode(ActionInstance(repair))
+        retry_node = ContingentPlanNode(ActionInstance(attempt))
+        root.add_child({broken(): TRUE()}, repair_node)
+        repair_node.add_child({}, retry_node)
+        evaluation = evaluator.evaluate(ContingentPlan(root))
+        self.assertAlmostEqual(evaluation.success_probability, 0.6 + 0.4 * 0.6)
+        self.assertAlmostEqual(evaluation.expected_cost, 2 + 0.4 * 5 + 0.4 * 2)
+        # the acyclic plan is evaluated by the first iteration and checked by the second
+        self.assertEqual(evaluation.iterations, 2)
+
+
+if __name__ == "__main__":
+    main()
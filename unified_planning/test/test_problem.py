@@ -17,7 +17,11 @@ import unified_planning as up
 from unified_planning.shortcuts import *
 from unified_planning.test import unittest_TestCase, main, examples
 from unified_planning.test.examples import get_example_problems
-from unified_planning.exceptions import UPTypeError
+from unified_planning.exceptions import (
+    UPProblemDefinitionError,
+    UPTypeError,
+    UPUsageError,
+)
 
 
 class TestProblem(unittest_TestCase):
@@ -33,6 +37,22 @@ class TestProblem(unittest_TestCase):
         self.assertTrue(problem_kind.has_discrete_time())
         problem_kind.set_time("CONTINUOUS_TIME")
         self.assertTrue(problem_kind.has_continuous_time())
+        self.assertTrue(problem_kind.has_time())
+        self.assertFalse(problem_kind.has_typing())
+        self.assertEqual(problem_kind.features, {"DISCRETE_TIME", "CONTINUOUS_TIME"})
+        problem_kind.unset_time("DISCRETE_TIME")
+        self.assertFalse(problem_kind.has_discrete_time())
+
+        other_kind = ProblemKind({"CONTINUOUS_TIME", "FLAT_TYPING"})
+        self.assertTrue(problem_kind <= other_kind)
+        self.assertFalse(other_kind <= problem_kind)
+        self.assertEqual(problem_kind.union(other_kind), other_kind)
+        self.assertEqual(problem_kind.intersection(other_kind), problem_kind)
+        self.assertEqual(problem_kind.clone(), problem_kind)
+        # the features deprecated in the version are ignored by equality and hash
+        deprecated_kind = ProblemKind({"CONTINUOUS_TIME", "NUMERIC_FLUENTS"}, 2)
+        self.assertEqual(deprecated_kind, ProblemKind({"CONTINUOUS_TIME"}, 2))
+        self.assertEqual(hash(deprecated_kind), hash(ProblemKind({"CONTINUOUS_TIME"})))
 
     def test_basic(self):
         problem = self.problems["basic"].problem
@@ -456,6 +476,108 @@ class TestProblem(unittest_TestCase):
                         Int(-1),
                     )
 
+    def test_initial_values_view(self):
+        Location = UserType("Location")
+        robot_at = Fluent("robot_at", BoolType(), position=Location)
+        distance = Fluent("distance", IntType(0, 100), l1=Location, l2=Location)
+        visited = Fluent("visited", BoolType(), position=Location)
+        locations = [Object(f"l{i}", Location) for i in range(4)]
+        problem = Problem("robot")
+        problem.add_fluent(robot_at, default_initial_value=False)
+        problem.add_fluent(distance, default_initial_value=5)
+        problem.add_fluent(visited)
+        problem.add_objects(locations)
+        problem.set_initial_value(robot_at(locations[0]), True)
+        problem.set_initial_value(distance(locations[0], locations[1]), 10)
+        problem.set_initial_value(visited(locations[0]), True)
+
+        initial_values = problem.initial_values
+        self.assertEqual(len(initial_values), 3 + 3 + 15)
+        self.assertEqual(initial_values[robot_at(locations[0])], TRUE())
+        self.assertEqual(initial_values[robot_at(locations[1])], FALSE())
+        self.assertEqual(initial_values[distance(locations[2], locations[3])], Int(5))
+        self.assertEqual(initial_values[visited(locations[0])], TRUE())
+        self.assertNotIn(visited(locations[1]), initial_values)
+        self.assertNotIn(robot_at(Object("l4", Location)), initial_values)
+        self.assertEqual(
+            list(initial_values)[:3], list(problem.explicit_initial_values)
+        )
+        self.assertEqual(len(list(initial_values.items())), len(initial_values))
+        for fluent_exp, value in initial_values.items():
+            self.assertEqual(problem.initial_value(fluent_exp), value)
+        # the default values are not added to the explicit ones
+        self.assertEqual(len(problem.explicit_initial_values), 3)
+
+        # the view follows the changes of the problem
+        problem.add_object(Object("l4", Location))
+        self.assertEqual(initial_values[robot_at(problem.object("l4"))], FALSE())
+        self.assertEqual(len(initial_values), 3 + 4 + 24)
+        self.assertEqual(problem.initial_values.copy(), dict(initial_values.items()))
+        cloned_problem = problem.clone()
+        self.assertEqual(cloned_problem.initial_values, initial_values)
+        self.assertEqual(hash(cloned_problem), hash(problem))
+        cloned_problem.set_initial_value(robot_at(locations[1]), False)
+        self.assertEqual(cloned_problem, problem)
+        cloned_problem.set_initial_value(robot_at(locations[2]), True)
+        self.assertNotEqual(cloned_problem, problem)
+
+    def test_bulk_load(self):
+        Location = UserType("Location")
+        visited = Fluent("visited", BoolType(), position=Location)
+        distance = Fluent("distance", IntType(0, 100), position=Location)
+        problem = Problem("bulk")
+        problem.add_fluent(visited, default_initial_value=False)
+        with problem.bulk_load():
+            problem.add_fluent(distance, default_initial_value=0)
+            for i in range(100):
+                location = problem.add_object(f"l{i}", Location)
+                problem.set_initial_value(visited(location), i % 2 == 0)
+                problem.set_initial_value(distance(location), i)
+        self.assertEqual(len(problem.all_objects), 100)
+        self.assertEqual(problem.user_types, [Location])
+        self.assertEqual(len(problem.explicit_initial_values), 200)
+        self.assertEqual(problem.initial_value(distance(problem.object("l7"))), Int(7))
+
+        # the checks are done when the bulk load ends
+        with self.assertRaises(UPProblemDefinitionError):
+            with problem.bulk_load():
+                problem.add_object("l101", Location)
+                problem.add_object("l101", Location)
+        with self.assertRaises(UPProblemDefinitionError):
+            with problem.bulk_load():
+                problem.add_object("visited", Location)
+        with self.assertRaises(UPTypeError):
+            with problem.bulk_load():
+                problem.set_initial_value(distance(problem.object("l0")), 1000)
+        with self.assertRaises(UPUsageError):
+            with problem.bulk_load():
+                with problem.bulk_load():
+                    pass
+        # the failed bulk loads are rolled back
+        self.assertEqual(len(problem.all_objects), 100)
+        self.assertFalse(problem.has_object("l101"))
+        self.assertEqual(problem.initial_value(distance(problem.object("l0"))), Int(0))
+        self.assertEqual(len(problem.explicit_initial_values), 200)
+        Robot = UserType("Robot")
+        robot_at = Fluent("robot_at", BoolType(), robot=Robot, position=Location)
+        with self.assertRaises(UPTypeError):
+            with problem.bulk_load():
+                problem.add_fluent(robot_at, default_initial_value=False)
+                robot = problem.add_object("r", Robot)
+                problem.set_initial_value(robot_at(robot, problem.object("l1")), True)
+                problem.set_initial_value(visited(problem.object("l1")), True)
+                problem.set_initial_value(distance(problem.object("l1")), -1)
+        self.assertEqual(problem.user_types, [Location])
+        self.assertEqual(problem.fluents, [visited, distance])
+        self.assertNotIn(robot_at, problem.fluents_defaults)
+        self.assertEqual(len(problem.all_objects), 100)
+        self.assertEqual(problem.initial_value(visited(problem.object("l1"))), FALSE())
+        self.assertEqual(problem.initial_value(distance(problem.object("l1"))), Int(1))
+        self.assertEqual(len(problem.explicit_initial_values), 200)
+        # the checks are not deferred after a bulk load
+        with self.assertRaises(UPProblemDefinitionError):
+            problem.add_object("l0", Location)
+
     def test_problem_defaults(self):
         Location = UserType("Location")
         robot_at = Fluent("robot_at", BoolType(), position=Location)
@@ -136,6 +136,16 @@ class TestProtobufIO(unittest_TestCase):
         self.assertEqual(set(problem.kind.features), pb_features)
         self.assertEqual(problem, problem_up)
 
+    def test_problem_message_not_modified(self):
+        problem = self.problems["robot_loader_weak_bridge"].problem
+        problem_pb = self.pb_writer.convert(problem)
+        serialized = problem_pb.SerializeToString(deterministic=True)
+        first = self.pb_reader.convert(problem_pb)
+        self.assertEqual(serialized, problem_pb.SerializeToString(deterministic=True))
+        # the same message is converted again, also by the same reader
+        self.assertEqual(problem, first)
+        self.assertEqual(problem, self.pb_reader.convert(problem_pb))
+
     def test_action(self):
         problem = self.problems["robot"].problem
         action = problem.action("move")
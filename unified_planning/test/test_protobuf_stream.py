@@ -0,0 +1,95 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+from unified_planning.shortcuts import *
+from unified_planning.exceptions import UPUsageError
+from unified_planning.plans import SequentialPlan, TimeTriggeredPlan
+from unified_planning.test import (
+    unittest_TestCase,
+    main,
+    skipIfModuleNotInstalled,
+)
+from unified_planning.test.examples import get_example_problems
+
+
+class TestProtobufStream(unittest_TestCase):
+    @skipIfModuleNotInstalled("google.protobuf")
+    def setUp(self):
+        unittest_TestCase.setUp(self)
+        self.problems = get_example_problems()
+        from unified_planning.grpc.proto_stream import (  # type: ignore[attr-defined]
+            ProtobufStreamReader,
+            ProtobufStreamWriter,
+        )
+
+        self.stream_writer = ProtobufStreamWriter(chunk_size=2)
+        self.stream_reader = ProtobufStreamReader()
+
+    def test_all_problems(self):
+        import unified_planning.grpc.generated.unified_planning_pb2 as proto
+        from unified_planning.grpc.proto_writer import ProtobufWriter  # type: ignore[attr-defined]
+
+        writer = ProtobufWriter()
+        for name, example in self.problems.items():
+            problem = example.problem
+            if not isinstance(problem, Problem):
+                with self.assertRaises(UPUsageError):
+                    next(self.stream_writer.problem_chunks(problem))
+                continue
+            # the merge of the chunks is the monolithic message
+            merged = proto.Problem()
+            for chunk in self.stream_writer.problem_chunks(problem):
+                merged.MergeFrom(chunk)
+            self.assertEqual(merged, writer.convert(problem), name)
+
+            stream = io.BytesIO()
+            self.stream_writer.write_problem(problem, stream)
+            stream.seek(0)
+            problem_up = self.stream_reader.read_problem(stream)
+            self.assertEqual(problem, problem_up, name)
+
+            for plan in example.valid_plans:
+                if isinstance(plan, (SequentialPlan, TimeTriggeredPlan)):
+                    stream = io.BytesIO()
+                    self.stream_writer.write_plan(plan, stream)
+                    stream.seek(0)
+                    plan_up = self.stream_reader.read_plan(stream, problem)
+                    self.assertEqual(plan, plan_up, name)
+
+    def test_long_plan(self):
+        problem = self.problems["robot_loader"].problem
+        plan = self.problems["robot_loader"].valid_plans[0]
+        long_plan = SequentialPlan(plan.actions * 500)
+        chunks = list(self.stream_writer.plan_chunks(long_plan))
+        self.assertEqual(len(chunks), len(long_plan.actions) // 2)
+        self.assertTrue(all(len(c.actions) == 2 for c in chunks))
+        plan_up = self.stream_reader.read_plan_chunks(iter(chunks), problem)
+        self.assertEqual(long_plan, plan_up)
+
+    def test_truncated_stream(self):
+        from google.protobuf.message import DecodeError
+
+        problem = self.problems["robot"].problem
+        stream = io.BytesIO()
+        self.stream_writer.write_problem(problem, stream)
+        truncated = io.BytesIO(stream.getvalue()[:-3])
+        with self.assertRaises(DecodeError):
+            self.stream_reader.read_problem(truncated)
+        with self.assertRaises(UPUsageError):
+            self.stream_reader.read_problem(io.BytesIO())
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 
+from fractions import Fraction
 from typing import cast
 import warnings
 import unified_planning as up
@@ -267,3 +268,78 @@ class TestSimulator(unittest_TestCase):
             state = simulator.apply(cast(State, state), ai)
             self.assertIsNotNone(state)
         self.assertTrue(simulator.is_goal(cast(State, state)))
+
+    def test_batch_methods(self):
+        for name in [
+            "robot_loader_adv",
+            "hierarchical_blocks_world",
+            "basic_conditional",
+            "robot_real_constants",
+        ]:
+            example = self.problems[name]
+            problem, plan = example.problem, example.valid_plans[0]
+            simulator = UPSequentialSimulator(problem)
+            frontier = [simulator.get_initial_state()]
+            for _ in range(3):
+                expanded = simulator.expand(frontier)
+                # compare with the state by state expansion
+                expected = SequentialSimulatorMixin._expand(simulator, frontier)
+                self.assertEqual(len(expanded), len(frontier))
+                for successors, expected_successors in zip(expanded, expected):
+                    self.assertEqual(
+                        [(a, p) for a, p, _ in successors],
+                        [(a, p) for a, p, _ in expected_successors],
+                    )
+                    for (_, _, s), (_, _, e) in zip(successors, expected_successors):
+                        self.assertEqual(s, e)
+                frontier = [s for successors in expanded for _, _, s in successors]
+            self.assertEqual(
+                simulator.goal_mask(frontier), [simulator.is_goal(s) for s in frontier]
+            )
+
+            state = simulator.get_initial_state()
+            states = [state]
+            for ai in plan.actions:
+                actions = [ai, (ai.action, ai.actual_parameters)]
+                next_states = simulator.apply_many(state, actions)
+                self.assertEqual(next_states[0], simulator.apply(state, ai))
+                self.assertEqual(next_states[0], next_states[1])
+                state = cast(State, next_states[0])
+                states.append(state)
+            mask = simulator.goal_mask(states)
+            self.assertEqual(mask, [simulator.is_goal(s) for s in states])
+            self.assertTrue(mask[-1])
+
+    def test_goal_mask_real_goals(self):
+        x = Fluent("x", RealType())
+        y = Fluent("y", RealType())
+        problem = Problem("real_goal")
+        problem.add_fluent(x, default_initial_value=Fraction(3, 10))
+        problem.add_fluent(y, default_initial_value=Fraction(1, 10))
+        problem.add_goal(Equals(x, Plus(y, Fraction(2, 10))))
+        simulator = UPSequentialSimulator(problem)
+        state = simulator.get_initial_state()
+        # 0.3 != 0.1 + 0.2 with floats, the mask must use the exact semantic
+        self.assertTrue(simulator.is_goal(state))
+        self.assertEqual(simulator.goal_mask([state]), [True])
+
+    def test_grounded_actions(self):
+        problem = self.problems["robot_locations_connected"].problem
+        simulator = UPSequentialSimulator(problem)
+        grounded_actions = list(simulator.get_grounded_actions())
+        move = problem.action("move")
+        r1, l1, l2 = (problem.object(name) for name in ("r1", "l1", "l2"))
+        self.assertIn(
+            (move, (ObjectExp(r1), ObjectExp(l1), ObjectExp(l2))),
+            [(a, params) for a, params, _ in grounded_actions],
+        )
+        # the static fluents are replaced with their initial values
+        is_connected = problem.fluent("is_connected")
+        self.assertEqual(
+            simulator.simplify(is_connected(l1, l2)),
+            problem.initial_value(is_connected(l1, l2)),
+        )
+        hidden_simulator = UPSequentialSimulator(problem, hidden_fluents=[is_connected])
+        self.assertEqual(
+            hidden_simulator.simplify(is_connected(l1, l2)), is_connected(l1, l2)
+        )
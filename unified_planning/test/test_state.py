@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from random import shuffle
+from fractions import Fraction
+from random import Random, shuffle
 import unified_planning
 from unified_planning.shortcuts import *
+from unified_planning.model import UPState
+from unified_planning.model.walkers import BatchEvaluator, StateBatch, StateEvaluator
 from unified_planning.test import unittest_TestCase
 
 
@@ -72,3 +75,107 @@ class TestUPState(unittest_TestCase):
         state_2 = state_2.make_child({c: n5})
 
         self.assert_same_state(state_2, state_4)
+
+    def test_quantifiers_evaluation(self):
+        Package = UserType("Package")
+        Location = UserType("Location")
+        at = Fluent("at", BoolType(), p=Package, l=Location)
+        target = Fluent("target", BoolType(), l=Location)
+        problem = Problem("packages")
+        problem.add_fluent(at, default_initial_value=False)
+        problem.add_fluent(target, default_initial_value=False)
+        packages = [Object(f"p{i}", Package) for i in range(4)]
+        locations = [Object(f"l{i}", Location) for i in range(4)]
+        problem.add_objects(packages + locations)
+        for p, l in zip(packages, locations):
+            problem.set_initial_value(at(p, l), True)
+        problem.set_initial_value(target(locations[2]), True)
+        state = UPState(problem.initial_values)
+        se = StateEvaluator(problem)
+
+        p, l = Variable("p", Package), Variable("l", Location)
+        expected = {
+            Exists(And(at(p, l), target(l)), p, l): True,
+            Exists(And(at(p, l), Not(target(l)), at(p, locations[2])), p, l): False,
+            Forall(Implies(at(p, l), Not(target(l))), p, l): False,
+            Forall(
+                Or(Not(at(p, l)), Not(target(l)), Equals(p, packages[2])), p, l
+            ): True,
+            # nested quantifiers
+            Forall(Exists(at(p, l), l), p): True,
+            Forall(Or(Exists(at(p, l), p), Not(target(l))), l): True,
+            Exists(And(target(l), Forall(Not(at(p, l)), p)), l): False,
+            # the innermost quantifier binds again the variable l
+            Forall(
+                Or(Not(target(l)), Exists(And(at(p, l), Exists(Not(target(l)), l)), p)),
+                l,
+            ): True,
+        }
+        for expression, expected_value in expected.items():
+            self.assertEqual(
+                se.evaluate(expression, state).bool_constant_value(), expected_value
+            )
+
+        # the quantifiers are evaluated in a scope of the bounded memoization
+        se = StateEvaluator(problem)
+        se.memoization_limit = 100
+        g = target(locations[0])
+        expected = {
+            And(Or(Not(g), at(packages[0], locations[0])), Not(g)): True,
+            And(Exists(Or(Not(g), at(p, locations[0])), p), Not(g)): True,
+            **expected,
+        }
+        for expression, expected_value in expected.items():
+            self.assertEqual(
+                se.evaluate(expression, state).bool_constant_value(), expected_value
+            )
+
+    def test_batch_evaluation(self):
+        Location = UserType("Location")
+        x = Fluent("x", IntType())
+        y = Fluent("y", RealType())
+        b = Fluent("b", BoolType(), l=Location)
+        pos = Fluent("pos", Location)
+        problem = Problem("batch")
+        problem.add_fluent(x, default_initial_value=0)
+        problem.add_fluent(y, default_initial_value=0)
+        problem.add_fluent(b, default_initial_value=False)
+        problem.add_fluent(pos)
+        locations = [Object(f"l{i}", Location) for i in range(3)]
+        problem.add_objects(locations)
+        problem.set_initial_value(pos, locations[0])
+        l = Variable("l", Location)
+        expressions = [
+            And(b(locations[0]), Or(b(locations[1]), LT(x, 3))),
+            Implies(b(locations[2]), Iff(b(locations[0]), b(locations[1]))),
+            Plus(Times(x, 2), Minus(y, 1)),
+            Div(x, 3),
+            LE(Div(y, 3), Minus(x, 2)),
+            Equals(pos, locations[1]),
+            FluentExp(pos),
+            Exists(And(b(l), Equals(pos, l)), l),
+            Equals(x, x),
+        ]
+        rng = Random(0)
+        states = []
+        for _ in range(50):
+            values = {FluentExp(x): Int(rng.randint(-5, 5))}
+            values[FluentExp(y)] = Real(Fraction(rng.randint(-10, 10), 3))
+            values[FluentExp(pos)] = ObjectExp(rng.choice(locations))
+            for loc in locations:
+                values[FluentExp(b, [loc])] = Bool(rng.random() < 0.5)
+            states.append(UPState(values))
+        se = StateEvaluator(problem)
+        batch = StateBatch(states)
+        exact_results = BatchEvaluator(problem, exact=True).evaluate(expressions, batch)
+        results = BatchEvaluator(problem).evaluate(expressions, batch)
+        for e, exact_res, res in zip(expressions, exact_results, results):
+            self.assertEqual(len(exact_res), len(states))
+            for i, state in enumerate(states):
+                expected = se.evaluate(e, state)
+                if expected.is_object_exp():
+                    self.assertEqual(exact_res[i], expected)
+                    self.assertEqual(res[i], expected)
+                else:
+                    self.assertEqual(exact_res[i], expected.constant_value())
+                    self.assertAlmostEqual(res[i], float(expected.constant_value()))
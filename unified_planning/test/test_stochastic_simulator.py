@@ -0,0 +1,119 @@
+# Copyright 2021-2023 AIPlan4EU project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from concurrent.futures.process import BrokenProcessPool
+from unified_planning.shortcuts import *
+from unified_planning.engines import UPStochasticSimulator
+from unified_planning.engines.policy_evaluator import PolicyEvaluator
+from unified_planning.exceptions import UPUsageError
+from unified_planning.model.nondeterministicAction import NondeterministicAction
+from unified_planning.plans import ActionInstance
+from unified_planning.test import unittest_TestCase, main
+
+
+class TestStochasticSimulator(unittest_TestCase):
+    def _coins_problem(self, n: int = 3):
+        # every coin lands on heads with probability 0.7 and on its edge with 0.1
+        lost = Fluent("lost")
+        problem = Problem("coins")
+        problem.add_fluent(lost, default_initial_value=False)
+        costs = {}
+        for i in range(n):
+            heads = Fluent(f"heads_{i}")
+            problem.add_fluent(heads, default_initial_value=False)
+            toss = NondeterministicAction(
+                f"toss_{i}",
+                [(heads, 0.7, True), (heads, 0.2, False), (lost, 0.1, True)],
+            )
+            toss.add_precondition(Not(heads))
+            toss.add_precondition(Not(lost))
+            problem.add_action(toss)
+            problem.add_goal(heads)
+            costs[toss] = 2
+        problem.add_quality_metric(MinimizeActionCosts(costs))
+        return problem
+
+    def _policy(self, problem):
+        def policy(state):
+            for toss in problem.actions:
+                if simulator.is_applicable(state, toss):
+                    return ActionInstance(toss)
+            return None
+
+        simulator = UPStochasticSimulator(problem)
+        return policy
+
+    def test_sampling(self):
+        problem = self._coins_problem()
+        toss = problem.action("toss_0")
+        heads = problem.fluent("heads_0")
+        simulator = UPStochasticSimulator(problem, seed=1)
+        state = simulator.get_initial_state()
+        self.assertTrue(simulator.is_applicable(state, toss))
+        outcomes = simulator.outcomes(state, toss)
+        self.assertEqual([p for _, p in outcomes], [0.7, 0.2, 0.1])
+        self.assertTrue(outcomes[0][0].get_value(heads()).bool_constant_value())
+        self.assertEqual(outcomes[1][0], state)
+        successors = [simulator.apply(state, toss) for _ in range(200)]
+        num_heads = sum(s.get_value(heads()).bool_constant_value() for s in successors)
+        self.assertTrue(100 < num_heads < 180)
+        other = UPStochasticSimulator(problem, seed=1)
+        self.assertEqual(successors[:20], [other.apply(state, toss) for _ in range(20)])
+        # every state has one successor for every coin, with a sampled outcome
+        self.assertEqual(len(simulator.expand([state])[0]), 3)
+        self.assertEqual(len(list(simulator.get_applicable_actions(state))), 3)
+
+    def test_rollouts(self):
+        problem = self._coins_problem()
+        policy = self._policy(problem)
+        with SequentialSimulator(
+            problem, name="up_stochastic_simulator", params={"seed": 0}
+        ) as simulator:
+            stats = simulator.rollouts(policy, 2000, seed=1)
+            self.assertEqual(stats.num_rollouts, 2000)
+            self.assertEqual(stats.truncated, 0)
+            parallel_stats = simulator.rollouts(policy, 2000, processes=3, seed=1)
+            self.assertEqual(parallel_stats.successes, stats.successes)
+            self.assertAlmostEqual(parallel_stats.cost_mean, stats.cost_mean)
+            truncated = simulator.rollouts(policy, 100, max_steps=2)
+            self.assertEqual(truncated.successes, 0)
+            self.assertGreater(truncated.truncated, 0)
+            with self.assertRaises(UPUsageError):
+                simulator.rollouts(policy, 0)
+
+        # the confidence intervals contain the exact values
+        evaluation = PolicyEvaluator(problem).evaluate(policy)
+        low, high = stats.success_interval
+        self.assertTrue(low <= evaluation.success_probability <= high)
+        low, high = stats.cost_interval
+        self.assertTrue(low <= evaluation.expected_cost <= high)
+
+    def test_rollouts_killed_worker(self):
+        problem = self._coins_problem()
+        simulator = UPStochasticSimulator(problem, seed=0)
+        parent_pid = os.getpid()
+
+        def policy(state):
+            if os.getpid() != parent_pid:
+                # the worker processes die without returning their results
+                os._exit(1)
+            return None
+
+        with self.assertRaises(BrokenProcessPool):
+            simulator.rollouts(policy, 10, processes=2)
+
+
+if __name__ == "__main__":
+    main()
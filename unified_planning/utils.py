@@ -15,9 +15,18 @@
 """This module defines some utility functions."""
 
 from itertools import chain, combinations
+from typing import Iterator
 
 
 def powerset(iterable):
     "powerset([1,2,3]) --> () (1,) (2,) (3,) (1,2) (1,3) (2,3) (1,2,3)"
     s = list(iterable)
     return chain.from_iterable(combinations(s, r) for r in range(len(s) + 1))
+
+
+def set_bits(mask: int) -> Iterator[int]:
+    "set_bits(0b10110) --> 1 2 4"
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low